@@ -25,8 +25,10 @@ import json
 
 # Core Imports
 from .ai_providers import OpenAIEmbeddingProvider
+from .chunking import ChunkRecord, chunk_document
+from .config import get_enhanced_metadata_enabled
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client.models import Distance, FieldCondition, Filter, MatchValue, VectorParams, PointStruct
 
 # Enhanced Schemas Integration
 from .schemas_enhanced import (
@@ -49,6 +51,14 @@ except ImportError:
 
 logger = logging.getLogger("KI-QMS.AdvancedRAG")
 
+def _matches_chunks(chunks_metadata: Optional[List[EnhancedChunkMetadata]], records: List[ChunkRecord]) -> bool:
+    """True, wenn übergebene Chunk-Metadaten exakt dieselben Chunks (Index + Offsets) beschreiben."""
+    if not chunks_metadata:
+        return False
+    return [(chunk.chunk_index, chunk.char_start, chunk.char_end) for chunk in chunks_metadata] == [
+        (record.index, record.start, record.end) for record in records
+    ]
+
 @dataclass
 class SearchResult:
     """Strukturiertes Suchergebnis mit erweiterten Metadaten"""
@@ -86,21 +96,31 @@ class AdvancedChunker:
         self.chunk_size = chunk_size
         self.overlap = overlap
     
-    def hierarchical_chunk(self, content: str, title: str = "") -> List[Dict]:
-        """Hierarchical Chunking mit Kontext-Anreicherung"""
+    def hierarchical_chunk(self, content: str, title: str = "",
+                           records: Optional[List[ChunkRecord]] = None) -> List[Dict]:
+        """
+        Hierarchical Chunking mit Kontext-Anreicherung
+        
+        ``records``: bereits erstellte Chunks (chunk_document), z.B. die der
+        Enhanced Metadata Extraction - sonst werden sie hier erstellt.
+        """
         
         # 1. Strukturanalyse
         structure = self._analyze_structure(content)
         
         # 2. Primary Chunking
-        primary_chunks = self._create_base_chunks(content)
+        if records is None:
+            records = self._create_base_chunks(content)
+        primary_chunks = [record.text for record in records]
         
         # 3. Erweiterte Chunks mit Metadaten
         enhanced_chunks = []
         for i, chunk in enumerate(primary_chunks):
             enhanced_chunk = {
                 "content": chunk,
-                "chunk_index": i,
+                "chunk_index": records[i].index,
+                "char_start": records[i].start,
+                "char_end": records[i].end,
                 "section": self._find_section(chunk, structure),
                 "keywords": self._extract_keywords(chunk),
                 "importance_score": self._calculate_importance(chunk, title),
@@ -133,36 +153,9 @@ class AdvancedChunker:
         
         return structure
     
-    def _create_base_chunks(self, content: str) -> List[str]:
-        """Erstellt Basis-Chunks mit intelligenten Trennungen"""
-        # Hierarchical Separators
-        separators = [
-            '\n\n\n',  # Section breaks
-            '\n\n',    # Paragraph breaks
-            '\n',      # Line breaks
-            '. ',      # Sentence breaks
-            ' ',       # Word breaks
-            ''         # Character breaks
-        ]
-        
-        chunks = []
-        current_chunk = ""
-        
-        # Split by paragraphs first
-        paragraphs = content.split('\n\n')
-        
-        for paragraph in paragraphs:
-            if len(current_chunk + paragraph) <= self.chunk_size:
-                current_chunk += paragraph + '\n\n'
-            else:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = paragraph + '\n\n'
-        
-        if current_chunk:
-            chunks.append(current_chunk.strip())
-        
-        return chunks
+    def _create_base_chunks(self, content: str) -> List[ChunkRecord]:
+        """Erstellt Basis-Chunks (Absätze bis chunk_size, exakte Offsets)"""
+        return chunk_document(content, self.chunk_size)
     
     def _find_section(self, chunk: str, structure: Dict) -> str:
         """Findet zugehörige Sektion"""
@@ -322,6 +315,12 @@ class AdvancedRAGEngine:
         """
         🔧 Erweiterte Dokumenten-Indexierung mit Enhanced Metadata Extraction
         
+        Enthält ``metadata`` bereits ``enhanced_metadata``/``chunk_metadata``
+        aus dem Upload und passen deren Offsets zu den eigenen Chunks, werden
+        sie übernommen statt erneut per LLM extrahiert (Extraktion nur mit
+        ENHANCED_METADATA_EXTRACTION). Beide Schlüssel landen nicht im
+        Punkt-Payload.
+        
         Returns:
             Dict mit Indexierungs-Statistiken und Enhanced Metadata
         """
@@ -334,48 +333,58 @@ class AdvancedRAGEngine:
             if not self.client or not self.embedding_model or not self.chunker:
                 raise RuntimeError("Engine nicht vollständig initialisiert")
             
-            # 1. Enhanced Metadata Extraction (falls verfügbar)
-            enhanced_metadata = None
-            enhanced_response = None
-            if ENHANCED_METADATA_AVAILABLE:
+            # 1. Chunking - einmal pro Dokument, für Metadaten und Embeddings
+            records = chunk_document(content, self.chunk_size)
+            
+            # 2. Enhanced Metadata: aus dem Upload übernehmen oder extrahieren (falls verfügbar)
+            metadata = dict(metadata or {})
+            enhanced_metadata = metadata.pop("enhanced_metadata", None)
+            chunks_metadata = metadata.pop("chunk_metadata", None)
+            if enhanced_metadata is not None and _matches_chunks(chunks_metadata, records):
+                logger.info(f"♻️ Enhanced Metadata aus dem Upload übernommen ({len(chunks_metadata)} Chunks)")
+            elif ENHANCED_METADATA_AVAILABLE and get_enhanced_metadata_enabled():
+                enhanced_metadata = chunks_metadata = None
                 try:
                     logger.info(f"🎯 Starte Enhanced Metadata Extraction für '{title}'")
                     enhanced_response = await extract_enhanced_metadata(
                         content=content,
                         document_title=title,
-                        document_type_hint=document_type
+                        document_type_hint=document_type,
+                        chunks=records
                     )
                     enhanced_metadata = enhanced_response.metadata
+                    chunks_metadata = enhanced_response.chunks_metadata
                     logger.info(f"✅ Enhanced Metadata extrahiert mit Konfidenz: {enhanced_metadata.ai_confidence}")
                 except Exception as e:
                     logger.warning(f"⚠️ Enhanced Metadata Extraction fehlgeschlagen: {e}")
-            
-            # 2. Advanced Chunking (mit Enhanced Metadata falls verfügbar)
-            if enhanced_metadata and enhanced_response and enhanced_response.chunks_metadata:
-                # Verwende Enhanced Chunks
-                enhanced_chunks = enhanced_response.chunks_metadata
-                chunks = []
-                for i, enhanced_chunk in enumerate(enhanced_chunks):
-                    chunk_data = {
-                        "content": content[i*800:(i+1)*800],  # Approximation
-                        "chunk_index": enhanced_chunk.chunk_index,
-                        "section": enhanced_chunk.section_title or "",
-                        "keywords": [kw.term for kw in enhanced_chunk.keywords],
-                        "importance_score": enhanced_chunk.importance_score,
-                        "context_before": "",
-                        "context_after": "",
-                        "full_paragraph": content[i*800:(i+1)*800],
-                        "page_estimate": enhanced_chunk.page_number or 1,
-                        "enhanced_metadata": enhanced_chunk
-                    }
-                    chunks.append(chunk_data)
-                logger.info(f"📝 {len(chunks)} Enhanced Chunks verwendet")
             else:
-                # Fallback zu Standard Chunking
-                chunks = self.chunker.hierarchical_chunk(content, title)
+                enhanced_metadata = chunks_metadata = None
+            
+            # 3. Advanced Chunking (mit Enhanced Metadata falls verfügbar)
+            chunks = self.chunker.hierarchical_chunk(content, title, records)
+            if enhanced_metadata and chunks_metadata:
+                # Enhanced Chunk-Metadaten über chunk_index auf dieselben Chunks legen
+                enhanced_by_index = {
+                    enhanced_chunk.chunk_index: enhanced_chunk
+                    for enhanced_chunk in chunks_metadata
+                }
+                for chunk_data in chunks:
+                    enhanced_chunk = enhanced_by_index.get(chunk_data["chunk_index"])
+                    if enhanced_chunk is None:
+                        continue
+                    if enhanced_chunk.section_title:
+                        chunk_data["section"] = enhanced_chunk.section_title
+                    if enhanced_chunk.keywords:
+                        chunk_data["keywords"] = [kw.term for kw in enhanced_chunk.keywords]
+                    chunk_data["importance_score"] = enhanced_chunk.importance_score
+                    if enhanced_chunk.page_number:
+                        chunk_data["page_estimate"] = enhanced_chunk.page_number
+                    chunk_data["enhanced_metadata"] = enhanced_chunk
+                logger.info(f"📝 {len(chunks)} Chunks mit {len(enhanced_by_index)} Enhanced Chunk-Metadaten")
+            else:
                 logger.info(f"📝 {len(chunks)} Standard Chunks erstellt für Dokument {document_id}")
             
-            # 3. OpenAI Embeddings und Indexierung
+            # 4. OpenAI Embeddings und Indexierung
             points = []
             chunk_texts = [chunk_data["content"] for chunk_data in chunks]
             embeddings = await self.embedding_model.encode(chunk_texts)
@@ -395,6 +404,8 @@ class AdvancedRAGEngine:
                     "title": title,
                     "content": chunk_data["content"],
                     "chunk_index": chunk_data["chunk_index"],
+                    "char_start": chunk_data["char_start"],
+                    "char_end": chunk_data["char_end"],
                     "document_type": document_type,
                     "section": chunk_data["section"],
                     "keywords": chunk_data["keywords"],
@@ -403,7 +414,7 @@ class AdvancedRAGEngine:
                     "context_after": chunk_data.get("context_after", ""),
                     "full_paragraph": chunk_data.get("full_paragraph", chunk_data["content"]),
                     "page_number": chunk_data.get("page_estimate", 1),
-                    **(metadata or {})
+                    **metadata
                 }
                 
                 # Enhanced Metadata hinzufügen falls verfügbar
@@ -457,7 +468,7 @@ class AdvancedRAGEngine:
                     "metadata": payload
                 })
             
-            # 4. Upsert zu Qdrant
+            # 5. Upsert zu Qdrant
             if points:
                 self.client.upsert(
                     collection_name=self.collection_name,
@@ -469,7 +480,7 @@ class AdvancedRAGEngine:
             
             processing_time = time.time() - start_time
             
-            # 5. Enhanced Response
+            # 6. Enhanced Response
             response = {
                 "success": True,
                 "document_id": document_id,
@@ -808,6 +819,90 @@ class AdvancedRAGEngine:
                 "engine_type": "advanced_rag_openai_enterprise"
             }
 
+    async def copy_document_index(
+        self,
+        source_document_id: int,
+        document_id: int,
+        title: str,
+        document_type: str = "OTHER",
+        metadata: Optional[Dict] = None
+    ) -> Dict:
+        """
+        ♻️ Übernimmt die Vektoren eines inhaltsgleichen Dokuments (gleicher SHA-256)
+        
+        Keine Embeddings und keine Enhanced-Metadaten-Requests: Die Punkte des
+        Quelldokuments werden mit neuer Dokument-ID und neuem Payload kopiert.
+        
+        Returns:
+            Dict mit Statistiken - ``points_indexed == 0``, wenn das
+            Quelldokument nicht indexiert ist
+        """
+        start_time = time.time()
+        
+        try:
+            if not self.is_initialized:
+                await self.initialize()
+            
+            metadata = dict(metadata or {})
+            metadata.pop("enhanced_metadata", None)
+            metadata.pop("chunk_metadata", None)
+            source_filter = Filter(must=[
+                FieldCondition(key="document_id", match=MatchValue(value=source_document_id))
+            ])
+            
+            points = []
+            offset = None
+            while True:
+                records, offset = self.client.scroll(
+                    collection_name=self.collection_name,
+                    scroll_filter=source_filter,
+                    limit=256,
+                    offset=offset,
+                    with_payload=True,
+                    with_vectors=True
+                )
+                for record in records:
+                    payload = {
+                        **record.payload,
+                        **metadata,
+                        "document_id": document_id,
+                        "title": title,
+                        "document_type": document_type
+                    }
+                    point_id = document_id * 1000 + payload["chunk_index"]
+                    points.append(PointStruct(id=point_id, vector=record.vector, payload=payload))
+                    self.document_store.append({
+                        "id": str(point_id),
+                        "content": payload["content"],
+                        "metadata": payload
+                    })
+                if offset is None:
+                    break
+            
+            if points:
+                self.client.upsert(collection_name=self.collection_name, points=points)
+                logger.info(f"♻️ {len(points)} Punkte von Dokument {source_document_id} für Dokument {document_id} übernommen")
+            
+            return {
+                "success": True,
+                "document_id": document_id,
+                "source_document_id": source_document_id,
+                "chunks_created": len(points),
+                "points_indexed": len(points),
+                "processing_time": time.time() - start_time,
+                "methodology": "copied_vectors_from_identical_content"
+            }
+            
+        except Exception as e:
+            processing_time = time.time() - start_time
+            logger.error(f"❌ Übernahme der Vektoren fehlgeschlagen: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "processing_time": processing_time,
+                "methodology": "copied_vectors_from_identical_content"
+            }
+    
 # Global Instance
 advanced_rag_engine = AdvancedRAGEngine()
 
@@ -14,7 +14,7 @@ import logging
 from .database import get_db
 from .auth import get_current_active_user
 from .models import User as UserModel
-from .text_extraction import extract_text_from_file
+from .text_extraction import extract_text_from_file_async
 from .ai_metadata_extractor import extract_document_metadata
 
 logger = logging.getLogger("KI-QMS.AIEndpoints")
@@ -51,7 +51,7 @@ async def extract_metadata_endpoint(
         # Text extrahieren
         extracted_text = ""
         try:
-            extracted_text = extract_text_from_file(str(temp_file_path), file.content_type or "application/octet-stream")
+            extracted_text = await extract_text_from_file_async(str(temp_file_path), file.content_type or "application/octet-stream")
             logger.info(f"Text extrahiert: {len(extracted_text)} Zeichen")
         except Exception as e:
             logger.warning(f"Text-Extraktion fehlgeschlagen: {e}")
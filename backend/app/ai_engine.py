@@ -14,8 +14,9 @@ Features:
 
 import re
 import string
-from typing import Dict, List, Tuple, Optional, Union, Any
-from dataclasses import dataclass
+from collections import Counter
+from typing import Dict, List, Tuple, Optional, Union, Any, Iterable, Set
+from dataclasses import dataclass, field
 from enum import Enum
 import logging
 from .config import get_provider_fallback_chain
@@ -31,6 +32,13 @@ except ImportError:
     OpenAI4oMiniProvider = None
     GoogleGeminiProvider = None
 
+# Aho-Corasick für den Multi-Pattern-Matcher (optional, sonst Trie-Regex)
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 # Enhanced Logging Setup für besseres Debugging
 logging.basicConfig(level=logging.INFO)
 
@@ -98,6 +106,168 @@ class AIAnalysisResult:
     # Ähnlichkeitsanalyse
     potential_duplicates: List[Dict[str, Union[int, str, float]]]
 
+# Wort-Tokenisierung (identisch zu den bisherigen re.findall-Aufrufen)
+_WORD_RE = re.compile(r'\b\w+\b')
+_NUMBERING_RE = re.compile(r'\d+\.')
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+
+# Einfache Stopword-Liste für Ähnlichkeitsvergleiche
+SIMILARITY_STOPWORDS = {'der', 'die', 'das', 'und', 'oder', 'the', 'and', 'or', 'of', 'to', 'in'}
+_UPPERCASE_RE = re.compile(r'[A-Z]')
+
+
+def similarity_tokens(text: str) -> Set[str]:
+    """
+    Normalisierte Wortmenge für Ähnlichkeitsvergleiche
+    
+    Lowercase, Interpunktion entfernt, ohne Stopwords und Wörter ≤ 2 Zeichen.
+    Grundlage für die Jaccard-Ähnlichkeit und die MinHash-Signaturen.
+    """
+    words = _PUNCTUATION_RE.sub(' ', text.lower()).split()
+    return {w for w in words if w not in SIMILARITY_STOPWORDS and len(w) > 2}
+
+
+def _build_trie_pattern(terms: Iterable[str]) -> str:
+    """
+    Baut aus Literal-Begriffen ein Trie-förmiges Regex-Muster.
+    
+    Gemeinsame Präfixe werden nur einmal geprüft und optionale Fortsetzungen
+    sind greedy - an jeder Position matcht damit der längste Begriff.
+    """
+    trie: Dict[str, Dict] = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    
+    def _node_pattern(node: Dict[str, Dict]) -> str:
+        branches = [re.escape(char) + _node_pattern(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+    
+    return _node_pattern(trie)
+
+
+class CompiledTermMatcher:
+    """
+    ⚡ Vorkompilierter Multi-Pattern-Matcher für Literal-Begriffe
+    
+    Alle Begriffe werden einmalig in einen Aho-Corasick-Automaten
+    (pyahocorasick, falls installiert) bzw. in ein Trie-Regex innerhalb eines
+    Lookaheads kompiliert. Ein Durchlauf über den Text liefert für jeden
+    Begriff die Anzahl nicht-überlappender Vorkommen - exakt wie
+    ``text_lower.count(term)``, aber ohne einen Textdurchlauf pro Begriff.
+    """
+    
+    def __init__(self, terms: Iterable[str]):
+        self.terms = sorted({term.lower() for term in terms if term})
+        self._automaton = None
+        self._regex = None
+        
+        if AHOCORASICK_AVAILABLE and self.terms:
+            self._automaton = ahocorasick.Automaton()
+            for term in self.terms:
+                self._automaton.add_word(term, term)
+            self._automaton.make_automaton()
+        elif self.terms:
+            # Zu jedem Begriff alle Begriffe, die Präfix davon sind (inkl. selbst)
+            self._prefix_terms = {
+                term: [other for other in self.terms if term.startswith(other)]
+                for term in self.terms
+            }
+            self._regex = re.compile('(?=(' + _build_trie_pattern(self.terms) + '))')
+    
+    def _iter_occurrences(self, text_lower: str):
+        """Liefert (Startposition, Begriff) für alle - auch überlappenden - Vorkommen."""
+        if self._automaton is not None:
+            for end_index, term in self._automaton.iter(text_lower):
+                yield end_index - len(term) + 1, term
+        elif self._regex is not None:
+            for match in self._regex.finditer(text_lower):
+                position = match.start()
+                for term in self._prefix_terms[match.group(1)]:
+                    yield position, term
+    
+    def count(self, text_lower: str) -> Dict[str, int]:
+        """Zählt alle Begriffe in einem Durchlauf (Text muss lowercase sein)."""
+        counts = dict.fromkeys(self.terms, 0)
+        if not text_lower:
+            return counts
+        
+        next_free = {}
+        for position, term in self._iter_occurrences(text_lower):
+            # Nicht-überlappende Zählung wie str.count()
+            if position >= next_free.get(term, 0):
+                counts[term] += 1
+                next_free[term] = position + len(term)
+        return counts
+
+
+class CompiledNormMatcher:
+    """
+    📋 Alle Norm-Regexes als eine einzige Alternation
+    
+    Die Patterns sind lowercase formuliert und beginnen jeweils mit einem
+    Literal; die kombinierte Alternation wird case-sensitiv gegen
+    ``text.lower()`` ausgeführt. So kann die Regex-Engine direkt zu
+    Kandidaten-Zeichen springen, statt an jeder Position alle Patterns zu
+    probieren. Das getroffene Pattern wird nur für echte Treffer ermittelt.
+    """
+    
+    def __init__(self, norm_patterns: Dict[str, Dict[str, str]]):
+        self._patterns = [re.compile(pattern) for pattern in norm_patterns]
+        self._patterns_ignorecase = [re.compile(pattern, re.IGNORECASE) for pattern in norm_patterns]
+        self._norm_infos = list(norm_patterns.values())
+        self._regex = re.compile('|'.join(norm_patterns)) if norm_patterns else None
+    
+    def find_all(self, text: str, text_lower: Optional[str] = None) -> List[Tuple[Any, Dict[str, str]]]:
+        """
+        Liefert (Match, Norm-Info) für alle Norm-Referenzen im Text,
+        sortiert nach Pattern-Reihenfolge und Position (wie die Einzel-Scans).
+        """
+        if not self._regex or not text:
+            return []
+        text_lower = text.lower() if text_lower is None else text_lower
+        
+        if len(text_lower) != len(text):
+            # Unicode-Sonderfälle (lower() ändert die Länge): Offsets nicht
+            # übertragbar, daher klassisch je Pattern auf dem Originaltext
+            return [(match, info) for regex, info in zip(self._patterns_ignorecase, self._norm_infos)
+                    for match in regex.finditer(text)]
+        
+        matches = []
+        for combined_match in self._regex.finditer(text_lower):
+            position = combined_match.start()
+            # Erstes Pattern, das hier matcht = Alternative der Alternation
+            index = next(i for i, regex in enumerate(self._patterns) if regex.match(text_lower, position))
+            # Match auf dem Originaltext, damit matched_text die Schreibweise behält
+            match = self._patterns_ignorecase[index].match(text, position)
+            matches.append((index, match))
+        matches.sort(key=lambda item: item[0])
+        return [(match, self._norm_infos[index]) for index, match in matches]
+
+
+@dataclass
+class TextScan:
+    """Ergebnis eines einzelnen Scans: alle Wort-, Begriffs- und Norm-Treffer"""
+    text_lower: str
+    word_counts: Counter
+    word_total: int
+    term_counts: Dict[str, int]
+    norm_matches: List[Tuple[Any, Dict[str, str]]] = field(default_factory=list)
+    
+    def count(self, term: str) -> int:
+        """Anzahl nicht-überlappender Vorkommen eines registrierten Begriffs"""
+        return self.term_counts.get(term.lower(), 0)
+    
+    def contains(self, term: str) -> bool:
+        return self.count(term) > 0
+
+
 class AdvancedAIEngine:
     """
     🤖 Fortgeschrittene KI-Engine mit Multi-Provider Support
@@ -109,11 +279,28 @@ class AdvancedAIEngine:
     4. Rule-based Fallback
     """
     
+    # Begriffslisten der regelbasierten Bewertung (im Matcher mitkompiliert)
+    QUALITY_TECHNICAL_TERMS = ['verfahren', 'process', 'anforderung', 'requirement',
+                               'prüfung', 'testing', 'dokumentation', 'documentation']
+    COMPLETENESS_INDICATORS = ['zweck', 'purpose', 'anwendungsbereich', 'scope',
+                               'verantwortlichkeit', 'responsibility', 'verfahren', 'procedure']
+    COMPLEXITY_TECHNICAL_INDICATORS = ['verfahren', 'prozess', 'system', 'anforderung',
+                                       'spezifikation', 'validierung', 'kalibrierung']
+    RISK_TERMS = ['risiko', 'risk']
+    SAFETY_TERMS = ['sicherheit', 'safety']
+    
     def __init__(self):
         self.logger = logging.getLogger("KI-QMS.AIEngine")
         self.ai_providers = {}
         self._setup_providers()
         
+        # Pattern-Tabellen laden und einmalig kompilieren
+        self._init_language_patterns()
+        self._init_document_type_patterns()
+        self._init_norm_patterns()
+        self._init_compliance_keywords()
+        self._init_matchers()
+        
     def _setup_providers(self):
         """Initialisiert verfügbare KI-Provider"""
         try:
@@ -336,61 +523,66 @@ class AdvancedAIEngine:
         }
     
     def _init_norm_patterns(self):
-        """Initialisiert Norm-Erkennungspatterns"""
+        """
+        Initialisiert Norm-Erkennungspatterns
+        
+        Lowercase und mit Literal am Anfang jeder Alternative: Die Patterns
+        werden im CompiledNormMatcher kombiniert gegen text.lower() gematcht.
+        """
         self.norm_patterns = {
             # ISO Normen
-            r'ISO\s*13485(?::?\s*(\d{4}))?': {
+            r'iso\s*13485(?::?\s*(\d{4}))?': {
                 'name': 'ISO 13485',
                 'type': 'medical_devices_qms',
                 'description': 'Medical devices - Quality management systems'
             },
-            r'ISO\s*14971(?::?\s*(\d{4}))?': {
+            r'iso\s*14971(?::?\s*(\d{4}))?': {
                 'name': 'ISO 14971', 
                 'type': 'risk_management',
                 'description': 'Medical devices - Application of risk management'
             },
-            r'ISO\s*9001(?::?\s*(\d{4}))?': {
+            r'iso\s*9001(?::?\s*(\d{4}))?': {
                 'name': 'ISO 9001',
                 'type': 'quality_management',
                 'description': 'Quality management systems - Requirements'
             },
-            r'ISO\s*27001(?::?\s*(\d{4}))?': {
+            r'iso\s*27001(?::?\s*(\d{4}))?': {
                 'name': 'ISO 27001',
                 'type': 'information_security',
                 'description': 'Information security management systems'
             },
             
             # EU Regulierungen
-            r'(?:EU\s*)?MDR\s*(?:2017/745|745/2017)': {
+            r'eu\s*mdr\s*(?:2017/745|745/2017)|mdr\s*(?:2017/745|745/2017)': {
                 'name': 'EU MDR 2017/745',
                 'type': 'medical_device_regulation',
                 'description': 'European Medical Device Regulation'
             },
-            r'(?:EU\s*)?IVDR\s*(?:2017/746|746/2017)': {
+            r'eu\s*ivdr\s*(?:2017/746|746/2017)|ivdr\s*(?:2017/746|746/2017)': {
                 'name': 'EU IVDR 2017/746',
                 'type': 'ivd_regulation', 
                 'description': 'In Vitro Diagnostic Medical Devices Regulation'
             },
             
             # FDA Regulierungen
-            r'(?:FDA\s*)?21\s*CFR\s*(?:Part\s*)?820': {
+            r'fda\s*21\s*cfr\s*(?:part\s*)?820|21\s*cfr\s*(?:part\s*)?820': {
                 'name': 'FDA 21 CFR Part 820',
                 'type': 'quality_system_regulation',
                 'description': 'Quality System Regulation'
             },
-            r'(?:FDA\s*)?21\s*CFR\s*(?:Part\s*)?11': {
+            r'fda\s*21\s*cfr\s*(?:part\s*)?11|21\s*cfr\s*(?:part\s*)?11': {
                 'name': 'FDA 21 CFR Part 11',
                 'type': 'electronic_records',
                 'description': 'Electronic Records; Electronic Signatures'
             },
             
             # IEC Normen
-            r'IEC\s*62304(?::?\s*(\d{4}))?': {
+            r'iec\s*62304(?::?\s*(\d{4}))?': {
                 'name': 'IEC 62304',
                 'type': 'medical_software',
                 'description': 'Medical device software - Software life cycle processes'
             },
-            r'IEC\s*60601(?:-\d+)?(?:-\d+)?(?::?\s*(\d{4}))?': {
+            r'iec\s*60601(?:-\d+)?(?:-\d+)?(?::?\s*(\d{4}))?': {
                 'name': 'IEC 60601',
                 'type': 'medical_electrical_equipment',
                 'description': 'Medical electrical equipment'
@@ -427,7 +619,48 @@ class AdvancedAIEngine:
             ]
         }
 
-    def detect_language(self, text: str) -> Tuple[DocumentLanguage, float, Dict[str, float]]:
+    def _init_matchers(self):
+        """Kompiliert alle Begriffs- und Norm-Patterns in je einen Matcher"""
+        terms = []
+        for patterns in self.language_patterns.values():
+            terms.extend(patterns['medical_terms'])
+            terms.extend(patterns['qms_terms'])
+        for patterns in self.document_type_patterns.values():
+            terms.extend(patterns['keywords'])
+            terms.extend(patterns['indicators'])
+            terms.extend(patterns['structure_hints'])
+        for keywords in self.compliance_keywords.values():
+            terms.extend(keywords)
+        terms.extend(self.QUALITY_TECHNICAL_TERMS)
+        terms.extend(self.COMPLETENESS_INDICATORS)
+        terms.extend(self.COMPLEXITY_TECHNICAL_INDICATORS)
+        terms.extend(self.RISK_TERMS)
+        terms.extend(self.SAFETY_TERMS)
+        
+        self.term_matcher = CompiledTermMatcher(terms)
+        self.norm_matcher = CompiledNormMatcher(self.norm_patterns)
+        self.logger.info(f"⚡ Matcher kompiliert: {len(self.term_matcher.terms)} Begriffe, {len(self.norm_patterns)} Norm-Patterns")
+    
+    def scan_text(self, text: str) -> TextScan:
+        """
+        ⚡ Scannt den Text einmal und liefert alle Wort-, Begriffs- und Norm-Treffer
+        
+        Das Ergebnis kann an detect_language, classify_document_type_advanced,
+        extract_norm_references usw. übergeben werden, damit der Text nicht
+        pro Analyse-Schritt erneut durchsucht wird.
+        """
+        text = text or ""
+        text_lower = text.lower()
+        words = _WORD_RE.findall(text_lower)
+        return TextScan(
+            text_lower=text_lower,
+            word_counts=Counter(words),
+            word_total=len(words),
+            term_counts=self.term_matcher.count(text_lower),
+            norm_matches=self.norm_matcher.find_all(text, text_lower)
+        )
+    
+    def detect_language(self, text: str, scan: Optional[TextScan] = None) -> Tuple[DocumentLanguage, float, Dict[str, float]]:
         """
         🌍 Erkennt die Sprache eines Dokuments mit Konfidenz-Score
         
@@ -441,11 +674,11 @@ class AdvancedAIEngine:
         if not text or len(text.strip()) < 50:
             return DocumentLanguage.UNKNOWN, 0.0, {}
         
-        # Text normalisieren
-        text_lower = text.lower()
-        words = re.findall(r'\b\w+\b', text_lower)
+        # Text normalisieren (einmaliger Scan)
+        scan = scan or self.scan_text(text)
+        total_words = scan.word_total
         
-        if len(words) < 10:
+        if total_words < 10:
             return DocumentLanguage.UNKNOWN, 0.0, {}
         
         language_scores = {}
@@ -457,23 +690,23 @@ class AdvancedAIEngine:
             
             # Common words checken
             for word in patterns['common_words']:
-                count = words.count(word)
+                count = scan.word_counts.get(word, 0)
                 score += count * 2.0
                 word_count += count
             
             # Medical terms checken  
             for term in patterns['medical_terms']:
-                if term in text_lower:
+                if scan.contains(term):
                     score += 3.0
                     
             # QMS terms checken
             for term in patterns['qms_terms']:
-                if term in text_lower:
+                if scan.contains(term):
                     score += 2.0
             
             # Normalisieren basierend auf Textlänge
-            if len(words) > 0:
-                language_scores[lang.value] = min(score / len(words) * 100, 100.0)
+            if total_words > 0:
+                language_scores[lang.value] = min(score / total_words * 100, 100.0)
             else:
                 language_scores[lang.value] = 0.0
         
@@ -495,7 +728,7 @@ class AdvancedAIEngine:
         
         return detected_lang, confidence, language_scores
 
-    def classify_document_type_advanced(self, text: str, filename: str = "") -> Tuple[str, float, List[Tuple[str, float]]]:
+    def classify_document_type_advanced(self, text: str, filename: str = "", scan: Optional[TextScan] = None) -> Tuple[str, float, List[Tuple[str, float]]]:
         """
         📊 Erweiterte Dokumenttyp-Klassifikation mit 95%+ Genauigkeit
         
@@ -510,7 +743,7 @@ class AdvancedAIEngine:
         if not text:
             return "OTHER", 0.0, []
         
-        text_lower = text.lower()
+        scan = scan or self.scan_text(text)
         filename_lower = filename.lower() if filename else ""
         
         type_scores = {}
@@ -521,7 +754,7 @@ class AdvancedAIEngine:
             
             # Keywords im Text suchen
             for keyword in patterns['keywords']:
-                keyword_count = text_lower.count(keyword.lower())
+                keyword_count = scan.count(keyword)
                 score += keyword_count * 5.0
                 
                 # Bonus für Keywords im Dateinamen
@@ -530,12 +763,12 @@ class AdvancedAIEngine:
             
             # Indicators suchen
             for indicator in patterns['indicators']:
-                if indicator.lower() in text_lower:
+                if scan.contains(indicator):
                     score += 3.0
             
             # Strukturelle Hinweise
             for hint in patterns['structure_hints']:
-                hint_count = text_lower.count(hint.lower())
+                hint_count = scan.count(hint)
                 score += hint_count * 2.0
             
             # Normalisierung basierend auf Textlänge
@@ -560,7 +793,7 @@ class AdvancedAIEngine:
         
         return best_type, confidence, alternatives
 
-    def extract_norm_references(self, text: str) -> List[Dict[str, Union[str, float]]]:
+    def extract_norm_references(self, text: str, scan: Optional[TextScan] = None) -> List[Dict[str, Union[str, float]]]:
         """
         📋 Extrahiert Norm-Referenzen mit Konfidenz-Scores
         
@@ -571,39 +804,37 @@ class AdvancedAIEngine:
             List[Dict]: Liste erkannter Norm-Referenzen
         """
         norm_references = []
+        norm_matches = scan.norm_matches if scan is not None else self.norm_matcher.find_all(text or "")
         
-        for pattern, norm_info in self.norm_patterns.items():
-            matches = re.finditer(pattern, text, re.IGNORECASE)
+        for match, norm_info in norm_matches:
+            # Kontext um die Referenz extrahieren
+            start = max(0, match.start() - 50)
+            end = min(len(text), match.end() + 50)
+            context = text[start:end].strip()
             
-            for match in matches:
-                # Kontext um die Referenz extrahieren
-                start = max(0, match.start() - 50)
-                end = min(len(text), match.end() + 50)
-                context = text[start:end].strip()
-                
-                # Konfidenz basierend auf Kontext bewerten
-                confidence = 0.8  # Basis-Konfidenz für Regex-Match
-                
-                # Bonus für relevante Kontextwörter
-                context_lower = context.lower()
-                if any(word in context_lower for word in ['gemäß', 'according', 'conform', 'compliant']):
-                    confidence += 0.1
-                if any(word in context_lower for word in ['anforderung', 'requirement', 'standard']):
-                    confidence += 0.1
-                
-                confidence = min(confidence, 1.0)
-                
-                norm_ref = {
-                    'norm_name': norm_info['name'],
-                    'norm_type': norm_info['type'],
-                    'description': norm_info['description'],
-                    'matched_text': match.group(),
-                    'context': context,
-                    'confidence': confidence,
-                    'position': match.start()
-                }
-                
-                norm_references.append(norm_ref)
+            # Konfidenz basierend auf Kontext bewerten
+            confidence = 0.8  # Basis-Konfidenz für Regex-Match
+            
+            # Bonus für relevante Kontextwörter
+            context_lower = context.lower()
+            if any(word in context_lower for word in ['gemäß', 'according', 'conform', 'compliant']):
+                confidence += 0.1
+            if any(word in context_lower for word in ['anforderung', 'requirement', 'standard']):
+                confidence += 0.1
+            
+            confidence = min(confidence, 1.0)
+            
+            norm_ref = {
+                'norm_name': norm_info['name'],
+                'norm_type': norm_info['type'],
+                'description': norm_info['description'],
+                'matched_text': match.group(),
+                'context': context,
+                'confidence': confidence,
+                'position': match.start()
+            }
+            
+            norm_references.append(norm_ref)
         
         # Duplikate entfernen (gleiche Norm, verschiedene Positionen)
         unique_norms = {}
@@ -619,7 +850,7 @@ class AdvancedAIEngine:
         
         return result
 
-    def extract_compliance_keywords(self, text: str) -> List[str]:
+    def extract_compliance_keywords(self, text: str, scan: Optional[TextScan] = None) -> List[str]:
         """
         ⚖️ Extrahiert Compliance-relevante Keywords
         
@@ -629,17 +860,17 @@ class AdvancedAIEngine:
         Returns:
             List[str]: Liste erkannter Compliance-Keywords
         """
-        text_lower = text.lower()
+        scan = scan or self.scan_text(text)
         found_keywords = []
         
         for category, keywords in self.compliance_keywords.items():
             for keyword in keywords:
-                if keyword.lower() in text_lower:
+                if scan.contains(keyword):
                     if keyword not in found_keywords:
                         found_keywords.append(keyword)
         
         # Nach Häufigkeit sortieren
-        keyword_counts = [(kw, text_lower.count(kw.lower())) for kw in found_keywords]
+        keyword_counts = [(kw, scan.count(kw)) for kw in found_keywords]
         keyword_counts.sort(key=lambda x: x[1], reverse=True)
         
         result = [kw for kw, count in keyword_counts if count > 0]
@@ -661,19 +892,8 @@ class AdvancedAIEngine:
         if not text1 or not text2:
             return 0.0
         
-        # Texte normalisieren
-        def normalize_text(text):
-            # Zu Lowercase, Interpunktion entfernen
-            text = text.lower()
-            text = re.sub(r'[^\w\s]', ' ', text)
-            words = text.split()
-            # Stopwords entfernen (einfache Liste)
-            stopwords = {'der', 'die', 'das', 'und', 'oder', 'the', 'and', 'or', 'of', 'to', 'in'}
-            words = [w for w in words if w not in stopwords and len(w) > 2]
-            return set(words)
-        
-        words1 = normalize_text(text1)
-        words2 = normalize_text(text2)
+        words1 = similarity_tokens(text1)
+        words2 = similarity_tokens(text2)
         
         if not words1 or not words2:
             return 0.0
@@ -686,7 +906,7 @@ class AdvancedAIEngine:
         
         return similarity
 
-    def assess_content_quality(self, text: str) -> Tuple[float, float]:
+    def assess_content_quality(self, text: str, scan: Optional[TextScan] = None) -> Tuple[float, float]:
         """
         📈 Bewertet Inhaltsqualität und Vollständigkeit
         
@@ -712,24 +932,24 @@ class AdvancedAIEngine:
             completeness_score += 0.2
         
         # Strukturelle Elemente
-        if re.search(r'\d+\.', text):  # Nummerierung
+        if _NUMBERING_RE.search(text):  # Nummerierung
             quality_score += 0.1
             completeness_score += 0.1
         
-        if re.search(r'[A-Z][^.!?]*[.!?]', text):  # Vollständige Sätze
+        # Vollständige Sätze: Großbuchstabe vor dem letzten Satzzeichen
+        # (gleichwertig zu r'[A-Z][^.!?]*[.!?]', aber linear statt quadratisch)
+        last_terminator = max(text.rfind('.'), text.rfind('!'), text.rfind('?'))
+        if last_terminator > 0 and _UPPERCASE_RE.search(text, 0, last_terminator):
             quality_score += 0.1
         
         # Fachliche Begriffe
-        technical_terms = ['verfahren', 'process', 'anforderung', 'requirement', 
-                          'prüfung', 'testing', 'dokumentation', 'documentation']
-        term_count = sum(1 for term in technical_terms if term.lower() in text.lower())
+        scan = scan or self.scan_text(text)
+        term_count = sum(1 for term in self.QUALITY_TECHNICAL_TERMS if scan.contains(term))
         quality_score += min(term_count * 0.05, 0.2)
         
         # Vollständigkeitsindikatoren
-        completeness_indicators = ['zweck', 'purpose', 'anwendungsbereich', 'scope',
-                                 'verantwortlichkeit', 'responsibility', 'verfahren', 'procedure']
-        completeness_count = sum(1 for indicator in completeness_indicators 
-                               if indicator.lower() in text.lower())
+        completeness_count = sum(1 for indicator in self.COMPLETENESS_INDICATORS
+                               if scan.contains(indicator))
         completeness_score += min(completeness_count * 0.1, 0.5)
         
         # Scores begrenzen
@@ -753,25 +973,28 @@ class AdvancedAIEngine:
         """
         self.logger.info(f"🧠 Starte umfassende KI-Analyse für: {filename}")
         
+        # 0. Einmaliger Scan - alle folgenden Schritte arbeiten auf den Trefferzahlen
+        scan = self.scan_text(text)
+        
         # 1. Spracherkennung
-        language, lang_confidence, lang_details = self.detect_language(text)
+        language, lang_confidence, lang_details = self.detect_language(text, scan)
         
         # 2. Dokumenttyp-Klassifikation
-        doc_type, type_confidence, type_alternatives = self.classify_document_type_advanced(text, filename)
+        doc_type, type_confidence, type_alternatives = self.classify_document_type_advanced(text, filename, scan)
         
         # 3. Norm-Referenzen extrahieren
-        norm_refs = self.extract_norm_references(text)
+        norm_refs = self.extract_norm_references(text, scan)
         
         # 4. Compliance-Keywords
-        compliance_kw = self.extract_compliance_keywords(text)
+        compliance_kw = self.extract_compliance_keywords(text, scan)
         
         # 5. Erweiterte Metadaten
-        extracted_keywords = self._extract_keywords(text)
-        complexity_score = self._calculate_complexity_score(text)
-        risk_level = self._assess_risk_level(text, doc_type)
+        extracted_keywords = self._extract_keywords(text, scan)
+        complexity_score = self._calculate_complexity_score(text, scan)
+        risk_level = self._assess_risk_level(text, doc_type, scan)
         
         # 6. Qualitätsbewertung
-        quality_score, completeness_score = self.assess_content_quality(text)
+        quality_score, completeness_score = self.assess_content_quality(text, scan)
         
         # 7. Duplikatsprüfung
         potential_duplicates = []
@@ -810,15 +1033,10 @@ class AdvancedAIEngine:
         
         return result
 
-    def _extract_keywords(self, text: str) -> List[str]:
+    def _extract_keywords(self, text: str, scan: Optional[TextScan] = None) -> List[str]:
         """Extrahiert relevante Keywords aus dem Text"""
-        text_lower = text.lower()
-        words = re.findall(r'\b\w{4,}\b', text_lower)  # Wörter mit mind. 4 Buchstaben
-        
-        # Häufigkeit zählen
-        word_freq = {}
-        for word in words:
-            word_freq[word] = word_freq.get(word, 0) + 1
+        # Häufigkeit zählen (Wort-Counter aus dem Scan, Reihenfolge = erstes Vorkommen)
+        word_freq = (scan or self.scan_text(text)).word_counts
         
         # Top Keywords (min. 2x erwähnt)
         keywords = [word for word, freq in word_freq.items() 
@@ -827,7 +1045,7 @@ class AdvancedAIEngine:
         
         return keywords[:10]  # Top 10
 
-    def _calculate_complexity_score(self, text: str) -> int:
+    def _calculate_complexity_score(self, text: str, scan: Optional[TextScan] = None) -> int:
         """Berechnet Komplexitäts-Score (1-10)"""
         if not text:
             return 1
@@ -843,9 +1061,8 @@ class AdvancedAIEngine:
             score += 1
         
         # Technische Begriffe
-        technical_indicators = ['verfahren', 'prozess', 'system', 'anforderung', 
-                               'spezifikation', 'validierung', 'kalibrierung']
-        tech_count = sum(1 for term in technical_indicators if term in text.lower())
+        scan = scan or self.scan_text(text)
+        tech_count = sum(1 for term in self.COMPLEXITY_TECHNICAL_INDICATORS if scan.contains(term))
         score += min(tech_count, 3)
         
         # Norm-Referenzen
@@ -854,10 +1071,11 @@ class AdvancedAIEngine:
         
         return min(score, 10)
 
-    def _assess_risk_level(self, text: str, doc_type: str) -> str:
+    def _assess_risk_level(self, text: str, doc_type: str, scan: Optional[TextScan] = None) -> str:
         """Bewertet Risiko-Level basierend auf Inhalt und Typ"""
-        risk_indicators = text.lower().count('risiko') + text.lower().count('risk')
-        safety_indicators = text.lower().count('sicherheit') + text.lower().count('safety')
+        scan = scan or self.scan_text(text)
+        risk_indicators = sum(scan.count(term) for term in self.RISK_TERMS)
+        safety_indicators = sum(scan.count(term) for term in self.SAFETY_TERMS)
         
         # Dokumenttyp-basierte Risikobewertung
         high_risk_types = ['RISK_ASSESSMENT', 'VALIDATION_PROTOCOL', 'AUDIT_REPORT']
@@ -15,10 +15,13 @@ Version: 2.0 - Enterprise Grade
 """
 
 from typing import Dict, List, Optional, Any, Tuple
+import asyncio
 import logging
 import re
 import time
 import json
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
 from enum import Enum
 
@@ -26,8 +29,105 @@ from enum import Enum
 import google.generativeai as genai
 import os
 
+from .config import get_metadata_layer_concurrency, get_metadata_layer_timeout, get_metadata_extraction_mode
+from .json_parser import get_global_parser
+
 logger = logging.getLogger("KI-QMS.AdvancedMetadataExtractor")
 
+# Analyse-Layer: Prompt-Schlüssel → Schlüssel im Analyse-Ergebnis
+ANALYSIS_LAYERS = {
+    "document_analysis": "document_analysis",
+    "keyword_extraction": "keyword_analysis",
+    "structure_analysis": "structure_analysis",
+    "compliance_analysis": "compliance_analysis",
+    "quality_assessment": "quality_analysis",
+}
+
+# Pflichtfelder je Layer mit erwartetem Typ (Validierung der fusionierten Antwort)
+LAYER_FIELDS = {
+    "document_analysis": {
+        "document_type": str, "title": str, "description": str,
+        "main_category": str, "sub_category": str, "process_area": str,
+    },
+    "keyword_analysis": {
+        "primary_keywords": list, "secondary_keywords": list,
+        "qm_keywords": list, "compliance_keywords": list,
+    },
+    "structure_analysis": {
+        "sections_detected": list, "has_tables": bool, "has_figures": bool, "has_appendices": bool,
+    },
+    "compliance_analysis": {
+        "iso_standards_referenced": list, "regulatory_references": list, "compliance_areas": list,
+    },
+    "quality_analysis": {
+        "content_quality_score": (int, float), "completeness_score": (int, float), "clarity_score": (int, float),
+    },
+}
+
+# Token-Verbrauch der laufenden Extraktion (siehe track_token_usage)
+_token_usage: ContextVar[Optional[Dict[str, int]]] = ContextVar("metadata_token_usage", default=None)
+
+
+@contextmanager
+def track_token_usage():
+    """
+    Context Manager: summiert LLM-Aufrufe und Tokens aller Analysen im Block
+    (auch in parallelen Layer-Tasks).
+    
+    Yields:
+        Dict[str, int]: calls, prompt_tokens, output_tokens
+    """
+    usage = {"calls": 0, "prompt_tokens": 0, "output_tokens": 0}
+    token = _token_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _token_usage.reset(token)
+
+
+def _record_token_usage(response):
+    usage = _token_usage.get()
+    if usage is None:
+        return
+    usage["calls"] += 1
+    usage_metadata = getattr(response, "usage_metadata", None)
+    if usage_metadata is not None:
+        usage["prompt_tokens"] += getattr(usage_metadata, "prompt_token_count", 0) or 0
+        usage["output_tokens"] += getattr(usage_metadata, "candidates_token_count", 0) or 0
+
+
+def validate_layer_fields(layer_key: str, data: Any) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Prüft die Pflichtfelder eines Layer-Ergebnisses.
+    
+    Returns:
+        (gültige Felder inkl. Zusatzfelder, Namen fehlender/ungültiger Pflichtfelder)
+    """
+    spec = LAYER_FIELDS[layer_key]
+    if not isinstance(data, dict):
+        return {}, list(spec)
+    
+    valid = {}
+    failed = []
+    for field, value in data.items():
+        expected = spec.get(field)
+        # bool ist in Python ein int - Scores dürfen keine Booleans sein
+        if expected is not None and (not isinstance(value, expected) or (expected is not bool and isinstance(value, bool))):
+            continue
+        valid[field] = value
+    failed = [field for field in spec if field not in valid]
+    return valid, failed
+
+
+def layer_field_completeness(analysis_results: Dict[str, Any]) -> float:
+    """Anteil gültig gefüllter Pflichtfelder über alle Layer (0.0-1.0)."""
+    total = sum(len(spec) for spec in LAYER_FIELDS.values())
+    filled = sum(
+        len(LAYER_FIELDS[layer_key]) - len(validate_layer_fields(layer_key, analysis_results.get(layer_key))[1])
+        for layer_key in LAYER_FIELDS
+    )
+    return filled / total
+
 class DocumentTypeClassification(Enum):
     """Erweiterte Dokumenttyp-Klassifizierung"""
     # QM Core Documents
@@ -111,6 +211,7 @@ class AdvancedMetadata:
     # Version & Tracking
     extraction_version: str = "2.0"
     processed_timestamp: Optional[str] = None
+    token_usage: Optional[Dict[str, int]] = None
 
 class AdvancedAIMetadataExtractor:
     """
@@ -129,6 +230,9 @@ class AdvancedAIMetadataExtractor:
         self.is_initialized = False
         self.model_name = "gemini-1.5-flash"
         self.extraction_prompts = self._create_extraction_prompts()
+        self.layer_concurrency = get_metadata_layer_concurrency()
+        self.layer_timeout = get_metadata_layer_timeout()
+        self.extraction_mode = get_metadata_extraction_mode()
         
         # QM Domain Knowledge
         self.qm_patterns = self._initialize_qm_patterns()
@@ -149,7 +253,7 @@ class AdvancedAIMetadataExtractor:
             self.client = genai.GenerativeModel(self.model_name)
             
             # Test API Connection
-            test_response = self.client.generate_content("Test")
+            test_response = await self.client.generate_content_async("Test")
             logger.info(f"✅ Gemini API erfolgreich verbunden: {self.model_name}")
             
             self.is_initialized = True
@@ -285,6 +389,65 @@ JSON-Antwort:
     "overall_assessment": "...",
     "improvement_suggestions": [...]
 }}
+""",
+
+            # Alle fünf Layer in einem Request (Dokument wird nur einmal gesendet)
+            "fused_analysis": """
+Du bist ein Experte für Qualitätsmanagement-Systeme, Regulatory Affairs und
+Dokumentenanalyse. Analysiere das folgende Dokument in EINEM Durchgang auf
+fünf Ebenen.
+
+DOKUMENT:
+{content}
+
+ANALYSE-EBENEN:
+1. document_analysis: Dokumenttyp (QM_MANUAL, SOP, STANDARD_NORM, ...), offizieller
+   Titel, 2-3 Satz Beschreibung, Haupt-/Unterkategorie, Prozessbereich
+2. keyword_analysis: 3-5 Primary, 5-8 Secondary, QM- und Compliance-Keywords
+3. structure_analysis: Abschnitte/Kapitel, Tabellen, Abbildungen, Anhänge, Gliederung
+4. compliance_analysis: referenzierte ISO Standards, Regulatory Referenzen (FDA, MDR, ...),
+   Compliance-Bereiche
+5. quality_analysis: Inhaltsqualität, Vollständigkeit, Klarheit (je 0.0-1.0)
+
+Antworte ausschließlich mit einem JSON-Objekt in exakt dieser Struktur:
+{{
+    "document_analysis": {{
+        "document_type": "...",
+        "title": "...",
+        "description": "...",
+        "main_category": "...",
+        "sub_category": "...",
+        "process_area": "...",
+        "reasoning": "..."
+    }},
+    "keyword_analysis": {{
+        "primary_keywords": [...],
+        "secondary_keywords": [...],
+        "qm_keywords": [...],
+        "compliance_keywords": [...]
+    }},
+    "structure_analysis": {{
+        "sections_detected": [...],
+        "has_tables": true/false,
+        "has_figures": true/false,
+        "has_appendices": true/false,
+        "structure_type": "...",
+        "numbering_scheme": "..."
+    }},
+    "compliance_analysis": {{
+        "iso_standards_referenced": [...],
+        "regulatory_references": [...],
+        "compliance_areas": [...],
+        "standards_compliance_level": "..."
+    }},
+    "quality_analysis": {{
+        "content_quality_score": 0.0-1.0,
+        "completeness_score": 0.0-1.0,
+        "clarity_score": 0.0-1.0,
+        "overall_assessment": "...",
+        "improvement_suggestions": [...]
+    }}
+}}
 """
         }
     
@@ -335,7 +498,8 @@ JSON-Antwort:
         self, 
         content: str, 
         document_id: Optional[int] = None,
-        filename: Optional[str] = None
+        filename: Optional[str] = None,
+        mode: Optional[str] = None
     ) -> AdvancedMetadata:
         """
         🔧 Führt erweiterte AI-basierte Metadaten-Extraktion durch
@@ -346,20 +510,25 @@ JSON-Antwort:
         3. Structure Analysis (Sections, Tables, etc.)
         4. Compliance Analysis (Standards, Regulatory)
         5. Quality Assessment (Scores, Recommendations)
+        
+        ``mode``: "layered" (fünf Requests) oder "fused" (ein Request),
+        Standard aus METADATA_EXTRACTION_MODE.
         """
         start_time = time.time()
+        mode = mode or self.extraction_mode
         
         try:
             if not self.is_initialized:
                 await self.initialize()
             
-            logger.info(f"🤖 Starte erweiterte Metadaten-Extraktion für Dokument {document_id}")
+            logger.info(f"🤖 Starte erweiterte Metadaten-Extraktion ({mode}) für Dokument {document_id}")
             
             # Content Preprocessing
             processed_content = self._preprocess_content(content)
             
             # Multi-Layer AI Analysis
-            analysis_results = await self._perform_multilayer_analysis(processed_content)
+            with track_token_usage() as token_usage:
+                analysis_results = await self.analyze_content(processed_content, mode)
             
             # Pattern-based Enhancement
             enhanced_results = self._enhance_with_patterns(processed_content, analysis_results)
@@ -379,6 +548,9 @@ JSON-Antwort:
             processing_time = time.time() - start_time
             metadata.ai_processing_time = processing_time
             metadata.processed_timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+            metadata.token_usage = token_usage
+            if mode == "fused":
+                metadata.ai_methodology = "fused_analysis_with_pattern_enhancement"
             
             logger.info(f"✅ Erweiterte Metadaten-Extraktion abgeschlossen in {processing_time:.2f}s")
             logger.info(f"📊 Erkannter Typ: {metadata.document_type.value}")
@@ -411,60 +583,109 @@ JSON-Antwort:
         
         return content.strip()
     
-    async def _perform_multilayer_analysis(self, content: str) -> Dict[str, Any]:
-        """Führt Multi-Layer AI-Analyse durch"""
+    async def analyze_content(self, content: str, mode: str = "layered") -> Dict[str, Any]:
+        """AI-Analyse eines vorverarbeiteten Dokuments im gewählten Modus ("layered"/"fused")."""
+        if mode == "fused":
+            return await self._perform_fused_analysis(content)
+        return await self._perform_multilayer_analysis(content)
+    
+    async def _perform_multilayer_analysis(self, content: str, prompt_keys: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Führt Multi-Layer AI-Analyse durch (alle Layer oder nur ``prompt_keys``).
+        
+        Die fünf Layer sind unabhängig voneinander und laufen parallel
+        (max. ``layer_concurrency`` gleichzeitig, je ``layer_timeout``
+        Sekunden). Ergebnisse werden übernommen, sobald ein Layer fertig
+        ist - Layer mit Timeout/Fehler liefern ein leeres Ergebnis. Die
+        Laufzeit entspricht damit etwa dem langsamsten Layer statt der
+        Summe aller Layer.
+        """
         results = {}
+        semaphore = asyncio.Semaphore(self.layer_concurrency)
+        
+        async def run_layer(prompt_key: str) -> Tuple[str, Dict[str, Any], float]:
+            async with semaphore:
+                layer_start = time.time()
+                try:
+                    result = await asyncio.wait_for(
+                        self._ai_analysis(self.extraction_prompts[prompt_key].format(content=content)),
+                        timeout=self.layer_timeout
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning(f"⏱️ Layer {prompt_key} nach {self.layer_timeout}s abgebrochen")
+                    result = {}
+                return prompt_key, result, time.time() - layer_start
         
+        tasks = [asyncio.create_task(run_layer(prompt_key)) for prompt_key in (prompt_keys or ANALYSIS_LAYERS)]
         try:
-            # Layer 1: Document Analysis
-            logger.info("🔍 Layer 1: Document Analysis...")
-            doc_analysis = await self._ai_analysis(
-                self.extraction_prompts["document_analysis"].format(content=content)
-            )
-            results["document_analysis"] = doc_analysis
-            
-            # Layer 2: Keyword Extraction  
-            logger.info("🔍 Layer 2: Keyword Extraction...")
-            keyword_analysis = await self._ai_analysis(
-                self.extraction_prompts["keyword_extraction"].format(content=content)
-            )
-            results["keyword_analysis"] = keyword_analysis
-            
-            # Layer 3: Structure Analysis
-            logger.info("🔍 Layer 3: Structure Analysis...")
-            structure_analysis = await self._ai_analysis(
-                self.extraction_prompts["structure_analysis"].format(content=content)
-            )
-            results["structure_analysis"] = structure_analysis
-            
-            # Layer 4: Compliance Analysis
-            logger.info("🔍 Layer 4: Compliance Analysis...")
-            compliance_analysis = await self._ai_analysis(
-                self.extraction_prompts["compliance_analysis"].format(content=content)
-            )
-            results["compliance_analysis"] = compliance_analysis
-            
-            # Layer 5: Quality Assessment
-            logger.info("🔍 Layer 5: Quality Assessment...")
-            quality_analysis = await self._ai_analysis(
-                self.extraction_prompts["quality_assessment"].format(content=content)
-            )
-            results["quality_analysis"] = quality_analysis
-            
+            for finished in asyncio.as_completed(tasks):
+                prompt_key, result, layer_time = await finished
+                results[ANALYSIS_LAYERS[prompt_key]] = result
+                logger.info(f"🔍 Layer {prompt_key}: {'✅' if result else '⚠️ leer'} ({layer_time:.2f}s)")
             return results
             
         except Exception as e:
             logger.warning(f"⚠️ Multi-Layer Analysis teilweise fehlgeschlagen: {e}")
+            for task in tasks:
+                task.cancel()
             return results  # Return partial results
     
+    async def _perform_fused_analysis(self, content: str) -> Dict[str, Any]:
+        """
+        Fusionierte Analyse: ein JSON-Request liefert alle fünf Layer.
+        
+        Die Antwort wird mit dem EnhancedJSONParser geparst und je Layer
+        gegen LAYER_FIELDS validiert. Nur Layer mit fehlenden/ungültigen
+        Feldern werden einzeln nachgefragt - und daraus nur diese Felder
+        übernommen.
+        """
+        results = {}
+        parsed = None
+        try:
+            response_text = await asyncio.wait_for(
+                self._generate_text(self.extraction_prompts["fused_analysis"].format(content=content), json_mode=True),
+                timeout=self.layer_timeout
+            )
+            parsed = get_global_parser().parse_json_object(response_text)
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ Fusionierte Analyse nach {self.layer_timeout}s abgebrochen")
+        except Exception as e:
+            logger.warning(f"⚠️ Fusionierte Analyse fehlgeschlagen: {e}")
+        
+        failed_layers: Dict[str, List[str]] = {}
+        for prompt_key, layer_key in ANALYSIS_LAYERS.items():
+            layer_data = parsed.get(layer_key) if parsed else None
+            results[layer_key], failed_fields = validate_layer_fields(layer_key, layer_data)
+            if failed_fields:
+                failed_layers[prompt_key] = failed_fields
+        
+        if failed_layers:
+            logger.info(f"🔁 Fusionierte Analyse: Layer-Fallback für {', '.join(failed_layers)}")
+            fallback = await self._perform_multilayer_analysis(content, list(failed_layers))
+            for prompt_key, failed_fields in failed_layers.items():
+                layer_key = ANALYSIS_LAYERS[prompt_key]
+                layer_fallback = fallback.get(layer_key) or {}
+                for field in failed_fields:
+                    if field in layer_fallback:
+                        results[layer_key][field] = layer_fallback[field]
+        
+        return results
+    
+    async def _generate_text(self, prompt: str, json_mode: bool = False) -> str:
+        """Ein LLM-Aufruf (async); ``json_mode`` erzwingt eine JSON-Antwort."""
+        if not self.client:
+            raise RuntimeError("AI Client nicht initialisiert")
+        
+        generation_config = {"response_mime_type": "application/json", "temperature": 0} if json_mode else None
+        # Async-Aufruf: blockiert den Event-Loop nicht, parallele Layer möglich
+        response = await self.client.generate_content_async(prompt, generation_config=generation_config)
+        _record_token_usage(response)
+        return response.text
+    
     async def _ai_analysis(self, prompt: str) -> Dict[str, Any]:
         """Führt einzelne AI-Analyse durch mit Fehlerbehandlung"""
         try:
-            if not self.client:
-                raise RuntimeError("AI Client nicht initialisiert")
-            
-            response = self.client.generate_content(prompt)
-            response_text = response.text
+            response_text = await self._generate_text(prompt)
             
             # JSON Parsing mit Fehlerbehandlung
             try:
@@ -706,10 +927,11 @@ advanced_metadata_extractor = AdvancedAIMetadataExtractor()
 async def extract_advanced_metadata(
     content: str, 
     document_id: Optional[int] = None,
-    filename: Optional[str] = None
+    filename: Optional[str] = None,
+    mode: Optional[str] = None
 ) -> AdvancedMetadata:
     """🤖 Erweiterte AI-Metadaten-Extraktion"""
-    return await advanced_metadata_extractor.extract_advanced_metadata(content, document_id, filename)
+    return await advanced_metadata_extractor.extract_advanced_metadata(content, document_id, filename, mode)
 
 async def initialize_advanced_extractor():
     """🔧 Initialisiert Advanced Metadata Extractor"""
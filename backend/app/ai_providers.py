@@ -248,6 +248,32 @@ class OpenAI4oMiniProvider:
             logger.error(f"OpenAI simple_prompt Fehler: {e}")
             return {"ai_summary": f"OpenAI Fehler: {str(e)}", "response": f"Fehler: {str(e)}"}
 
+    async def generate_response(self, prompt: str, temperature: float = 0.0,
+                                max_tokens: int = 4000, **_prompt_config) -> str:
+        """
+        Roher Antworttext für einen fertigen Prompt (Enhanced Metadata Extractor).
+
+        Weitere Schlüssel aus ``get_prompt_config()`` (z.B. ``version``) werden ignoriert.
+
+        Raises:
+            Exception: wenn der API Key fehlt oder die API einen Fehler liefert
+        """
+        if not self.api_key:
+            raise Exception("OpenAI API Key nicht konfiguriert")
+
+        from openai import OpenAI
+        client = OpenAI(api_key=self.api_key)
+
+        # Synchroner Client im Threadpool - parallele Chunk-Requests blockieren den Event Loop nicht
+        response = await asyncio.to_thread(
+            client.chat.completions.create,
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
+        return response.choices[0].message.content or ""
+
     async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
         """Generiert OpenAI Embeddings"""
         try:
@@ -429,6 +455,34 @@ class GoogleGeminiProvider:
             logger.error(f"Google Gemini Fehler: {e}")
             raise Exception(f"Google Gemini Fehler: {e}")
     
+    async def generate_response(self, prompt: str, temperature: float = 0.0,
+                                max_tokens: int = 4000, **_prompt_config) -> str:
+        """
+        Roher Antworttext für einen fertigen Prompt (Enhanced Metadata Extractor).
+
+        Weitere Schlüssel aus ``get_prompt_config()`` (z.B. ``model``) werden ignoriert.
+
+        Raises:
+            Exception: wenn der API Key fehlt oder die API keine Antwort liefert
+        """
+        if not self.api_key:
+            raise Exception("Google Gemini API Key nicht konfiguriert")
+
+        payload = {
+            "contents": [{"parts": [{"text": prompt}]}],
+            "generationConfig": {"temperature": temperature, "maxOutputTokens": max_tokens}
+        }
+        url = f"{self.base_url}/models/{self.model}:generateContent?key={self.api_key}"
+        response = await asyncio.to_thread(
+            requests.post, url, json=payload, headers={"Content-Type": "application/json"}, timeout=30
+        )
+        if response.status_code != 200:
+            raise Exception(f"Google Gemini API Fehler: {response.status_code}")
+        candidates = response.json().get("candidates") or []
+        if not candidates:
+            raise Exception("Google Gemini API lieferte keine Antwort")
+        return candidates[0]["content"]["parts"][0]["text"]
+    
     def _parse_gemini_response(self, response: str, original_content: str) -> Dict[str, Any]:
         """Parst Gemini JSON-Response"""
         try:
@@ -62,17 +62,27 @@ Version: 1.0.0 (MVP Phase 1)
 Last Updated: 2025-01-27
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from fastapi import Depends, HTTPException, status, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from passlib.context import CryptContext
 from jose import JWTError, jwt
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+import asyncio
+import logging
 import os
+import time
+import uuid
 from dotenv import load_dotenv
 
-from .database import get_db
+from .config import get_access_token_expire_minutes, get_bcrypt_rounds, get_password_hash_workers
+from .database import get_db, get_async_db, run_in_db_thread
+from .principal_cache import principal_cache
+from .token_revocation import token_denylist
 from .models import User as UserModel, InterestGroup as InterestGroupModel, UserGroupMembership
 
 # Environment Variables laden
@@ -81,11 +91,28 @@ load_dotenv()
 # === KONFIGURATION ===
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+ACCESS_TOKEN_EXPIRE_MINUTES = get_access_token_expire_minutes()
+
+logger = logging.getLogger("KI-QMS.Auth")
 
 # === SECURITY SETUP ===
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min/max = Standard: Hashes mit abweichendem Kostenfaktor gelten als veraltet
+# und werden beim nächsten erfolgreichen Login neu erzeugt (verify_and_update)
+BCRYPT_ROUNDS = get_bcrypt_rounds()
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS
+)
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+# Worker-Pool für BCrypt (wird bei Bedarf gestartet). bcrypt gibt während
+# des Hashens den GIL frei - Threads laufen echt parallel, ohne den
+# Event-Loop zu blockieren.
+_password_executor: Optional[ThreadPoolExecutor] = None
 
 # === PASSWORD UTILITIES ===
 
@@ -130,10 +157,48 @@ def get_password_hash(password: str) -> str:
     """
     return pwd_context.hash(password)
 
+def get_password_executor() -> ThreadPoolExecutor:
+    """Gibt den geteilten Worker-Pool für Passwort-Hashing zurück."""
+    global _password_executor
+    if _password_executor is None:
+        workers = get_password_hash_workers()
+        _password_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        logger.info(f"🔐 Passwort-Hash-Pool gestartet: {workers} Worker, BCrypt-Kostenfaktor {BCRYPT_ROUNDS}")
+    return _password_executor
+
+def shutdown_password_executor() -> None:
+    """Beendet den Passwort-Hash-Pool (z.B. beim Backend-Shutdown)."""
+    global _password_executor
+    if _password_executor is not None:
+        _password_executor.shutdown(wait=False, cancel_futures=True)
+        _password_executor = None
+
+async def _run_in_password_pool(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_password_executor(), func, *args)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Wie verify_password, aber im Worker-Pool (blockiert den Event-Loop nicht)."""
+    return await _run_in_password_pool(pwd_context.verify, plain_password, hashed_password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifiziert ein Passwort im Worker-Pool und liefert ggf. einen neuen Hash.
+    
+    Returns:
+        (gültig, neuer_hash): neuer_hash ist gesetzt, wenn der gespeicherte
+        Hash einen veralteten Kostenfaktor hat und ersetzt werden soll
+    """
+    return await _run_in_password_pool(pwd_context.verify_and_update, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Wie get_password_hash, aber im Worker-Pool (blockiert den Event-Loop nicht)."""
+    return await _run_in_password_pool(pwd_context.hash, password)
+
 # === JWT TOKEN UTILITIES ===
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """JWT Access Token erstellen"""
+    """JWT Access Token erstellen (mit Token-ID ``jti`` und Ausstellungszeit ``iat`` für die Sperrliste)"""
     to_encode = data.copy()
     
     if expires_delta:
@@ -142,6 +207,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire})
+    to_encode.setdefault("jti", uuid.uuid4().hex)
+    to_encode.setdefault("iat", time.time())
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -156,6 +223,56 @@ def verify_token(token: str) -> Optional[dict]:
     except JWTError:
         return None
 
+# Spalten des Benutzers, die als Claims ins Token wandern (Claim-Name → Spalte).
+# Deckt alles ab, was Handler und Admin-Prüfungen am current_user lesen.
+USER_CLAIM_COLUMNS = {
+    "email": "email",
+    "name": "full_name",
+    "eid": "employee_id",
+    "unit": "organizational_unit",
+    "lvl": "approval_level",
+    "head": "is_department_head",
+    "act": "is_active",
+    "ind": "individual_permissions",
+}
+
+def build_access_claims(user: UserModel, groups: List[str], permissions: List[str], version_tag: str) -> dict:
+    """
+    Claims für den zustandslosen Fast-Path von get_current_user.
+    
+    Args:
+        version_tag: ``principal_cache.version_tag`` *vor* dem Laden von
+            Gruppen/Berechtigungen - ändert sich danach etwas, passt der
+            Tag nicht mehr und das Token fällt auf den DB-Pfad zurück
+    """
+    return {
+        "sub": str(user.id),
+        "usr": {claim: getattr(user, column) for claim, column in USER_CLAIM_COLUMNS.items()},
+        "grp": list(groups),
+        "prm": sorted(permissions),
+        "pv": version_tag,
+    }
+
+def _principal_from_claims(user_id: int, payload: dict):
+    """
+    Principal direkt aus den signierten Claims (kein DB-Zugriff).
+    
+    Nur wenn das Token die aktuelle Berechtigungs-Version dieses Prozesses
+    trägt, sonst None (→ Datenbank). Das User-Objekt ist transient (nie
+    gespeichert, ohne Beziehungen) - Handler nutzen nur Spalten und IDs.
+    """
+    version = principal_cache.version_from_tag(payload.get("pv"))
+    claims = payload.get("usr")
+    if version is None or version != principal_cache.version or not isinstance(claims, dict):
+        return None
+
+    user = UserModel(id=user_id, **{column: claims.get(claim) for claim, column in USER_CLAIM_COLUMNS.items()})
+    return principal_cache.put(user, payload.get("grp") or [], payload.get("prm") or [], version)
+
+def revoke_access_token(payload: dict):
+    """Sperrt ein Token (Logout) bis zu seinem Ablauf."""
+    token_denylist.revoke_token(payload.get("jti"), payload.get("exp"))
+
 # === AUTHENTICATION ===
 
 def authenticate_user(db: Session, email: str, password: str) -> Optional[UserModel]:
@@ -167,11 +284,44 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[UserMo
         return None
     return user
 
+async def authenticate_user_async(db: Session, email: str, password: str) -> Optional[UserModel]:
+    """
+    Benutzer authentifizieren - BCrypt läuft im Worker-Pool.
+    
+    Hat der gespeicherte Hash einen veralteten Kostenfaktor (BCRYPT_ROUNDS
+    geändert), wird er nach erfolgreicher Prüfung transparent ersetzt.
+    """
+    user = db.query(UserModel).filter(UserModel.email == email).first()
+    if not user or not user.hashed_password:
+        return None
+
+    valid, new_hash = await verify_and_update_password_async(password, user.hashed_password)
+    if not valid:
+        return None
+
+    if new_hash:
+        user.hashed_password = new_hash
+        await run_in_db_thread(db.commit)
+        logger.info(f"🔄 Passwort-Hash für Benutzer {user.id} auf Kostenfaktor {BCRYPT_ROUNDS} umgestellt")
+    return user
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Security(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> UserModel:
-    """Aktuell authentifizierten Benutzer abrufen"""
+    """
+    Aktuell authentifizierten Benutzer abrufen.
+    
+    Reihenfolge (die ersten drei ohne DB-Zugriff):
+    1. Sperrliste (Logout, Deaktivierung, Passwort-Reset)
+    2. Principal-Cache
+    3. Signierte Claims, sofern ihre Berechtigungs-Version aktuell ist
+    4. Benutzer, Gruppen und Berechtigungen über die AsyncSession laden
+       (blockiert den Event-Loop nicht) und cachen
+    
+    Das Objekt ist von jeder Session gelöst: Für Änderungen den Benutzer in
+    der Session des Endpoints per ``db.get(UserModel, current_user.id)`` laden.
+    """
     
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -186,11 +336,28 @@ async def get_current_user(
     if token_data is None:
         raise credentials_exception
     
-    # Benutzer aus Datenbank laden
-    user = db.query(UserModel).filter(UserModel.id == token_data["user_id"]).first()
+    try:
+        user_id = int(token_data["user_id"])
+    except (TypeError, ValueError):
+        raise credentials_exception
+    
+    if token_denylist.is_revoked(user_id, token_data["payload"]):
+        raise credentials_exception
+    
+    principal = principal_cache.get(user_id) or _principal_from_claims(user_id, token_data["payload"])
+    if principal is not None:
+        return principal.user
+    
+    # Benutzer aus Datenbank laden (Version vor dem Laden merken)
+    version = principal_cache.version
+    result = await db.execute(select(UserModel).where(UserModel.id == user_id))
+    user = result.scalar_one_or_none()
     if user is None:
         raise credentials_exception
     
+    groups, permissions = _access_from_rows(user, await _active_group_rows_async(db, user.id))
+    db.expunge(user)
+    principal_cache.put(user, groups, permissions, version)
     return user
 
 async def get_current_active_user(
@@ -244,60 +411,96 @@ def is_system_admin(user: UserModel) -> bool:
         (user.approval_level == 4 and user.is_department_head and user.organizational_unit == "System Administration")
     )
 
-def get_user_permissions(db: Session, user: UserModel) -> List[str]:
-    """Alle Berechtigungen eines Benutzers sammeln"""
-    permissions = set()
-    
+# Vollzugriff des QMS Admins (unabhängig von Gruppen)
+QMS_ADMIN_PERMISSIONS = [
+    "system_administration",
+    "user_management",
+    "all_rights",
+    "final_approval",
+    "document_management",
+    "equipment_management",
+    "norm_management"
+]
+
+def _parse_permission_list(raw) -> List[str]:
+    """JSON-Berechtigungsliste aus der Datenbank (ungültige Werte → leer)."""
+    if not raw:
+        return []
+    try:
+        import json
+        parsed = json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        return []
+    return parsed if isinstance(parsed, list) else []
+
+def _active_group_rows(db: Session, user_id: int):
+    """(code, group_permissions) aller aktiven Mitgliedschaften - ein Join, eine Query."""
+    return (
+        db.query(InterestGroupModel.code, InterestGroupModel.group_permissions)
+        .join(UserGroupMembership, UserGroupMembership.interest_group_id == InterestGroupModel.id)
+        .filter(
+            UserGroupMembership.user_id == user_id,
+            UserGroupMembership.is_active == True
+        )
+        .all()
+    )
+
+async def _active_group_rows_async(db: AsyncSession, user_id: int):
+    """Wie ``_active_group_rows``, für die AsyncSession."""
+    result = await db.execute(
+        select(InterestGroupModel.code, InterestGroupModel.group_permissions)
+        .join(UserGroupMembership, UserGroupMembership.interest_group_id == InterestGroupModel.id)
+        .where(
+            UserGroupMembership.user_id == user_id,
+            UserGroupMembership.is_active == True
+        )
+    )
+    return result.all()
+
+def _access_from_rows(user: UserModel, rows) -> Tuple[List[str], List[str]]:
+    """Gruppen-Codes und Berechtigungen aus den Mitgliedschafts-Zeilen."""
+    groups = [code for code, _ in rows]
+
     # ✅ SPEZIAL: QMS Admin bekommt automatisch alle Admin-Rechte
     if is_qms_admin(user):
-        permissions.update([
-            "system_administration",
-            "user_management", 
-            "all_rights",
-            "final_approval",
-            "document_management",
-            "equipment_management",
-            "norm_management"
-        ])
-        return list(permissions)
-    
-    # Individuelle Berechtigungen
-    if user.individual_permissions:
-        try:
-            import json
-            individual_perms = json.loads(user.individual_permissions)
-            if isinstance(individual_perms, list):
-                permissions.update(individual_perms)
-        except (json.JSONDecodeError, TypeError):
-            pass
-    
-    # Gruppen-Berechtigungen
-    memberships = db.query(UserGroupMembership).filter(
-        UserGroupMembership.user_id == user.id,
-        UserGroupMembership.is_active == True
-    ).all()
-    
-    for membership in memberships:
-        group = membership.interest_group
-        if group and group.group_permissions:
-            try:
-                import json
-                group_perms = json.loads(group.group_permissions)
-                if isinstance(group_perms, list):
-                    permissions.update(group_perms)
-            except (json.JSONDecodeError, TypeError):
-                pass
-    
-    return list(permissions)
+        return groups, list(QMS_ADMIN_PERMISSIONS)
 
-def get_user_groups(db: Session, user: UserModel) -> List[str]:
-    """Alle Interessengruppen-Codes eines Benutzers"""
-    memberships = db.query(UserGroupMembership).filter(
-        UserGroupMembership.user_id == user.id,
-        UserGroupMembership.is_active == True
-    ).all()
+    permissions = set(_parse_permission_list(user.individual_permissions))
+    for _, group_permissions in rows:
+        permissions.update(_parse_permission_list(group_permissions))
+    return groups, list(permissions)
+
+def resolve_user_access(db: Session, user: UserModel) -> Tuple[List[str], List[str]]:
+    """
+    Gruppen-Codes und Berechtigungen eines Benutzers.
+    
+    Aus dem Principal-Cache, sonst in einem Datenbank-Roundtrip.
     
-    return [membership.interest_group.code for membership in memberships if membership.interest_group]
+    Returns:
+        Tuple[List[str], List[str]]: (Gruppen-Codes, Berechtigungen)
+    """
+    principal = principal_cache.get(user.id)
+    if principal is not None:
+        return list(principal.groups), list(principal.permissions)
+    return _access_from_rows(user, _active_group_rows(db, user.id))
+
+def get_user_permissions(db: Session, user: UserModel) -> List[str]:
+    """Alle Berechtigungen eines Benutzers sammeln (individuell + Gruppen, eine Query)"""
+    # ✅ SPEZIAL: QMS Admin bekommt automatisch alle Admin-Rechte (ohne DB-Zugriff)
+    if is_qms_admin(user):
+        return list(QMS_ADMIN_PERMISSIONS)
+    return resolve_user_access(db, user)[1]
+
+def get_user_groups(db: Session, user: UserModel) -> List[str]:
+    """Alle Interessengruppen-Codes eines Benutzers (Cache, sonst eine Query)"""
+    return resolve_user_access(db, user)[0]
+
+async def get_user_groups_async(db: AsyncSession, user: UserModel) -> List[str]:
+    """Alle Interessengruppen-Codes eines Benutzers (Cache, sonst AsyncSession, eine Query)"""
+    principal = principal_cache.get(user.id)
+    if principal is not None:
+        return list(principal.groups)
+    return [code for code, _ in await _active_group_rows_async(db, user.id)]
 
 class PermissionChecker:
     """Klasse für Berechtigungsprüfungen"""
@@ -0,0 +1,186 @@
+"""
+KI-QMS Bulk-Import (Benutzer, Mitgliedschaften, Equipment, Kalibrierungen)
+
+Gemeinsame Bausteine der ``/bulk``-Endpoints:
+
+- Validierung jedes Eintrags gegen das Create-Schema (Fehler pro Eintrag
+  statt 422 für den ganzen Request)
+- Eindeutigkeitsprüfungen innerhalb des Batches und gegen die Datenbank
+  mit wenigen ``IN (...)``-Abfragen statt einer Abfrage pro Eintrag
+- Einfügen per executemany (``INSERT ... RETURNING id``) in einer
+  Transaktion - IDs in Request-Reihenfolge
+- Datumswerte mit Zeitzone werden nach UTC umgerechnet und naiv
+  gespeichert (wie ``datetime.utcnow`` in den Modellen)
+
+Die fachlichen Regeln je Entität stehen in den Endpoints (main.py).
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Type
+import logging
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from .config import get_bulk_max_items
+from .schemas import BulkCreateRequest, BulkCreateResponse, BulkItemResult
+
+logger = logging.getLogger("KI-QMS.BulkImport")
+
+# Parameter pro IN-Abfrage (SQLite-Limit für Bind-Variablen, Plan-Cache)
+IN_CHUNK_SIZE = 500
+
+ValidatedItem = Tuple[int, BaseModel]
+
+
+class BulkBatch:
+    """Ergebnisse eines Bulk-Requests je Eintrag (Index = Position im Request)."""
+
+    def __init__(self, request: BulkCreateRequest):
+        max_items = get_bulk_max_items()
+        if len(request.items) > max_items:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Maximal {max_items} Einträge pro Bulk-Request (erhalten: {len(request.items)})"
+            )
+        self.items = request.items
+        self.atomic = request.atomic
+        self._results: Dict[int, BulkItemResult] = {}
+
+    def validate(self, schema: Type[BaseModel]) -> List[ValidatedItem]:
+        """Validiert alle Einträge gegen ``schema``; ungültige werden als Fehler vermerkt."""
+        valid = []
+        for index, raw in enumerate(self.items):
+            try:
+                valid.append((index, schema.model_validate(raw)))
+            except ValidationError as e:
+                self.fail(index, "; ".join(
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+                ))
+        return valid
+
+    def fail(self, index: int, error: str):
+        self._results[index] = BulkItemResult(index=index, success=False, error=error)
+
+    def succeed(self, index: int, entity_id: int):
+        self._results[index] = BulkItemResult(index=index, success=True, id=entity_id)
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for result in self._results.values() if not result.success)
+
+    @property
+    def should_abort(self) -> bool:
+        """Im atomic-Modus wird bei einem Fehler nichts gespeichert."""
+        return self.atomic and self.failed > 0
+
+    def reject_duplicates(self, entries: List[ValidatedItem], key: Callable[[BaseModel], Any],
+                          label: str) -> List[ValidatedItem]:
+        """Entfernt Einträge, deren Schlüssel im Batch schon vorkam (der erste gewinnt)."""
+        seen: Dict[Any, int] = {}
+        unique = []
+        for index, item in entries:
+            value = key(item)
+            if value is not None and value in seen:
+                self.fail(index, f"{label} '{value}' doppelt im Request (siehe Eintrag {seen[value]})")
+                continue
+            if value is not None:
+                seen[value] = index
+            unique.append((index, item))
+        return unique
+
+    def reject_existing(self, entries: List[ValidatedItem], key: Callable[[BaseModel], Any],
+                        existing: Set[Any], message: Callable[[Any], str]) -> List[ValidatedItem]:
+        """Entfernt Einträge, deren Schlüssel in ``existing`` liegt."""
+        remaining = []
+        for index, item in entries:
+            value = key(item)
+            if value is not None and value in existing:
+                self.fail(index, message(value))
+                continue
+            remaining.append((index, item))
+        return remaining
+
+    def reject_missing(self, entries: List[ValidatedItem], key: Callable[[BaseModel], Any],
+                       known: Set[Any], message: Callable[[Any], str]) -> List[ValidatedItem]:
+        """Entfernt Einträge, deren Referenz (z.B. Fremdschlüssel) nicht in ``known`` liegt."""
+        remaining = []
+        for index, item in entries:
+            value = key(item)
+            if value is not None and value not in known:
+                self.fail(index, message(value))
+                continue
+            remaining.append((index, item))
+        return remaining
+
+    def response(self) -> BulkCreateResponse:
+        results = [self._results[index] for index in sorted(self._results)]
+        created = sum(1 for result in results if result.success)
+        return BulkCreateResponse(total=len(self.items), created=created,
+                                  failed=len(results) - created, results=results)
+
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Zeitzonenbehaftete Werte nach UTC umrechnen; naive Werte gelten bereits als UTC."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def normalize_datetimes(entries: List[ValidatedItem], *fields: str) -> List[ValidatedItem]:
+    """Setzt die Datumsfelder ``fields`` aller Einträge auf naive UTC-Werte."""
+    return [
+        (index, item.model_copy(update={field: to_naive_utc(getattr(item, field)) for field in fields}))
+        for index, item in entries
+    ]
+
+
+def _chunks(values: List[Any]) -> Iterable[List[Any]]:
+    for start in range(0, len(values), IN_CHUNK_SIZE):
+        yield values[start:start + IN_CHUNK_SIZE]
+
+
+def existing_values(db: Session, column, values: Iterable[Any]) -> Set[Any]:
+    """Welche der ``values`` gibt es in ``column`` bereits (IN-Abfragen in Blöcken)."""
+    wanted = sorted({value for value in values if value is not None}, key=str)
+    found: Set[Any] = set()
+    for chunk in _chunks(wanted):
+        found.update(db.scalars(select(column).where(column.in_(chunk))).all())
+    return found
+
+
+def existing_pairs(db: Session, first_column, second_column, pairs: Iterable[Tuple[Any, Any]]) -> Set[Tuple[Any, Any]]:
+    """Welche (first, second)-Paare gibt es bereits (gefiltert über first in Blöcken)."""
+    pairs = set(pairs)
+    found: Set[Tuple[Any, Any]] = set()
+    for chunk in _chunks(sorted({first for first, _ in pairs})):
+        rows = db.execute(select(first_column, second_column).where(first_column.in_(chunk))).all()
+        found.update(pair for pair in map(tuple, rows) if pair in pairs)
+    return found
+
+
+def insert_returning_ids(db: Session, model, mappings: List[Dict[str, Any]],
+                         key_columns: Tuple[str, ...] = ()) -> List[int]:
+    """
+    executemany-INSERT mit RETURNING (SQLAlchemy "insertmanyvalues").
+
+    Mit ``key_columns`` (im Batch eindeutig) werden die zurückgelieferten
+    Zeilen über diesen Schlüssel zugeordnet - mehrere tausend Zeilen pro
+    Statement. Ohne Schlüssel garantiert ``sort_by_parameter_order`` die
+    Reihenfolge; SQLite fügt dann zeilenweise ein.
+
+    Returns:
+        List[int]: Neue IDs in der Reihenfolge von ``mappings``
+    """
+    if not mappings:
+        return []
+    if not key_columns:
+        statement = insert(model).returning(model.id, sort_by_parameter_order=True)
+        return list(db.scalars(statement, mappings).all())
+
+    table = model.__table__
+    statement = insert(model).returning(model.id, *[table.c[name] for name in key_columns])
+    ids = {tuple(row[1:]): row[0] for row in db.execute(statement, mappings)}
+    return [ids[tuple(mapping[name] for name in key_columns)] for mapping in mappings]
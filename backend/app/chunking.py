@@ -0,0 +1,95 @@
+"""
+KI-QMS Chunking-Stufe (gemeinsam für Metadaten und Embeddings)
+
+Ein Dokument wird genau einmal in Chunks zerlegt. Jeder Chunk kennt seine
+exakten Zeichen-Offsets im Dokumenttext (``content[start:end] == text``),
+so dass Chunk-Metadaten (Enhanced Metadata Extractor) und die in Qdrant
+gespeicherten Vektoren (Advanced RAG Engine) denselben Text beschreiben:
+
+    records = chunk_document(content)
+    response = await extract_enhanced_metadata(content, title, chunks=records)
+    # chunks_metadata[i].chunk_index -> records[chunk_index]
+
+Zerlegung: Absätze (Leerzeile) werden bis ``chunk_size`` Zeichen
+zusammengefasst; längere Absätze werden an Satz- bzw. Wortgrenzen geteilt.
+"""
+
+from dataclasses import dataclass
+from typing import Iterator, List, Tuple
+import re
+
+# Chunk-Größe in Zeichen (Advanced RAG Engine)
+DEFAULT_CHUNK_SIZE = 800
+
+_PARAGRAPH_BREAK = re.compile(r'\n[ \t]*\n')
+_SENTENCE_END = re.compile(r'[.!?:;]\s')
+
+
+@dataclass(frozen=True)
+class ChunkRecord:
+    """Ein Chunk mit exakten Offsets im Dokumenttext."""
+    index: int
+    start: int
+    end: int
+    text: str
+
+
+def _paragraph_spans(content: str) -> Iterator[Tuple[int, int]]:
+    """(start, end) aller Absätze ohne umgebende Leerzeichen."""
+    position = 0
+    for match in _PARAGRAPH_BREAK.finditer(content):
+        yield from _stripped_span(content, position, match.start())
+        position = match.end()
+    yield from _stripped_span(content, position, len(content))
+
+
+def _stripped_span(content: str, start: int, end: int) -> Iterator[Tuple[int, int]]:
+    while start < end and content[start].isspace():
+        start += 1
+    while end > start and content[end - 1].isspace():
+        end -= 1
+    if start < end:
+        yield start, end
+
+
+def _split_long_span(content: str, start: int, end: int, chunk_size: int) -> Iterator[Tuple[int, int]]:
+    """Teilt einen zu langen Absatz bevorzugt am Satzende, sonst am Wortende."""
+    while end - start > chunk_size:
+        window = content[start:start + chunk_size]
+        cut = max((match.end() for match in _SENTENCE_END.finditer(window)), default=0)
+        if cut < chunk_size // 2:
+            cut = window.rfind(' ') + 1
+        if cut <= 0:
+            cut = chunk_size
+        yield from _stripped_span(content, start, start + cut)
+        start += cut
+    yield from _stripped_span(content, start, end)
+
+
+def chunk_document(content: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[ChunkRecord]:
+    """
+    Zerlegt ``content`` in Chunks mit exakten Offsets.
+
+    Returns:
+        List[ChunkRecord]: Chunks in Dokumentreihenfolge (index = Position)
+    """
+    spans: List[Tuple[int, int]] = []
+    chunk_start = chunk_end = None
+
+    for paragraph_start, paragraph_end in _paragraph_spans(content):
+        if chunk_start is not None and paragraph_end - chunk_start <= chunk_size:
+            chunk_end = paragraph_end
+            continue
+        if chunk_start is not None:
+            spans.append((chunk_start, chunk_end))
+        if paragraph_end - paragraph_start > chunk_size:
+            spans.extend(_split_long_span(content, paragraph_start, paragraph_end, chunk_size))
+            chunk_start = chunk_end = None
+        else:
+            chunk_start, chunk_end = paragraph_start, paragraph_end
+
+    if chunk_start is not None:
+        spans.append((chunk_start, chunk_end))
+
+    return [ChunkRecord(index=index, start=start, end=end, text=content[start:end])
+            for index, (start, end) in enumerate(spans)]
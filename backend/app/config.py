@@ -38,6 +38,17 @@ um hardcodierte Werte zu vermeiden und Flexibilität zu gewährleisten.
 - DEFAULT_AI_PROVIDER: Standard-Provider
 - ENVIRONMENT: Development/Production
 - DEBUG_LEVEL: Logging-Level
+- TEXT_EXTRACTION_POOL: Worker-Pool für Textextraktion (process/thread)
+- TEXT_EXTRACTION_WORKERS: Anzahl Extraktions-Worker
+- PDF_TEXT_BACKENDS: PDF-Text-Backends in Fallback-Reihenfolge
+- PDF_PAGE_RANGE_SIZE: Seiten pro parallelem PDF-Seitenbereich
+- DATABASE_URL: SQLAlchemy-Datenbank-URL (SQLite oder PostgreSQL)
+- DB_POOL_SIZE / DB_MAX_OVERFLOW: Connection-Pool (PostgreSQL)
+- DB_STATEMENT_CACHE_SIZE: Größe des Statement-Caches
+- SQLITE_READER_POOL_SIZE: Lese-Connections für SQLite
+- DB_WRITE_TIMEOUT: Wartezeit auf die SQLite-Schreib-Connection (Sekunden)
+- PRINCIPAL_CACHE_TTL: Lebensdauer gecachter Benutzer-Berechtigungen (Sekunden, 0 = aus)
+- PRINCIPAL_CACHE_SIZE: Maximale Anzahl gecachter Benutzer
 
 📋 FALLBACK-STRATEGIE:
 1. Environment Variable (höchste Priorität)
@@ -266,6 +277,298 @@ def get_prompt_filename(prompt_type: str) -> str:
     # Standard-Mapping
     return MULTI_VISIO_PROMPT_FILES.get(prompt_type, f"{prompt_type}.txt")
 
+# =============================================================================
+# ⚡ WORKER-POOLS (CPU-gebundene Verarbeitung)
+# =============================================================================
+
+def get_extraction_pool_type() -> str:
+    """
+    Gibt den Pool-Typ für die Textextraktion zurück.
+    
+    Priorität:
+    1. Umgebungsvariable TEXT_EXTRACTION_POOL ("process" oder "thread")
+    2. "process" (Standard) - PyPDF2/python-docx/openpyxl sind GIL-gebunden
+    """
+    pool_type = os.getenv('TEXT_EXTRACTION_POOL', 'process').strip().lower()
+    return pool_type if pool_type in ("process", "thread") else "process"
+
+def get_extraction_pool_workers() -> int:
+    """
+    Gibt die Anzahl paralleler Extraktions-Worker zurück.
+    
+    Priorität:
+    1. Umgebungsvariable TEXT_EXTRACTION_WORKERS
+    2. Anzahl CPU-Kerne (max. 4)
+    """
+    env_workers = os.getenv('TEXT_EXTRACTION_WORKERS')
+    if env_workers:
+        try:
+            return max(1, int(env_workers))
+        except ValueError:
+            pass
+    return min(4, os.cpu_count() or 1)
+
+# PDF-Text-Backends in Prioritätsreihenfolge
+DEFAULT_PDF_TEXT_BACKENDS = ["pymupdf", "pypdf2"]
+
+def get_pdf_text_backends() -> List[str]:
+    """
+    Gibt die PDF-Text-Backends in Fallback-Reihenfolge zurück.
+    
+    Priorität:
+    1. Umgebungsvariable PDF_TEXT_BACKENDS (kommasepariert, z.B. "pypdf2")
+    2. DEFAULT_PDF_TEXT_BACKENDS (PyMuPDF, dann PyPDF2)
+    """
+    env_backends = os.getenv('PDF_TEXT_BACKENDS')
+    if env_backends:
+        return [b.strip().lower() for b in env_backends.split(',') if b.strip()]
+    
+    return DEFAULT_PDF_TEXT_BACKENDS.copy()
+
+def get_pdf_page_range_size() -> int:
+    """
+    Gibt die Seitenanzahl pro parallel verarbeitetem PDF-Seitenbereich zurück.
+    
+    Priorität:
+    1. Umgebungsvariable PDF_PAGE_RANGE_SIZE
+    2. 25 Seiten (Standard)
+    """
+    try:
+        return max(1, int(os.getenv('PDF_PAGE_RANGE_SIZE', '25')))
+    except ValueError:
+        return 25
+
+# =============================================================================
+# 🗄️ DATENBANK
+# =============================================================================
+
+DEFAULT_DATABASE_URL = "sqlite:///./qms_mvp.db"
+
+def _get_int_env(name: str, default: int, minimum: int = 0) -> int:
+    """Liest eine ganzzahlige Umgebungsvariable (ungültige Werte → Standard)."""
+    try:
+        return max(minimum, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+def get_database_url() -> str:
+    """
+    Gibt die Datenbank-URL zurück.
+    
+    Priorität:
+    1. Umgebungsvariable DATABASE_URL (z.B. postgresql+psycopg2://user:pw@host/qms)
+    2. Lokale SQLite-Datenbank (Standard)
+    """
+    return os.getenv('DATABASE_URL', '').strip() or DEFAULT_DATABASE_URL
+
+def get_db_pool_size() -> int:
+    """Persistente Connections im PostgreSQL-Pool (DB_POOL_SIZE, Standard: 10)."""
+    return _get_int_env('DB_POOL_SIZE', 10, minimum=1)
+
+def get_db_max_overflow() -> int:
+    """Zusätzliche Connections bei Lastspitzen (DB_MAX_OVERFLOW, Standard: 20)."""
+    return _get_int_env('DB_MAX_OVERFLOW', 20)
+
+def get_db_statement_cache_size() -> int:
+    """Einträge im Statement-Cache (DB_STATEMENT_CACHE_SIZE, Standard: 500)."""
+    return _get_int_env('DB_STATEMENT_CACHE_SIZE', 500)
+
+def get_sqlite_reader_pool_size() -> int:
+    """
+    Gibt die Anzahl der Lese-Connections für SQLite zurück.
+    
+    Priorität:
+    1. Umgebungsvariable SQLITE_READER_POOL_SIZE
+    2. Anzahl CPU-Kerne (min. 2, max. 8)
+    """
+    return _get_int_env('SQLITE_READER_POOL_SIZE', min(8, max(2, os.cpu_count() or 1)), minimum=1)
+
+def get_db_write_timeout() -> int:
+    """Sekunden, die ein Request auf die SQLite-Schreib-Connection wartet (DB_WRITE_TIMEOUT, Standard: 30)."""
+    return _get_int_env('DB_WRITE_TIMEOUT', 30, minimum=1)
+
+def get_bulk_max_items() -> int:
+    """Maximale Anzahl Einträge pro Bulk-Request (BULK_MAX_ITEMS, Standard: 10000)."""
+    return _get_int_env('BULK_MAX_ITEMS', 10000, minimum=1)
+
+# =============================================================================
+# 🔐 AUTHENTIFIZIERUNG
+# =============================================================================
+
+def get_access_token_expire_minutes() -> int:
+    """Gültigkeit der JWT-Access-Tokens in Minuten (ACCESS_TOKEN_EXPIRE_MINUTES, Standard: 30)."""
+    return _get_int_env('ACCESS_TOKEN_EXPIRE_MINUTES', 30, minimum=1)
+
+def get_principal_cache_ttl() -> int:
+    """
+    Gibt die Lebensdauer gecachter Benutzer/Berechtigungen in Sekunden zurück.
+    
+    Priorität:
+    1. Umgebungsvariable PRINCIPAL_CACHE_TTL (0 deaktiviert den Cache)
+    2. 60 Sekunden (Standard) - Änderungen über die API wirken sofort,
+       die TTL begrenzt nur Änderungen an anderer Stelle (Skripte, andere Worker)
+    """
+    return _get_int_env('PRINCIPAL_CACHE_TTL', 60)
+
+def get_principal_cache_size() -> int:
+    """Maximale Anzahl gecachter Benutzer (PRINCIPAL_CACHE_SIZE, Standard: 10000)."""
+    return _get_int_env('PRINCIPAL_CACHE_SIZE', 10000, minimum=1)
+
+def get_bcrypt_rounds() -> int:
+    """
+    Gibt den BCrypt-Kostenfaktor (log2 der Runden) zurück.
+    
+    Priorität:
+    1. Umgebungsvariable BCRYPT_ROUNDS (4-31)
+    2. 12 (Standard, ~200-300 ms pro Hash)
+    
+    Bestehende Hashes mit anderem Kostenfaktor werden beim nächsten
+    erfolgreichen Login transparent neu gehasht.
+    """
+    return min(31, _get_int_env('BCRYPT_ROUNDS', 12, minimum=4))
+
+def get_password_hash_workers() -> int:
+    """
+    Gibt die Anzahl paralleler Passwort-Hash-Worker zurück.
+    
+    Priorität:
+    1. Umgebungsvariable PASSWORD_HASH_WORKERS
+    2. Anzahl CPU-Kerne (max. 4)
+    """
+    return _get_int_env('PASSWORD_HASH_WORKERS', min(4, os.cpu_count() or 1), minimum=1)
+
+# =============================================================================
+# 🧠 KI-METADATEN-EXTRAKTION
+# =============================================================================
+
+def get_metadata_layer_concurrency() -> int:
+    """
+    Gibt die Anzahl gleichzeitiger LLM-Aufrufe pro Dokument zurück
+    (Analyse-Layer der Advanced-Metadaten-Extraktion).
+    
+    Priorität:
+    1. Umgebungsvariable METADATA_LAYER_CONCURRENCY
+    2. 5 (alle Layer parallel)
+    """
+    return _get_int_env('METADATA_LAYER_CONCURRENCY', 5, minimum=1)
+
+def get_metadata_layer_timeout() -> int:
+    """Timeout je Analyse-Layer in Sekunden (METADATA_LAYER_TIMEOUT, Standard: 60)."""
+    return _get_int_env('METADATA_LAYER_TIMEOUT', 60, minimum=1)
+
+def get_metadata_extraction_mode() -> str:
+    """
+    Gibt den Modus der Advanced-Metadaten-Extraktion zurück.
+    
+    Priorität:
+    1. Umgebungsvariable METADATA_EXTRACTION_MODE
+    2. "layered" (Standard): fünf Layer-Prompts parallel
+    
+    "fused": ein einziger JSON-Request für alle Layer (Dokument wird nur
+    einmal gesendet), Layer-Fallback nur für fehlerhafte Felder.
+    """
+    mode = os.getenv('METADATA_EXTRACTION_MODE', 'layered').strip().lower()
+    return mode if mode in ('layered', 'fused') else 'layered'
+
+def get_enhanced_metadata_enabled() -> bool:
+    """
+    Gibt zurück, ob Upload und RAG-Indexierung die Enhanced-Metadaten-
+    Extraktion (Dokument + alle Chunks per LLM) ausführen.
+    
+    Priorität:
+    1. Umgebungsvariable ENHANCED_METADATA_EXTRACTION ("true"/"false")
+    2. false - kostet pro Upload einen Dokument-Request plus gepackte
+       Chunk-Requests; ohne Opt-in bleibt die Legacy-KI-Analyse aktiv
+    """
+    return os.getenv('ENHANCED_METADATA_EXTRACTION', 'false').strip().lower() in ('1', 'true', 'yes')
+
+def get_chunk_metadata_concurrency() -> int:
+    """
+    Gibt die Anzahl gleichzeitiger LLM-Aufrufe für Chunk-Metadaten zurück
+    (prozessweit, über alle Dokumente des Enhanced Metadata Extractors).
+    
+    Priorität:
+    1. Umgebungsvariable CHUNK_METADATA_CONCURRENCY
+    2. 4
+    """
+    return _get_int_env('CHUNK_METADATA_CONCURRENCY', 4, minimum=1)
+
+def get_chunk_metadata_token_budget() -> int:
+    """
+    Token-Budget (geschätzt) für Chunk-Metadaten pro Dokument
+    (CHUNK_METADATA_TOKEN_BUDGET, Standard: 200000, 0 = unbegrenzt).
+    Chunks jenseits des Budgets erhalten Fallback-Metadaten.
+    """
+    return _get_int_env('CHUNK_METADATA_TOKEN_BUDGET', 200000, minimum=0)
+
+def get_chunk_metadata_pack_tokens() -> int:
+    """
+    Kleine Chunks werden bis zu dieser Tokenzahl (geschätzt) in einen
+    gemeinsamen Prompt gepackt (CHUNK_METADATA_PACK_TOKENS, Standard: 1500,
+    0 = nicht packen).
+    """
+    return _get_int_env('CHUNK_METADATA_PACK_TOKENS', 1500, minimum=0)
+
+def get_chunk_metadata_max_retries() -> int:
+    """Wiederholungen je Chunk-Request mit exponentiellem Backoff (CHUNK_METADATA_MAX_RETRIES, Standard: 3)."""
+    return _get_int_env('CHUNK_METADATA_MAX_RETRIES', 3, minimum=0)
+
+# =============================================================================
+# 👁️ VISION-ANALYSE
+# =============================================================================
+
+def get_vision_page_concurrency() -> int:
+    """
+    Gibt die Anzahl gleichzeitig analysierter Seiten pro Dokument zurück
+    (Vision API, Ergebnisse werden beim Eintreffen zusammengeführt).
+    
+    Priorität:
+    1. Umgebungsvariable VISION_PAGE_CONCURRENCY
+    2. 3
+    """
+    return _get_int_env('VISION_PAGE_CONCURRENCY', 3, minimum=1)
+
+# =============================================================================
+# 💾 UPLOAD-SPEICHER
+# =============================================================================
+
+def get_upload_reuse_results() -> bool:
+    """
+    Gibt zurück, ob bei erneutem Upload identischer Inhalte (gleicher SHA-256,
+    gleiche Upload-Methode) die Ergebnisse des bereits verarbeiteten Dokuments
+    übernommen werden (keine erneute Extraktion, PNG-Erzeugung, KI-Analyse).
+    
+    Priorität:
+    1. Umgebungsvariable UPLOAD_REUSE_RESULTS ("true"/"false")
+    2. true
+    """
+    return os.getenv('UPLOAD_REUSE_RESULTS', 'true').strip().lower() in ('1', 'true', 'yes')
+
+# =============================================================================
+# 🖼️ VORSCHAU-THUMBNAILS
+# =============================================================================
+
+def get_thumbnail_format() -> str:
+    """
+    Gibt das Bildformat der Vorschau-Thumbnails zurück ("webp" oder "jpeg").
+    
+    Priorität:
+    1. Umgebungsvariable THUMBNAIL_FORMAT
+    2. "webp" (fällt auf "jpeg" zurück, wenn Pillow kein WebP kann)
+    """
+    image_format = os.getenv('THUMBNAIL_FORMAT', 'webp').strip().lower()
+    return "jpeg" if image_format in ("jpg", "jpeg") else "webp"
+
+def get_thumbnail_max_pages() -> int:
+    """
+    Gibt die maximale Seitenanzahl zurück, für die Thumbnails erzeugt werden.
+    
+    Priorität:
+    1. Umgebungsvariable THUMBNAIL_MAX_PAGES
+    2. 50
+    """
+    return _get_int_env('THUMBNAIL_MAX_PAGES', 50, minimum=1)
+
 # =============================================================================
 # 🌍 UMGEBUNGS-HILFSFUNKTIONEN
 # =============================================================================
@@ -339,6 +642,47 @@ def get_config_summary() -> Dict[str, any]:
             "fallback_chain": get_provider_fallback_chain()
         },
         "quality_thresholds": QUALITY_THRESHOLDS,
+        "worker_pools": {
+            "text_extraction": get_extraction_pool_type(),
+            "text_extraction_workers": get_extraction_pool_workers(),
+            "pdf_text_backends": get_pdf_text_backends(),
+            "pdf_page_range_size": get_pdf_page_range_size()
+        },
+        "database": {
+            "backend": get_database_url().split(":", 1)[0],
+            "pool_size": get_db_pool_size(),
+            "max_overflow": get_db_max_overflow(),
+            "statement_cache_size": get_db_statement_cache_size(),
+            "sqlite_reader_pool_size": get_sqlite_reader_pool_size(),
+            "write_timeout": get_db_write_timeout(),
+            "bulk_max_items": get_bulk_max_items()
+        },
+        "auth": {
+            "principal_cache_ttl": get_principal_cache_ttl(),
+            "principal_cache_size": get_principal_cache_size(),
+            "bcrypt_rounds": get_bcrypt_rounds(),
+            "password_hash_workers": get_password_hash_workers()
+        },
+        "metadata_extraction": {
+            "layer_concurrency": get_metadata_layer_concurrency(),
+            "layer_timeout": get_metadata_layer_timeout(),
+            "mode": get_metadata_extraction_mode(),
+            "enhanced_enabled": get_enhanced_metadata_enabled(),
+            "chunk_concurrency": get_chunk_metadata_concurrency(),
+            "chunk_token_budget": get_chunk_metadata_token_budget(),
+            "chunk_pack_tokens": get_chunk_metadata_pack_tokens(),
+            "chunk_max_retries": get_chunk_metadata_max_retries()
+        },
+        "vision": {
+            "page_concurrency": get_vision_page_concurrency()
+        },
+        "upload_storage": {
+            "reuse_results": get_upload_reuse_results()
+        },
+        "thumbnails": {
+            "format": get_thumbnail_format(),
+            "max_pages": get_thumbnail_max_pages()
+        },
         "environment": {
             "is_development": is_development(),
             "is_production": is_production(),
@@ -0,0 +1,202 @@
+"""
+KI-QMS Content-Addressable Storage (Upload-Deduplizierung)
+
+Der Inhalt jedes Uploads liegt genau einmal als Blob unter seinem SHA-256:
+
+    uploads/.cas/ab/ab3f...e9
+
+Die lesbaren Pfade (``uploads/{type}/{timestamp}_{hash8}_{filename}``) sind
+Hardlinks auf diesen Blob (Fallback: Symlink, zuletzt Kopie). Dieselbe PDF
+von fünf Abteilungen belegt so den Speicher nur einmal.
+
+Referenzzählung: Referenzen sind die ``Document``-Zeilen mit diesem
+``file_hash``. Beim Löschen eines Dokuments entfernt ``release`` den
+lesbaren Pfad (sofern kein anderes Dokument ihn nutzt) und den Blob, sobald
+keine Zeile mehr auf den Hash verweist. Dateien aus der Zeit vor dem CAS
+(ohne Blob) bleiben wie bisher unangetastet.
+
+Ergebnis-Wiederverwendung: ``find_processed_document`` liefert das zuletzt
+verarbeitete Dokument mit gleichem Hash und gleicher Upload-Methode;
+``REUSED_RESULT_FIELDS`` sind die Spalten (Extraktion, PNG-Vorschau,
+Vision-/Multi-Visio-Analyse, KI-Risikostufe), die ein neues Dokument daraus
+übernimmt. Sprache, Qualität und Compliance-Keywords der KI-Analyse stehen
+nur im Block ``🤖 KI-Analyse`` der Bemerkungen - ``stored_ai_analysis``
+liefert ihn unverändert, ``reused_ai_result`` die Werte daraus.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+import errno
+import logging
+import os
+import re
+import shutil
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from .models import Document as DocumentModel
+
+logger = logging.getLogger("KI-QMS.ContentStore")
+
+# Spalten, die ein identischer Upload vom bereits verarbeiteten Dokument übernimmt
+REUSED_RESULT_FIELDS = (
+    "extracted_text", "keywords",
+    "validation_status", "structured_analysis", "prompt_used", "ocr_text_preview",
+    "png_preview_path", "png_preview_hash", "png_preview_size",
+    "png_generation_timestamp", "png_generation_method",
+    "conversion_success", "conversion_duration_seconds", "conversion_log",
+    "multi_visio_stage1_result", "multi_visio_stage2_result", "multi_visio_stage3_result",
+    "multi_visio_stage4_result", "multi_visio_stage5_result", "multi_visio_pipeline_summary",
+    "multi_visio_provider_used", "multi_visio_total_duration", "multi_visio_success_rate",
+    "priority",
+)
+
+# Block der KI-Analyse in ``Document.remarks`` (geschrieben beim Upload)
+AI_ANALYSIS_MARKER = "🤖 KI-Analyse"
+_AI_LANGUAGE_PATTERN = re.compile(r"^- Sprache: (\S+) \(([\d.]+)%\)$", re.MULTILINE)
+_AI_QUALITY_PATTERN = re.compile(r"^- Qualität: ([\d.]+)%$", re.MULTILINE)
+_AI_TOPICS_PATTERN = re.compile(r"^- Compliance-Keywords: (.*)$", re.MULTILINE)
+
+
+class ContentStore:
+    """Blobs unter ihrem SHA-256 plus lesbare Links darauf."""
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.root / sha256[:2] / sha256
+
+    def put(self, source: Path, sha256: str) -> bool:
+        """
+        Übernimmt ``source`` (temporäre Datei) als Blob ``sha256``.
+
+        Returns:
+            bool: True wenn der Inhalt neu ist, False bei Treffer (``source`` wird verworfen)
+        """
+        blob = self.blob_path(sha256)
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        # os.link schlägt fehl statt zu ersetzen: bei parallelen Uploads desselben
+        # Inhalts gewinnt genau einer, lesbare Links zeigen nie auf verwaiste Inodes
+        try:
+            os.link(source, blob)
+        except FileExistsError:
+            source.unlink(missing_ok=True)
+            return False
+        except OSError as e:
+            if e.errno not in (errno.EPERM, errno.ENOTSUP):
+                raise
+            # Dateisystem ohne Hardlinks: lesbare Pfade sind dort Symlinks oder
+            # Kopien, ein ersetzter Blob lässt also keinen Link verwaisen
+            if blob.exists():
+                source.unlink(missing_ok=True)
+                return False
+            os.replace(source, blob)
+            return True
+        source.unlink(missing_ok=True)
+        return True
+
+    def link(self, sha256: str, path: Path) -> str:
+        """Legt ``path`` als Hardlink (sonst Symlink, sonst Kopie) auf den Blob an."""
+        blob = self.blob_path(sha256)
+        if path.exists() and os.path.samefile(path, blob):
+            return "existing"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(blob, path)
+            return "hardlink"
+        except OSError:
+            pass
+        try:
+            os.symlink(os.path.relpath(blob, path.parent), path)
+            return "symlink"
+        except OSError:
+            shutil.copy2(blob, path)
+            return "copy"
+
+    def release(self, db: Session, sha256: Optional[str], path: Optional[str]) -> bool:
+        """
+        Nach dem Löschen eines Dokuments: lesbaren Pfad und ggf. Blob entfernen.
+
+        Returns:
+            bool: True wenn der Blob entfernt wurde
+        """
+        if not sha256 or not self.blob_path(sha256).exists():
+            return False
+
+        if path and not _path_in_use(db, path):
+            file_path = Path(path)
+            if file_path.is_symlink() or (file_path.exists() and os.path.samefile(file_path, self.blob_path(sha256))):
+                file_path.unlink()
+
+        blob = self.blob_path(sha256)
+        # Weitere Hardlinks (z.B. Uploads ohne Dokument) halten den Blob ebenfalls
+        if reference_count(db, sha256) > 0 or blob.stat().st_nlink > 1:
+            return False
+        blob.unlink(missing_ok=True)
+        logger.info(f"🗑️ Blob {sha256[:8]}... ohne Referenzen entfernt")
+        return True
+
+
+def reference_count(db: Session, sha256: str) -> int:
+    """Anzahl der Dokumente, die auf den Inhalt ``sha256`` verweisen."""
+    return db.scalar(select(func.count()).where(DocumentModel.file_hash == sha256)) or 0
+
+
+def _path_in_use(db: Session, path: str) -> bool:
+    return db.scalar(select(DocumentModel.id).where(DocumentModel.file_path == path).limit(1)) is not None
+
+
+def find_processed_document(db: Session, sha256: str, upload_method: str) -> Optional[DocumentModel]:
+    """Zuletzt verarbeitetes Dokument mit gleichem Inhalt und gleicher Upload-Methode."""
+    return db.scalars(
+        select(DocumentModel)
+        .where(DocumentModel.file_hash == sha256,
+               DocumentModel.upload_method == upload_method,
+               DocumentModel.extracted_text.is_not(None))
+        .order_by(DocumentModel.id.desc())
+        .limit(1)
+    ).first()
+
+
+def stored_ai_analysis(document: DocumentModel) -> Optional[str]:
+    """Block ``🤖 KI-Analyse ...`` aus den Bemerkungen eines Dokuments (None wenn nicht vorhanden)."""
+    remarks = document.remarks or ""
+    start = remarks.find(AI_ANALYSIS_MARKER)
+    return remarks[start:] if start >= 0 else None
+
+
+def reused_ai_result(document: DocumentModel) -> Dict[str, Any]:
+    """
+    KI-Ergebnis eines identischen Uploads aus den gespeicherten Werten.
+
+    Enthält nur, was zum Dokument gespeichert ist - fehlt der Analyse-Block,
+    bleiben Sprache und Qualität weg statt geschätzt zu werden.
+    """
+    result: Dict[str, Any] = {
+        'document_type': document.document_type.value if document.document_type else 'OTHER',
+        'keywords': [kw.strip() for kw in (document.keywords or "").split(",") if kw.strip()],
+        'main_topics': [],
+        'norm_references': [],
+        'ai_summary': f"Übernommen aus Dokument {document.id} (identischer Inhalt)",
+        'provider': f"wiederverwendet (Dokument {document.id})",
+    }
+    if document.priority:
+        result['risk_level'] = document.priority
+
+    analysis = stored_ai_analysis(document)
+    if analysis is None:
+        return result
+    language = _AI_LANGUAGE_PATTERN.search(analysis)
+    if language:
+        result['language'] = language.group(1)
+        result['language_confidence'] = float(language.group(2)) / 100
+    quality = _AI_QUALITY_PATTERN.search(analysis)
+    if quality:
+        # gespeichert als quality_score / 10 in Prozent
+        result['quality_score'] = round(float(quality.group(1)) / 10)
+    topics = _AI_TOPICS_PATTERN.search(analysis)
+    if topics:
+        result['main_topics'] = [topic.strip() for topic in topics.group(1).split(",") if topic.strip()]
+    return result
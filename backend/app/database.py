@@ -6,70 +6,89 @@ KI-gestützte Qualitätsmanagementsystem. Es stellt SQLAlchemy-Engine,
 Session-Factory und Dependency-Injection für FastAPI bereit.
 
 Technische Details:
-- SQLite-Datenbank für MVP (einfache Deployment)
+- Datenbank über ``DATABASE_URL`` wählbar (SQLite für MVP, PostgreSQL für Produktion)
 - SQLAlchemy ORM für Datenbankoperationen
-- Connection Pooling für Performance
+- Dialekt-spezifisches Connection-Pooling (siehe unten)
 - Automatische Session-Verwaltung mit Dependency Injection
-- Check_same_thread=False für Multi-Threading-Unterstützung
 
-Produktion-Überlegungen:
-- Für Produktion: PostgreSQL/MySQL empfohlen
-- Umgebungsvariablen für DB-Credentials
-- Connection Pool Size Tuning
-- Read-Write Replica Support
+PostgreSQL:
+- QueuePool (DB_POOL_SIZE / DB_MAX_OVERFLOW), pool_pre_ping, pool_recycle
+- Statement-Cache (SQLAlchemy-Compile-Cache, bei psycopg 3 zusätzlich
+  serverseitige Prepared Statements)
+
+SQLite (ein Schreiber pro Datenbankdatei):
+- Schreib-Engine mit genau einer Connection: Schreibende Sessions werden
+  im Pool serialisiert (Wartezeit DB_WRITE_TIMEOUT) statt mit
+  ``database is locked`` abzubrechen
+- Sync- und Async-Schreib-Engine teilen einen Schreib-Lock (Pool-Checkout
+  bis -Checkin); die AsyncSession wartet darauf, ohne den Event-Loop zu
+  blockieren
+- Lese-Engine mit eigenem Pool (SQLITE_READER_POOL_SIZE, ``query_only``):
+  Dank WAL lesen Requests parallel zum Schreiber
+- ``RoutingSession`` leitet Lesezugriffe an den Lese-Pool und Flush/DML an
+  die Schreib-Connection; nach dem ersten Schreibzugriff bleibt die Session
+  bis Transaktionsende beim Schreiber (liest ihre eigenen Änderungen)
+
+Async: ``get_async_db`` liefert eine ``AsyncSession`` über aiosqlite bzw.
+asyncpg mit denselben Pools/Routing-Regeln (eigene Connections).
+Sync-Sessions (``get_db``) warten blockierend auf den Schreiber - Endpoints
+mit ``get_db`` sind daher ``def`` (Threadpool); ``async def``-Endpoints
+nutzen ``get_async_db`` oder lagern Sync-Schreibzugriffe mit
+``run_in_db_thread`` aus.
+
+Datenübernahme zwischen Datenbanken: ``scripts/migrate_database.py``
 
 Autoren: KI-QMS Entwicklungsteam
 Version: 1.0.0 (MVP Phase 1)
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, ForeignKey, event
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, ForeignKey, event, exc, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import Session, sessionmaker, relationship
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.util import await_only
 from datetime import datetime
+import asyncio
+import logging
 import os
+import threading
+import time
+
+from .config import (
+    get_database_url, get_db_pool_size, get_db_max_overflow, get_db_statement_cache_size,
+    get_sqlite_reader_pool_size, get_db_write_timeout
+)
+
+logger = logging.getLogger("KI-QMS.Database")
 
 # ===== DATENBANK-KONFIGURATION =====
 
-# SQLite-Datenbankpfad (relativ zum Backend-Verzeichnis)
-# In Produktion durch Umgebungsvariable DATABASE_URL ersetzen
-DATABASE_URL = "sqlite:///./qms_mvp.db"
-
-# SQLAlchemy-Engine mit SQLite-spezifischen Optimierungen
-engine = create_engine(
-    DATABASE_URL,
-    # SQLite-spezifische Optionen für FastAPI-Kompatibilität
-    connect_args={
-        "check_same_thread": False,    # Erlaubt Multi-Threading-Zugriff
-        "timeout": 30                  # Connection-Timeout in Sekunden
-    },
-    # Performance-Optimierungen
-    pool_size=20,                      # Anzahl persistenter Connections
-    max_overflow=30,                   # Zusätzliche Connections bei Bedarf
-    pool_pre_ping=True,                # Validiert Connections vor Nutzung
-    echo=False                         # SQL-Logging (für Debug auf True setzen)
-)
+# Standard: SQLite relativ zum Backend-Verzeichnis, in Produktion DATABASE_URL setzen
+DATABASE_URL = get_database_url()
+DATABASE_BACKEND = make_url(DATABASE_URL).get_backend_name()
+IS_SQLITE = DATABASE_BACKEND == "sqlite"
 
-# Session-Factory für Datenbank-Operationen
-# autocommit=False: Explizite Transaktions-Kontrolle
-# autoflush=False: Bessere Performance, manueller Flush
-SessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=engine
-)
+# In-Memory-SQLite: Lese- und Schreib-Pool würden verschiedene Datenbanken sehen
+_SQLITE_IN_MEMORY = IS_SQLITE and make_url(DATABASE_URL).database in (None, "", ":memory:")
 
-# Deklarative Basis für alle ORM-Modelle
-# Alle Model-Klassen erben von dieser Basis
-Base = declarative_base()
+# Async-Treiber je Backend (für AsyncSession)
+_ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+# Lesende Raw-SQL-Statements (alles andere geht an den Schreiber)
+_READ_ONLY_SQL_PREFIXES = ("SELECT", "WITH", "EXPLAIN")
 
 # ===== SQLITE-OPTIMIERUNGEN =====
 
 def _set_sqlite_pragma(dbapi_connection, connection_record):
     """
-    SQLite-Performance-Optimierungen bei jeder neuen Connection.
+    SQLite-Einstellungen bei jeder neuen Connection.
     
-    Aktiviert wichtige SQLite-Features für bessere Performance
-    und Datenintegrität im Produktions-ähnlichen Betrieb.
+    Nur Connection-bezogene PRAGMAs - ``page_size`` und ``auto_vacuum``
+    wirken erst beim Anlegen bzw. nach VACUUM und werden daher nicht
+    mehr pro Connection gesetzt.
     
     Args:
         dbapi_connection: Raw SQLite-Connection
@@ -77,38 +96,238 @@ def _set_sqlite_pragma(dbapi_connection, connection_record):
         
     Optimierungen:
         - Foreign Key Constraints für Referentielle Integrität
-        - WAL-Mode für bessere Concurrency
-        - Synchronous=NORMAL für Performance/Sicherheit-Balance
-        - Memory-Mapped I/O für Speed
-        - Optimierte Cache-Größe
+        - WAL-Mode: Leser blockieren den Schreiber nicht (persistent in der Datei)
+        - Synchronous=NORMAL für Performance/Sicherheit-Balance (sicher mit WAL)
+        - Memory-Mapped I/O und Cache-Größe pro Connection
     """
     cursor = dbapi_connection.cursor()
     try:
-        # Aktiviere Foreign Key Constraints (standardmäßig deaktiviert)
         cursor.execute("PRAGMA foreign_keys=ON")
-        
-        # WAL-Mode für bessere Multi-User-Performance
         cursor.execute("PRAGMA journal_mode=WAL")
-        
-        # Synchronization-Mode: NORMAL (Performance/Sicherheit-Balance)
         cursor.execute("PRAGMA synchronous=NORMAL")
-        
-        # Memory-Mapped I/O für bessere Performance
         cursor.execute("PRAGMA mmap_size=268435456")  # 256MB
-        
-        # Cache-Größe für häufig genutzte Pages
-        cursor.execute("PRAGMA cache_size=10000")      # 10000 Pages ~40MB
-        
-        # Optimierter Page-Size (Standard: 4096)
-        cursor.execute("PRAGMA page_size=4096")
-        
-        # Auto-Vacuum für Speicher-Effizienz
-        cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        cursor.execute("PRAGMA cache_size=-40000")     # ~40MB
     finally:
         cursor.close()
 
-# Event-Listener für SQLite-Optimierungen bei jeder Connection
-event.listen(engine, "connect", _set_sqlite_pragma)
+def _set_sqlite_reader_pragma(dbapi_connection, connection_record):
+    """Lese-Connections: zusätzlich ``query_only`` - Schreibversuche schlagen sofort fehl."""
+    _set_sqlite_pragma(dbapi_connection, connection_record)
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+# ===== GEMEINSAMER SCHREIB-LOCK (SQLite) =====
+
+# Sync- und Async-Schreib-Engine haben je eine Connection auf dieselbe Datei.
+# Eine Schreib-Connection ist nur ausgecheckt, solange sie diesen Lock hält -
+# beide Engines reihen sich so hintereinander ein, statt sich gegenseitig
+# mit ``database is locked`` abzubrechen.
+_WRITER_LOCK_FLAG = "qms_writer_lock"
+_WRITER_LOCK_POLL_SECONDS = 0.005
+_writer_lock = threading.Lock()
+
+def _writer_lock_timeout():
+    return exc.TimeoutError(
+        f"Schreib-Lock nicht innerhalb von {get_db_write_timeout()}s frei (DB_WRITE_TIMEOUT)"
+    )
+
+def _running_on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+def _acquire_writer_lock(dbapi_connection, connection_record, connection_proxy):
+    """Checkout der Sync-Schreib-Connection: wartet im aufrufenden Thread."""
+    if not _writer_lock.acquire(blocking=False):
+        if _running_on_event_loop():
+            logger.warning("⚠️ Sync-Schreibzugriff wartet im Event-Loop auf den Schreib-Lock "
+                           "(Endpoint als 'def' oder mit get_async_db umsetzen)")
+        if not _writer_lock.acquire(timeout=get_db_write_timeout()):
+            raise _writer_lock_timeout()
+    connection_record.info[_WRITER_LOCK_FLAG] = True
+
+async def _wait_for_writer_lock():
+    """Pollt den Lock, ohne den Event-Loop zu blockieren (abbrechbar)."""
+    deadline = time.monotonic() + get_db_write_timeout()
+    while not _writer_lock.acquire(blocking=False):
+        if time.monotonic() >= deadline:
+            raise _writer_lock_timeout()
+        await asyncio.sleep(_WRITER_LOCK_POLL_SECONDS)
+
+def _acquire_writer_lock_async(dbapi_connection, connection_record, connection_proxy):
+    """Checkout der Async-Schreib-Connection (läuft im Greenlet der AsyncSession)."""
+    await_only(_wait_for_writer_lock())
+    connection_record.info[_WRITER_LOCK_FLAG] = True
+
+def _release_writer_lock(dbapi_connection, connection_record):
+    """Checkin (auch nach Fehlern/Invalidierung): Lock wieder freigeben."""
+    if connection_record.info.pop(_WRITER_LOCK_FLAG, False):
+        _writer_lock.release()
+
+def _create_sqlite_engines(url=DATABASE_URL, create=create_engine, pool_class=QueuePool):
+    """Schreib-Engine (eine Connection) und Lese-Engine (Pool) für SQLite."""
+    connect_args = {
+        "check_same_thread": False,            # Connections wechseln zwischen Threads
+        "timeout": get_db_write_timeout()      # busy_timeout gegenüber anderen Prozessen
+    }
+
+    if _SQLITE_IN_MEMORY:
+        memory_engine = create(url, connect_args=connect_args, poolclass=StaticPool)
+        event.listen(getattr(memory_engine, "sync_engine", memory_engine), "connect", _set_sqlite_pragma)
+        return memory_engine, memory_engine
+
+    writer = create(
+        url,
+        connect_args=connect_args,
+        poolclass=pool_class,
+        pool_size=1,                           # Genau ein Schreiber
+        max_overflow=0,
+        pool_timeout=get_db_write_timeout(),   # Wartende Schreiber reihen sich ein
+        query_cache_size=get_db_statement_cache_size(),
+        echo=False
+    )
+    reader = create(
+        url,
+        connect_args=connect_args,
+        poolclass=pool_class,
+        pool_size=get_sqlite_reader_pool_size(),
+        max_overflow=get_sqlite_reader_pool_size(),
+        query_cache_size=get_db_statement_cache_size(),
+        echo=False
+    )
+    # Async-Engines: PRAGMAs und Lock über die darunterliegende Sync-Engine
+    is_async = hasattr(writer, "sync_engine")
+    writer_events = getattr(writer, "sync_engine", writer)
+    event.listen(writer_events, "connect", _set_sqlite_pragma)
+    event.listen(writer_events, "checkout", _acquire_writer_lock_async if is_async else _acquire_writer_lock)
+    event.listen(writer_events, "checkin", _release_writer_lock)
+    event.listen(getattr(reader, "sync_engine", reader), "connect", _set_sqlite_reader_pragma)
+    return writer, reader
+
+def _create_server_engine(url=DATABASE_URL, create=create_engine, pool_class=QueuePool):
+    """Engine für Server-Datenbanken (PostgreSQL) mit QueuePool und Statement-Cache."""
+    connect_args = {}
+    if make_url(url).get_driver_name() == "psycopg":
+        # psycopg 3: wiederholte Statements serverseitig vorbereiten
+        connect_args["prepare_threshold"] = 5
+
+    return create(
+        url,
+        connect_args=connect_args,
+        poolclass=pool_class,
+        pool_size=get_db_pool_size(),
+        max_overflow=get_db_max_overflow(),
+        pool_pre_ping=True,                    # Validiert Connections vor Nutzung
+        pool_recycle=1800,                     # Vor Server-/Proxy-Timeouts erneuern
+        query_cache_size=get_db_statement_cache_size(),
+        echo=False                             # SQL-Logging (für Debug auf True setzen)
+    )
+
+def _to_async_url(url: str):
+    """Leitet die Async-Treiber-URL ab (sqlite → aiosqlite, postgresql → asyncpg)."""
+    parsed = make_url(url)
+    if parsed.get_driver_name() in ("aiosqlite", "asyncpg", "psycopg"):
+        return parsed                          # psycopg 3 kann sync und async
+    async_driver = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if async_driver is None:
+        return parsed
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{async_driver}")
+
+ASYNC_DATABASE_URL = _to_async_url(DATABASE_URL)
+
+if IS_SQLITE:
+    engine, read_engine = _create_sqlite_engines()
+    async_engine, async_read_engine = _create_sqlite_engines(
+        ASYNC_DATABASE_URL, create=create_async_engine, pool_class=AsyncAdaptedQueuePool
+    )
+else:
+    engine = _create_server_engine()
+    read_engine = engine
+    async_engine = _create_server_engine(
+        ASYNC_DATABASE_URL, create=create_async_engine, pool_class=AsyncAdaptedQueuePool
+    )
+    async_read_engine = async_engine
+
+# ===== SESSION-ROUTING =====
+
+def _is_write_statement(clause) -> bool:
+    """True für DML (INSERT/UPDATE/DELETE) und nicht-lesendes Raw-SQL."""
+    if clause is None:
+        return False
+    if getattr(clause, "is_dml", False):
+        return True
+    if isinstance(clause, TextClause):
+        return not clause.text.lstrip().upper().startswith(_READ_ONLY_SQL_PREFIXES)
+    return False
+
+class RoutingSession(Session):
+    """
+    Session mit getrennten Lese- und Schreib-Connections (SQLite).
+    
+    - Flush, DML und schreibendes Raw-SQL → Schreib-Engine
+    - SELECTs → Lese-Pool, solange die Session in dieser Transaktion noch
+      nicht geschrieben hat
+    - ``session.connection()`` ohne Statement → Schreib-Engine
+    """
+
+    _WRITE_FLAG = "qms_uses_writer"
+
+    writer_engine = engine
+    reader_engine = read_engine
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.writer_engine is self.reader_engine:
+            return self.writer_engine
+        if (
+            self.info.get(self._WRITE_FLAG)
+            or self._flushing
+            or _is_write_statement(clause)
+            or (mapper is None and clause is None)
+        ):
+            self.info[self._WRITE_FLAG] = True
+            return self.writer_engine
+        return self.reader_engine
+
+class AsyncRoutingSession(RoutingSession):
+    """Sync-Session hinter ``AsyncSession`` - gleiches Routing über die Async-Engines."""
+
+    writer_engine = async_engine.sync_engine
+    reader_engine = async_read_engine.sync_engine
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _release_writer_flag(session, transaction):
+    """Nach Commit/Rollback darf die Session wieder aus dem Lese-Pool lesen."""
+    if transaction.parent is None:
+        session.info.pop(RoutingSession._WRITE_FLAG, None)
+
+# Session-Factory für Datenbank-Operationen
+# autocommit=False: Explizite Transaktions-Kontrolle
+# autoflush=False: Bessere Performance, manueller Flush
+SessionLocal = sessionmaker(
+    class_=RoutingSession if IS_SQLITE else Session,
+    autocommit=False,
+    autoflush=False,
+    bind=engine
+)
+
+# Async-Session-Factory für nicht-blockierende Endpoints
+# expire_on_commit=False: Attribute bleiben nach Commit ohne implizites (blockierendes) Nachladen lesbar
+AsyncSessionLocal = async_sessionmaker(
+    class_=AsyncSession,
+    sync_session_class=AsyncRoutingSession if IS_SQLITE else Session,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=async_engine
+)
+
+# Deklarative Basis für alle ORM-Modelle
+# Alle Model-Klassen erben von dieser Basis
+Base = declarative_base()
 
 # ===== DATABASE SESSION MANAGEMENT =====
 
@@ -131,7 +350,7 @@ def get_db():
     Usage:
         ```python
         @app.get("/api/example")
-        async def example_endpoint(db: Session = Depends(get_db)):
+        def example_endpoint(db: Session = Depends(get_db)):
             return db.query(Model).all()
         ```
         
@@ -144,6 +363,8 @@ def get_db():
         - Session-Scope: Ein Request
         - Connection Reuse durch Pool
         - Lazy Loading für Relationships
+        - Endpoint als ``def``: FastAPI führt ihn im Threadpool aus, das
+          Warten auf den Schreiber blockiert den Event-Loop nicht
     """
     # Erstelle neue Session für diesen Request
     db = SessionLocal()
@@ -163,6 +384,58 @@ def get_db():
         # Session immer schließen für Connection Pool Cleanup
         db.close()
 
+async def get_async_db():
+    """
+    FastAPI Dependency für eine ``AsyncSession`` (aiosqlite/asyncpg).
+    
+    Datenbankzugriffe blockieren den Event-Loop nicht - langsame Queries
+    halten parallel laufende (KI-)Requests desselben Workers nicht auf.
+    
+    Yields:
+        AsyncSession: Session für ``await db.execute(select(...))``
+        
+    Usage:
+        ```python
+        @app.get("/api/example")
+        async def example_endpoint(db: AsyncSession = Depends(get_async_db)):
+            result = await db.execute(select(Model))
+            return result.scalars().all()
+        ```
+        
+    Note:
+        - Beziehungen vorab laden (selectinload) oder Serialisierung über
+          ``await db.run_sync(...)`` ausführen - implizites Lazy Loading
+          ist in async-Code nicht möglich
+        - Objekte gehören zur AsyncSession, nicht zur Sync-Session aus get_db
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception:
+            await db.rollback()
+            raise
+
+async def run_in_db_thread(func, *args, **kwargs):
+    """
+    Führt einen Sync-Datenbankzugriff (z. B. ``db.commit``) im Threadpool aus.
+    
+    Für ``async def``-Endpoints mit ``get_db``: Das Warten auf die
+    Schreib-Connection (bis DB_WRITE_TIMEOUT) hält den Event-Loop nicht an.
+    
+    Usage:
+        ```python
+        db.add(obj)
+        await run_in_db_thread(db.commit)
+        ```
+    """
+    return await asyncio.to_thread(func, *args, **kwargs)
+
+async def dispose_async_engines():
+    """Schließt die Async-Connection-Pools (beim Shutdown)."""
+    await async_engine.dispose()
+    if async_read_engine is not async_engine:
+        await async_read_engine.dispose()
+
 def create_tables():
     """
     Erstellt alle Datenbank-Tabellen basierend auf SQLAlchemy-Modellen.
@@ -221,8 +494,9 @@ def get_db_info():
         {
             "database_url": "sqlite:///./qms_mvp.db",
             "engine_name": "sqlite",
-            "pool_size": 20,
-            "max_overflow": 30,
+            "pool_size": 1,
+            "max_overflow": 0,
+            "reader_pool_size": 8,
             "total_tables": 8,
             "table_names": ["users", "interest_groups", ...]
         }
@@ -231,10 +505,11 @@ def get_db_info():
     from . import models
     
     return {
-        "database_url": DATABASE_URL,
+        "database_url": make_url(DATABASE_URL).render_as_string(hide_password=True),
         "engine_name": engine.name,
-        "pool_size": engine.pool.size(),
-        "max_overflow": engine.pool._max_overflow,
+        "pool_size": engine.pool.size() if isinstance(engine.pool, QueuePool) else 1,
+        "max_overflow": getattr(engine.pool, "_max_overflow", 0),
+        "reader_pool_size": read_engine.pool.size() if read_engine is not engine else None,
         "total_tables": len(Base.metadata.tables),
         "table_names": list(Base.metadata.tables.keys())
     }
@@ -263,7 +538,7 @@ def check_database_connection():
     try:
         # Einfache Query um Connection zu testen
         with engine.connect() as connection:
-            result = connection.execute("SELECT 1")
+            result = connection.execute(text("SELECT 1"))
             return result.fetchone()[0] == 1
             
     except Exception as e:
@@ -319,10 +594,14 @@ def reset_database():
 # Hauptsächlich genutzte Objekte für Import in anderen Modulen
 
 __all__ = [
-    "engine",          # SQLAlchemy Engine
+    "engine",          # SQLAlchemy Engine (Schreiber)
+    "read_engine",     # Lese-Engine (SQLite: eigener Pool, sonst = engine)
     "SessionLocal",    # Session Factory
     "Base",           # Deklarative Basis für Modelle
     "get_db",         # FastAPI Dependency
+    "AsyncSessionLocal",  # Async-Session-Factory
+    "get_async_db",   # FastAPI Dependency (AsyncSession)
+    "run_in_db_thread",  # Sync-DB-Zugriff aus async-Code im Threadpool
     "create_tables",  # Schema-Erstellung
     "get_db_info",    # DB-Informationen
     "check_database_connection"  # Health Check
@@ -0,0 +1,292 @@
+"""
+KI-QMS Duplikats-Index (MinHash + LSH)
+
+Ersetzt den O(N)-Vergleich gegen alle Dokumenttexte durch einen
+persistenten MinHash-Index:
+
+- Beim Upload wird aus dem extrahierten Text einmalig eine MinHash-Signatur
+  berechnet und in ``document_signatures`` gespeichert.
+- Ein In-Memory-LSH-Index (Banding) liefert in Millisekunden die Kandidaten,
+  deren geschätzte Jaccard-Ähnlichkeit über der Schwelle liegen kann.
+- Nur für diese Kandidaten wird anschließend die exakte Ähnlichkeit
+  berechnet (``AdvancedAIEngine._find_potential_duplicates``).
+
+Die Tokenisierung (``similarity_tokens``) ist dieselbe wie in
+``AdvancedAIEngine.calculate_content_similarity``; die MinHash-Schätzung
+nähert also genau die bisherige Jaccard-Ähnlichkeit an. Texte ohne Tokens
+(leer, Extraktion fehlgeschlagen) haben wie dort Ähnlichkeit 0.0: ihre
+Signatur (nur Maximalwerte) wird gespeichert, aber nie als Kandidat
+geliefert.
+"""
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import hashlib
+import logging
+import threading
+
+import numpy as np
+from sqlalchemy.orm import Session, load_only
+
+from .ai_engine import similarity_tokens
+from .models import Document as DocumentModel, DocumentSignature
+
+logger = logging.getLogger("KI-QMS.DuplicateIndex")
+
+# 128 Permutationen in 32 Bändern à 4 Zeilen: Kandidaten-Schwelle ≈ (1/32)^(1/4) ≈ 0.42,
+# Dokumente mit Jaccard ≥ 0.7 werden mit > 99.9% Wahrscheinlichkeit gefunden
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 32
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+
+# Schwelle für die Kandidatenauswahl (geschätzt) vor der exakten Prüfung
+CANDIDATE_MIN_ESTIMATE = 0.5
+MAX_CANDIDATES = 50
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_HASH_BLOCK_SIZE = 4096
+
+# Feste Permutationen: Signaturen müssen über Neustarts hinweg vergleichbar bleiben
+_random = np.random.RandomState(20240101)
+_PERM_A = _random.randint(1, 1 << 32, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _random.randint(0, 1 << 32, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def compute_minhash(tokens: Iterable[str]) -> np.ndarray:
+    """
+    Berechnet die MinHash-Signatur einer Wortmenge.
+
+    Token-Hashes sind prozessunabhängig (blake2b statt ``hash()``), die
+    Permutationen werden blockweise vektorisiert angewendet.
+    """
+    signature = np.full(NUM_PERMUTATIONS, _MAX_HASH, dtype=np.uint64)
+    token_hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=4).digest(), 'little')
+         for token in tokens),
+        dtype=np.uint64
+    )
+    for offset in range(0, len(token_hashes), _HASH_BLOCK_SIZE):
+        block = token_hashes[offset:offset + _HASH_BLOCK_SIZE, np.newaxis]
+        permuted = (block * _PERM_A + _PERM_B) % _MERSENNE_PRIME & _MAX_HASH
+        np.minimum(signature, permuted.min(axis=0), out=signature)
+    return signature.astype(np.uint32)
+
+
+def signature_to_bytes(signature: np.ndarray) -> bytes:
+    return signature.astype('<u4').tobytes()
+
+
+def signature_from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype='<u4').astype(np.uint32)
+
+
+def is_empty_signature(signature: np.ndarray) -> bool:
+    """Signatur einer leeren Tokenmenge (alle Werte unverändert auf dem Maximum)."""
+    return bool(np.all(signature == np.uint32(_MAX_HASH)))
+
+
+def estimate_similarity(signature1: np.ndarray, signature2: np.ndarray) -> float:
+    """Geschätzte Jaccard-Ähnlichkeit = Anteil übereinstimmender MinHash-Werte (0.0 ohne Tokens)."""
+    if is_empty_signature(signature1) or is_empty_signature(signature2):
+        return 0.0
+    return float(np.count_nonzero(signature1 == signature2)) / NUM_PERMUTATIONS
+
+
+class MinHashLSHIndex:
+    """
+    In-Memory-LSH-Index über alle gespeicherten Dokument-Signaturen.
+
+    Wird beim ersten Zugriff aus ``document_signatures`` aufgebaut (fehlende
+    Signaturen werden dabei nachberechnet) und danach bei Upload/Löschen
+    inkrementell gepflegt.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._signatures: Dict[int, np.ndarray] = {}
+        self._buckets: List[Dict[bytes, Set[int]]] = [{} for _ in range(LSH_BANDS)]
+
+    @staticmethod
+    def _band_keys(signature: np.ndarray) -> List[bytes]:
+        return [signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes() for band in range(LSH_BANDS)]
+
+    def add(self, document_id: int, signature: np.ndarray):
+        with self._lock:
+            self.remove(document_id)
+            self._signatures[document_id] = signature
+            if is_empty_signature(signature):
+                # Ohne Tokens kein Duplikat-Kandidat (alle leeren Texte teilen dieselben Bänder)
+                return
+            for band, key in enumerate(self._band_keys(signature)):
+                self._buckets[band].setdefault(key, set()).add(document_id)
+
+    def remove(self, document_id: int):
+        with self._lock:
+            signature = self._signatures.pop(document_id, None)
+            if signature is None:
+                return
+            for band, key in enumerate(self._band_keys(signature)):
+                bucket = self._buckets[band].get(key)
+                if bucket:
+                    bucket.discard(document_id)
+                    if not bucket:
+                        del self._buckets[band][key]
+
+    def get(self, document_id: int) -> Optional[np.ndarray]:
+        return self._signatures.get(document_id)
+
+    def query(
+        self,
+        signature: np.ndarray,
+        exclude_id: Optional[int] = None,
+        min_estimate: float = CANDIDATE_MIN_ESTIMATE,
+        limit: int = MAX_CANDIDATES
+    ) -> List[Tuple[int, float]]:
+        """
+        Liefert (document_id, geschätzte Ähnlichkeit) aller Kandidaten,
+        absteigend sortiert.
+        """
+        if is_empty_signature(signature):
+            return []
+        with self._lock:
+            candidate_ids: Set[int] = set()
+            for band, key in enumerate(self._band_keys(signature)):
+                candidate_ids.update(self._buckets[band].get(key, ()))
+            candidate_ids.discard(exclude_id)
+            scored = [(doc_id, estimate_similarity(signature, self._signatures[doc_id]))
+                      for doc_id in candidate_ids]
+        scored = [item for item in scored if item[1] >= min_estimate]
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:limit]
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def ensure_loaded(self, db: Session, batch_size: int = 500):
+        """Baut den Index einmalig aus der Datenbank auf (inkl. Nachberechnung fehlender Signaturen)."""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+
+            for row in db.query(DocumentSignature).yield_per(batch_size):
+                if row.num_permutations == NUM_PERMUTATIONS:
+                    self.add(row.document_id, signature_from_bytes(row.signature))
+
+            # Dokumente ohne (aktuelle) Signatur: erst nur IDs, dann Texte batchweise
+            missing_ids = [
+                document_id for (document_id,) in
+                db.query(DocumentModel.id)
+                .outerjoin(DocumentSignature, DocumentSignature.document_id == DocumentModel.id)
+                .filter(DocumentModel.extracted_text.isnot(None))
+                .filter((DocumentSignature.document_id.is_(None)) |
+                        (DocumentSignature.num_permutations != NUM_PERMUTATIONS))
+            ]
+            for offset in range(0, len(missing_ids), batch_size):
+                batch = (
+                    db.query(DocumentModel.id, DocumentModel.extracted_text)
+                    .filter(DocumentModel.id.in_(missing_ids[offset:offset + batch_size]))
+                    .all()
+                )
+                for document_id, text in batch:
+                    store_document_signature(db, document_id, text, commit=False)
+                db.commit()
+            if missing_ids:
+                logger.info(f"🔁 {len(missing_ids)} fehlende MinHash-Signaturen nachberechnet")
+
+            self._loaded = True
+            logger.info(f"🔍 Duplikats-Index geladen: {len(self._signatures)} Dokumente")
+
+
+# Globale Index-Instanz
+duplicate_index = MinHashLSHIndex()
+
+
+def store_document_signature(db: Session, document_id: int, text: Optional[str], commit: bool = True) -> Optional[np.ndarray]:
+    """
+    Berechnet und speichert die Signatur eines Dokuments und aktualisiert den Index.
+
+    Returns:
+        Die Signatur oder None, wenn das Dokument keinen Text hat
+    """
+    if not text:
+        db.query(DocumentSignature).filter(DocumentSignature.document_id == document_id).delete()
+        duplicate_index.remove(document_id)
+        if commit:
+            db.commit()
+        return None
+
+    tokens = similarity_tokens(text)
+    signature = compute_minhash(tokens)
+    row = db.get(DocumentSignature, document_id)
+    if row is None:
+        row = DocumentSignature(document_id=document_id)
+        db.add(row)
+    row.signature = signature_to_bytes(signature)
+    row.num_permutations = NUM_PERMUTATIONS
+    row.token_count = len(tokens)
+    if commit:
+        db.commit()
+    duplicate_index.add(document_id, signature)
+    return signature
+
+
+def get_document_signature(db: Session, document_id: int) -> Optional[np.ndarray]:
+    """Gespeicherte Signatur eines Dokuments (wird bei Bedarf berechnet)."""
+    duplicate_index.ensure_loaded(db)
+    signature = duplicate_index.get(document_id)
+    if signature is not None:
+        return signature
+
+    document = (
+        db.query(DocumentModel)
+        .options(load_only(DocumentModel.id, DocumentModel.extracted_text))
+        .filter(DocumentModel.id == document_id)
+        .first()
+    )
+    if not document:
+        return None
+    return store_document_signature(db, document_id, document.extracted_text)
+
+
+def find_duplicate_candidates(
+    db: Session,
+    text: Optional[str] = None,
+    document_id: Optional[int] = None,
+    limit: int = MAX_CANDIDATES
+) -> List[Dict]:
+    """
+    Lädt nur die LSH-Kandidaten (id, title, extracted_text) für die exakte
+    Duplikatsprüfung - im Format von ``comprehensive_analysis(existing_documents=...)``.
+
+    Args:
+        text: Zu prüfender Text (für noch nicht gespeicherte Texte)
+        document_id: Bereits gespeichertes Dokument (wird selbst ausgeschlossen)
+    """
+    duplicate_index.ensure_loaded(db)
+
+    signature = None
+    if document_id is not None:
+        signature = get_document_signature(db, document_id)
+    if signature is None and text:
+        signature = compute_minhash(similarity_tokens(text))
+    if signature is None:
+        return []
+
+    candidates = duplicate_index.query(signature, exclude_id=document_id, limit=limit)
+    if not candidates:
+        return []
+
+    documents = (
+        db.query(DocumentModel)
+        .options(load_only(DocumentModel.id, DocumentModel.title, DocumentModel.extracted_text))
+        .filter(DocumentModel.id.in_([doc_id for doc_id, _ in candidates]))
+        .filter(DocumentModel.extracted_text.isnot(None))
+        .all()
+    )
+    return [
+        {'id': doc.id, 'title': doc.title, 'extracted_text': doc.extracted_text or ""}
+        for doc in documents
+    ]
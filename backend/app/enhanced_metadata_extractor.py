@@ -24,30 +24,61 @@ Version: 3.5.0 - Enterprise Edition
 
 import logging
 import asyncio
+import random
 import time
 from typing import Dict, Any, List, Optional, Union
 from datetime import datetime
 
 # Enhanced Schemas Import
-from schemas_enhanced import (
-    EnhancedDocumentMetadata,
-    EnhancedChunkMetadata,
-    EnhancedMetadataResponse,
-    EnhancedMetadataExtractionRequest,
-    EnhancedDocumentType,
-    EnhancedKeyword,
-    KeywordImportance,
-    QualityScore,
-    ComplianceLevel,
-    normalize_document_type,
-    create_fallback_metadata
-)
+try:
+    from .schemas_enhanced import (
+        EnhancedDocumentMetadata,
+        EnhancedChunkMetadata,
+        EnhancedMetadataResponse,
+        EnhancedMetadataExtractionRequest,
+        EnhancedDocumentType,
+        EnhancedKeyword,
+        KeywordImportance,
+        QualityScore,
+        ComplianceLevel,
+        normalize_document_type,
+        create_fallback_metadata
+    )
+except ImportError:
+    from schemas_enhanced import (
+        EnhancedDocumentMetadata,
+        EnhancedChunkMetadata,
+        EnhancedMetadataResponse,
+        EnhancedMetadataExtractionRequest,
+        EnhancedDocumentType,
+        EnhancedKeyword,
+        KeywordImportance,
+        QualityScore,
+        ComplianceLevel,
+        normalize_document_type,
+        create_fallback_metadata
+    )
 
 # Enhanced Tools Import
-from json_parser import (
-    EnhancedJSONParser,
-    parse_ai_response,
-    validate_json_response
+try:
+    from .json_parser import (
+        EnhancedJSONParser,
+        parse_ai_response,
+        validate_json_response
+    )
+except ImportError:
+    from json_parser import (
+        EnhancedJSONParser,
+        parse_ai_response,
+        validate_json_response
+    )
+
+from .chunking import ChunkRecord, chunk_document
+from .config import (
+    get_chunk_metadata_concurrency,
+    get_chunk_metadata_token_budget,
+    get_chunk_metadata_pack_tokens,
+    get_chunk_metadata_max_retries
 )
 
 from .rag_prompts import (
@@ -61,11 +92,69 @@ from .rag_prompts import (
 )
 
 # AI Provider Import
-from ai_providers import OpenAI4oMiniProvider, GoogleGeminiProvider
+try:
+    from .ai_providers import OpenAI4oMiniProvider, GoogleGeminiProvider
+except ImportError:
+    from ai_providers import OpenAI4oMiniProvider, GoogleGeminiProvider
 
 # Setup Logging
 logger = logging.getLogger(__name__)
 
+# Chunk-Metadaten: maximal so viele Chunks pro gepacktem Prompt
+MAX_CHUNKS_PER_PACK = 8
+# Geschätzte Output-Tokens je Chunk (für das Token-Budget)
+CHUNK_OUTPUT_TOKENS = 250
+# Basis-Wartezeit des exponentiellen Backoffs (Sekunden)
+CHUNK_RETRY_BASE_DELAY = 1.0
+
+PACKED_CHUNK_PROMPT = """
+Du bist ein Experte für QM-Dokumentation. Analysiere die folgenden Abschnitte
+des Dokuments "{document_title}" (Typ: {document_type}) jeweils einzeln.
+
+{chunks}
+
+Antworte ausschließlich mit JSON in dieser Struktur - ein Eintrag pro
+Abschnitt, chunk_index wie angegeben:
+{{
+    "chunks": [
+        {{
+            "chunk_index": 0,
+            "section_title": "...",
+            "paragraph_number": null,
+            "keywords": [{{"term": "...", "importance": "CRITICAL|HIGH|MEDIUM|LOW", "category": "...", "confidence": 0.0-1.0}}],
+            "importance_score": 0.0-1.0,
+            "interest_groups": [...]
+        }}
+    ]
+}}
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Grobe Token-Schätzung (~4 Zeichen pro Token) für Budget und Packing."""
+    return len(text) // 4 + 1
+
+
+class ChunkTokenBudget:
+    """Token-Budget eines Dokuments für Chunk-Requests (0 = unbegrenzt)."""
+    
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self.exhausted = False
+    
+    def reserve(self, tokens: int) -> bool:
+        """Bucht ``tokens``; False, wenn das Budget nicht mehr reicht."""
+        if self.limit and self.used + tokens > self.limit:
+            self.exhausted = True
+            return False
+        self.used += tokens
+        return True
+
+
+class ChunkBudgetExceeded(Exception):
+    """Token-Budget des Dokuments für Chunk-Metadaten aufgebraucht."""
+
 class EnhancedMetadataExtractor:
     """
     🎯 Enterprise-Grade Metadata Extractor
@@ -88,9 +177,19 @@ class EnhancedMetadataExtractor:
             'total_extractions': 0,
             'successful_extractions': 0,
             'average_processing_time': 0.0,
-            'fallback_uses': 0
+            'fallback_uses': 0,
+            'chunk_requests': 0,
+            'chunk_retries': 0,
+            'chunk_fallbacks': 0
         }
         
+        # Chunk-Fan-out: prozessweites Limit gleichzeitiger LLM-Aufrufe
+        self.chunk_concurrency = get_chunk_metadata_concurrency()
+        self.chunk_token_budget = get_chunk_metadata_token_budget()
+        self.chunk_pack_tokens = get_chunk_metadata_pack_tokens()
+        self.chunk_max_retries = get_chunk_metadata_max_retries()
+        self._chunk_semaphore = asyncio.Semaphore(self.chunk_concurrency)
+        
         # Initialize AI Provider
         self._initialize_ai_provider()
     
@@ -115,7 +214,8 @@ class EnhancedMetadataExtractor:
                                       content: str,
                                       document_title: Optional[str] = None,
                                       document_type_hint: Optional[str] = None,
-                                      include_chunking: bool = True) -> EnhancedMetadataResponse:
+                                      include_chunking: bool = True,
+                                      chunks: Optional[List[ChunkRecord]] = None) -> EnhancedMetadataResponse:
         """
         🎯 Hauptfunktion für Enhanced Metadata Extraction
         
@@ -124,6 +224,8 @@ class EnhancedMetadataExtractor:
             document_title: Optional - Dokumenttitel
             document_type_hint: Optional - Dokumenttyp-Hinweis
             include_chunking: Ob Chunk-Metadaten erstellt werden sollen
+            chunks: Optional - bereits erstellte Chunks (chunk_document), damit
+                Metadaten und Embeddings dieselben Chunks beschreiben
             
         Returns:
             EnhancedMetadataResponse: Vollständige Metadaten-Response
@@ -142,7 +244,7 @@ class EnhancedMetadataExtractor:
             chunks_metadata = []
             if include_chunking:
                 chunks_metadata = await self._extract_chunks_metadata(
-                    content, document_metadata
+                    content, document_metadata, chunks
                 )
             
             processing_time = time.time() - start_time
@@ -226,127 +328,220 @@ class EnhancedMetadataExtractor:
     
     async def _extract_chunks_metadata(self,
                                      content: str,
-                                     document_metadata: EnhancedDocumentMetadata) -> List[EnhancedChunkMetadata]:
-        """Extrahiert Chunk-Metadaten für Advanced RAG Integration"""
+                                     document_metadata: EnhancedDocumentMetadata,
+                                     chunks: Optional[List[ChunkRecord]] = None) -> List[EnhancedChunkMetadata]:
+        """
+        Extrahiert Chunk-Metadaten für Advanced RAG Integration.
+        
+        ``chunk_index``, ``char_start`` und ``char_end`` verweisen auf die
+        Chunks aus ``chunk_document`` (bzw. die übergebenen ``chunks``).
+        
+        Gedrosselter Fan-out statt eines Requests pro Chunk auf einmal:
+        - Kleine Chunks werden in gemeinsame Prompts gepackt
+        - Höchstens CHUNK_METADATA_CONCURRENCY LLM-Aufrufe gleichzeitig
+        - Token-Budget pro Dokument, danach Fallback-Metadaten
+        - Progressive Retries: Backoff, gepackte Batches werden geteilt,
+          zuletzt Einzel-Chunk-Analyse
+        """
         
         if not self.ai_provider:
             logger.warning("❌ AI Provider nicht verfügbar für Chunk-Metadaten")
             return []
         
         try:
-            # 1. Content Chunking (einfache Implementierung)
-            chunks = self._create_content_chunks(content)
+            # 1. Gemeinsame Chunking-Stufe (exakte Offsets)
+            if chunks is None:
+                chunks = chunk_document(content)
             
-            # 2. Parallel Chunk Analysis
-            chunk_tasks = []
-            for i, chunk_content in enumerate(chunks):
-                task = self._analyze_single_chunk(
-                    chunk_content, i, document_metadata
-                )
-                chunk_tasks.append(task)
+            # 2. Kleine Chunks packen
+            batches = self._pack_chunks(chunks)
+            budget = ChunkTokenBudget(self.chunk_token_budget)
             
-            # 3. Execute Parallel Analysis
-            chunks_metadata = await asyncio.gather(*chunk_tasks, return_exceptions=True)
+            # 3. Gedrosselte Analyse (Semaphore in _generate_chunk_response)
+            batch_results = await asyncio.gather(
+                *[self._analyze_chunk_batch(batch, document_metadata, budget) for batch in batches],
+                return_exceptions=True
+            )
             
             # 4. Filter successful results
             valid_chunks = []
-            for chunk_meta in chunks_metadata:
-                if isinstance(chunk_meta, EnhancedChunkMetadata):
-                    valid_chunks.append(chunk_meta)
-                elif isinstance(chunk_meta, Exception):
-                    logger.warning(f"⚠️ Chunk-Analyse fehlgeschlagen: {chunk_meta}")
+            for batch_result in batch_results:
+                if isinstance(batch_result, Exception):
+                    logger.warning(f"⚠️ Chunk-Analyse fehlgeschlagen: {batch_result}")
+                    continue
+                valid_chunks.extend(chunk_meta for chunk_meta in batch_result if isinstance(chunk_meta, EnhancedChunkMetadata))
+            valid_chunks.sort(key=lambda chunk_meta: chunk_meta.chunk_index)
             
-            logger.info(f"✅ {len(valid_chunks)} Chunk-Metadaten erstellt")
+            if budget.exhausted:
+                logger.warning(f"⚠️ Token-Budget ({budget.limit}) für Chunk-Metadaten erschöpft - restliche Chunks mit Fallback-Metadaten")
+            logger.info(f"✅ {len(valid_chunks)} Chunk-Metadaten erstellt ({len(batches)} Requests, ~{budget.used} Tokens)")
             return valid_chunks
             
         except Exception as e:
             logger.error(f"❌ Chunk-Metadaten-Extraktion fehlgeschlagen: {e}")
             return []
     
+    def _pack_chunks(self, chunks: List[ChunkRecord]) -> List[List[ChunkRecord]]:
+        """Fasst aufeinanderfolgende kleine Chunks bis CHUNK_METADATA_PACK_TOKENS zusammen."""
+        batches: List[List[ChunkRecord]] = []
+        current: List[ChunkRecord] = []
+        current_tokens = 0
+        
+        for record in chunks:
+            tokens = estimate_tokens(record.text)
+            if current and (current_tokens + tokens > self.chunk_pack_tokens or len(current) >= MAX_CHUNKS_PER_PACK):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(record)
+            current_tokens += tokens
+        
+        if current:
+            batches.append(current)
+        return batches
+    
+    async def _generate_chunk_response(self, prompt: str, budget: ChunkTokenBudget, chunk_count: int = 1) -> str:
+        """
+        LLM-Aufruf für Chunk-Metadaten mit Concurrency-Limit, Token-Budget
+        und exponentiellem Backoff (Wartezeit ohne belegten Slot).
+        
+        Raises:
+            ChunkBudgetExceeded: Budget des Dokuments aufgebraucht
+        """
+        if not budget.reserve(estimate_tokens(prompt) + CHUNK_OUTPUT_TOKENS * chunk_count):
+            raise ChunkBudgetExceeded()
+        
+        prompt_config = get_prompt_config()
+        for attempt in range(self.chunk_max_retries + 1):
+            try:
+                async with self._chunk_semaphore:
+                    self.performance_metrics['chunk_requests'] += 1
+                    return await self.ai_provider.generate_response(prompt=prompt, **prompt_config)
+            except Exception as e:
+                if attempt >= self.chunk_max_retries:
+                    raise
+                self.performance_metrics['chunk_retries'] += 1
+                delay = CHUNK_RETRY_BASE_DELAY * 2 ** attempt * (1 + random.random())
+                logger.warning(f"🔁 Chunk-Request fehlgeschlagen ({e}), neuer Versuch in {delay:.1f}s")
+                await asyncio.sleep(delay)
+    
+    async def _analyze_chunk_batch(self,
+                                   batch: List[ChunkRecord],
+                                   document_metadata: EnhancedDocumentMetadata,
+                                   budget: ChunkTokenBudget) -> List[EnhancedChunkMetadata]:
+        """Analysiert einen (gepackten) Batch; fehlende Chunks werden in halbierten Batches wiederholt."""
+        if len(batch) == 1:
+            return [await self._analyze_single_chunk(batch[0], document_metadata, budget)]
+        
+        results: Dict[int, EnhancedChunkMetadata] = {}
+        try:
+            prompt = PACKED_CHUNK_PROMPT.format(
+                document_title=document_metadata.title,
+                document_type=document_metadata.document_type.value,
+                chunks="\n\n".join(f"### ABSCHNITT chunk_index={record.index}\n{record.text}" for record in batch)
+            )
+            ai_response = await self._generate_chunk_response(prompt, budget, len(batch))
+            parsed = self.json_parser.parse_json_object(ai_response) or {}
+            records = {record.index: record for record in batch}
+            for chunk_data in parsed.get('chunks') or []:
+                if not isinstance(chunk_data, dict) or chunk_data.get('chunk_index') not in records:
+                    continue
+                chunk_index = chunk_data['chunk_index']
+                try:
+                    results[chunk_index] = self._build_chunk_metadata(chunk_data, records[chunk_index], document_metadata)
+                except Exception as e:
+                    logger.debug(f"Chunk {chunk_index} im gepackten Ergebnis ungültig: {e}")
+        except ChunkBudgetExceeded:
+            return [self._fallback_chunk_metadata(record, document_metadata) for record in batch]
+        except Exception as e:
+            logger.warning(f"⚠️ Gepackte Chunk-Analyse ({len(batch)} Chunks) fehlgeschlagen: {e}")
+        
+        missing = [record for record in batch if record.index not in results]
+        if missing:
+            # Progressiver Retry: kleinere Batches bis hin zu Einzel-Chunks
+            middle = (len(missing) + 1) // 2
+            halves = [half for half in (missing[:middle], missing[middle:]) if half]
+            for half_results in await asyncio.gather(
+                *[self._analyze_chunk_batch(half, document_metadata, budget) for half in halves]
+            ):
+                results.update((chunk_meta.chunk_index, chunk_meta) for chunk_meta in half_results)
+        
+        return [results[record.index] for record in batch]
+    
     async def _analyze_single_chunk(self,
-                                  chunk_content: str,
-                                  chunk_index: int,
-                                  document_metadata: EnhancedDocumentMetadata) -> EnhancedChunkMetadata:
+                                  record: ChunkRecord,
+                                  document_metadata: EnhancedDocumentMetadata,
+                                  budget: Optional[ChunkTokenBudget] = None) -> EnhancedChunkMetadata:
         """Analysiert einzelnen Chunk mit AI"""
         
         try:
             # 1. Build Chunking Prompt
             prompt = build_chunking_prompt(
-                chunk_content=chunk_content,
+                chunk_content=record.text,
                 document_title=document_metadata.title,
                 document_type=document_metadata.document_type.value,
                 section_title=None  # TODO: Section detection
             )
             
-            # 2. AI Analysis
-            prompt_config = get_prompt_config()
-            ai_response = await self.ai_provider.generate_response(
-                prompt=prompt,
-                **prompt_config
-            )
+            # 2. AI Analysis (gedrosselt, mit Retries)
+            ai_response = await self._generate_chunk_response(prompt, budget or ChunkTokenBudget(0))
             
             # 3. Parse Response
             chunk_data = self.json_parser._extract_fields_with_regex(ai_response)
             
             # 4. Create Enhanced Chunk Metadata
-            chunk_metadata = EnhancedChunkMetadata(
-                document_id=0,  # Will be set later
-                chunk_index=chunk_index,
-                document_title=document_metadata.title,
-                document_type=document_metadata.document_type,
-                document_version=document_metadata.version,
-                section_title=chunk_data.get('section_title'),
-                paragraph_number=chunk_data.get('paragraph_number'),
-                word_count=len(chunk_content.split()),
-                keywords=[
-                    EnhancedKeyword(
-                        term=kw.get('term', ''),
-                        importance=KeywordImportance(kw.get('importance', 'MEDIUM')),
-                        category=kw.get('category', 'general'),
-                        confidence=kw.get('confidence', 0.7)
-                    ) for kw in chunk_data.get('keywords', [])
-                ],
-                importance_score=chunk_data.get('importance_score', 0.5),
-                interest_groups=chunk_data.get('interest_groups', [])
-            )
-            
-            return chunk_metadata
+            return self._build_chunk_metadata(chunk_data, record, document_metadata)
             
+        except ChunkBudgetExceeded:
+            return self._fallback_chunk_metadata(record, document_metadata)
         except Exception as e:
-            logger.error(f"❌ Chunk-Analyse fehlgeschlagen für Index {chunk_index}: {e}")
-            
-            # Fallback Chunk Metadata
-            return EnhancedChunkMetadata(
-                document_id=0,
-                chunk_index=chunk_index,
-                document_title=document_metadata.title,
-                document_type=document_metadata.document_type,
-                document_version=document_metadata.version,
-                word_count=len(chunk_content.split()),
-                importance_score=0.3,
-                ai_methodology="fallback_chunk_analysis"
-            )
+            logger.error(f"❌ Chunk-Analyse fehlgeschlagen für Index {record.index}: {e}")
+            return self._fallback_chunk_metadata(record, document_metadata)
     
-    def _create_content_chunks(self, content: str, chunk_size: int = 1000) -> List[str]:
-        """Erstellt Content-Chunks (einfache Implementierung)"""
-        
-        # Split by paragraphs first
-        paragraphs = content.split('\n\n')
-        chunks = []
-        current_chunk = ""
-        
-        for paragraph in paragraphs:
-            if len(current_chunk + paragraph) <= chunk_size:
-                current_chunk += paragraph + '\n\n'
-            else:
-                if current_chunk.strip():
-                    chunks.append(current_chunk.strip())
-                current_chunk = paragraph + '\n\n'
-        
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
-        
-        return chunks
+    def _build_chunk_metadata(self,
+                              chunk_data: Dict[str, Any],
+                              record: ChunkRecord,
+                              document_metadata: EnhancedDocumentMetadata) -> EnhancedChunkMetadata:
+        """Erstellt EnhancedChunkMetadata aus den AI-Feldern eines Chunks"""
+        return EnhancedChunkMetadata(
+            document_id=0,  # Will be set later
+            chunk_index=record.index,
+            char_start=record.start,
+            char_end=record.end,
+            document_title=document_metadata.title,
+            document_type=document_metadata.document_type,
+            document_version=document_metadata.version,
+            section_title=chunk_data.get('section_title'),
+            paragraph_number=chunk_data.get('paragraph_number'),
+            word_count=len(record.text.split()),
+            keywords=[
+                EnhancedKeyword(
+                    term=kw.get('term', ''),
+                    importance=KeywordImportance(kw.get('importance', 'MEDIUM')),
+                    category=kw.get('category', 'general'),
+                    confidence=kw.get('confidence', 0.7)
+                ) for kw in chunk_data.get('keywords', [])
+            ],
+            importance_score=chunk_data.get('importance_score', 0.5),
+            interest_groups=chunk_data.get('interest_groups', [])
+        )
+    
+    def _fallback_chunk_metadata(self,
+                                 record: ChunkRecord,
+                                 document_metadata: EnhancedDocumentMetadata) -> EnhancedChunkMetadata:
+        """Fallback Chunk Metadata (AI-Fehler oder Token-Budget erschöpft)"""
+        self.performance_metrics['chunk_fallbacks'] += 1
+        return EnhancedChunkMetadata(
+            document_id=0,
+            chunk_index=record.index,
+            char_start=record.start,
+            char_end=record.end,
+            document_title=document_metadata.title,
+            document_type=document_metadata.document_type,
+            document_version=document_metadata.version,
+            word_count=len(record.text.split()),
+            importance_score=0.3,
+            ai_methodology="fallback_chunk_analysis"
+        )
     
     def get_performance_metrics(self) -> Dict[str, Any]:
         """Gibt Performance-Metriken zurück"""
@@ -379,7 +574,8 @@ def get_enhanced_extractor(ai_provider: str = "openai") -> EnhancedMetadataExtra
 async def extract_enhanced_metadata(content: str,
                                   document_title: Optional[str] = None,
                                   document_type_hint: Optional[str] = None,
-                                  ai_provider: str = "openai") -> EnhancedMetadataResponse:
+                                  ai_provider: str = "openai",
+                                  chunks: Optional[List[ChunkRecord]] = None) -> EnhancedMetadataResponse:
     """
     🎯 Convenience Function für Enhanced Metadata Extraction
     
@@ -388,13 +584,14 @@ async def extract_enhanced_metadata(content: str,
         document_title: Optional - Dokumenttitel
         document_type_hint: Optional - Dokumenttyp-Hinweis
         ai_provider: AI Provider ("openai" oder "gemini")
+        chunks: Optional - Chunks aus chunk_document (sonst intern erstellt)
         
     Returns:
         EnhancedMetadataResponse: Vollständige Metadaten-Response
     """
     extractor = get_enhanced_extractor(ai_provider)
     return await extractor.extract_enhanced_metadata(
-        content, document_title, document_type_hint
+        content, document_title, document_type_hint, chunks=chunks
     )
 
 
@@ -0,0 +1,162 @@
+"""
+KI-QMS Datei-Ingest (Streaming-Upload mit einmaliger Hash-Berechnung)
+
+Uploads werden in Blöcken fester Größe auf die Platte geschrieben; der
+SHA-256 wird dabei inkrementell berechnet und die Maximalgröße schon
+während des Lesens geprüft. Eine 50-MB-Datei liegt so nie vollständig im
+Speicher und wird genau einmal gehasht.
+
+Mit ``store`` (ContentStore) landet der Inhalt als Blob unter seinem
+SHA-256; der lesbare Dateiname ist ein Link darauf (Deduplizierung).
+
+Das Ergebnis (``StoredFile``: Pfad, Größe, SHA-256) ist das Hash-Handle für
+alle folgenden Stufen (Dokument-Datensatz, Bildkonvertierungs-Cache,
+Multi-Visio-Cache). Zusätzlich merkt sich ``file_hashes`` den Hash je Pfad
+(validiert über Größe und mtime): ``file_sha256(path)`` liest eine bereits
+gehashte Datei nicht erneut.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple, Union
+import hashlib
+import logging
+import os
+import threading
+import uuid
+
+import aiofiles
+from fastapi import HTTPException, UploadFile
+
+from .content_store import ContentStore
+
+logger = logging.getLogger("KI-QMS.FileIngest")
+
+# Blockgröße für Lesen/Schreiben/Hashen (1 MiB)
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+PathLike = Union[str, Path]
+
+
+@dataclass(frozen=True)
+class StoredFile:
+    """Gespeicherte Datei mit ihrem Inhalts-Hash."""
+    path: Path
+    size: int
+    sha256: str
+    deduplicated: bool = False
+
+
+class FileHashRegistry:
+    """SHA-256 je Dateipfad, gültig solange Größe und mtime unverändert sind."""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[int, int, str]] = {}
+
+    @staticmethod
+    def _key(path: PathLike) -> str:
+        return os.path.abspath(path)
+
+    def register(self, path: PathLike, sha256: str):
+        stat = os.stat(path)
+        with self._lock:
+            key = self._key(path)
+            self._entries.pop(key, None)
+            if len(self._entries) >= self.max_entries:
+                # Ältesten Eintrag verdrängen (Einfügereihenfolge)
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (stat.st_size, stat.st_mtime_ns, sha256)
+
+    def get(self, path: PathLike) -> Optional[str]:
+        entry = self._entries.get(self._key(path))
+        if entry is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        size, mtime_ns, sha256 = entry
+        if stat.st_size != size or stat.st_mtime_ns != mtime_ns:
+            return None
+        return sha256
+
+
+# Globale Registry (Prozess-weit)
+file_hashes = FileHashRegistry()
+
+
+def file_sha256(path: PathLike) -> str:
+    """SHA-256 einer Datei - aus der Registry oder blockweise gelesen (und dann registriert)."""
+    known = file_hashes.get(path)
+    if known:
+        return known
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b''):
+            digest.update(block)
+    sha256 = digest.hexdigest()
+    file_hashes.register(path, sha256)
+    return sha256
+
+
+def _too_large(size: int, max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"Datei zu groß: {size} Bytes. Maximum: {max_size} Bytes"
+    )
+
+
+async def stream_upload(file: UploadFile, target_dir: Path, max_size: int,
+                        filename_for: Callable[[str], str],
+                        store: Optional[ContentStore] = None) -> StoredFile:
+    """
+    Schreibt einen Upload blockweise nach ``target_dir`` und hasht dabei.
+
+    Die Datei entsteht zunächst als temporäre ``.part``-Datei und wird nach
+    dem letzten Block atomar in ``filename_for(sha256)`` umbenannt - bzw.
+    mit ``store`` als Blob übernommen und unter diesem Namen verlinkt.
+
+    Raises:
+        HTTPException: 413 sobald ``max_size`` überschritten wird (Teil-Datei wird gelöscht)
+    """
+    if file.size is not None and file.size > max_size:
+        raise _too_large(file.size, max_size)
+
+    target_dir.mkdir(parents=True, exist_ok=True)
+    part_path = target_dir / f".{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        async with aiofiles.open(part_path, 'wb') as out:
+            while True:
+                block = await file.read(UPLOAD_CHUNK_SIZE)
+                if not block:
+                    break
+                size += len(block)
+                if size > max_size:
+                    raise _too_large(size, max_size)
+                digest.update(block)
+                await out.write(block)
+
+        sha256 = digest.hexdigest()
+        file_path = target_dir / filename_for(sha256)
+        deduplicated = False
+        if store is None:
+            os.replace(part_path, file_path)
+        else:
+            deduplicated = not store.put(part_path, sha256)
+            store.link(sha256, file_path)
+    except BaseException:
+        part_path.unlink(missing_ok=True)
+        raise
+
+    file_hashes.register(file_path, sha256)
+    if deduplicated:
+        logger.info(f"♻️ Inhalt bereits gespeichert (SHA-256 {sha256[:8]}...) - nur Link angelegt: {file_path}")
+    else:
+        logger.debug(f"💾 Upload gespeichert: {file_path} ({size} Bytes, SHA-256 {sha256[:8]}...)")
+    return StoredFile(path=file_path, size=size, sha256=sha256, deduplicated=deduplicated)
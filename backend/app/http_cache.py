@@ -0,0 +1,72 @@
+"""
+KI-QMS HTTP-Caching für Datei-Auslieferung (Downloads, PNG-Vorschauen)
+
+- ETag aus dem in der Datenbank gespeicherten SHA-256 (``file_hash`` bzw.
+  ``png_preview_hash``) - stabil über Neustarts und Worker hinweg
+- ``If-None-Match``: 304 ohne Dateizugriff (nicht einmal ``stat``)
+- Range-Requests (206, ``If-Range``) übernimmt Starlettes ``FileResponse``
+- Cache-Control: URLs mit passender Version (``?v=<hash>``) sind
+  unveränderlich und dürfen ein Jahr gecacht werden; ohne Version muss der
+  Client revalidieren (günstig dank 304)
+"""
+
+from pathlib import Path
+from typing import Dict, Optional
+
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import FileResponse
+
+# Ein Jahr für versionierte (inhaltsadressierte) URLs
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+def etag_for(content_hash: Optional[str]) -> Optional[str]:
+    """Starker ETag aus einem Inhalts-Hash (None wenn kein Hash bekannt)."""
+    return f'"{content_hash}"' if content_hash else None
+
+
+def etag_matches(request: Request, etag: Optional[str]) -> bool:
+    """Erfüllt ``If-None-Match`` den ETag (inkl. ``*`` und schwacher Vergleich)?"""
+    header = request.headers.get("if-none-match")
+    if not etag or not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def cache_headers(request: Request, content_hash: Optional[str]) -> Dict[str, str]:
+    """ETag und Cache-Control für eine Antwort mit Inhalt ``content_hash``."""
+    headers = {"Accept-Ranges": "bytes"}
+    etag = etag_for(content_hash)
+    if etag:
+        headers["ETag"] = etag
+    if content_hash and request.query_params.get("v") == content_hash:
+        headers["Cache-Control"] = f"private, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    else:
+        headers["Cache-Control"] = "private, no-cache"
+    return headers
+
+
+def cached_file_response(request: Request, path: Path, content_hash: Optional[str],
+                         media_type: str, filename: Optional[str] = None,
+                         disposition: str = "inline") -> Response:
+    """
+    Liefert ``path`` mit ETag/Cache-Control aus; 304 bei passendem ``If-None-Match``.
+
+    Raises:
+        HTTPException: 404 wenn die Datei fehlt (nur geprüft, wenn kein 304 möglich ist)
+    """
+    headers = cache_headers(request, content_hash)
+    if etag_matches(request, headers.get("ETag")):
+        return Response(status_code=304, headers=headers)
+
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail=f"Datei nicht gefunden: {path}")
+
+    return FileResponse(
+        path=path,
+        media_type=media_type,
+        filename=filename,
+        content_disposition_type=disposition,
+        headers=headers
+    )
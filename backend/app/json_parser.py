@@ -13,12 +13,16 @@ Robuster JSON Parser mit umfassenden Fallback-Mechanismen:
 - 📈 Performance-Optimierung für Large Documents
 
 🎯 FALLBACK STRATEGY:
-1. Standard JSON Parse
-2. Regex-basierte Reparatur
+1. Fast Path (orjson, falls installiert) + Pydantic-Validierung
+2. Toleranter Single-Pass-Parser (Trailing Commas, Kommentare, Single
+   Quotes, Keys ohne Anführungszeichen, abgeschnittene Antworten werden
+   an der Abbruchstelle geschlossen)
 3. Partial JSON Extraction
 4. Fuzzy Field Matching
 5. Minimal Fallback Schema
 
+Trefferquoten und Laufzeiten je Strategie: ``get_performance_metrics()``.
+
 Author: Enhanced AI Assistant
 Version: 3.5.0 - Enterprise Edition
 """
@@ -26,21 +30,41 @@ Version: 3.5.0 - Enterprise Edition
 import json
 import re
 import logging
-from typing import Dict, Any, Optional, List, Union, Tuple
-from datetime import datetime
+import time
+from typing import Callable, Dict, Any, Optional, List, Union, Tuple
 import traceback
 
+# orjson als schneller JSON-Decoder (optional, sonst json)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from pydantic import ValidationError
-from schemas_enhanced import (
-    EnhancedDocumentMetadata,
-    EnhancedDocumentType,
-    EnhancedKeyword,
-    KeywordImportance,
-    QualityScore,
-    ComplianceLevel,
-    normalize_document_type,
-    create_fallback_metadata
-)
+try:
+    from .schemas_enhanced import (
+        EnhancedDocumentMetadata,
+        EnhancedDocumentType,
+        EnhancedKeyword,
+        KeywordImportance,
+        QualityScore,
+        ComplianceLevel,
+        normalize_document_type,
+        create_fallback_metadata
+    )
+except ImportError:
+    # Direkter Import (Skripte mit app/ im sys.path)
+    from schemas_enhanced import (
+        EnhancedDocumentMetadata,
+        EnhancedDocumentType,
+        EnhancedKeyword,
+        KeywordImportance,
+        QualityScore,
+        ComplianceLevel,
+        normalize_document_type,
+        create_fallback_metadata
+    )
 
 # Setup Logging
 logger = logging.getLogger(__name__)
@@ -49,6 +73,238 @@ class JSONParseError(Exception):
     """Custom Exception für JSON-Parsing-Fehler"""
     pass
 
+
+# Parsing-Strategien in Reihenfolge (Schlüssel der Strategie-Metriken)
+PARSE_STRATEGIES = ("fast_path", "tolerant", "partial_json", "fuzzy_matching", "minimal_fallback")
+
+_MISSING = object()
+_EMPTY = object()  # Wertposition direkt vor ",", "}" oder "]" (z.B. '"version": ,')
+_SKIP = re.compile(r'(?:\s+|//[^\n]*|/\*.*?(?:\*/|\Z))*', re.DOTALL)
+_DOUBLE_QUOTED = re.compile(r'"((?:[^"\\]|\\.)*)("?)', re.DOTALL)
+_SINGLE_QUOTED = re.compile(r"'((?:[^'\\]|\\.)*)('?)", re.DOTALL)
+_NUMBER = re.compile(r'-?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+_BARE_WORD = re.compile(r'[^\s,:\[\]{}"\']+')
+_BARE_VALUE = re.compile(r'[^,\]}\n]+')
+_SUBTREE_DECODER = json.JSONDecoder(strict=False)
+_MAX_DECODER_FAILURES = 3
+_LITERALS = {"true": True, "false": False, "null": None, "True": True, "False": False, "None": None}
+
+
+def _decode_string_body(body: str) -> str:
+    """JSON-String-Inhalt dekodieren (Steuerzeichen erlaubt, ungültige Escapes roh)."""
+    if '\\' not in body:
+        return body
+    try:
+        return json.loads(f'"{body}"', strict=False)
+    except ValueError:
+        return body
+
+
+class TolerantJSONParser:
+    """
+    Toleranter Single-Pass-JSON-Parser für LLM-Antworten.
+    
+    Liest ab dem ersten ``{``/``[`` (Prosa und Markdown-Fences davor
+    werden übersprungen) und repariert Fehler genau an der Stelle, an der
+    sie auftreten - statt Regex-Ersetzungen über die ganze Antwort.
+    Gültige Teilbäume dekodiert der C-Decoder von ``json`` am Stück; nur
+    entlang der Fehlerstellen wird zeichenweise geparst. Scheitert der
+    Decoder mehrfach in Folge (Fehler in jedem Element), wird er nicht
+    mehr versucht - jeder Fehlversuch kostet O(Position).
+    
+    Reparaturen:
+    - Kommentare (``//``, ``/* */``) außerhalb von Strings
+    - Trailing/fehlende Kommata, ``=`` statt ``:``
+    - Single Quotes, Keys ohne Anführungszeichen, True/False/None
+    - Abbruch (Token-Limit): offene Strings, Arrays und Objekte werden
+      geschlossen, ein Key ohne Wert wird verworfen
+    - Leere Werte (``"version": ,``) werden verworfen, ohne das Trennzeichen
+      zu verbrauchen - folgende Keys verschieben sich nicht
+    
+    Zu tiefe Verschachtelung endet als ``JSONParseError``.
+    
+    ``repaired`` ist True, wenn die Eingabe kein gültiges JSON war.
+    """
+    
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+        self.repaired = False
+        self._decoder_failures = 0
+    
+    def parse(self) -> Any:
+        starts = [index for index in (self.text.find('{'), self.text.find('[')) if index >= 0]
+        if not starts:
+            raise JSONParseError("Kein JSON-Objekt oder -Array gefunden")
+        self.pos = min(starts)
+        try:
+            return self._value()
+        except RecursionError:
+            raise JSONParseError("JSON zu tief verschachtelt")
+    
+    def _skip(self):
+        self.pos = _SKIP.match(self.text, self.pos).end()
+    
+    def _value(self) -> Any:
+        self._skip()
+        if self.pos >= len(self.text):
+            return _MISSING
+        char = self.text[self.pos]
+        if char in '{[':
+            if self._decoder_failures < _MAX_DECODER_FAILURES:
+                try:
+                    value, self.pos = _SUBTREE_DECODER.raw_decode(self.text, self.pos)
+                    self._decoder_failures = 0
+                    return value
+                except ValueError:
+                    self._decoder_failures += 1
+            return self._object() if char == '{' else self._array()
+        if char in '"\'':
+            return self._string()
+        
+        match = _NUMBER.match(self.text, self.pos)
+        # "10:30" oder "4711-A" sind Text ohne Anführungszeichen, keine Zahl
+        if match and not _BARE_WORD.match(self.text, match.end()) and not self.text.startswith(':', match.end()):
+            self.pos = match.end()
+            number = match.group()
+            if number.lstrip('-').startswith('.') or number.endswith('.'):
+                self.repaired = True
+            return float(number) if any(c in number for c in '.eE') else int(number)
+        
+        # Literale oder Text ohne Anführungszeichen (bis zum nächsten Trennzeichen)
+        self.repaired = self.repaired or not _BARE_WORD.match(self.text, self.pos)
+        match = _BARE_VALUE.match(self.text, self.pos)
+        if not match:
+            # Trennzeichen statt Wert: gehört dem umgebenden Objekt/Array
+            self.repaired = True
+            return _EMPTY
+        self.pos = match.end()
+        word = match.group().strip()
+        if word in ("true", "false", "null"):
+            return _LITERALS[word]
+        self.repaired = True
+        return _LITERALS.get(word, word)
+    
+    def _string(self) -> str:
+        pattern = _DOUBLE_QUOTED if self.text[self.pos] == '"' else _SINGLE_QUOTED
+        match = pattern.match(self.text, self.pos)
+        self.pos = match.end()
+        body, closed = match.group(1), match.group(2)
+        if pattern is _SINGLE_QUOTED:
+            self.repaired = True
+            body = body.replace("\\'", "'").replace('"', '\\"')
+        if not closed:
+            self.repaired = True  # Abgeschnittener String
+            body = body.rstrip('\\')
+        return _decode_string_body(body)
+    
+    def _key(self) -> Any:
+        char = self.text[self.pos]
+        if char in '"\'':
+            return self._string()
+        match = _BARE_WORD.match(self.text, self.pos)
+        if not match:
+            return _MISSING
+        self.repaired = True
+        self.pos = match.end()
+        return match.group()
+    
+    def _object(self) -> Dict[str, Any]:
+        self.pos += 1
+        result: Dict[str, Any] = {}
+        after_value = after_comma = False
+        while True:
+            self._skip()
+            if self.pos >= len(self.text):
+                self.repaired = True
+                return result
+            char = self.text[self.pos]
+            if char in '}]':
+                self.repaired = self.repaired or char == ']' or after_comma
+                self.pos += 1
+                return result
+            if char == ',':
+                # Nur direkt nach einem Wert gültig (sonst ",," bzw. führendes Komma)
+                self.repaired = self.repaired or not after_value
+                after_value, after_comma = False, True
+                self.pos += 1
+                continue
+            
+            self.repaired = self.repaired or after_value  # Fehlendes Komma
+            after_value, after_comma = True, False
+            key = self._key()
+            if key is _MISSING:
+                self.repaired = True
+                self.pos += 1
+                continue
+            self._skip()
+            if self.text.startswith(':', self.pos):
+                self.pos += 1
+            elif self.text.startswith('=', self.pos):
+                self.repaired = True
+                self.pos += 1
+            else:
+                self.repaired = True
+            value = self._value()
+            if value is _MISSING:
+                self.repaired = True
+                return result
+            if value is not _EMPTY:
+                result[str(key)] = value
+    
+    def _array(self) -> List[Any]:
+        self.pos += 1
+        result: List[Any] = []
+        after_value = after_comma = False
+        while True:
+            self._skip()
+            if self.pos >= len(self.text):
+                self.repaired = True
+                return result
+            char = self.text[self.pos]
+            if char in ']}':
+                self.repaired = self.repaired or char == '}' or after_comma
+                self.pos += 1
+                return result
+            if char == ',':
+                self.repaired = self.repaired or not after_value
+                after_value, after_comma = False, True
+                self.pos += 1
+                continue
+            
+            self.repaired = self.repaired or after_value  # Fehlendes Komma
+            after_value, after_comma = True, False
+            value = self._value()
+            if value is _MISSING:
+                self.repaired = True
+                return result
+            if value is not _EMPTY:
+                result.append(value)
+
+
+def parse_tolerant_json(text: str) -> Any:
+    """Parst (fehlerhaftes oder abgeschnittenes) JSON aus einer LLM-Antwort."""
+    return TolerantJSONParser(text).parse()
+
+
+def _strip_json_wrapper(text: str) -> str:
+    """Markdown-Fences bzw. Prosa um das äußerste JSON-Objekt entfernen (ohne Regex über den Inhalt)."""
+    stripped = text.strip()
+    if stripped.startswith('{') and stripped.endswith('}'):
+        return stripped
+    start = stripped.find('{')
+    end = stripped.rfind('}')
+    if start < 0 or end < start:
+        return stripped
+    return stripped[start:end + 1]
+
+
+def fast_json_loads(text: str) -> Any:
+    """Strikter JSON-Decoder (orjson falls installiert, sonst json)."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(text)
+    return json.loads(text)
+
 class EnhancedJSONParser:
     """
     🎯 Enterprise-Grade JSON Parser mit 5-Layer Fallback-System
@@ -70,6 +326,9 @@ class EnhancedJSONParser:
             'fallback_uses': 0,
             'average_parse_time': 0.0
         }
+        self.strategy_metrics = {
+            name: {'attempts': 0, 'hits': 0, 'total_time': 0.0} for name in PARSE_STRATEGIES
+        }
     
     def parse_enhanced_metadata(self, 
                               json_response: str, 
@@ -86,37 +345,39 @@ class EnhancedJSONParser:
         Returns:
             EnhancedDocumentMetadata: Validierte Metadaten
         """
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         self.parse_attempts = 0
         
         try:
-            # Layer 1: Standard JSON Parse
-            metadata = self._parse_standard_json(json_response)
+            # Layer 1: Fast Path (striktes JSON + Schema-Validierung)
+            metadata = self._run_strategy("fast_path", lambda: self._parse_fast_path(json_response))
             if metadata:
-                self._log_success("Standard JSON Parse", start_time)
+                self._log_success("Fast Path", start_time)
                 return metadata
             
-            # Layer 2: Regex-basierte Reparatur
-            metadata = self._parse_with_regex_repair(json_response)
+            # Layer 2: Toleranter Parser (Reparatur an der Fehlerstelle)
+            metadata = self._run_strategy("tolerant", lambda: self._parse_tolerant(json_response))
             if metadata:
-                self._log_success("Regex Repair", start_time)
+                self._log_success("Tolerant Parser", start_time)
                 return metadata
             
             # Layer 3: Partial JSON Extraction
-            metadata = self._parse_partial_json(json_response)
+            metadata = self._run_strategy("partial_json", lambda: self._parse_partial_json(json_response))
             if metadata:
                 self._log_success("Partial JSON", start_time)
                 return metadata
             
             # Layer 4: Fuzzy Field Matching
-            metadata = self._parse_fuzzy_matching(json_response)
+            metadata = self._run_strategy("fuzzy_matching", lambda: self._parse_fuzzy_matching(json_response))
             if metadata:
                 self._log_success("Fuzzy Matching", start_time)
                 return metadata
             
             # Layer 5: Minimal Fallback
             if not strict_mode:
-                metadata = self._create_minimal_fallback(json_response, document_title)
+                metadata = self._run_strategy(
+                    "minimal_fallback", lambda: self._create_minimal_fallback(json_response, document_title)
+                )
                 self._log_fallback("Minimal Fallback", start_time)
                 return metadata
             
@@ -133,41 +394,73 @@ class EnhancedJSONParser:
             
             return create_fallback_metadata(document_title)
     
-    def _parse_standard_json(self, json_response: str) -> Optional[EnhancedDocumentMetadata]:
-        """Layer 1: Standard JSON Parsing"""
-        self.parse_attempts += 1
+    def parse_json_object(self, json_response: str) -> Optional[Dict[str, Any]]:
+        """
+        Parst eine AI-Response zu einem Dict - ohne Konvertierung in
+        EnhancedDocumentMetadata. Für Antworten mit eigenem Schema (z.B. die
+        fusionierte Metadaten-Extraktion); Fast Path, danach toleranter
+        Parser (Layer 1-2).
         
+        Returns:
+            Dict oder None, wenn kein JSON-Objekt gefunden wurde
+        """
+        data = self._run_strategy("fast_path", lambda: self._load_fast(json_response))
+        if data is None:
+            data = self._run_strategy("tolerant", lambda: self._load_tolerant(json_response))
+        return data if isinstance(data, dict) else None
+    
+    def _run_strategy(self, name: str, strategy: Callable[[], Any]) -> Any:
+        """Führt eine Strategie aus und erfasst Versuche, Treffer und Laufzeit."""
+        metrics = self.strategy_metrics[name]
+        started = time.perf_counter()
         try:
-            # Bereinige Response
-            cleaned_json = self._clean_json_response(json_response)
-            
-            # Parse JSON
-            data = json.loads(cleaned_json)
-            
-            # Validiere und konvertiere zu Pydantic Model
-            return self._convert_to_enhanced_metadata(data)
-            
-        except (json.JSONDecodeError, ValidationError, KeyError) as e:
+            result = strategy()
+        finally:
+            metrics['total_time'] += time.perf_counter() - started
+            metrics['attempts'] += 1
+        if result is not None:
+            metrics['hits'] += 1
+        return result
+    
+    def _load_fast(self, json_response: str) -> Optional[Any]:
+        """Layer 1: striktes JSON (orjson) nach Entfernen von Fences/Prosa"""
+        self.parse_attempts += 1
+        try:
+            return fast_json_loads(_strip_json_wrapper(json_response))
+        except (ValueError, RecursionError) as e:
             if self.enable_logging:
-                logger.debug(f"Standard JSON Parse failed: {e}")
+                logger.debug(f"Fast Path JSON Parse failed: {e}")
             return None
     
-    def _parse_with_regex_repair(self, json_response: str) -> Optional[EnhancedDocumentMetadata]:
-        """Layer 2: Regex-basierte JSON Reparatur"""
+    def _load_tolerant(self, json_response: str) -> Optional[Any]:
+        """Layer 2: toleranter Single-Pass-Parser"""
         self.parse_attempts += 1
-        
         try:
-            # Häufige JSON-Fehler reparieren
-            repaired_json = self._repair_common_json_errors(json_response)
-            
-            # Parse repariertes JSON
-            data = json.loads(repaired_json)
-            
+            parser = TolerantJSONParser(json_response)
+            data = parser.parse()
+            if parser.repaired and self.enable_logging:
+                logger.debug("Tolerant JSON Parser: Antwort repariert")
+            return data
+        except JSONParseError as e:
+            if self.enable_logging:
+                logger.debug(f"Tolerant JSON Parse failed: {e}")
+            return None
+    
+    def _parse_fast_path(self, json_response: str) -> Optional[EnhancedDocumentMetadata]:
+        return self._convert_or_none(self._load_fast(json_response))
+    
+    def _parse_tolerant(self, json_response: str) -> Optional[EnhancedDocumentMetadata]:
+        return self._convert_or_none(self._load_tolerant(json_response))
+    
+    def _convert_or_none(self, data: Any) -> Optional[EnhancedDocumentMetadata]:
+        """Validiert ein geparstes Objekt gegen das Enhanced Schema"""
+        if not isinstance(data, dict):
+            return None
+        try:
             return self._convert_to_enhanced_metadata(data)
-            
-        except (json.JSONDecodeError, ValidationError, KeyError) as e:
+        except (ValidationError, KeyError, TypeError, ValueError) as e:
             if self.enable_logging:
-                logger.debug(f"Regex Repair failed: {e}")
+                logger.debug(f"Schema-Validierung fehlgeschlagen: {e}")
             return None
     
     def _parse_partial_json(self, json_response: str) -> Optional[EnhancedDocumentMetadata]:
@@ -247,30 +540,11 @@ class EnhancedJSONParser:
         # Entferne führende/nachfolgende Whitespaces
         cleaned = cleaned.strip()
         
-        # Entferne Kommentare
-        cleaned = re.sub(r'//.*$', '', cleaned, flags=re.MULTILINE)
+        # Entferne Kommentarzeilen (nicht "//" innerhalb von Strings, z.B. URLs)
+        cleaned = re.sub(r'^\s*//.*$', '', cleaned, flags=re.MULTILINE)
         
         return cleaned
     
-    def _repair_common_json_errors(self, json_str: str) -> str:
-        """Repariert häufige JSON-Syntax-Fehler"""
-        repaired = json_str
-        
-        # Repariere trailing commas
-        repaired = re.sub(r',\s*}', '}', repaired)
-        repaired = re.sub(r',\s*]', ']', repaired)
-        
-        # Repariere fehlende Anführungszeichen bei Keys
-        repaired = re.sub(r'(\w+):', r'"\1":', repaired)
-        
-        # Repariere single quotes zu double quotes
-        repaired = re.sub(r"'([^']*)':", r'"\1":', repaired)
-        
-        # Repariere unescaped quotes in strings
-        repaired = re.sub(r':\s*"([^"]*)"([^",}\]]*)"', r': "\1\2"', repaired)
-        
-        return repaired
-    
     def _extract_json_blocks(self, text: str) -> List[str]:
         """Extrahiert JSON-ähnliche Blöcke aus Text"""
         # Finde alle { } Blöcke
@@ -372,20 +646,28 @@ class EnhancedJSONParser:
         # Erstelle und validiere Pydantic Model
         return EnhancedDocumentMetadata(**data)
     
-    def _log_success(self, method: str, start_time: datetime):
+    def _record_parse_time(self, duration: float):
+        """Laufender Mittelwert der Parse-Dauer (Sekunden)"""
+        total = self.performance_metrics['total_parses']
+        average = self.performance_metrics['average_parse_time']
+        self.performance_metrics['average_parse_time'] = average + (duration - average) / total
+    
+    def _log_success(self, method: str, start_time: float):
         """Loggt erfolgreiche Parsing-Versuche"""
-        duration = (datetime.now() - start_time).total_seconds()
+        duration = time.perf_counter() - start_time
         self.performance_metrics['total_parses'] += 1
         self.performance_metrics['successful_parses'] += 1
+        self._record_parse_time(duration)
         
         if self.enable_logging:
             logger.info(f"JSON Parser Success: {method} in {duration:.3f}s after {self.parse_attempts} attempts")
     
-    def _log_fallback(self, method: str, start_time: datetime):
+    def _log_fallback(self, method: str, start_time: float):
         """Loggt Fallback-Nutzung"""
-        duration = (datetime.now() - start_time).total_seconds()
+        duration = time.perf_counter() - start_time
         self.performance_metrics['total_parses'] += 1
         self.performance_metrics['fallback_uses'] += 1
+        self._record_parse_time(duration)
         
         if self.enable_logging:
             logger.warning(f"JSON Parser Fallback: {method} in {duration:.3f}s after {self.parse_attempts} attempts")
@@ -400,11 +682,23 @@ class EnhancedJSONParser:
             success_rate = 0
             fallback_rate = 0
         
+        strategies = {}
+        for name, metrics in self.strategy_metrics.items():
+            attempts = metrics['attempts']
+            strategies[name] = {
+                'attempts': attempts,
+                'hits': metrics['hits'],
+                'hit_rate': f"{metrics['hits'] / attempts * 100:.1f}%" if attempts else "0.0%",
+                'average_time_ms': round(metrics['total_time'] / attempts * 1000, 3) if attempts else 0.0
+            }
+        
         return {
             **self.performance_metrics,
             'success_rate': f"{success_rate:.1f}%",
             'fallback_rate': f"{fallback_rate:.1f}%",
-            'last_error': self.last_error
+            'last_error': self.last_error,
+            'strategies': strategies,
+            'orjson_available': ORJSON_AVAILABLE
         }
 
 
@@ -114,15 +114,19 @@ License: MIT License
 Last Updated: 2024-12-20
 """
 
-from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File, Form, Request, Query
-from .config import get_uploads_dir, get_prompts_dir, get_available_providers, get_default_provider, get_provider_fallback_chain, get_quality_threshold, get_prompt_filename
+from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File, Form, Request, Query, Security, BackgroundTasks
+from fastapi.security import HTTPAuthorizationCredentials
+from .config import get_uploads_dir, get_prompts_dir, get_available_providers, get_default_provider, get_provider_fallback_chain, get_quality_threshold, get_prompt_filename, get_upload_reuse_results, get_enhanced_metadata_enabled
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, defer, joinedload, load_only, selectinload
+from typing import List, Optional, Dict, Any, Tuple, Union
 from dotenv import load_dotenv
 import os
+import asyncio
 import hashlib
-import aiofiles
 import base64
 import json
 import tempfile
@@ -163,7 +167,7 @@ root_path = pathlib.Path(__file__).parent.parent.parent  # backend/app -> backen
 env_path = root_path / ".env"
 load_dotenv(dotenv_path=env_path, override=True, verbose=True)
 
-from .database import get_db, create_tables
+from .database import get_db, get_async_db, run_in_db_thread, create_tables, engine, dispose_async_engines
 from .models import (
     InterestGroup as InterestGroupModel, 
     User as UserModel, 
@@ -176,29 +180,42 @@ from .models import (
     DocumentStatus
 )
 from .schemas import (
+    BulkCreateRequest, BulkCreateResponse,
     InterestGroup, InterestGroupCreate, InterestGroupUpdate,
     User, UserCreate, UserUpdate,
     UserGroupMembership, UserGroupMembershipCreate,
-    Document, DocumentCreate, DocumentUpdate,
+    Document, DocumentCreate, DocumentUpdate, DocumentSummary, DocumentSearchHit,
     DocumentStatusChange, DocumentStatusHistory, NotificationInfo,
     Norm, NormCreate, NormUpdate,
     Equipment, EquipmentCreate, EquipmentUpdate,
     Calibration, CalibrationCreate, CalibrationUpdate,
     FileUploadResponse, DocumentWithFileCreate,
-    GenericResponse,
+    GenericResponse, CursorPage,
     PasswordChangeRequest, AdminPasswordResetRequest, 
     UserProfileResponse, PasswordResetResponse
 )
-from .text_extraction import extract_text_from_file, extract_keywords
+from .text_extraction import extract_text_from_file_async, extract_keywords, shutdown_extraction_executor, analyze_document_type, TEXT_PREFIX_CHARS
 from .auth import (
-    authenticate_user, create_access_token, get_current_active_user,
-    get_user_permissions, get_user_groups as auth_get_user_groups, get_password_hash,
+    authenticate_user_async, create_access_token, get_current_active_user,
+    get_user_groups_async, resolve_user_access, get_password_hash_async,
+    verify_password_async, shutdown_password_executor,
+    build_access_claims, verify_token, revoke_access_token, optional_security,
     Token, LoginRequest, UserInfo,
     require_qms_admin, require_system_admin, require_admin_or_qm,
     is_qms_admin, is_system_admin
 )
 from .workflow_engine import get_workflow_engine, WorkflowTask
 from .ai_engine import ai_engine
+from .pagination import paginate_keyset, paginate_keyset_async
+from .principal_cache import principal_cache, bump_permissions_version
+from .bulk_import import BulkBatch, existing_pairs, existing_values, insert_returning_ids, normalize_datetimes
+from .file_ingest import stream_upload
+from .content_store import ContentStore, REUSED_RESULT_FIELDS, find_processed_document, reused_ai_result, stored_ai_analysis
+from .http_cache import cached_file_response
+from .thumbnails import THUMBNAIL_SIZES, generate_document_thumbnails, get_thumbnail, list_thumbnails, media_type_for, remove_thumbnails
+from .token_revocation import revoke_user_tokens
+from . import search_index
+from .duplicate_index import duplicate_index, store_document_signature, get_document_signature, find_duplicate_candidates, estimate_similarity
 from .vision_ocr_engine import VisionOCREngine
 # RAG Engine mit Qdrant (Enterprise Grade mit Advanced AI)
 try:
@@ -312,6 +329,9 @@ INTELLIGENT_WORKFLOW_AVAILABLE = True
 UPLOAD_DIR = Path("uploads")  # Relativer Pfad vom backend/ Verzeichnis aus
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
+# Inhalte einmal pro SHA-256 speichern, lesbare Pfade als Links (Deduplizierung)
+content_store = ContentStore(UPLOAD_DIR / ".cas")
+
 # Maximale Dateigröße: 50MB
 MAX_FILE_SIZE = 50 * 1024 * 1024
 
@@ -373,10 +393,11 @@ async def save_uploaded_file(file: UploadFile, document_type: str, upload_method
         - Eindeutige Dateinamen (Timestamp + Hash) gegen Kollisionen
         - SHA-256 Hash für Integrität-Prüfung
         - Ordnerstruktur nach Dokumenttyp für Organisation
-        - Async I/O für bessere Performance
+        - Streaming in Blöcken: Datei liegt nie komplett im Speicher, wird einmal gehasht
         
     File Organization:
         uploads/
+        ├── .cas/          (Inhalte nach SHA-256, siehe content_store)
         ├── QM_MANUAL/
         ├── SOP/
         ├── WORK_INSTRUCTION/
@@ -394,44 +415,31 @@ async def save_uploaded_file(file: UploadFile, document_type: str, upload_method
             detail=f"Dateityp nicht erlaubt: {mime_type}. Erlaubt: PDF, DOC, DOCX, TXT, MD, XLS, XLSX"
         )
     
-    # Datei-Content lesen
-    content = await file.read()
-    file_size = len(content)
-    
-    # Größe prüfen
-    if file_size > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=413,
-            detail=f"Datei zu groß: {file_size} Bytes. Maximum: {MAX_FILE_SIZE} Bytes"
-        )
-    
-    # Hash berechnen für Integrität
-    file_hash = hashlib.sha256(content).hexdigest()
-    
-    # Eindeutigen Dateinamen generieren
+    # Eindeutigen Dateinamen generieren (Hash steht erst nach dem Schreiben fest)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe_filename = f"{timestamp}_{file_hash[:8]}_{file.filename}"
     
     # Ordnerstruktur nach Dokumenttyp
     type_dir = UPLOAD_DIR / document_type
-    type_dir.mkdir(exist_ok=True)
     
-    file_path = type_dir / safe_filename
-    
-    # Datei speichern
-    async with aiofiles.open(file_path, 'wb') as f:
-        await f.write(content)
+    # Datei blockweise speichern, dabei SHA-256 berechnen und Größe prüfen
+    # (Inhalt als Blob unter seinem SHA-256, der lesbare Dateiname verlinkt darauf)
+    stored = await stream_upload(
+        file, type_dir, MAX_FILE_SIZE,
+        lambda file_hash: f"{timestamp}_{file_hash[:8]}_{file.filename}",
+        store=content_store
+    )
     
     # Relative Pfad für Datenbank (fix für das --reload Problem)
-    relative_path = str(file_path)
+    relative_path = str(stored.path)
     
     return FileUploadResponse(
         file_path=relative_path,
         file_name=file.filename,
-        file_size=file_size,
-        file_hash=file_hash,
+        file_size=stored.size,
+        file_hash=stored.sha256,
         mime_type=mime_type,
-        uploaded_at=datetime.utcnow()
+        uploaded_at=datetime.utcnow(),
+        deduplicated=stored.deduplicated
     )
 def extract_smart_title_and_description(text: str, filename: str) -> tuple[str, str]:
     """
@@ -564,80 +572,6 @@ def extract_smart_title_and_description(text: str, filename: str) -> tuple[str,
         
     return extracted_title, extracted_description
 
-def extract_text_from_file(file_path: Path, mime_type: str) -> str:
-    """
-    Extrahiert Text aus Dateien für RAG-Indexierung.
-    
-    Args:
-        file_path: Pfad zur Datei
-        mime_type: MIME-Type der Datei
-        
-    Returns:
-        Extrahierter Text oder leerer String
-    """
-    try:
-        if mime_type == "text/plain" or mime_type == "text/markdown":
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        
-        elif mime_type == "application/pdf":
-            try:
-                import PyPDF2
-                with open(file_path, 'rb') as file:
-                    reader = PyPDF2.PdfReader(file)
-                    text = ""
-                    for page in reader.pages:
-                        text += page.extract_text() + "\n"
-                    return text.strip()
-            except Exception as pdf_error:
-                return f"[PDF-Extraktion fehlgeschlagen: {str(pdf_error)}]"
-        
-        elif mime_type in ["application/msword", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"]:
-            try:
-                from docx import Document
-                doc = Document(file_path)
-                
-                text_parts = []
-                # Absätze extrahieren
-                for paragraph in doc.paragraphs:
-                    if paragraph.text.strip():
-                        text_parts.append(paragraph.text)
-                
-                # Tabellen extrahieren
-                for table in doc.tables:
-                    for row in table.rows:
-                        row_text = " | ".join(cell.text for cell in row.cells)
-                        text_parts.append(row_text)
-                        
-                return "\n".join(text_parts)
-            except Exception as word_error:
-                return f"[Word-Extraktion fehlgeschlagen: {str(word_error)}]"
-        
-        elif mime_type in ["application/vnd.ms-excel", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"]:
-            try:
-                import openpyxl
-                workbook = openpyxl.load_workbook(file_path)
-                text_parts = []
-                
-                for sheet_name in workbook.sheetnames:
-                    sheet = workbook[sheet_name]
-                    text_parts.append(f"=== {sheet_name} ===")
-                    
-                    for row in sheet.iter_rows(values_only=True):
-                        row_text = " | ".join(str(cell) if cell is not None else "" for cell in row)
-                        if row_text.strip():
-                            text_parts.append(row_text)
-                
-                return "\n".join(text_parts)
-            except Exception as excel_error:
-                return f"[Excel-Extraktion fehlgeschlagen: {str(excel_error)}]"
-        
-        else:
-            return f"[Text-Extraktion für {mime_type} noch nicht implementiert]"
-        
-    except Exception as e:
-        return f"[Fehler bei Text-Extraktion: {str(e)}]"
-
 def generate_document_number(document_type: str) -> str:
     """
     Generiert eine eindeutige Dokumentennummer.
@@ -737,6 +671,7 @@ async def startup_event():
     - Loggt Systemzustand
     """
     create_tables()
+    search_index.ensure_search_index(engine)
     
     # ✅ NEU: Initialisiere Standard-User und Interessensgruppen
     await initialize_default_data()
@@ -745,6 +680,19 @@ async def startup_event():
     print("📊 13-Interessensgruppen-System ist bereit!")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Anwendungsende-Event.
+    
+    Gibt Worker-Pools und Async-Connection-Pools frei, damit keine
+    verwaisten Prozesse/Connections zurückbleiben.
+    """
+    shutdown_extraction_executor()
+    shutdown_password_executor()
+    await dispose_async_engines()
+
+
 async def initialize_default_data():
     """
     Initialisiert Standard-Daten für das QMS-System.
@@ -932,7 +880,7 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     """
     
     # Benutzer authentifizieren
-    user = authenticate_user(db, login_data.email, login_data.password)
+    user = await authenticate_user_async(db, login_data.email, login_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -940,12 +888,14 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Benutzer-Gruppen und Berechtigungen laden
-    user_groups = auth_get_user_groups(db, user)
-    user_permissions = get_user_permissions(db, user)
+    # Benutzer-Gruppen und Berechtigungen laden (Version vorher merken)
+    version_tag = principal_cache.version_tag
+    user_groups, user_permissions = resolve_user_access(db, user)
     
-    # JWT Token erstellen
-    access_token = create_access_token(data={"sub": str(user.id)})
+    # JWT Token mit Claims für den zustandslosen Fast-Path erstellen
+    access_token = create_access_token(
+        data=build_access_claims(user, user_groups, user_permissions, version_tag)
+    )
     
     return Token(
         access_token=access_token,
@@ -958,7 +908,7 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     )
 
 @app.get("/api/auth/me", response_model=UserInfo, tags=["Authentication"])
-async def get_current_user_info(
+def get_current_user_info(
     current_user: UserModel = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -995,8 +945,7 @@ async def get_current_user_info(
         - Berechtigungen werden aus Gruppen + individuellen Rechten zusammengestellt
     """
     
-    user_groups = auth_get_user_groups(db, current_user)
-    user_permissions = get_user_permissions(db, current_user)
+    user_groups, user_permissions = resolve_user_access(db, current_user)
     
     return UserInfo(
         id=current_user.id,
@@ -1010,12 +959,13 @@ async def get_current_user_info(
         permissions=user_permissions
     )
 @app.post("/api/auth/logout", response_model=dict, tags=["Authentication"])
-async def logout():
+async def logout(credentials: Optional[HTTPAuthorizationCredentials] = Security(optional_security)):
     """
     Benutzer-Logout (Token invalidieren).
     
-    Da JWT-Tokens stateless sind, erfolgt das Logout client-seitig
-    durch Löschen des Tokens. Dieser Endpoint dient als formaler Logout-Trigger.
+    Das übergebene Token wird bis zu seinem Ablauf auf die Sperrliste
+    gesetzt und ab sofort abgelehnt. Ohne (gültiges) Token ist der Aufruf
+    ein formaler Logout-Trigger.
     
     Returns:
         dict: Logout-Bestätigung
@@ -1030,9 +980,11 @@ async def logout():
         
     Note:
         - Client muss Token aus Local Storage/Session Storage löschen
-        - Server-seitige Token-Blacklist optional für höhere Sicherheit
-        - Für stateful Sessions würde hier Session gelöscht werden
+        - Die Sperrliste gilt pro Backend-Prozess
     """
+    token_data = verify_token(credentials.credentials) if credentials else None
+    if token_data:
+        revoke_access_token(token_data["payload"])
     
     return {
         "message": "Successfully logged out",
@@ -1062,10 +1014,11 @@ async def change_password(
     Raises:
         HTTPException: 400 bei Validierungsfehlern, 401 bei falschem aktuellen Passwort
     """
-    from .auth import verify_password, get_password_hash
+    # current_user stammt aus der AsyncSession/dem Principal-Cache → hier neu laden
+    user = db.get(UserModel, current_user.id)
     
     # Aktuelles Passwort validieren
-    if not verify_password(password_change.current_password, current_user.hashed_password):
+    if not await verify_password_async(password_change.current_password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Aktuelles Passwort ist falsch")
     
     # Neues Passwort validieren
@@ -1077,8 +1030,9 @@ async def change_password(
         raise HTTPException(status_code=400, detail="Neues Passwort muss mindestens 8 Zeichen lang sein")
     
     # Passwort ändern
-    current_user.hashed_password = get_password_hash(password_change.new_password)
-    db.commit()
+    user.hashed_password = await get_password_hash_async(password_change.new_password)
+    await run_in_db_thread(db.commit)
+    bump_permissions_version()
     
     return {
         "message": "Passwort erfolgreich geändert",
@@ -1088,7 +1042,7 @@ async def change_password(
 # === INTEREST GROUPS API ===
 
 @app.get("/api/interest-groups", response_model=List[InterestGroup], tags=["Interest Groups"])
-async def get_interest_groups(
+def get_interest_groups(
     skip: int = 0,
     limit: int = 20,
     include_inactive: bool = False,
@@ -1168,7 +1122,7 @@ async def get_interest_groups(
     return groups
 
 @app.get("/api/interest-groups/{group_id}", response_model=InterestGroup, tags=["Interest Groups"])
-async def get_interest_group(group_id: int, db: Session = Depends(get_db)):
+def get_interest_group(group_id: int, db: Session = Depends(get_db)):
     """
     Eine spezifische Interessensgruppe abrufen.
     
@@ -1224,7 +1178,7 @@ async def get_interest_group(group_id: int, db: Session = Depends(get_db)):
     return group
 
 @app.post("/api/interest-groups", response_model=InterestGroup, tags=["Interest Groups"])
-async def create_interest_group(
+def create_interest_group(
     group: InterestGroupCreate,
     db: Session = Depends(get_db)
 ):
@@ -1299,11 +1253,12 @@ async def create_interest_group(
     db_group = InterestGroupModel(**group_data)
     db.add(db_group)
     db.commit()
+    bump_permissions_version()
     db.refresh(db_group)
     return db_group
 
 @app.put("/api/interest-groups/{group_id}", response_model=InterestGroup, tags=["Interest Groups"])
-async def update_interest_group(
+def update_interest_group(
     group_id: int,
     group_update: InterestGroupUpdate,
     db: Session = Depends(get_db)
@@ -1397,11 +1352,12 @@ async def update_interest_group(
         setattr(db_group, field, value)
     
     db.commit()
+    bump_permissions_version()
     db.refresh(db_group)
     return db_group
 
 @app.delete("/api/interest-groups/{group_id}", response_model=GenericResponse, tags=["Interest Groups"])
-async def delete_interest_group(group_id: int, db: Session = Depends(get_db)):
+def delete_interest_group(group_id: int, db: Session = Depends(get_db)):
     """
     Interessensgruppe löschen (Soft Delete).
     
@@ -1447,15 +1403,17 @@ async def delete_interest_group(group_id: int, db: Session = Depends(get_db)):
     # Soft Delete: is_active auf false setzen
     db_group.is_active = False
     db.commit()
+    bump_permissions_version()
     return GenericResponse(message=f"Interessensgruppe '{db_group.name}' wurde deaktiviert")
 
 # === USERS API ===
 # Benutzerverwaltung mit Rollen- und Interessensgruppen-Zuordnung
 
-@app.get("/api/users", response_model=List[User], tags=["Users"])
-async def get_users(
+@app.get("/api/users", response_model=Union[List[User], CursorPage[User]], tags=["Users"])
+def get_users(
     skip: int = 0, 
     limit: int = 20, 
+    cursor: Optional[str] = Query(None, description="Keyset-Pagination: leer für die erste Seite, danach next_cursor der Vorseite"),
     current_user: UserModel = Depends(require_admin_or_qm),
     db: Session = Depends(get_db)
 ):
@@ -1468,10 +1426,12 @@ async def get_users(
     Args:
         skip (int): Anzahl zu überspringender Datensätze (Pagination). Default: 0
         limit (int): Maximale Anzahl zurückzugebender Datensätze. Default: 20, Max: 100
+        cursor (str): Keyset-Pagination nach (created_at, id); leer = erste Seite
         db (Session): Datenbankverbindung (automatisch injiziert)
         
     Returns:
         List[User]: Liste aller Benutzer im System
+        CursorPage[User]: ``{"items": [...], "next_cursor": ...}`` wenn cursor gesetzt ist
         
     Example Response:
         ```json
@@ -1515,7 +1475,11 @@ async def get_users(
         - Sortierung nach created_at (neueste zuerst)
         - Für User-Management-Interfaces gedacht
     """
-    users = db.query(UserModel).offset(skip).limit(limit).all()
+    next_cursor = None
+    if cursor is not None:
+        users, next_cursor = paginate_keyset(db.query(UserModel), UserModel.created_at, UserModel.id, cursor, limit)
+    else:
+        users = db.query(UserModel).offset(skip).limit(limit).all()
     
     # JSON-Strings in Listen konvertieren für Response-Validierung
     for user in users:
@@ -1526,9 +1490,11 @@ async def get_users(
             except (json.JSONDecodeError, TypeError):
                 user.individual_permissions = []
     
+    if cursor is not None:
+        return {"items": users, "next_cursor": next_cursor}
     return users
 @app.get("/api/users/{user_id}", response_model=User, tags=["Users"])
-async def get_user(user_id: int, db: Session = Depends(get_db)):
+def get_user(user_id: int, db: Session = Depends(get_db)):
     """
     Einen spezifischen Benutzer abrufen.
     
@@ -1586,6 +1552,24 @@ async def get_user(user_id: int, db: Session = Depends(get_db)):
     
     return user
 
+# Mapping von organizational_unit Namen zu Interest Group IDs (automatische Abteilungszuordnung)
+DEPARTMENT_INTEREST_GROUPS = {
+    "System Administration": 1,  # Team/Eingangsmodul (verwende für System Admin)
+    "Team/Eingangsmodul": 1,
+    "Qualitätsmanagement": 2,
+    "Entwicklung": 3,
+    "Einkauf": 4,
+    "Produktion": 5,
+    "HR/Schulung": 6,
+    "Dokumentation": 7,
+    "Service/Support": 8,
+    "Vertrieb": 9,
+    "Regulatory Affairs": 10,
+    "IT-Abteilung": 11,
+    "Externe Auditoren": 12,
+    "Lieferanten": 13
+}
+
 @app.post("/api/users", response_model=User, tags=["Users"])
 async def create_user(
     user: UserCreate, 
@@ -1662,7 +1646,7 @@ async def create_user(
         )
     
     # Password hashen mit bcrypt
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     
     # Individual permissions als JSON-String serialisieren
     import json
@@ -1679,31 +1663,14 @@ async def create_user(
         approval_level=user.approval_level
     )
     db.add(db_user)
-    db.commit()
+    await run_in_db_thread(db.commit)
+    bump_permissions_version()
     db.refresh(db_user)
     
     # === AUTOMATISCHE ABTEILUNGSZUORDNUNG ===
-    # Mapping von organizational_unit Namen zu Interest Group IDs
-    department_mapping = {
-        "System Administration": 1,  # Team/Eingangsmodul (verwende für System Admin)
-        "Team/Eingangsmodul": 1,
-        "Qualitätsmanagement": 2,
-        "Entwicklung": 3,
-        "Einkauf": 4,
-        "Produktion": 5,
-        "HR/Schulung": 6,
-        "Dokumentation": 7,
-        "Service/Support": 8,
-        "Vertrieb": 9,
-        "Regulatory Affairs": 10,
-        "IT-Abteilung": 11,
-        "Externe Auditoren": 12,
-        "Lieferanten": 13
-    }
-    
     # Automatische Zuordnung zur passenden Interest Group
-    if user.organizational_unit in department_mapping:
-        interest_group_id = department_mapping[user.organizational_unit]
+    if user.organizational_unit in DEPARTMENT_INTEREST_GROUPS:
+        interest_group_id = DEPARTMENT_INTEREST_GROUPS[user.organizational_unit]
         
         # UserGroupMembership erstellen
         new_membership = UserGroupMembershipModel(
@@ -1717,7 +1684,8 @@ async def create_user(
         )
         
         db.add(new_membership)
-        db.commit()
+        await run_in_db_thread(db.commit)
+        bump_permissions_version()
         db.refresh(new_membership)
         
         print(f"✅ User '{user.full_name}' automatisch der Abteilung '{user.organizational_unit}' zugeordnet (Level {user.approval_level})")
@@ -1726,8 +1694,93 @@ async def create_user(
     
     return db_user
 
+@app.post("/api/users/bulk", response_model=BulkCreateResponse, tags=["Users"])
+async def create_users_bulk(
+    request: BulkCreateRequest,
+    current_user: UserModel = Depends(require_qms_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Mehrere Benutzer in einer Transaktion anlegen (Onboarding, HR-Import).
+    
+    Jeder Eintrag hat das Format von ``POST /api/users`` (UserCreate).
+    Wie beim Einzel-Endpoint wird jeder Benutzer automatisch der Gruppe
+    seiner ``organizational_unit`` zugeordnet.
+    
+    Validierung in einem Durchgang: Schema, Email/Mitarbeiternummer doppelt
+    im Request oder bereits vergeben. Passwörter werden parallel im
+    Passwort-Hash-Pool gehasht.
+    
+    Returns:
+        BulkCreateResponse: Ergebnis je Eintrag (ID oder Fehlermeldung)
+    """
+    batch = BulkBatch(request)
+    entries = batch.validate(UserCreate)
+    entries = batch.reject_duplicates(entries, lambda item: item.email.lower(), "Email-Adresse")
+    entries = batch.reject_duplicates(entries, lambda item: item.employee_id, "Mitarbeiternummer")
+    
+    existing_emails = existing_values(db, UserModel.email, [item.email for _, item in entries])
+    entries = batch.reject_existing(entries, lambda item: item.email, existing_emails,
+                                    lambda email: f"Email-Adresse '{email}' ist bereits registriert")
+    existing_employee_ids = existing_values(db, UserModel.employee_id, [item.employee_id for _, item in entries])
+    entries = batch.reject_existing(entries, lambda item: item.employee_id, existing_employee_ids,
+                                    lambda employee_id: f"Mitarbeiternummer '{employee_id}' ist bereits vergeben")
+    
+    if batch.should_abort or not entries:
+        return batch.response()
+    
+    hashed_passwords = await asyncio.gather(*[get_password_hash_async(item.password) for _, item in entries])
+    
+    def insert_users():
+        user_ids = insert_returning_ids(db, UserModel, [
+            {
+                "email": item.email,
+                "hashed_password": hashed_password,
+                "full_name": item.full_name,
+                "employee_id": item.employee_id,
+                "organizational_unit": item.organizational_unit,
+                "individual_permissions": json.dumps(item.individual_permissions or []),
+                "is_department_head": item.is_department_head,
+                "approval_level": item.approval_level,
+                "is_active": True
+            }
+            for (_, item), hashed_password in zip(entries, hashed_passwords)
+        ], key_columns=("email",))
+        
+        # Automatische Abteilungszuordnung (wie POST /api/users)
+        memberships = [
+            {
+                "user_id": user_id,
+                "interest_group_id": DEPARTMENT_INTEREST_GROUPS[item.organizational_unit],
+                "approval_level": item.approval_level,
+                "role_in_group": f"Level {item.approval_level}",
+                "is_department_head": item.is_department_head,
+                "assigned_by_id": current_user.id,
+                "notes": f"Automatisch zugeordnet bei Bulk-Import für '{item.organizational_unit}'"
+            }
+            for (_, item), user_id in zip(entries, user_ids)
+            if item.organizational_unit in DEPARTMENT_INTEREST_GROUPS
+        ]
+        if memberships:
+            db.execute(insert(UserGroupMembershipModel), memberships)
+        db.commit()
+        return user_ids, memberships
+    
+    try:
+        # Schreiben im Threadpool: Warten auf die Schreib-Connection blockiert nicht den Event-Loop
+        user_ids, memberships = await run_in_db_thread(insert_users)
+    except IntegrityError as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Bulk-Import abgebrochen (Konflikt): {e.orig}")
+    bump_permissions_version()
+    
+    for (index, _), user_id in zip(entries, user_ids):
+        batch.succeed(index, user_id)
+    logger.info(f"👥 Bulk-Import: {len(user_ids)} Benutzer angelegt, {len(memberships)} Abteilungszuordnungen, {batch.failed} Fehler")
+    return batch.response()
+
 @app.put("/api/users/{user_id}", response_model=User, tags=["Users"])
-async def update_user(
+def update_user(
     user_id: int,
     user_update: UserUpdate,
     current_user: UserModel = Depends(require_admin_or_qm),
@@ -1835,11 +1888,14 @@ async def update_user(
         setattr(db_user, field, value)
     
     db.commit()
+    bump_permissions_version()
+    if update_data.get("is_active") is False:
+        revoke_user_tokens(user_id)
     db.refresh(db_user)
     return db_user
 
 @app.delete("/api/users/{user_id}", response_model=GenericResponse, tags=["Users"])
-async def delete_user(user_id: int, db: Session = Depends(get_db)):
+def delete_user(user_id: int, db: Session = Depends(get_db)):
     """
     Benutzer löschen (Soft Delete).
     
@@ -1921,6 +1977,8 @@ async def delete_user(user_id: int, db: Session = Depends(get_db)):
     db_user.is_active = False
     
     db.commit()
+    bump_permissions_version()
+    revoke_user_tokens(user_id)
     
     return GenericResponse(
         message=f"Benutzer '{db_user.full_name}' ({db_user.employee_id or 'ohne ID'}) wurde erfolgreich deaktiviert",
@@ -1928,7 +1986,7 @@ async def delete_user(user_id: int, db: Session = Depends(get_db)):
     )
 
 @app.delete("/api/users/{user_id}/hard-delete", response_model=GenericResponse, tags=["Users"])
-async def hard_delete_user(
+def hard_delete_user(
     user_id: int, 
     confirm_deletion: bool = False,
     db: Session = Depends(get_db)
@@ -2032,6 +2090,8 @@ async def hard_delete_user(
     # 4. Benutzer permanent löschen
     db.delete(db_user)
     db.commit()
+    bump_permissions_version()
+    revoke_user_tokens(user_id)
     
     return GenericResponse(
         message=f"Benutzer permanent gelöscht. Referenzen anonymisiert: {affected_documents} Dokumente, {affected_calibrations} Kalibrierungen",
@@ -2042,7 +2102,7 @@ async def hard_delete_user(
 # Zuordnung von Benutzern zu Interessensgruppen (Many-to-Many Relationship)
 
 @app.get("/api/user-group-memberships", response_model=List[UserGroupMembership], tags=["User Group Memberships"])
-async def get_memberships(skip: int = 0, limit: int = 50, db: Session = Depends(get_db)):
+def get_memberships(skip: int = 0, limit: int = 50, db: Session = Depends(get_db)):
     """
     Alle Benutzer-Gruppen-Zuordnungen abrufen.
     
@@ -2087,11 +2147,16 @@ async def get_memberships(skip: int = 0, limit: int = 50, db: Session = Depends(
         - role_in_group definiert spezifische Rolle in der Gruppe
         - Nur aktive Memberships werden standardmäßig angezeigt
     """
-    memberships = db.query(UserGroupMembershipModel).offset(skip).limit(limit).all()
+    # User und Gruppe per JOIN mitladen (sonst 2 Lazy-Load-Queries pro Zeile)
+    memberships = (
+        db.query(UserGroupMembershipModel)
+        .options(joinedload(UserGroupMembershipModel.user), joinedload(UserGroupMembershipModel.interest_group))
+        .offset(skip).limit(limit).all()
+    )
     return memberships
 
 @app.post("/api/user-group-memberships", response_model=UserGroupMembership, tags=["User Group Memberships"])
-async def create_membership(
+def create_membership(
     membership: UserGroupMembershipCreate,
     db: Session = Depends(get_db)
 ):
@@ -2175,11 +2240,60 @@ async def create_membership(
     db_membership = UserGroupMembershipModel(**membership.dict())
     db.add(db_membership)
     db.commit()
+    bump_permissions_version()
     db.refresh(db_membership)
     return db_membership
 
+@app.post("/api/user-group-memberships/bulk", response_model=BulkCreateResponse, tags=["User Group Memberships"])
+def create_memberships_bulk(
+    request: BulkCreateRequest,
+    current_user: UserModel = Depends(require_admin_or_qm),
+    db: Session = Depends(get_db)
+):
+    """
+    Mehrere Benutzer-Gruppen-Zuordnungen in einer Transaktion anlegen.
+    
+    Jeder Eintrag hat das Format von ``POST /api/user-group-memberships``.
+    Geprüft wird wie beim Einzel-Endpoint (Benutzer und Gruppe existieren,
+    Zuordnung noch nicht vorhanden) - mit je einer Abfrage für alle Einträge.
+    
+    Returns:
+        BulkCreateResponse: Ergebnis je Eintrag (ID oder Fehlermeldung)
+    """
+    batch = BulkBatch(request)
+    entries = batch.validate(UserGroupMembershipCreate)
+    entries = batch.reject_duplicates(entries, lambda item: (item.user_id, item.interest_group_id), "Zuordnung")
+    
+    known_users = existing_values(db, UserModel.id, [item.user_id for _, item in entries])
+    entries = batch.reject_missing(entries, lambda item: item.user_id, known_users,
+                                   lambda user_id: f"Benutzer mit ID {user_id} existiert nicht")
+    known_groups = existing_values(db, InterestGroupModel.id, [item.interest_group_id for _, item in entries])
+    entries = batch.reject_missing(entries, lambda item: item.interest_group_id, known_groups,
+                                   lambda group_id: f"Interessensgruppe mit ID {group_id} existiert nicht")
+    existing = existing_pairs(db, UserGroupMembershipModel.user_id, UserGroupMembershipModel.interest_group_id,
+                              [(item.user_id, item.interest_group_id) for _, item in entries])
+    entries = batch.reject_existing(entries, lambda item: (item.user_id, item.interest_group_id), existing,
+                                    lambda pair: "Diese Benutzer-Gruppen-Zuordnung existiert bereits")
+    
+    if batch.should_abort or not entries:
+        return batch.response()
+    
+    try:
+        membership_ids = insert_returning_ids(db, UserGroupMembershipModel, [
+            {**item.model_dump(), "assigned_by_id": current_user.id} for _, item in entries
+        ], key_columns=("user_id", "interest_group_id"))
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Bulk-Import abgebrochen (Konflikt): {e.orig}")
+    bump_permissions_version()
+    
+    for (index, _), membership_id in zip(entries, membership_ids):
+        batch.succeed(index, membership_id)
+    return batch.response()
+
 @app.put("/api/user-group-memberships/{membership_id}", response_model=dict, tags=["User Group Memberships"])
-async def update_user_group_membership(
+def update_user_group_membership(
     membership_id: int,
     membership_update: dict,
     db: Session = Depends(get_db)
@@ -2225,6 +2339,7 @@ async def update_user_group_membership(
     membership.approval_level = new_level
     
     db.commit()
+    bump_permissions_version()
     
     return {
         "message": f"Level erfolgreich auf {new_level} geändert",
@@ -2234,7 +2349,7 @@ async def update_user_group_membership(
     }
 
 @app.delete("/api/user-group-memberships/{membership_id}", response_model=GenericResponse, tags=["User Group Memberships"])
-async def delete_user_group_membership(membership_id: int, db: Session = Depends(get_db)):
+def delete_user_group_membership(membership_id: int, db: Session = Depends(get_db)):
     """
     Benutzer-Gruppen-Zuordnung löschen.
     
@@ -2282,12 +2397,13 @@ async def delete_user_group_membership(membership_id: int, db: Session = Depends
     
     db.delete(membership)
     db.commit()
+    bump_permissions_version()
     return GenericResponse(message=f"Benutzer '{user.full_name}' wurde aus Interessensgruppe '{group.name}' entfernt")
 
 # === HELPER ENDPOINTS ===
 
 @app.get("/api/users/{user_id}/memberships", response_model=List[UserGroupMembership], tags=["User Group Memberships"])
-async def get_user_memberships(user_id: int, db: Session = Depends(get_db)):
+def get_user_memberships(user_id: int, db: Session = Depends(get_db)):
     """
     Alle User-Group-Memberships eines Benutzers abrufen.
     
@@ -2305,23 +2421,22 @@ async def get_user_memberships(user_id: int, db: Session = Depends(get_db)):
         HTTPException: 404 wenn Benutzer nicht gefunden
         HTTPException: 500 bei Datenbankfehlern
     """
-    user = db.query(UserModel).filter(UserModel.id == user_id).first()
+    # User mit allen Memberships und Group-Details in einer Query
+    user = (
+        db.query(UserModel)
+        .options(joinedload(UserModel.group_memberships).joinedload(UserGroupMembershipModel.interest_group))
+        .filter(UserModel.id == user_id)
+        .first()
+    )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Benutzer mit ID {user_id} nicht gefunden"
         )
     
-    # Alle Memberships für diesen User mit Group-Details
-    memberships = db.query(UserGroupMembershipModel).filter(
-        UserGroupMembershipModel.user_id == user_id
-    ).all()
-    
     result = []
-    for membership in memberships:
-        group = db.query(InterestGroupModel).filter(
-            InterestGroupModel.id == membership.interest_group_id
-        ).first()
+    for membership in user.group_memberships:
+        group = membership.interest_group
         
         if group:
             result.append(UserGroupMembership(
@@ -2358,7 +2473,7 @@ async def get_user_memberships(user_id: int, db: Session = Depends(get_db)):
     return result
 
 @app.get("/api/users/{user_id}/groups", response_model=List[InterestGroup], tags=["User Group Memberships"])
-async def get_user_groups(user_id: int, db: Session = Depends(get_db)):
+def get_user_groups(user_id: int, db: Session = Depends(get_db)):
     """
     Alle Interessensgruppen eines Benutzers abrufen.
     
@@ -2416,18 +2531,24 @@ async def get_user_groups(user_id: int, db: Session = Depends(get_db)):
         - Berechtigungen prüfen
         - Team-Zugehörigkeiten verwalten
     """
-    user = db.query(UserModel).filter(UserModel.id == user_id).first()
+    # User, Memberships und Gruppen in einer Query (Existenzprüfung inklusive)
+    user = (
+        db.query(UserModel)
+        .options(joinedload(UserModel.group_memberships).joinedload(UserGroupMembershipModel.interest_group))
+        .filter(UserModel.id == user_id)
+        .first()
+    )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Benutzer mit ID {user_id} nicht gefunden"
         )
     
-    # Join über UserGroupMembership um nur aktive Gruppen zu holen
-    groups = db.query(InterestGroupModel).join(UserGroupMembershipModel).filter(
-        UserGroupMembershipModel.user_id == user_id,
-        InterestGroupModel.is_active == True
-    ).all()
+    # Nur aktive Gruppen
+    groups = [
+        membership.interest_group for membership in user.group_memberships
+        if membership.interest_group and membership.interest_group.is_active
+    ]
     
     # JSON-Strings in Listen konvertieren für Response-Validierung
     for group in groups:
@@ -2441,7 +2562,7 @@ async def get_user_groups(user_id: int, db: Session = Depends(get_db)):
     return groups
 
 @app.get("/api/interest-groups/{group_id}/users", response_model=List[User], tags=["User Group Memberships"])
-async def get_group_users(group_id: int, db: Session = Depends(get_db)):
+def get_group_users(group_id: int, db: Session = Depends(get_db)):
     """
     Alle Benutzer einer Interessensgruppe abrufen.
     
@@ -2495,18 +2616,24 @@ async def get_group_users(group_id: int, db: Session = Depends(get_db)):
         - Zuständigkeiten identifizieren
         - Benachrichtigungen an ganze Gruppen senden
     """
-    group = db.query(InterestGroupModel).filter(InterestGroupModel.id == group_id).first()
+    # Gruppe, Memberships und Benutzer in einer Query (Existenzprüfung inklusive)
+    group = (
+        db.query(InterestGroupModel)
+        .options(joinedload(InterestGroupModel.user_memberships).joinedload(UserGroupMembershipModel.user))
+        .filter(InterestGroupModel.id == group_id)
+        .first()
+    )
     if not group:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Interessensgruppe mit ID {group_id} nicht gefunden"
         )
     
-    # Join über UserGroupMembership um nur aktive Benutzer zu holen
-    users = db.query(UserModel).join(UserGroupMembershipModel).filter(
-        UserGroupMembershipModel.interest_group_id == group_id,
-        UserModel.is_active == True
-    ).all()
+    # Nur aktive Benutzer
+    users = [
+        membership.user for membership in group.user_memberships
+        if membership.user and membership.user.is_active
+    ]
     
     # JSON-Strings in Listen konvertieren für Response-Validierung
     for user in users:
@@ -2522,23 +2649,108 @@ async def get_group_users(group_id: int, db: Session = Depends(get_db)):
 # === DOCUMENTS API ===
 # Dokumentenmanagement mit 14 QMS-spezifischen Dokumenttypen
 
-@app.get("/api/documents", response_model=List[Document], tags=["Documents"])
+# Über fields= abrufbare Spalten (Beziehungen sind nur in view=full enthalten)
+DOCUMENT_PROJECTION_FIELDS = (
+    set(Document.model_fields) - {"creator", "reviewed_by", "approved_by", "parent_document"}
+)
+
+# Sortier-/Cursor-Spalten der Listen-Endpoints
+DOCUMENT_SORT_FIELDS = {"created_at", "updated_at"}
+
+# Beziehungen des Document-Schemas (eine Query je Beziehung statt Lazy Loading pro Zeile)
+DOCUMENT_RELATION_LOAD_OPTIONS = [
+    selectinload(DocumentModel.creator),
+    selectinload(DocumentModel.reviewed_by),
+    selectinload(DocumentModel.approved_by),
+    selectinload(DocumentModel.parent_document),
+]
+
+def _document_projection(view: str, fields: Optional[str]) -> Tuple[list, Optional[List[str]]]:
+    """
+    Ermittelt Lade-Optionen und Feldauswahl für Dokument-Listen.
+    
+    view=summary bzw. fields= laden nur die benötigten Spalten (load_only),
+    schwere Text-Spalten wie extracted_text oder die Multi-Visio-JSONs
+    werden dann gar nicht erst aus der Datenbank gelesen.
+    
+    Returns:
+        Tuple[list, Optional[List[str]]]: (Query-Optionen, ausgewählte Felder oder None)
+    """
+    if fields:
+        selected = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in selected if name not in DOCUMENT_PROJECTION_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unbekannte Felder: {', '.join(unknown)}. Erlaubt: {', '.join(sorted(DOCUMENT_PROJECTION_FIELDS))}"
+            )
+        if "id" not in selected:
+            selected.insert(0, "id")
+        # Sortierspalten immer mitladen (Cursor der Folgeseite, kein Nachladen pro Zeile)
+        loaded = set(selected) | DOCUMENT_SORT_FIELDS
+        return [load_only(*[getattr(DocumentModel, name) for name in loaded])], selected
+    
+    if view == "summary":
+        return [load_only(*[getattr(DocumentModel, name) for name in DocumentSummary.model_fields])], None
+    
+    # view=full: Benutzer-Beziehungen gebündelt laden statt pro Dokument
+    return DOCUMENT_RELATION_LOAD_OPTIONS, None
+
+def _serialize_documents(documents: List[DocumentModel], view: str, selected_fields: Optional[List[str]]) -> list:
+    """Wandelt Dokumente passend zur gewählten Projektion in Response-Objekte um."""
+    if selected_fields:
+        return [{name: getattr(doc, name) for name in selected_fields} for doc in documents]
+    if view == "summary":
+        return [DocumentSummary.model_validate(doc) for doc in documents]
+    return [Document.model_validate(doc) for doc in documents]
+
+async def _serialize_documents_async(db: AsyncSession, documents: List[DocumentModel], view: str, selected_fields: Optional[List[str]]) -> list:
+    """
+    Serialisierung für AsyncSession-Endpoints.
+    
+    view=full läuft über ``run_sync``: tiefere Beziehungen (z.B. die Kette
+    der parent_documents) dürfen dort wie gewohnt nachgeladen werden.
+    """
+    if selected_fields or view == "summary":
+        return _serialize_documents(documents, view, selected_fields)
+    return await db.run_sync(lambda _: _serialize_documents(documents, view, selected_fields))
+
+@app.get(
+    "/api/documents",
+    response_model=None,
+    responses={200: {"model": List[Document], "description": "Dokumente (view=full); view=summary liefert DocumentSummary, fields= nur die gewählten Felder"}},
+    tags=["Documents"]
+)
 async def get_documents(
     skip: int = 0,
     limit: int = 20,
     document_type: Optional[str] = None,
     status: Optional[str] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    view: str = Query("full", pattern="^(summary|full)$", description="summary: schlanke Listen-Ansicht ohne Textinhalte"),
+    fields: Optional[str] = Query(None, description="Kommagetrennte Feldliste, z.B. id,title,status"),
+    cursor: Optional[str] = Query(None, description="Keyset-Pagination: leer für die erste Seite, danach next_cursor der Vorseite"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Alle Dokumente abrufen mit erweiterten Filteroptionen.
     
     Lädt eine paginierte Liste aller QMS-Dokumente mit optionalen Filtern
     für Typ, Status und Volltextsuche.
+    
+    Projektion:
+        - ``view=full`` (Standard): vollständiges Document-Schema
+        - ``view=summary``: DocumentSummary ohne extracted_text/Beziehungen
+        - ``fields=id,title,...``: nur die angegebenen Felder
+    
+    Pagination:
+        - ``skip``/``limit`` (Standard): Offset-Pagination, Liste als Antwort
+        - ``cursor`` (leer = erste Seite): Keyset-Pagination nach (created_at, id),
+          Antwort ``{"items": [...], "next_cursor": ...}``
     """
+    load_options, selected_fields = _document_projection(view, fields)
     try:
-        query = db.query(DocumentModel)
+        query = select(DocumentModel).options(*load_options)
         
         # Filter nach Dokumenttyp
         if document_type:
@@ -2562,23 +2774,32 @@ async def get_documents(
                     detail=f"Ungültiger Status: {status}"
                 )
         
-        # Volltextsuche
+        # Volltextsuche (FTS5-Index, sonst ILIKE)
         if search:
-            search_filter = f"%{search}%"
-            query = query.filter(
-                (DocumentModel.title.ilike(search_filter)) |
-                (DocumentModel.content.ilike(search_filter))
-            )
+            match_query = search_index.build_match_query(search) if search_index.FTS5_AVAILABLE else None
+            if match_query:
+                query = query.filter(DocumentModel.id.in_(search_index.matching_ids_select(match_query)))
+            else:
+                search_filter = f"%{search}%"
+                query = query.filter(
+                    (DocumentModel.title.ilike(search_filter)) |
+                    (DocumentModel.content.ilike(search_filter))
+                )
         
-        documents = query.order_by(DocumentModel.created_at.desc()).offset(skip).limit(limit).all()
+        if cursor is not None:
+            documents, next_cursor = await paginate_keyset_async(db, query, DocumentModel.created_at, DocumentModel.id, cursor, limit)
+            return {"items": await _serialize_documents_async(db, documents, view, selected_fields), "next_cursor": next_cursor}
         
-        # Debug-Ausgabe
-        print(f"✅ Gefunden: {len(documents)} Dokumente")
-        for doc in documents[:3]:
-            print(f"  - {doc.id}: {doc.title} ({doc.document_type})")
+        result = await db.execute(query.order_by(DocumentModel.created_at.desc()).offset(skip).limit(limit))
+        documents = result.scalars().all()
+        
+        # Debug-Ausgabe (nur geladene Spalten - keine impliziten Nachlade-Queries)
+        print(f"✅ Gefunden: {len(documents)} Dokumente: {[doc.id for doc in documents[:3]]}")
             
-        return documents
+        return await _serialize_documents_async(db, documents, view, selected_fields)
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ FEHLER in get_documents: {e}")
         import traceback
@@ -2706,7 +2927,7 @@ async def confirm_visio_prompt_usage(document_type: str):
         }
 
 @app.get("/api/documents/{document_id}", response_model=Document, tags=["Documents"])
-async def get_document(document_id: int, db: Session = Depends(get_db)):
+async def get_document(document_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Ein spezifisches Dokument abrufen.
     
@@ -2714,7 +2935,7 @@ async def get_document(document_id: int, db: Session = Depends(get_db)):
     
     Args:
         document_id (int): Eindeutige ID des Dokuments
-        db (Session): Datenbankverbindung (automatisch injiziert)
+        db (AsyncSession): Datenbankverbindung (automatisch injiziert)
         
     Returns:
         Document: Detaillierte Dokumentinformationen
@@ -2745,13 +2966,16 @@ async def get_document(document_id: int, db: Session = Depends(get_db)):
         - file_path für Datei-Download
         - Audit-Trail durch created_by und approved_by
     """
-    document = db.query(DocumentModel).filter(DocumentModel.id == document_id).first()
+    result = await db.execute(
+        select(DocumentModel).options(*DOCUMENT_RELATION_LOAD_OPTIONS).where(DocumentModel.id == document_id)
+    )
+    document = result.scalar_one_or_none()
     if not document:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Dokument mit ID {document_id} nicht gefunden"
         )
-    return document
+    return await db.run_sync(lambda _: Document.model_validate(document))
 
 # === DOKUMENT-VORSCHAU ENDPOINT ===
 
@@ -2797,7 +3021,9 @@ async def preview_document_processing(
                 # === OCR-VORSCHAU ===
                 # Text extrahieren
                 mime_type = file.content_type or "application/octet-stream"
-                extracted_text = extract_text_from_file(tmp_path, mime_type)
+                extracted_text = await extract_text_from_file_async(
+                    tmp_path, mime_type, enable_vision_fallback=False
+                )
                 
                 # KEIN FALLBACK: OCR-Text wird so verwendet wie er ist
                 
@@ -4385,13 +4611,6 @@ async def simple_ai_prompt_test(
 # 📋 IN-MEMORY CACHE für Pipeline-Ergebnisse (verhindert redundante AI-Calls)
 _multi_visio_cache = {}
 
-def _get_file_hash(file_path: str) -> str:
-    """Erstellt einen Hash für die Datei zur Cache-Identifikation"""
-    import hashlib
-    with open(file_path, 'rb') as f:
-        content = f.read()
-    return hashlib.md5(content).hexdigest()
-
 @app.post("/api/multi-visio/stage/{stage_number}", tags=["Multi-Visio Pipeline"])
 async def execute_multi_visio_stage(
     stage_number: int,
@@ -4414,12 +4633,14 @@ async def execute_multi_visio_stage(
         # Datei speichern und PNG erstellen
         file_response = await save_uploaded_file(file, "OTHER", "multi-visio")
         file_path = file_response.file_path
+        # SHA-256 aus dem Upload (einmal beim Speichern berechnet) als Cache-Schlüssel
+        file_hash = file_response.file_hash
         
         # Multi-Visio Engine initialisieren
         multi_visio_engine = MultiVisioEngine()
         
         # 🚀 EINMALIGE Bildkonvertierung mit Cache (verhindert LibreOffice Pop-ups)
-        images = await multi_visio_engine._get_or_convert_images(file_path)
+        images = await multi_visio_engine._get_or_convert_images(file_path, file_hash=file_hash)
         
         if not images:
             raise HTTPException(status_code=500, detail="Dokument konnte nicht zu Bildern konvertiert werden")
@@ -4433,7 +4654,6 @@ async def execute_multi_visio_stage(
             
         elif stage_number == 2:
             # Stage 2: Strukturierte Analyse (Bild an AI) mit Cache
-            file_hash = _get_file_hash(file_path)
             cache_key = f"{file_hash}_stage2_{provider}"
             
             if cache_key in _multi_visio_cache:
@@ -4450,7 +4670,6 @@ async def execute_multi_visio_stage(
             logger.info("🔄 Stage 3 - Backend-Processing: Stage 2 → Text-Extraktion (KEIN AI-Call)")
             
             # 📋 CACHE-OPTIMIERUNG: Stage 2 nur einmal pro Datei
-            file_hash = _get_file_hash(file_path)
             cache_key = f"{file_hash}_stage2_{provider}"
             
             if cache_key in _multi_visio_cache:
@@ -4473,7 +4692,6 @@ async def execute_multi_visio_stage(
             logger.info("🔍 Stage 4 - Backend-Verifikation: Stage 2 → Stage 3 → Hybrid-Validation (KEIN AI-Call)")
             
             # 📋 CACHE-OPTIMIERUNG: Stage 2 + 3 aus Cache oder berechnen
-            file_hash = _get_file_hash(file_path)
             stage2_cache_key = f"{file_hash}_stage2_{provider}"
             stage3_cache_key = f"{file_hash}_stage3_{provider}"
             
@@ -4509,7 +4727,6 @@ async def execute_multi_visio_stage(
             # Stage 5: Norm-Compliance (mit Stage 2 Cache)
             logger.info("🔄 Stage 5 - Norm-Compliance: Stage 2 → Text-Analyse")
             
-            file_hash = _get_file_hash(file_path)
             stage2_cache_key = f"{file_hash}_stage2_{provider}"
             
             # Stage 2 aus Cache oder neu berechnen
@@ -4602,6 +4819,7 @@ async def upload_file(
 
 @app.post("/api/documents/with-file", response_model=Document, tags=["Documents"])
 async def create_document_with_file(
+    background_tasks: BackgroundTasks,
     title: Optional[str] = Form(None),
     document_type: Optional[str] = Form("OTHER"),
     creator_id: int = Form(...),
@@ -4685,34 +4903,74 @@ async def create_document_with_file(
         png_preview_size = None
         png_generation_timestamp = None
         png_generation_method = None
+        conversion_success = True
+        conversion_duration_seconds = None
+        conversion_log = None
+        
+        # Original-Dokument-Metadaten initialisieren
+        original_document_path = None
+        original_document_hash = None
+        original_document_size = None
+        original_document_mime_type = None
+        
+        # Multi-Visio Variablen initialisieren (falls nicht Multi-Visio)
+        multi_visio_stage1_result = None
+        multi_visio_stage2_result = None
+        multi_visio_stage3_result = None
+        multi_visio_stage4_result = None
+        multi_visio_stage5_result = None
+        multi_visio_pipeline_summary = None
+        multi_visio_provider_used = None
+        multi_visio_total_duration = None
+        multi_visio_success_rate = None
+        
+        # Bereits verarbeitetes Dokument mit identischem Inhalt (Ergebnisse übernehmen)
+        reused_document = None
+        
+        # Textanfang (OCR) für Titel und Dokumenttyp
+        text_prefix = ""
+        prefix_document_type = None
         
         if file:
             # 🎯 NEU: Original-Dokument-Metadaten speichern
             original_document_path = f"uploads/{document_type or 'OTHER'}/{file.filename}"
-            original_document_size = file.size
             original_document_mime_type = file.content_type
             
-            # Datei speichern
+            # Datei speichern (Streaming, SHA-256 wird dabei einmal berechnet)
             upload_result = await save_uploaded_file(file, document_type or "OTHER", upload_method)
             # FileUploadResponse hat kein success Attribut - es wird nur bei Erfolg zurückgegeben
             file_data = upload_result
             
-            # 🎯 NEU: Original-Dokument-Hash berechnen
-            import hashlib
-            file_content = await file.read()
-            original_document_hash = hashlib.sha256(file_content).hexdigest()
-            await file.seek(0)  # Reset file pointer
+            # 🎯 NEU: Original-Dokument-Hash und -Größe aus dem Upload übernehmen
+            original_document_size = upload_result.file_size
+            original_document_hash = upload_result.file_hash
+            
+            # ♻️ Identischer Inhalt schon verarbeitet? Dann keine Extraktion, PNG-Erzeugung und Analyse
+            if get_upload_reuse_results():
+                reused_document = find_processed_document(db, upload_result.file_hash, upload_method)
             
             # Je nach Upload-Methode verarbeiten
-            if upload_method == "ocr":
+            if reused_document is not None:
+                upload_logger.info(
+                    f"♻️ Inhalt bereits verarbeitet (Dokument {reused_document.id}, SHA-256 "
+                    f"{upload_result.file_hash[:8]}...) - Ergebnisse werden übernommen"
+                )
+                extracted_text = reused_document.extracted_text or ""
+                structured_analysis = reused_document.structured_analysis
+                
+            elif upload_method == "ocr":
                 # === OCR-METHODE: Textbasierte Verarbeitung ===
                 upload_logger.info("📄 OCR-Methode gewählt - Textextraktion")
                 
-                # Text extrahieren
-                extracted_text = extract_text_from_file(
+                # Text einmal extrahieren; Titel und Dokumenttyp nur aus dem Textanfang
+                extracted_text = await extract_text_from_file_async(
                     Path(upload_result.file_path), 
-                    upload_result.mime_type
+                    upload_result.mime_type,
+                    enable_vision_fallback=False
                 )
+                text_prefix = extracted_text[:TEXT_PREFIX_CHARS]
+                prefix_document_type = analyze_document_type(text_prefix, title or file.filename)
+                upload_logger.info(f"⚡ Typ aus Textanfang ({len(text_prefix)} Zeichen): {prefix_document_type}")
                 
                 # KEIN FALLBACK: OCR-Text wird so verwendet wie er ist
                 
@@ -4729,7 +4987,9 @@ async def create_document_with_file(
                     vision_engine = VisionOCREngine()
                     
                     # 1. Dokument zu Bildern konvertieren (mit Caching)
-                    images = await vision_engine._get_or_convert_images(Path(upload_result.file_path))
+                    images = await vision_engine._get_or_convert_images(
+                        Path(upload_result.file_path), file_hash=upload_result.file_hash
+                    )
                     if not images:
                         raise HTTPException(status_code=500, detail="Dokument konnte nicht zu Bildern konvertiert werden")
                     
@@ -5022,36 +5282,15 @@ async def create_document_with_file(
             # 🚀 ENHANCED SCHEMA METADATEN-EXTRAKTION (für beide Methoden)
             ai_result = None  # Initialisiere ai_result
             
-            # 🎯 Multi-Visio Variablen initialisieren (falls nicht Multi-Visio)
-            multi_visio_stage1_result = None
-            multi_visio_stage2_result = None
-            multi_visio_stage3_result = None
-            multi_visio_stage4_result = None
-            multi_visio_stage5_result = None
-            multi_visio_pipeline_summary = None
-            multi_visio_provider_used = None
-            multi_visio_total_duration = None
-            multi_visio_success_rate = None
-            
-            # 🎯 NEU: Original-Dokument und PNG-Metadaten
-            original_document_path = None
-            original_document_hash = None
-            original_document_size = None
-            original_document_mime_type = None
-            png_preview_path = None
-            png_preview_hash = None
-            png_preview_size = None
-            png_generation_timestamp = None
-            png_generation_method = None
-            conversion_success = True
-            conversion_duration_seconds = None
-            conversion_log = None
-            
             # Prüfe ob AI-Provider verfügbar sind
             from .ai_engine import ai_engine
             ai_providers_available = ai_engine.check_providers_available()
             
-            if ENHANCED_AI_AVAILABLE and extracted_text and ai_providers_available:
+            if reused_document is not None:
+                # Gespeicherte KI-Metadaten des bereits verarbeiteten Dokuments übernehmen
+                ai_result = reused_ai_result(reused_document)
+            
+            elif ENHANCED_AI_AVAILABLE and get_enhanced_metadata_enabled() and extracted_text and ai_providers_available:
                 upload_logger.info(f"🎯 Enhanced Schema Metadaten-Extraktion mit {ai_model}")
                 
                 try:
@@ -5107,7 +5346,7 @@ async def create_document_with_file(
                 # Für Testzwecke: Verwende Standardwerte ohne AI-Analyse
                 upload_logger.info("📝 Keine AI-Analyse verfügbar - Verwende Standardwerte für Test")
                 ai_result = {
-                    'document_type': document_type or 'OTHER',
+                    'document_type': document_type if document_type and document_type != "OTHER" else (prefix_document_type or 'OTHER'),
                     'confidence': 0.5,
                     'language': 'de',
                     'language_confidence': 0.5,
@@ -5155,7 +5394,7 @@ async def create_document_with_file(
             # Titel und Beschreibung automatisch extrahieren (falls nicht angegeben)
             if not title or not content:
                 auto_title, auto_content = extract_smart_title_and_description(
-                    extracted_text, file.filename
+                    text_prefix or extracted_text, file.filename
                 )
                 title = title or auto_title
                 content = content or auto_content or f"Automatisch generiert - {ai_result.get('document_type', 'OTHER')}"
@@ -5257,10 +5496,29 @@ async def create_document_with_file(
             # Zusätzliche KI-Metadaten (als JSON-String in bestehenden Feldern)
             remarks=f"{remarks or ''}\n\n🤖 KI-Analyse ({ai_result.get('provider', 'unknown')}):\n- Sprache: {detected_lang} ({lang_confidence:.1%})\n- Qualität: {legacy_result.content_quality_score:.1%}\n- Komplexität: {legacy_result.complexity_score}/10\n- Compliance-Keywords: {', '.join(legacy_result.compliance_keywords[:5])}"
         )
+        if reused_document is not None:
+            # Extraktion, PNG-Vorschau und Analyse unverändert übernehmen
+            for field in REUSED_RESULT_FIELDS:
+                setattr(db_document, field, getattr(reused_document, field))
+            reused_analysis = stored_ai_analysis(reused_document)
+            db_document.remarks = (
+                f"{remarks or ''}\n\n♻️ Übernommen aus Dokument {reused_document.id} (identischer Inhalt)"
+                + (f"\n{reused_analysis}" if reused_analysis else "")
+            )
         db.add(db_document)
-        db.commit()
+        await run_in_db_thread(db.commit)
         db.refresh(db_document)
         
+        # MinHash-Signatur für die Duplikatserkennung einmalig berechnen
+        try:
+            await run_in_db_thread(store_document_signature, db, db_document.id, db_document.extracted_text)
+        except Exception as e:
+            upload_logger.warning(f"⚠️ MinHash-Signatur konnte nicht gespeichert werden: {e}")
+        
+        # Vorschau-Thumbnails (alle Seiten, mehrere Größen) nach der Antwort erzeugen
+        if db_document.file_hash:
+            background_tasks.add_task(generate_document_thumbnails, db_document.id)
+        
         upload_logger.info(f"✅ Document erfolgreich erstellt: ID={db_document.id}, Title='{db_document.title}', Type={db_document.document_type}")
         upload_logger.info(f"⏱️ Upload-Zeit: {time.time() - start_time:.2f}s")
         
@@ -5294,11 +5552,32 @@ async def create_document_with_file(
         if extracted_text and len(extracted_text.strip()) > 100:  # Nur sinnvolle Texte indexieren
             try:
                 # UPGRADE: Advanced RAG Engine verwenden
-                import asyncio
-                
                 # Advanced Indexierung mit Hierarchical Chunking und Enhanced Metadata
                 async def async_advanced_index():
                     try:
+                        rag_metadata = {
+                            'creator_id': db_document.creator_id,
+                            'version': db_document.version,
+                            'file_name': db_document.file_name,
+                            'file_path': db_document.file_path,
+                            'keywords': db_document.keywords or "",
+                            'uploaded_at': datetime.utcnow().isoformat()
+                        }
+                        
+                        if reused_document is not None:
+                            # Identischer Inhalt: Vektoren des bereits indexierten Dokuments übernehmen (keine Embeddings/LLM)
+                            copy_result = await advanced_rag_engine.copy_document_index(
+                                source_document_id=reused_document.id,
+                                document_id=db_document.id,
+                                title=db_document.title,
+                                document_type=db_document.document_type.value,
+                                metadata=rag_metadata
+                            )
+                            if copy_result.get("points_indexed"):
+                                upload_logger.info(f"♻️ RAG-Vektoren aus Dokument {reused_document.id} übernommen: {copy_result}")
+                                return copy_result
+                            upload_logger.info(f"ℹ️ Dokument {reused_document.id} nicht indexiert - Indexierung läuft regulär")
+                        
                         # Advanced RAG mit Enhanced Schema Integration
                         enhanced_rag_metadata = {}
                         
@@ -5317,12 +5596,7 @@ async def create_document_with_file(
                             content=extracted_text,
                             document_type=db_document.document_type.value,
                             metadata={
-                                'creator_id': db_document.creator_id,
-                                'version': db_document.version,
-                                'file_name': db_document.file_name,
-                                'file_path': db_document.file_path,
-                                'keywords': db_document.keywords or "",
-                                'uploaded_at': datetime.utcnow().isoformat(),
+                                **rag_metadata,
                                 **enhanced_rag_metadata  # Enhanced Schema Metadaten hinzufügen
                             }
                         )
@@ -5420,20 +5694,22 @@ def _calculate_content_similarity(text1: str, text2: str) -> float:
     return len(intersection) / len(union) if union else 0.0
 
 @app.get("/api/documents/{document_id}/download", tags=["Documents"])
-async def download_document_file(document_id: int, db: Session = Depends(get_db)):
+def download_document_file(document_id: int, request: Request, db: Session = Depends(get_db)):
     """
     Lädt eine Dokumentdatei herunter oder öffnet sie im Browser.
     
+    HTTP-Caching: ETag = ``file_hash``, ``If-None-Match`` → 304 ohne
+    Dateizugriff, Range-Requests (206), ``?v=<file_hash>`` → unveränderlich.
+    
     Args:
         document_id (int): ID des Dokuments
         
     Returns:
-        FileResponse: Die Dokumentdatei zum Download/Anzeige
+        FileResponse: Die Dokumentdatei zum Download/Anzeige (oder 304)
         
     Raises:
         HTTPException: 404 wenn Dokument oder Datei nicht gefunden
     """
-    from fastapi.responses import FileResponse
     import os
     
     # Dokument aus DB laden
@@ -5452,11 +5728,6 @@ async def download_document_file(document_id: int, db: Session = Depends(get_db)
         )
     
     file_path = os.path.join("backend", document.file_path)
-    if not os.path.exists(file_path):
-        raise HTTPException(
-            status_code=404,
-            detail=f"Datei nicht gefunden: {document.file_path}"
-        )
     
     # MIME-Type basierend auf Dateierweiterung
     import mimetypes
@@ -5464,20 +5735,13 @@ async def download_document_file(document_id: int, db: Session = Depends(get_db)
     if not mime_type:
         mime_type = "application/octet-stream"
     
-    # Dateiname für Download
+    # Dateiname für Download (inline öffnet im Browser)
     filename = os.path.basename(file_path)
     
-    return FileResponse(
-        path=file_path,
-        media_type=mime_type,
-        filename=filename,
-        headers={
-            "Content-Disposition": f"inline; filename={filename}"  # inline öffnet im Browser
-        }
-    )
+    return cached_file_response(request, Path(file_path), document.file_hash, mime_type, filename=filename)
 
 @app.post("/api/documents", response_model=Document, tags=["Documents"])
-async def create_document(document: DocumentCreate, db: Session = Depends(get_db)):
+def create_document(document: DocumentCreate, db: Session = Depends(get_db)):
     """
     Neues Dokument erstellen.
     
@@ -5553,10 +5817,13 @@ async def create_document(document: DocumentCreate, db: Session = Depends(get_db
     db.add(db_document)
     db.commit()
     db.refresh(db_document)
+    
+    if db_document.extracted_text:
+        store_document_signature(db, db_document.id, db_document.extracted_text)
     return db_document
 
 @app.put("/api/documents/{document_id}", response_model=Document, tags=["Documents"])
-async def update_document(
+def update_document(
     document_id: int,
     document_update: DocumentUpdate,
     db: Session = Depends(get_db)
@@ -5641,7 +5908,7 @@ async def update_document(
     return db_document
 
 @app.delete("/api/documents/{document_id}", response_model=GenericResponse, tags=["Documents"])
-async def delete_document(document_id: int, db: Session = Depends(get_db)):
+def delete_document(document_id: int, db: Session = Depends(get_db)):
     """
     Dokument löschen.
     
@@ -5669,7 +5936,8 @@ async def delete_document(document_id: int, db: Session = Depends(get_db)):
         
     Note:
         - Hard Delete: Dokument wird permanent entfernt
-        - Datei auf Festplatte bleibt bestehen (separater Prozess)
+        - Upload-Datei: Link wird entfernt, der Inhalt (CAS-Blob) erst wenn
+          kein weiteres Dokument denselben Inhalt referenziert
         - Für Compliance-relevante Dokumente vorsichtig verwenden
         
     Warning:
@@ -5707,9 +5975,18 @@ async def delete_document(document_id: int, db: Session = Depends(get_db)):
             except Exception as e:
                 print(f"⚠️ RAG-Cleanup fehlgeschlagen (nicht kritisch): {e}")
         
-        # 3. Hauptdokument löschen
+        # 3. Hauptdokument löschen (MinHash-Signatur per Cascade)
+        file_hash, file_path = db_document.file_hash, db_document.file_path
         db.delete(db_document)
         db.commit()
+        duplicate_index.remove(document_id)
+        
+        # 4. Upload-Datei freigeben (Blob wird entfernt, wenn kein Dokument mehr darauf verweist)
+        try:
+            content_store.release(db, file_hash, file_path)
+            remove_thumbnails(db, file_hash)
+        except Exception as e:
+            print(f"⚠️ Datei-Freigabe fehlgeschlagen (nicht kritisch): {e}")
         
         cleanup_info = ""
         if rag_cleanup_result and rag_cleanup_result.get('success'):
@@ -5797,7 +6074,7 @@ async def change_document_status(
     document_id: int,
     status_change: DocumentStatusChange,
     current_user: UserModel = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Dokumentstatus ändern mit QM-Workflow-Validierung.
@@ -5808,14 +6085,17 @@ async def change_document_status(
     - APPROVED → OBSOLETE: Nur QM-Gruppe
     - OBSOLETE → DRAFT: Nur QM-Gruppe (für Testing)
     """
-    # Dokument laden
-    document = db.query(DocumentModel).filter(DocumentModel.id == document_id).first()
+    # Dokument laden (creator für die Benachrichtigung gleich mit)
+    result = await db.execute(
+        select(DocumentModel).options(selectinload(DocumentModel.creator)).where(DocumentModel.id == document_id)
+    )
+    document = result.scalar_one_or_none()
     if not document:
         raise HTTPException(status_code=404, detail="Dokument nicht gefunden")
     
     # QM-Berechtigung prüfen (QMS Admin, Level 4 User oder quality_management Gruppe)
     from .auth import is_qms_admin
-    user_groups = auth_get_user_groups(db, current_user)
+    user_groups = await get_user_groups_async(db, current_user)
     is_qm_user = (
         is_qms_admin(current_user) or 
         current_user.approval_level >= 4 or  # Level 4+ Users haben automatisch QM-Rechte
@@ -5874,15 +6154,15 @@ async def change_document_status(
     print(f"   Recipients: {', '.join(notification.recipients)}")
     
     try:
-        db.commit()
-        db.refresh(document)
-        return document
+        await db.commit()
+        await db.refresh(document)
+        return await db.run_sync(lambda _: Document.model_validate(document))
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Fehler beim Status-Update: {str(e)}")
 
 @app.get("/api/documents/{document_id}/status-history", response_model=List[DocumentStatusHistory], tags=["Document Workflow"])
-async def get_document_status_history(
+def get_document_status_history(
     document_id: int,
     db: Session = Depends(get_db)
 ):
@@ -5903,19 +6183,36 @@ async def get_document_status_history(
     
     return history
 
-@app.get("/api/documents/status/{status}", response_model=List[Document], tags=["Document Workflow"])
+@app.get(
+    "/api/documents/status/{status}",
+    response_model=None,
+    responses={200: {"model": List[Document], "description": "Dokumente (view=full); view=summary liefert DocumentSummary, fields= nur die gewählten Felder"}},
+    tags=["Document Workflow"]
+)
 async def get_documents_by_status(
     status: DocumentStatus,
     skip: int = 0,
     limit: int = 20,
-    db: Session = Depends(get_db)
+    view: str = Query("full", pattern="^(summary|full)$", description="summary: schlanke Listen-Ansicht ohne Textinhalte"),
+    fields: Optional[str] = Query(None, description="Kommagetrennte Feldliste, z.B. id,title,status"),
+    cursor: Optional[str] = Query(None, description="Keyset-Pagination: leer für die erste Seite, danach next_cursor der Vorseite"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Alle Dokumente mit einem bestimmten Status abrufen (für Workflow-Dashboards)."""
-    documents = db.query(DocumentModel).filter(
-        DocumentModel.status == status
-    ).order_by(DocumentModel.updated_at.desc()).offset(skip).limit(limit).all()
+    """
+    Alle Dokumente mit einem bestimmten Status abrufen (für Workflow-Dashboards).
     
-    return documents
+    Sortierung nach updated_at (zuletzt geändert zuerst); mit ``cursor``
+    Keyset-Pagination nach (updated_at, id) über den Index (status, updated_at, id).
+    """
+    load_options, selected_fields = _document_projection(view, fields)
+    query = select(DocumentModel).options(*load_options).where(DocumentModel.status == status)
+    
+    if cursor is not None:
+        documents, next_cursor = await paginate_keyset_async(db, query, DocumentModel.updated_at, DocumentModel.id, cursor, limit)
+        return {"items": await _serialize_documents_async(db, documents, view, selected_fields), "next_cursor": next_cursor}
+    
+    result = await db.execute(query.order_by(DocumentModel.updated_at.desc()).offset(skip).limit(limit))
+    return await _serialize_documents_async(db, result.scalars().all(), view, selected_fields)
 
 def generate_status_notification(
     document: DocumentModel, 
@@ -5953,7 +6250,7 @@ def generate_status_notification(
 # === NORMS API ===
 
 @app.get("/api/norms", response_model=List[Norm], tags=["Norms"])
-async def get_norms(skip: int = 0, limit: int = 20, db: Session = Depends(get_db)):
+def get_norms(skip: int = 0, limit: int = 20, db: Session = Depends(get_db)):
     """
     Alle Normen abrufen.
     
@@ -6017,7 +6314,7 @@ async def get_norms(skip: int = 0, limit: int = 20, db: Session = Depends(get_db
     return norms
 
 @app.get("/api/norms/{norm_id}", response_model=Norm, tags=["Norms"])
-async def get_norm(norm_id: int, db: Session = Depends(get_db)):
+def get_norm(norm_id: int, db: Session = Depends(get_db)):
     """
     Eine spezifische Norm abrufen.
     
@@ -6065,7 +6362,7 @@ async def get_norm(norm_id: int, db: Session = Depends(get_db)):
     return norm
 
 @app.post("/api/norms", response_model=Norm, tags=["Norms"])
-async def create_norm(norm: NormCreate, db: Session = Depends(get_db)):
+def create_norm(norm: NormCreate, db: Session = Depends(get_db)):
     """
     Neue Norm erstellen.
     
@@ -6139,7 +6436,7 @@ async def create_norm(norm: NormCreate, db: Session = Depends(get_db)):
     return db_norm
 
 @app.put("/api/norms/{norm_id}", response_model=Norm, tags=["Norms"])
-async def update_norm(
+def update_norm(
     norm_id: int,
     norm_update: NormUpdate,
     db: Session = Depends(get_db)
@@ -6187,7 +6484,7 @@ async def update_norm(
     return db_norm
 
 @app.delete("/api/norms/{norm_id}", response_model=GenericResponse, tags=["Norms"])
-async def delete_norm(norm_id: int, db: Session = Depends(get_db)):
+def delete_norm(norm_id: int, db: Session = Depends(get_db)):
     """
     Norm löschen.
     
@@ -6220,8 +6517,13 @@ async def delete_norm(norm_id: int, db: Session = Depends(get_db)):
     )
 # === EQUIPMENT API ===
 
-@app.get("/api/equipment", response_model=List[Equipment], tags=["Equipment"])
-async def get_equipment(skip: int = 0, limit: int = 20, db: Session = Depends(get_db)):
+@app.get("/api/equipment", response_model=Union[List[Equipment], CursorPage[Equipment]], tags=["Equipment"])
+def get_equipment(
+    skip: int = 0,
+    limit: int = 20,
+    cursor: Optional[str] = Query(None, description="Keyset-Pagination: leer für die erste Seite, danach next_cursor der Vorseite"),
+    db: Session = Depends(get_db)
+):
     """
     Alle Equipment-Einträge abrufen.
     
@@ -6231,10 +6533,12 @@ async def get_equipment(skip: int = 0, limit: int = 20, db: Session = Depends(ge
     Args:
         skip (int): Anzahl zu überspringender Datensätze. Default: 0
         limit (int): Maximale Anzahl zurückzugebender Datensätze. Default: 20, Max: 100
+        cursor (str): Keyset-Pagination nach (created_at, id); leer = erste Seite
         db (Session): Datenbankverbindung (automatisch injiziert)
         
     Returns:
         List[Equipment]: Liste aller Equipment-Einträge
+        CursorPage[Equipment]: ``{"items": [...], "next_cursor": ...}`` wenn cursor gesetzt ist
         
     Example Response:
         ```json
@@ -6288,11 +6592,15 @@ async def get_equipment(skip: int = 0, limit: int = 20, db: Session = Depends(ge
         - test_equipment: Prüfgeräte
         - production_tool: Produktionswerkzeuge
     """
+    if cursor is not None:
+        equipment, next_cursor = paginate_keyset(db.query(EquipmentModel), EquipmentModel.created_at, EquipmentModel.id, cursor, limit)
+        return {"items": equipment, "next_cursor": next_cursor}
+    
     equipment = db.query(EquipmentModel).offset(skip).limit(limit).all()
     return equipment
 
 @app.get("/api/equipment/overdue", response_model=List[Equipment], tags=["Equipment"])
-async def get_overdue_equipment(db: Session = Depends(get_db)):
+def get_overdue_equipment(db: Session = Depends(get_db)):
     """
     Überfällige Equipment-Kalibrierungen abrufen.
     
@@ -6312,7 +6620,7 @@ async def get_overdue_equipment(db: Session = Depends(get_db)):
     return overdue_equipment
 
 @app.get("/api/equipment/{equipment_id}", response_model=Equipment, tags=["Equipment"])
-async def get_equipment_item(equipment_id: int, db: Session = Depends(get_db)):
+def get_equipment_item(equipment_id: int, db: Session = Depends(get_db)):
     """
     Ein spezifisches Equipment abrufen.
     
@@ -6363,7 +6671,7 @@ async def get_equipment_item(equipment_id: int, db: Session = Depends(get_db)):
     return equipment
 
 @app.post("/api/equipment", response_model=Equipment, tags=["Equipment"])
-async def create_equipment(equipment: EquipmentCreate, db: Session = Depends(get_db)):
+def create_equipment(equipment: EquipmentCreate, db: Session = Depends(get_db)):
     """
     Neues Equipment erstellen.
     
@@ -6444,8 +6752,51 @@ async def create_equipment(equipment: EquipmentCreate, db: Session = Depends(get
     db.refresh(db_equipment)
     return db_equipment
 
+@app.post("/api/equipment/bulk", response_model=BulkCreateResponse, tags=["Equipment"])
+def create_equipment_bulk(
+    request: BulkCreateRequest,
+    current_user: UserModel = Depends(require_admin_or_qm),
+    db: Session = Depends(get_db)
+):
+    """
+    Mehrere Geräte in einer Transaktion anlegen (z.B. ERP-Import).
+    
+    Jeder Eintrag hat das Format von ``POST /api/equipment``. Geräte- und
+    Seriennummer müssen eindeutig sein - im Request und in der Datenbank.
+    
+    Returns:
+        BulkCreateResponse: Ergebnis je Eintrag (ID oder Fehlermeldung)
+    """
+    batch = BulkBatch(request)
+    entries = batch.validate(EquipmentCreate)
+    entries = batch.reject_duplicates(entries, lambda item: item.equipment_number, "Gerätenummer")
+    entries = batch.reject_duplicates(entries, lambda item: item.serial_number, "Seriennummer")
+    
+    existing_numbers = existing_values(db, EquipmentModel.equipment_number, [item.equipment_number for _, item in entries])
+    entries = batch.reject_existing(entries, lambda item: item.equipment_number, existing_numbers,
+                                    lambda number: f"Equipment mit Gerätenummer '{number}' existiert bereits")
+    existing_serials = existing_values(db, EquipmentModel.serial_number, [item.serial_number for _, item in entries])
+    entries = batch.reject_existing(entries, lambda item: item.serial_number, existing_serials,
+                                    lambda serial: f"Equipment mit Seriennummer '{serial}' existiert bereits")
+    
+    if batch.should_abort or not entries:
+        return batch.response()
+    
+    try:
+        equipment_ids = insert_returning_ids(db, EquipmentModel, [item.model_dump() for _, item in entries],
+                                             key_columns=("equipment_number",))
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Bulk-Import abgebrochen (Konflikt): {e.orig}")
+    
+    for (index, _), equipment_id in zip(entries, equipment_ids):
+        batch.succeed(index, equipment_id)
+    logger.info(f"🔧 Bulk-Import: {len(equipment_ids)} Geräte angelegt, {batch.failed} Fehler")
+    return batch.response()
+
 @app.put("/api/equipment/{equipment_id}", response_model=Equipment, tags=["Equipment"])
-async def update_equipment(
+def update_equipment(
     equipment_id: int,
     equipment_update: EquipmentUpdate,
     db: Session = Depends(get_db)
@@ -6532,7 +6883,7 @@ async def update_equipment(
     return db_equipment
 
 @app.delete("/api/equipment/{equipment_id}", response_model=GenericResponse, tags=["Equipment"])
-async def delete_equipment(equipment_id: int, db: Session = Depends(get_db)):
+def delete_equipment(equipment_id: int, db: Session = Depends(get_db)):
     """
     Equipment löschen.
     
@@ -6600,8 +6951,13 @@ async def delete_equipment(equipment_id: int, db: Session = Depends(get_db)):
 
 # === CALIBRATIONS API ===
 
-@app.get("/api/calibrations", response_model=List[Calibration], tags=["Calibrations"])
-async def get_calibrations(skip: int = 0, limit: int = 20, db: Session = Depends(get_db)):
+@app.get("/api/calibrations", response_model=Union[List[Calibration], CursorPage[Calibration]], tags=["Calibrations"])
+def get_calibrations(
+    skip: int = 0,
+    limit: int = 20,
+    cursor: Optional[str] = Query(None, description="Keyset-Pagination: leer für die erste Seite, danach next_cursor der Vorseite"),
+    db: Session = Depends(get_db)
+):
     """
     Alle Kalibrierungen abrufen.
     
@@ -6611,10 +6967,12 @@ async def get_calibrations(skip: int = 0, limit: int = 20, db: Session = Depends
     Args:
         skip (int): Anzahl zu überspringender Datensätze. Default: 0
         limit (int): Maximale Anzahl zurückzugebender Datensätze. Default: 20, Max: 100
+        cursor (str): Keyset-Pagination nach (created_at, id); leer = erste Seite
         db (Session): Datenbankverbindung (automatisch injiziert)
         
     Returns:
         List[Calibration]: Liste aller Kalibrierungsprotokoll
+        CursorPage[Calibration]: ``{"items": [...], "next_cursor": ...}`` wenn cursor gesetzt ist
         
     Example Response:
         ```json
@@ -6662,11 +7020,15 @@ async def get_calibrations(skip: int = 0, limit: int = 20, db: Session = Depends
         - failed: Fehlgeschlagen, außerhalb der Toleranzen
         - conditional: Bedingt bestanden, mit Einschränkungen
     """
+    if cursor is not None:
+        calibrations, next_cursor = paginate_keyset(db.query(CalibrationModel), CalibrationModel.created_at, CalibrationModel.id, cursor, limit)
+        return {"items": calibrations, "next_cursor": next_cursor}
+    
     calibrations = db.query(CalibrationModel).offset(skip).limit(limit).all()
     return calibrations
 
 @app.get("/api/calibrations/{calibration_id}", response_model=Calibration, tags=["Calibrations"])
-async def get_calibration(calibration_id: int, db: Session = Depends(get_db)):
+def get_calibration(calibration_id: int, db: Session = Depends(get_db)):
     """
     Eine spezifische Kalibrierung abrufen.
     
@@ -6715,7 +7077,7 @@ async def get_calibration(calibration_id: int, db: Session = Depends(get_db)):
         )
     return calibration
 @app.post("/api/calibrations", response_model=Calibration, tags=["Calibrations"])
-async def create_calibration(calibration: CalibrationCreate, db: Session = Depends(get_db)):
+def create_calibration(calibration: CalibrationCreate, db: Session = Depends(get_db)):
     """
     Neue Kalibrierung erstellen.
     
@@ -6809,8 +7171,68 @@ async def create_calibration(calibration: CalibrationCreate, db: Session = Depen
     db.refresh(db_calibration)
     return db_calibration
 
+@app.post("/api/calibrations/bulk", response_model=BulkCreateResponse, tags=["Calibrations"])
+def create_calibrations_bulk(
+    request: BulkCreateRequest,
+    current_user: UserModel = Depends(require_admin_or_qm),
+    db: Session = Depends(get_db)
+):
+    """
+    Mehrere Kalibrierungen in einer Transaktion anlegen.
+    
+    Jeder Eintrag hat das Format von ``POST /api/calibrations``. Equipment
+    und verantwortliche Person müssen existieren. Anschließend werden
+    ``last_calibration``/``next_calibration`` jedes betroffenen Geräts auf
+    die jüngste Kalibrierung gesetzt (sofern neuer als der bisherige Stand).
+    
+    Returns:
+        BulkCreateResponse: Ergebnis je Eintrag (ID oder Fehlermeldung)
+    """
+    batch = BulkBatch(request)
+    # "2030-01-01T00:00:00Z" und naive Werte gemischt: vor Vergleich und Speicherung auf naive UTC
+    entries = normalize_datetimes(batch.validate(CalibrationCreate), "calibration_date", "next_due_date")
+    
+    equipment_ids = {item.equipment_id for _, item in entries}
+    last_calibrations = dict(db.execute(
+        select(EquipmentModel.id, EquipmentModel.last_calibration).where(EquipmentModel.id.in_(equipment_ids))
+    ).all()) if equipment_ids else {}
+    entries = batch.reject_missing(entries, lambda item: item.equipment_id, set(last_calibrations),
+                                   lambda equipment_id: f"Equipment mit ID {equipment_id} nicht gefunden")
+    known_users = existing_values(db, UserModel.id, [item.responsible_user_id for _, item in entries])
+    entries = batch.reject_missing(entries, lambda item: item.responsible_user_id, known_users,
+                                   lambda user_id: f"Benutzer mit ID {user_id} existiert nicht")
+    
+    if batch.should_abort or not entries:
+        return batch.response()
+    
+    # Jüngste Kalibrierung je Gerät für die Equipment-Kalibrierungsdaten
+    latest: Dict[int, CalibrationCreate] = {}
+    for _, item in entries:
+        current = latest.get(item.equipment_id)
+        if current is None or item.calibration_date > current.calibration_date:
+            latest[item.equipment_id] = item
+    equipment_updates = [
+        {"id": equipment_id, "last_calibration": item.calibration_date, "next_calibration": item.next_due_date}
+        for equipment_id, item in latest.items()
+        if last_calibrations[equipment_id] is None or item.calibration_date >= last_calibrations[equipment_id]
+    ]
+    
+    try:
+        calibration_ids = insert_returning_ids(db, CalibrationModel, [item.model_dump() for _, item in entries])
+        if equipment_updates:
+            db.execute(update(EquipmentModel), equipment_updates)
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Bulk-Import abgebrochen (Konflikt): {e.orig}")
+    
+    for (index, _), calibration_id in zip(entries, calibration_ids):
+        batch.succeed(index, calibration_id)
+    logger.info(f"📏 Bulk-Import: {len(calibration_ids)} Kalibrierungen angelegt, {len(equipment_updates)} Geräte aktualisiert, {batch.failed} Fehler")
+    return batch.response()
+
 @app.put("/api/calibrations/{calibration_id}", response_model=Calibration, tags=["Calibrations"])
-async def update_calibration(
+def update_calibration(
     calibration_id: int,
     calibration_update: CalibrationUpdate,
     db: Session = Depends(get_db)
@@ -6895,7 +7317,7 @@ async def update_calibration(
     return db_calibration
 
 @app.delete("/api/calibrations/{calibration_id}", response_model=GenericResponse, tags=["Calibrations"])
-async def delete_calibration(calibration_id: int, db: Session = Depends(get_db)):
+def delete_calibration(calibration_id: int, db: Session = Depends(get_db)):
     """
     Kalibrierung löschen.
     
@@ -6952,7 +7374,7 @@ async def delete_calibration(calibration_id: int, db: Session = Depends(get_db))
 # Erweiterte Such- und Analysefunktionen
 
 @app.get("/api/documents/{document_id}/workflow", tags=["Document Workflow"])
-async def get_document_workflow(document_id: int, db: Session = Depends(get_db)):
+def get_document_workflow(document_id: int, db: Session = Depends(get_db)):
     """
     Workflow-Status für ein Dokument abrufen.
     
@@ -6979,12 +7401,52 @@ async def get_document_workflow(document_id: int, db: Session = Depends(get_db))
     
     return workflow_summary
 
+@app.get("/api/documents/{document_id}/preview/image", tags=["Documents"])
+def get_document_preview_image(
+    document_id: int,
+    request: Request,
+    size: Optional[str] = Query(None, description=f"Thumbnail-Größe ({', '.join(THUMBNAIL_SIZES)}); ohne Angabe volle PNG-Vorschau"),
+    page: int = Query(1, ge=1, description="Seitennummer (nur mit size)"),
+    db: Session = Depends(get_db)
+):
+    """
+    📸 Vorschau eines Dokuments als Bild (binär, cachebar)
+    
+    Ohne ``size``: volle PNG-Vorschau (Seite 1, 300 DPI). Mit ``size``:
+    WebP/JPEG-Thumbnail der Seite ``page`` (im Hintergrund nach dem Upload
+    erzeugt); solange es noch fehlt, wird für Seite 1 die PNG-Vorschau
+    geliefert.
+    
+    ETag = SHA-256 des ausgelieferten Bildes: Wiederholte Aufrufe mit
+    ``If-None-Match`` kosten ein 304 ohne Dateizugriff. Mit ``?v=<hash>`` ist
+    die URL unveränderlich (Cache-Control: immutable).
+    """
+    if size is not None and size not in THUMBNAIL_SIZES:
+        raise HTTPException(status_code=400, detail=f"Unbekannte Thumbnail-Größe '{size}'. Erlaubt: {', '.join(THUMBNAIL_SIZES)}")
+    
+    document = db.query(DocumentModel).filter(DocumentModel.id == document_id).first()
+    if not document:
+        raise HTTPException(status_code=404, detail="Dokument nicht gefunden")
+    
+    if size is not None:
+        thumbnail = get_thumbnail(db, document.file_hash, page, size)
+        if thumbnail:
+            return cached_file_response(request, Path(thumbnail.path), thumbnail.file_hash, media_type_for(thumbnail.image_format))
+        if page > 1:
+            raise HTTPException(status_code=404, detail=f"Kein Thumbnail für Seite {page} verfügbar")
+    
+    if not document.png_preview_path:
+        raise HTTPException(status_code=404, detail="Keine PNG-Vorschau verfügbar")
+    
+    return cached_file_response(request, Path(document.png_preview_path), document.png_preview_hash, "image/png")
+
 @app.get("/api/documents/{document_id}/preview", tags=["Documents"])
-async def get_document_preview(document_id: int, db: Session = Depends(get_db)):
+def get_document_preview(document_id: int, db: Session = Depends(get_db)):
     """
     📸 PNG-Vorschau eines Dokuments abrufen
     
     Lädt die gespeicherte PNG-Vorschau aus der Datenbank und gibt sie als Base64-kodiertes Bild zurück.
+    Für wiederholte Anzeigen ``image_url`` verwenden (binär, ETag/304, cachebar).
     """
     try:
         # Dokument aus Datenbank laden
@@ -7017,6 +7479,18 @@ async def get_document_preview(document_id: int, db: Session = Depends(get_db)):
             "png_generation_method": document.png_generation_method,
             "png_preview_hash": document.png_preview_hash,
             "image_data": f"data:image/png;base64,{png_base64}",
+            "image_url": f"/api/documents/{document_id}/preview/image" + (f"?v={document.png_preview_hash}" if document.png_preview_hash else ""),
+            "thumbnails": [
+                {
+                    "page": thumbnail.page,
+                    "size": thumbnail.size,
+                    "width": thumbnail.width,
+                    "height": thumbnail.height,
+                    "file_size": thumbnail.file_size,
+                    "url": f"/api/documents/{document_id}/preview/image?size={thumbnail.size}&page={thumbnail.page}&v={thumbnail.file_hash}"
+                }
+                for thumbnail in list_thumbnails(db, document.file_hash)
+            ],
             "message": f"PNG-Vorschau für '{document.title}' erfolgreich geladen"
         }
         
@@ -7029,34 +7503,67 @@ async def get_document_preview(document_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Fehler beim Laden der PNG-Vorschau: {str(e)}")
 
 
-@app.get("/api/documents/search/{query}", response_model=List[Document], tags=["Search"])
-async def search_documents(query: str, db: Session = Depends(get_db)):
+@app.get("/api/documents/search/{query}", response_model=List[DocumentSearchHit], tags=["Search"])
+def search_documents(
+    query: str,
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
     """
     Volltextsuche in Dokumenten.
     
-    Führt eine erweiterte Volltextsuche in Dokumententiteln und
-    -beschreibungen durch. Für schnelle Dokumentensuche.
+    Durchsucht Titel, Beschreibung und extrahierten Text über den
+    FTS5-Index: Prefix-Suche je Begriff, BM25-Ranking (Titel am stärksten
+    gewichtet) und hervorgehobene Snippets.
     
     Args:
-        query (str): Suchbegriff oder -phrase
+        query (str): Suchbegriff(e); alle Begriffe müssen vorkommen
+        limit (int): Maximale Trefferzahl. Default: 50
+        offset (int): Anzahl zu überspringender Treffer. Default: 0
         db (Session): Datenbankverbindung (automatisch injiziert)
         
     Returns:
-        List[Document]: Liste der gefundenen Dokumente
+        List[DocumentSearchHit]: Treffer nach Relevanz (``score``) sortiert
     """
     if not query or len(query.strip()) < 2:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
+            status_code=400,
             detail="Suchbegriff muss mindestens 2 Zeichen lang sein"
         )
     
-    search_filter = f"%{query}%"
-    documents = db.query(DocumentModel).filter(
-        (DocumentModel.title.ilike(search_filter)) |
-        (DocumentModel.description.ilike(search_filter))
-    ).limit(50).all()
+    summary_columns = load_only(*[getattr(DocumentModel, name) for name in DocumentSummary.model_fields])
     
-    return documents
+    if not search_index.FTS5_AVAILABLE:
+        # Fallback ohne FTS5: ILIKE über Titel und Beschreibung (ohne Ranking)
+        search_filter = f"%{query}%"
+        documents = db.query(DocumentModel).options(summary_columns).filter(
+            (DocumentModel.title.ilike(search_filter)) |
+            (DocumentModel.content.ilike(search_filter))
+        ).offset(offset).limit(limit).all()
+        return [DocumentSearchHit.model_validate(doc) for doc in documents]
+    
+    hits = search_index.search(db, query, limit=limit, offset=offset)
+    if not hits:
+        return []
+    
+    documents = {
+        doc.id: doc for doc in db.query(DocumentModel).options(summary_columns).filter(
+            DocumentModel.id.in_([hit.document_id for hit in hits])
+        )
+    }
+    
+    results = []
+    for hit in hits:
+        doc = documents.get(hit.document_id)
+        if doc is None:
+            continue
+        result = DocumentSearchHit.model_validate(doc)
+        result.score = hit.score
+        result.title_highlight = hit.title_highlight
+        result.snippet = hit.snippet
+        results.append(result)
+    return results
 
 
 @app.post("/api/users/{user_id}/temp-password", response_model=PasswordResetResponse, tags=["User Management (Admin Only)"])
@@ -7099,10 +7606,12 @@ async def generate_temp_password(
         temp_password = ''.join(secrets.choice(alphabet) for _ in range(10))
         
         # Passwort setzen
-        new_hashed_password = get_password_hash(temp_password)
+        new_hashed_password = await get_password_hash_async(temp_password)
         target_user.hashed_password = new_hashed_password
         
-        db.commit()
+        await run_in_db_thread(db.commit)
+        bump_permissions_version()
+        revoke_user_tokens(user_id)
         
         print(f"🔑 TEMP PASSWORD: {target_user.full_name} ({target_user.email}) von {current_user.full_name}")
         
@@ -7157,7 +7666,7 @@ def _is_system_admin(user: UserModel) -> bool:
 # Erweiterte KI-Funktionalitäten für intelligente Dokumentenanalyse
 
 @app.post("/api/documents/{document_id}/ai-analysis", tags=["AI Analysis"])
-async def analyze_document_with_ai(
+def analyze_document_with_ai(
     document_id: int,
     analyze_duplicates: bool = True,
     db: Session = Depends(get_db)
@@ -7190,20 +7699,10 @@ async def analyze_document_with_ai(
     if not document.extracted_text:
         raise HTTPException(status_code=400, detail="Dokument hat keinen extrahierten Text für KI-Analyse")
     
-    # Existierende Dokumente für Duplikatsprüfung laden (falls gewünscht)
+    # Duplikats-Kandidaten über den MinHash/LSH-Index (exakte Prüfung nur für diese)
     existing_docs_data = []
     if analyze_duplicates:
-        existing_docs = db.query(DocumentModel).filter(
-            DocumentModel.id != document_id,
-            DocumentModel.extracted_text.isnot(None)
-        ).all()
-        existing_docs_data = [
-            {
-                'id': doc.id,
-                'title': doc.title,
-                'extracted_text': doc.extracted_text or ""
-            } for doc in existing_docs
-        ]
+        existing_docs_data = find_duplicate_candidates(db, text=document.extracted_text, document_id=document_id)
     
     # KI-Analyse durchführen
     try:
@@ -7270,7 +7769,7 @@ async def analyze_document_with_ai(
         raise HTTPException(status_code=500, detail=f"KI-Analyse fehlgeschlagen: {str(e)}")
 
 @app.post("/api/ai/analyze-text", tags=["AI Analysis"])
-async def analyze_text_with_ai(
+def analyze_text_with_ai(
     text: str,
     filename: Optional[str] = None,
     analyze_duplicates: bool = False,
@@ -7294,19 +7793,10 @@ async def analyze_text_with_ai(
     if not text or len(text.strip()) < 50:
         raise HTTPException(status_code=400, detail="Text zu kurz für KI-Analyse (min. 50 Zeichen)")
     
-    # Existierende Dokumente für Duplikatsprüfung laden (falls gewünscht)
+    # Duplikats-Kandidaten über den MinHash/LSH-Index (exakte Prüfung nur für diese)
     existing_docs_data = []
     if analyze_duplicates:
-        existing_docs = db.query(DocumentModel).filter(
-            DocumentModel.extracted_text.isnot(None)
-        ).all()
-        existing_docs_data = [
-            {
-                'id': doc.id,
-                'title': doc.title,
-                'extracted_text': doc.extracted_text or ""
-            } for doc in existing_docs
-        ]
+        existing_docs_data = find_duplicate_candidates(db, text=text)
     
     try:
         ai_result = ai_engine.comprehensive_analysis(
@@ -7347,7 +7837,7 @@ async def analyze_text_with_ai(
         raise HTTPException(status_code=500, detail=f"Text-Analyse fehlgeschlagen: {str(e)}")
 
 @app.get("/api/ai/language-detection/{document_id}", tags=["AI Analysis"])
-async def detect_document_language(document_id: int, db: Session = Depends(get_db)):
+def detect_document_language(document_id: int, db: Session = Depends(get_db)):
     """
     🌍 Erkennt die Sprache eines Dokuments
     
@@ -7373,7 +7863,7 @@ async def detect_document_language(document_id: int, db: Session = Depends(get_d
     }
 
 @app.get("/api/ai/similarity/{document_id_1}/{document_id_2}", tags=["AI Analysis"])
-async def compare_documents_similarity(
+def compare_documents_similarity(
     document_id_1: int,
     document_id_2: int,
     db: Session = Depends(get_db)
@@ -7381,23 +7871,25 @@ async def compare_documents_similarity(
     """
     🔍 Berechnet die Ähnlichkeit zwischen zwei Dokumenten
     
-    Für Duplikatsanalyse und Inhaltsbewertung.
+    Für Duplikatsanalyse und Inhaltsbewertung. Verwendet die beim Upload
+    gespeicherten MinHash-Signaturen (geschätzte Jaccard-Ähnlichkeit),
+    statt beide Texte erneut zu tokenisieren.
     """
-    from .ai_engine import ai_engine
-    
-    # Beide Dokumente laden
-    doc1 = db.query(DocumentModel).filter(DocumentModel.id == document_id_1).first()
-    doc2 = db.query(DocumentModel).filter(DocumentModel.id == document_id_2).first()
+    # Beide Dokumente laden (ohne extrahierten Text)
+    doc1 = db.query(DocumentModel).options(defer(DocumentModel.extracted_text)).filter(DocumentModel.id == document_id_1).first()
+    doc2 = db.query(DocumentModel).options(defer(DocumentModel.extracted_text)).filter(DocumentModel.id == document_id_2).first()
     
     if not doc1:
         raise HTTPException(status_code=404, detail=f"Dokument {document_id_1} nicht gefunden")
     if not doc2:
         raise HTTPException(status_code=404, detail=f"Dokument {document_id_2} nicht gefunden")
     
-    if not doc1.extracted_text or not doc2.extracted_text:
+    signature1 = get_document_signature(db, document_id_1)
+    signature2 = get_document_signature(db, document_id_2)
+    if signature1 is None or signature2 is None:
         raise HTTPException(status_code=400, detail="Beide Dokumente benötigen extrahierten Text")
     
-    similarity = ai_engine.calculate_content_similarity(doc1.extracted_text, doc2.extracted_text)
+    similarity = estimate_similarity(signature1, signature2)
     
     # Ähnlichkeits-Level bestimmen
     if similarity >= 0.8:
@@ -23,6 +23,7 @@ für das 13-Interessensgruppen-System und QMS-spezifische Entitäten.
    - Document: QMS-Dokumente mit 25+ spezifischen Typen
    - DocumentStatusHistory: Audit-Trail für Status-Änderungen
    - DocumentNormMapping: Many-to-Many Beziehung Document ↔ Norms
+   - DocumentSignature: MinHash-Signatur für Duplikatserkennung
 
 3. ⚙️ EQUIPMENT MANAGEMENT:
    - Equipment: Geräte-Management mit Kalibrierungs-Tracking
@@ -64,7 +65,7 @@ Version: 1.0.0 (MVP Phase 1)
 Last Updated: 2025-01-27
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Enum, JSON, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Enum, JSON, Float, LargeBinary, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -202,6 +203,10 @@ class User(Base):
     - approved_documents: One-to-Many zu Document
     """
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset-Pagination nach (created_at, id)
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True,
                 comment="Eindeutige Benutzer-ID")
@@ -313,6 +318,11 @@ class Document(Base):
     - FDA 21 CFR Part 820 Anforderungen
     """
     __tablename__ = "documents"
+    __table_args__ = (
+        # Keyset-Pagination nach (created_at, id)
+        Index("ix_documents_created_at_id", "created_at", "id"),
+        Index("ix_documents_status_updated_at_id", "status", "updated_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True,
                 comment="Eindeutige Dokument-ID")
@@ -414,6 +424,7 @@ class Document(Base):
     child_documents = relationship("Document", back_populates="parent_document")
     norm_mappings = relationship("DocumentNormMapping", back_populates="document")
     status_history = relationship("DocumentStatusHistory", back_populates="document", order_by="DocumentStatusHistory.changed_at.desc()")
+    signature = relationship("DocumentSignature", back_populates="document", uselist=False, cascade="all, delete-orphan")
 
 # === NORMEN & COMPLIANCE ===
 
@@ -481,6 +492,10 @@ class Equipment(Base):
     - Standort-Verfolgung für Asset-Management
     """
     __tablename__ = "equipment"
+    __table_args__ = (
+        # Keyset-Pagination nach (created_at, id)
+        Index("ix_equipment_created_at_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True,
                 comment="Eindeutige Equipment-ID")
@@ -526,6 +541,10 @@ class Calibration(Base):
     - Audit-Trail für regulatorische Prüfungen
     """
     __tablename__ = "calibrations"
+    __table_args__ = (
+        # Keyset-Pagination nach (created_at, id)
+        Index("ix_calibrations_created_at_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True,
                 comment="Eindeutige Kalibrierungs-ID")
@@ -646,6 +665,64 @@ class DocumentIndex(Base):
     # Relationships
     document = relationship("Document")
 
+class DocumentSignature(Base):
+    """
+    MinHash-Signatur eines Dokuments für die Duplikatserkennung.
+    
+    Wird beim Upload einmalig aus dem extrahierten Text berechnet und vom
+    LSH-Index (duplicate_index) für die Kandidatensuche verwendet, damit
+    nicht bei jeder Analyse alle Dokumenttexte geladen werden müssen.
+    """
+    __tablename__ = "document_signatures"
+    
+    document_id = Column(Integer, ForeignKey("documents.id"), primary_key=True,
+                        comment="Referenz auf das Dokument")
+    signature = Column(LargeBinary, nullable=False,
+                      comment="MinHash-Signatur (uint32 little-endian)")
+    num_permutations = Column(Integer, nullable=False,
+                             comment="Anzahl Hash-Permutationen der Signatur")
+    token_count = Column(Integer, nullable=False, default=0,
+                        comment="Anzahl unterschiedlicher Tokens im Text")
+    computed_at = Column(DateTime, default=datetime.utcnow, nullable=False,
+                        comment="Zeitpunkt der Berechnung")
+    
+    # Relationships
+    document = relationship("Document", back_populates="signature")
+
+class DocumentThumbnail(Base):
+    """
+    Verkleinerte Seitenansicht (WebP/JPEG) eines Dokumentinhalts.
+
+    Schlüssel ist der Inhalts-Hash (``Document.file_hash``), nicht die
+    Dokument-ID: identische Uploads teilen sich ihre Thumbnails. Erzeugt im
+    Hintergrund nach dem Upload (``thumbnails.generate_document_thumbnails``)
+    für alle Seiten in mehreren Größen.
+    """
+    __tablename__ = "document_thumbnails"
+    __table_args__ = (
+        Index("ix_document_thumbnails_lookup", "content_hash", "page", "size", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), nullable=False,
+                         comment="SHA-256 des Original-Dokuments")
+    page = Column(Integer, nullable=False,
+                 comment="Seitennummer (1-basiert)")
+    size = Column(String(20), nullable=False,
+                 comment="Größenstufe (small, medium, large)")
+    image_format = Column(String(10), nullable=False,
+                         comment="Bildformat (webp oder jpeg)")
+    path = Column(String(500), nullable=False,
+                 comment="Pfad zur Thumbnail-Datei")
+    file_hash = Column(String(64), nullable=False,
+                      comment="SHA-256 der Thumbnail-Datei (ETag)")
+    file_size = Column(Integer, nullable=False,
+                      comment="Größe der Thumbnail-Datei in Bytes")
+    width = Column(Integer, nullable=False, comment="Breite in Pixeln")
+    height = Column(Integer, nullable=False, comment="Höhe in Pixeln")
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False,
+                       comment="Zeitpunkt der Erzeugung")
+
 class RAGQuery(Base):
     """
     RAG-Query-Historie für Analytics und Verbesserung.
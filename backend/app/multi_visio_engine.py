@@ -23,6 +23,7 @@ from datetime import datetime
 
 from .vision_ocr_engine import VisionOCREngine
 from .word_extraction_engine import WordExtractionEngine
+from .file_ingest import file_sha256
 
 # Logger konfigurieren
 logger = logging.getLogger(__name__)
@@ -143,23 +144,20 @@ class MultiVisioEngine:
         
         return prompts
     
-    async def _get_or_convert_images(self, file_path: str) -> List[bytes]:
+    async def _get_or_convert_images(self, file_path: str, file_hash: Optional[str] = None) -> List[bytes]:
         """
         Cached Image Conversion - verhindert doppelte LibreOffice-Aufrufe
         
         Args:
             file_path: Pfad zur Datei
+            file_hash: SHA-256 aus dem Upload (sonst aus der Hash-Registry bzw. blockweise berechnet)
             
         Returns:
             Liste der konvertierten Bilder (aus Cache oder neu konvertiert)
         """
-        import hashlib
-        
-        # Berechne Datei-Hash für Cache-Validierung
+        # Datei-Hash für Cache-Validierung (nur lesen, wenn noch unbekannt)
         try:
-            with open(file_path, 'rb') as f:
-                file_content = f.read()
-                current_hash = hashlib.sha256(file_content).hexdigest()
+            current_hash = file_hash or file_sha256(file_path)
         except Exception as e:
             logger.warning(f"⚠️ Kann Datei-Hash nicht berechnen: {e}")
             current_hash = f"{file_path}_{os.path.getmtime(file_path)}"
@@ -0,0 +1,155 @@
+"""
+KI-QMS Keyset-Pagination (Cursor)
+
+Ersetzt offset/limit für Listen-Endpoints: Statt ``OFFSET n`` (Kosten
+wachsen linear mit der Seitentiefe) wird ab dem letzten gesehenen
+``(Sortierspalte, id)``-Paar weitergelesen. Mit dem passenden
+Composite-Index kostet jede Seite gleich viel - egal wie tief.
+
+Cursor-Tokens sind opak (URL-sicheres Base64) und enthalten nur die
+Sortierwerte des letzten Eintrags der Seite.
+
+Einträge ohne Sortierwert (NULL, z.B. Altdaten) stehen in beiden
+Richtungen am Ende und werden in einer zweiten Phase (``sort IS NULL``)
+über die id weitergeblättert; der Cursor trägt dann ``null`` als
+Sortierwert. Beide Phasen bleiben Index-Seeks - kein ``OR``/``NULLS LAST``,
+das die Seite zum Index-Scan machen würde.
+
+Verwendung im Endpoint:
+    items, next_cursor = paginate_keyset(query, DocumentModel.created_at, DocumentModel.id, cursor, limit)
+    items, next_cursor = await paginate_keyset_async(db, select(DocumentModel), ...)  # AsyncSession
+"""
+
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+import base64
+import json
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+CURSOR_VERSION = 1
+
+
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    """Erzeugt ein opakes Cursor-Token aus (Sortierwert, id)."""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([CURSOR_VERSION, sort_value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, sort_is_datetime: bool = True) -> Tuple[Any, int]:
+    """
+    Dekodiert ein Cursor-Token.
+
+    Raises:
+        HTTPException: 400 bei ungültigem oder manipuliertem Cursor
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        version, sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if version != CURSOR_VERSION or not isinstance(row_id, int):
+            raise ValueError("Unbekannte Cursor-Version")
+        if sort_is_datetime and sort_value is not None:
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, row_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Ungültiger Pagination-Cursor")
+
+
+def _keyset_phases(query, sort_column, id_column, cursor: Optional[str], descending: bool) -> list:
+    """
+    Noch zu lesende Phasen als gefilterte, sortierte Queries (``Query`` oder ``select()``).
+
+    1. Einträge mit Sortierwert: reiner Row-Value-Vergleich auf (Sortierspalte, id)
+    2. NULL-Block: ``sort IS NULL`` und Vergleich auf die id
+
+    Beide Phasen sind Index-Seeks auf dem Composite-Index - ein ``OR`` bzw.
+    ``NULLS LAST`` würde daraus einen Scan über den ganzen Index machen.
+    """
+    sort_value = row_id = None
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor, sort_is_datetime=sort_column.type.python_type is datetime)
+
+    if descending:
+        sort_order, id_order = sort_column.desc(), id_column.desc()
+        id_after = id_column < row_id if row_id is not None else None
+    else:
+        sort_order, id_order = sort_column.asc(), id_column.asc()
+        id_after = id_column > row_id if row_id is not None else None
+
+    phases = []
+    if cursor is None:
+        phases.append(query.filter(sort_column.is_not(None)).order_by(sort_order, id_order))
+    elif sort_value is not None:
+        key = tuple_(sort_column, id_column)
+        seek = key < tuple_(sort_value, row_id) if descending else key > tuple_(sort_value, row_id)
+        phases.append(query.filter(seek).order_by(sort_order, id_order))
+
+    null_block = query.filter(sort_column.is_(None))
+    if sort_value is None and id_after is not None:
+        # Bereits im NULL-Block: nur noch nach id weiter
+        null_block = null_block.filter(id_after)
+    phases.append(null_block.order_by(id_order))
+    return phases
+
+
+def _split_page(rows: List[Any], sort_column, id_column, limit: int) -> Tuple[List[Any], Optional[str]]:
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+    return rows, next_cursor
+
+
+def paginate_keyset(
+    query,
+    sort_column,
+    id_column,
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = True
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Liefert eine Seite nach (sort_column, id_column) und den Cursor der Folgeseite.
+
+    Args:
+        query: Gefilterte SQLAlchemy-Query (ohne order_by/offset/limit)
+        sort_column: Sortierspalte (z.B. created_at)
+        id_column: Eindeutige Tiebreaker-Spalte (Primärschlüssel)
+        cursor: Token der vorherigen Seite oder leer/None für die erste Seite
+        limit: Seitengröße
+        descending: Neueste zuerst (Standard)
+
+    Returns:
+        Tuple[List, Optional[str]]: (Einträge, next_cursor oder None auf der letzten Seite)
+    """
+    rows = []
+    for phase in _keyset_phases(query, sort_column, id_column, cursor, descending):
+        # Ein Eintrag mehr laden, um das Seitenende ohne COUNT zu erkennen
+        rows.extend(phase.limit(limit + 1 - len(rows)).all())
+        if len(rows) > limit:
+            break
+    return _split_page(rows, sort_column, id_column, limit)
+
+
+async def paginate_keyset_async(
+    db,
+    statement,
+    sort_column,
+    id_column,
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = True
+) -> Tuple[List[Any], Optional[str]]:
+    """Wie ``paginate_keyset``, für ``select()``-Statements auf einer ``AsyncSession``."""
+    rows = []
+    for phase in _keyset_phases(statement, sort_column, id_column, cursor, descending):
+        result = await db.execute(phase.limit(limit + 1 - len(rows)))
+        rows.extend(result.scalars().all())
+        if len(rows) > limit:
+            break
+    return _split_page(rows, sort_column, id_column, limit)
@@ -0,0 +1,167 @@
+"""
+KI-QMS PDF-Text-Backends
+
+Austauschbare Backends für die PDF-Textextraktion mit Fallback-Kette:
+
+- PyMuPDF (fitz): Standard, deutlich schneller als PyPDF2
+- PyPDF2: Fallback, wenn PyMuPDF fehlt oder das Dokument nicht öffnen kann
+
+Große PDFs werden in Seitenbereiche zerlegt (PDF_PAGE_RANGE_SIZE), die
+unabhängig voneinander - z.B. im Process-Pool der Textextraktion -
+verarbeitet werden können. Jeder Bereich fällt bei Fehlern einzeln auf das
+nächste Backend zurück.
+
+Das Ausgabeformat (``=== Seite N ===`` Marker, ``[Fehler auf Seite N: ...]``)
+ist für alle Backends identisch.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+import logging
+
+from .config import get_pdf_text_backends, get_pdf_page_range_size
+
+logger = logging.getLogger("KI-QMS.PDFExtraction")
+
+
+@dataclass
+class PdfPageText:
+    """Extrahierter Text einer PDF-Seite (1-basiert) oder Fehlermeldung."""
+    page_number: int
+    text: str = ""
+    error: Optional[str] = None
+
+
+class PyMuPDFTextBackend:
+    """PDF-Text über PyMuPDF (fitz)."""
+
+    name = "pymupdf"
+
+    def page_count(self, file_path: Path) -> int:
+        import fitz
+        with fitz.open(file_path) as doc:
+            return doc.page_count
+
+    def extract_range(self, file_path: Path, start: int, end: int) -> List[PdfPageText]:
+        """Extrahiert die Seiten ``start`` bis ``end`` (exklusiv, 0-basiert)."""
+        import fitz
+        pages = []
+        with fitz.open(file_path) as doc:
+            for index in range(start, min(end, doc.page_count)):
+                try:
+                    pages.append(PdfPageText(index + 1, doc.load_page(index).get_text("text")))
+                except Exception as page_error:
+                    pages.append(PdfPageText(index + 1, error=str(page_error)))
+        return pages
+
+
+class PyPDF2TextBackend:
+    """PDF-Text über PyPDF2 (reines Python, langsamer)."""
+
+    name = "pypdf2"
+
+    def page_count(self, file_path: Path) -> int:
+        import PyPDF2
+        with open(file_path, 'rb') as file:
+            return len(PyPDF2.PdfReader(file).pages)
+
+    def extract_range(self, file_path: Path, start: int, end: int) -> List[PdfPageText]:
+        """Extrahiert die Seiten ``start`` bis ``end`` (exklusiv, 0-basiert)."""
+        import PyPDF2
+        pages = []
+        with open(file_path, 'rb') as file:
+            reader = PyPDF2.PdfReader(file)
+            for index in range(start, min(end, len(reader.pages))):
+                try:
+                    pages.append(PdfPageText(index + 1, reader.pages[index].extract_text()))
+                except Exception as page_error:
+                    pages.append(PdfPageText(index + 1, error=str(page_error)))
+        return pages
+
+
+# Registry aller bekannten Backends
+PDF_TEXT_BACKENDS: Dict[str, object] = {
+    PyMuPDFTextBackend.name: PyMuPDFTextBackend(),
+    PyPDF2TextBackend.name: PyPDF2TextBackend(),
+}
+
+
+def _backend_chain(backends: Optional[List[str]] = None) -> List[object]:
+    """Löst Backend-Namen in Instanzen auf (unbekannte Namen werden ignoriert)."""
+    names = backends or get_pdf_text_backends()
+    chain = [PDF_TEXT_BACKENDS[name] for name in names if name in PDF_TEXT_BACKENDS]
+    return chain or [PDF_TEXT_BACKENDS[PyPDF2TextBackend.name]]
+
+
+def pdf_page_count(file_path: Path, backends: Optional[List[str]] = None) -> Tuple[int, str]:
+    """
+    Ermittelt die Seitenanzahl mit dem ersten funktionierenden Backend.
+
+    Returns:
+        Tuple[int, str]: (Seitenanzahl, Name des verwendeten Backends)
+
+    Raises:
+        Exception: Fehler des letzten Backends, wenn keines das PDF öffnen kann
+    """
+    last_error: Optional[Exception] = None
+    for backend in _backend_chain(backends):
+        try:
+            return backend.page_count(file_path), backend.name
+        except Exception as e:
+            logger.warning(f"⚠️ PDF-Backend {backend.name} kann {file_path} nicht öffnen: {e}")
+            last_error = e
+    raise last_error
+
+
+def extract_pdf_page_range(
+    file_path: Path,
+    start: int,
+    end: int,
+    backends: Optional[List[str]] = None
+) -> List[PdfPageText]:
+    """
+    Extrahiert einen Seitenbereich mit Fallback auf das nächste Backend.
+
+    Modul-Level-Funktion, damit sie im Process-Pool ausgeführt werden kann.
+    """
+    last_error: Optional[Exception] = None
+    for backend in _backend_chain(backends):
+        try:
+            return backend.extract_range(file_path, start, end)
+        except Exception as e:
+            logger.warning(f"⚠️ PDF-Backend {backend.name} fehlgeschlagen (Seiten {start + 1}-{end}): {e}")
+            last_error = e
+    raise last_error
+
+
+def split_page_ranges(page_count: int, range_size: Optional[int] = None) -> List[Tuple[int, int]]:
+    """Zerlegt ``page_count`` Seiten in (start, end)-Bereiche für die Parallelisierung."""
+    size = range_size or get_pdf_page_range_size()
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def iter_pdf_pages(file_path: Path, backends: Optional[List[str]] = None) -> Iterator[PdfPageText]:
+    """
+    Liefert die Seiten eines PDFs sequenziell, bereichsweise extrahiert.
+
+    Konsumenten können nach jeder Seite abbrechen; es wird höchstens ein
+    Seitenbereich über den Bedarf hinaus gelesen.
+    """
+    page_count, _ = pdf_page_count(file_path, backends)
+    for start, end in split_page_ranges(page_count):
+        yield from extract_pdf_page_range(file_path, start, end, backends)
+
+
+def format_pdf_page(page: PdfPageText) -> Optional[str]:
+    """
+    Formatiert eine Seite im bekannten Ausgabeformat.
+
+    Returns:
+        ``=== Seite N ===`` + Text, Fehlermeldung, oder None für leere Seiten
+    """
+    if page.error is not None:
+        return f"[Fehler auf Seite {page.page_number}: {page.error}]"
+    if page.text and page.text.strip():
+        return f"=== Seite {page.page_number} ===\n{page.text}"
+    return None
@@ -0,0 +1,135 @@
+"""
+KI-QMS Principal-Cache (Benutzer + Berechtigungen)
+
+In-Process-TTL-Cache der aufgelösten Benutzer-Identität: User-Objekt,
+Gruppen-Codes und Berechtigungsmenge. ``get_current_user`` und die
+Berechtigungsprüfungen (PermissionChecker, GroupChecker,
+require_admin_or_qm) kommen für aktive Benutzer damit ohne Datenbankzugriff
+und ohne erneutes JSON-Dekodieren der Berechtigungen aus.
+
+Invalidierung:
+- Globaler Berechtigungs-Versionszähler: Schreib-Endpoints für Benutzer,
+  Gruppenmitgliedschaften und Interessengruppen rufen
+  ``bump_permissions_version()`` auf - alle Einträge älterer Versionen
+  sind sofort ungültig
+- TTL (PRINCIPAL_CACHE_TTL) für Änderungen außerhalb dieses Prozesses
+  (Skripte, weitere Uvicorn-Worker)
+
+Der Versions-Tag (``version_tag``, Prozess-Epoche + Zähler) wird beim
+Login in das JWT geschrieben: Stimmt er noch, können Benutzer und
+Berechtigungen direkt aus den signierten Claims übernommen werden.
+
+Gecachte User-Objekte sind von ihrer Session gelöst (detached): Spalten
+sind lesbar, Beziehungen werden nicht nachgeladen. Für Änderungen den
+Benutzer in der Session des Endpoints neu laden.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+import logging
+import secrets
+import threading
+import time
+
+from .config import get_principal_cache_ttl, get_principal_cache_size
+
+logger = logging.getLogger("KI-QMS.PrincipalCache")
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Aufgelöster Benutzer mit Gruppen und Berechtigungen."""
+    user: object
+    groups: Tuple[str, ...]
+    permissions: FrozenSet[str]
+    version: int
+    expires_at: float
+
+
+class PrincipalCache:
+    """TTL-Cache je Benutzer-ID, gültig nur für die aktuelle Berechtigungs-Version."""
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: Dict[int, Principal] = {}
+        self._version = 0
+        # Zufällige Epoche: Tags anderer Prozesse/früherer Starts passen nie
+        self.epoch = secrets.token_hex(4)
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def version_tag(self) -> str:
+        """Prozessweit eindeutige Kennung der aktuellen Berechtigungs-Version."""
+        return f"{self.epoch}.{self._version}"
+
+    def version_from_tag(self, tag) -> Optional[int]:
+        """Versionsnummer eines Tags dieses Prozesses, sonst None."""
+        epoch, _, version = str(tag or "").partition(".")
+        if epoch != self.epoch or not version.isdigit():
+            return None
+        return int(version)
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        """Gültiger Eintrag oder None (abgelaufen, veraltete Version, nicht vorhanden)."""
+        principal = self._entries.get(user_id)
+        if principal is None:
+            return None
+        if principal.version != self._version or principal.expires_at <= time.monotonic():
+            return None
+        return principal
+
+    def put(self, user, groups: Iterable[str], permissions: Iterable[str], version: int) -> Principal:
+        """
+        Speichert einen Principal.
+
+        ``version`` ist der Zählerstand *vor* dem Laden aus der Datenbank:
+        Wurde währenddessen invalidiert, wird der (evtl. veraltete) Eintrag
+        nicht gespeichert.
+        """
+        principal = Principal(
+            user=user,
+            groups=tuple(groups),
+            permissions=frozenset(permissions),
+            version=version,
+            expires_at=time.monotonic() + self.ttl_seconds
+        )
+        if not self.enabled:
+            return principal
+
+        with self._lock:
+            if version != self._version:
+                return principal
+            self._entries.pop(user.id, None)
+            if len(self._entries) >= self.max_entries:
+                # Ältesten Eintrag verdrängen (Einfügereihenfolge)
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[user.id] = principal
+        return principal
+
+    def bump_version(self):
+        """Invalidiert alle Einträge (nach Änderungen an Benutzern/Gruppen/Mitgliedschaften)."""
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+        logger.debug(f"🔄 Berechtigungs-Version {self._version}: Principal-Cache geleert")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Globale Cache-Instanz
+principal_cache = PrincipalCache(get_principal_cache_ttl(), get_principal_cache_size())
+
+
+def bump_permissions_version():
+    """Nach jedem Schreibzugriff auf Benutzer, Mitgliedschaften oder Interessengruppen aufrufen."""
+    principal_cache.bump_version()
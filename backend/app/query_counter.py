@@ -0,0 +1,81 @@
+"""
+KI-QMS SQL-Statement-Zähler
+
+Zählt die SQL-Statements, die innerhalb eines Blocks an die Datenbank
+gehen - über alle Engines (Schreiber, Lese-Pool, Async). Damit lassen sich
+N+1-Regressionen in Tests und beim Debuggen sofort erkennen:
+
+    from app.query_counter import assert_max_queries
+
+    with assert_max_queries(1):
+        get_user_permissions(db, user)
+
+    with count_queries() as counter:
+        client.get("/api/users/1/groups")
+    print(counter.count, counter.statements)
+
+Hinweis: Gezählt wird prozessweit - parallel laufende Requests in anderen
+Threads fließen mit ein.
+"""
+
+from contextlib import contextmanager
+from typing import List
+import threading
+
+from sqlalchemy import event
+
+from .database import engine, read_engine, async_engine, async_read_engine
+
+
+def _all_engines():
+    """Alle Sync-Engines, auf denen Statements ausgeführt werden (ohne Duplikate)."""
+    engines = []
+    for candidate in (engine, read_engine, async_engine.sync_engine, async_read_engine.sync_engine):
+        if all(candidate is not known for known in engines):
+            engines.append(candidate)
+    return engines
+
+
+class QueryCounter:
+    """Sammelt ausgeführte Statements (SQL-Text) während er aktiv ist."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.statements.append(statement)
+
+
+@contextmanager
+def count_queries():
+    """Context Manager: liefert einen QueryCounter für die Dauer des Blocks."""
+    counter = QueryCounter()
+    engines = _all_engines()
+    for target in engines:
+        event.listen(target, "before_cursor_execute", counter._before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        for target in engines:
+            event.remove(target, "before_cursor_execute", counter._before_cursor_execute)
+
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """
+    Context Manager: schlägt fehl, wenn der Block mehr als ``limit`` Statements ausführt.
+
+    Raises:
+        AssertionError: mit allen ausgeführten Statements in der Meldung
+    """
+    with count_queries() as counter:
+        yield counter
+    if counter.count > limit:
+        executed = "\n".join(f"  {index + 1}. {statement}" for index, statement in enumerate(counter.statements))
+        raise AssertionError(f"{counter.count} SQL-Statements ausgeführt, erlaubt: {limit}\n{executed}")
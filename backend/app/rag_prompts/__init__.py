@@ -22,6 +22,16 @@ from datetime import datetime
 
 logger = logging.getLogger("KI-QMS.RAGPromptManager")
 
+# Prompt-Builder des Enhanced Metadata Extractors
+from .enhanced_metadata import (
+    build_enhanced_extraction_prompt,
+    build_chunking_prompt,
+    build_quality_assessment_prompt,
+    build_compliance_analysis_prompt,
+    build_interest_group_prompt,
+    optimize_prompt_for_model
+)
+
 class RAGPromptsManager:
     """Zentrale Verwaltung aller RAG-Prompts (Text-basierte Analyse)"""
     
@@ -39,7 +49,8 @@ class RAGPromptsManager:
             "compliance_analysis",
             "workflow_automation",
             "hybrid_ai",
-            "provider_specific"
+            "provider_specific",
+            "enhanced_metadata"
         ]
         
         for module_name in prompt_modules:
@@ -118,4 +129,21 @@ def get_prompt_config() -> Dict[str, Any]:
         "max_tokens": 4000,
         "model": "gpt-4o-mini",
         "version": "1.0"
-    } 
\ No newline at end of file
+    }
+
+
+__all__ = [
+    "RAGPromptsManager",
+    "rag_prompts_manager",
+    "get_metadata_prompt",
+    "get_rag_prompt",
+    "get_strict_json_prompt",
+    "parse_ai_response",
+    "get_prompt_config",
+    "build_enhanced_extraction_prompt",
+    "build_chunking_prompt",
+    "build_quality_assessment_prompt",
+    "build_compliance_analysis_prompt",
+    "build_interest_group_prompt",
+    "optimize_prompt_for_model"
+]
@@ -0,0 +1,326 @@
+"""
+🎯 ENHANCED-METADATEN PROMPTS
+=============================
+
+Prompts des Enhanced Metadata Extractors (Dokument-Metadaten, Chunk-Metadaten,
+Qualität, Compliance, Interessensgruppen). Die JSON-Strukturen entsprechen
+``schemas_enhanced`` und werden vom ``json_parser`` ausgewertet.
+"""
+
+from typing import Optional
+
+VERSION = "1.0"
+
+ENHANCED_METADATA_EXTRACTION_PROMPT = """
+Sie sind ein Experte für Qualitätsmanagement-Systeme (QMS) und Dokumentenanalyse. 
+Analysieren Sie das folgende Dokument und extrahieren Sie umfassende Metadaten.
+
+WICHTIGE INSTRUKTIONEN:
+- Antworten Sie AUSSCHLIESSLICH mit gültigem JSON
+- Verwenden Sie die exakte Struktur unten
+- Seien Sie präzise und konsistent
+- Bei Unsicherheit wählen Sie die wahrscheinlichste Option
+
+DOKUMENT-INHALT:
+{document_content}
+
+ERWARTETE JSON-STRUKTUR:
+{{
+    "title": "Vollständiger Dokumenttitel",
+    "document_type": "QM_PROCEDURE | WORK_INSTRUCTION | FORM | QM_MANUAL | QM_POLICY | ISO_STANDARD | SOP | PROTOCOL | CHECKLIST | AUDIT_REPORT | TEST_REPORT | VALIDATION_REPORT | RISK_ASSESSMENT | OTHER",
+    "version": "Dokumentversion (z.B. '1.0', '2.1')",
+    "main_category": "Hauptkategorie (z.B. 'Quality Management', 'Process Control')",
+    "sub_category": "Unterkategorie (z.B. 'Procedures', 'Work Instructions')",
+    "process_area": "Prozessbereich (z.B. 'Design Controls', 'Manufacturing', 'Quality Assurance')",
+    "description": "Ausführliche Beschreibung des Dokuments (max 2000 Zeichen)",
+    "summary": "Kurze Zusammenfassung (max 500 Zeichen)",
+    "primary_keywords": [
+        {{
+            "term": "Hauptkeyword",
+            "importance": "CRITICAL | HIGH | MEDIUM | LOW",
+            "category": "qms | compliance | technical | process | safety",
+            "confidence": 0.95
+        }}
+    ],
+    "secondary_keywords": [
+        {{
+            "term": "Sekundäres Keyword",
+            "importance": "MEDIUM",
+            "category": "general",
+            "confidence": 0.8
+        }}
+    ],
+    "qm_keywords": [
+        {{
+            "term": "QM-spezifisches Keyword",
+            "importance": "HIGH",
+            "category": "qms",
+            "confidence": 0.9
+        }}
+    ],
+    "sections_detected": ["Erkannte Hauptsektionen/Kapitel"],
+    "has_tables": true,
+    "has_figures": false,
+    "has_appendices": true,
+    "iso_standards_referenced": ["ISO 13485", "ISO 14971"],
+    "regulatory_references": ["FDA 21 CFR 820", "MDR 2017/745"],
+    "compliance_areas": ["Design Controls", "Risk Management", "Clinical Evaluation"],
+    "compliance_level": "CRITICAL | HIGH | MEDIUM | LOW | NOT_APPLICABLE",
+    "quality_scores": {{
+        "overall": 0.85,
+        "content_quality": 0.9,
+        "completeness": 0.8,
+        "clarity": 0.85,
+        "structure": 0.9,
+        "compliance_readiness": 0.8
+    }},
+    "interest_groups": ["Quality Assurance", "Regulatory Affairs", "R&D", "Manufacturing"],
+    "ai_confidence": 0.9,
+    "ai_methodology": "enhanced_multilayer_analysis"
+}}
+
+ANALYSIEREN SIE NUN DAS DOKUMENT UND GEBEN SIE NUR DAS JSON ZURÜCK:
+"""
+
+QUALITY_ASSESSMENT_PROMPT = """
+Bewerten Sie die Qualität des Dokuments in verschiedenen Dimensionen.
+
+DOKUMENT-INHALT:
+{document_content}
+
+BEWERTUNGSKRITERIEN (0.0 - 1.0):
+
+CONTENT_QUALITY:
+- Fachliche Korrektheit
+- Vollständigkeit der Informationen
+- Aktualität der Inhalte
+
+COMPLETENESS:
+- Vollständigkeit der Struktur
+- Alle notwendigen Sektionen vorhanden
+- Keine offensichtlichen Lücken
+
+CLARITY:
+- Verständlichkeit der Sprache
+- Klare Strukturierung
+- Eindeutige Formulierungen
+
+STRUCTURE:
+- Logischer Aufbau
+- Konsistente Gliederung
+- Professionelle Formatierung
+
+COMPLIANCE_READINESS:
+- Regulatory Compliance
+- ISO-Konformität
+- Audit-Bereitschaft
+
+JSON-FORMAT:
+{{
+    "quality_scores": {{
+        "overall": 0.85,
+        "content_quality": 0.9,
+        "completeness": 0.8,
+        "clarity": 0.85,
+        "structure": 0.9,
+        "compliance_readiness": 0.8
+    }},
+    "assessment_notes": "Kurze Begründung der Bewertung"
+}}
+
+BEWERTEN SIE DAS DOKUMENT:
+"""
+
+INTEREST_GROUP_ANALYSIS_PROMPT = """
+Identifizieren Sie relevante Interessensgruppen für dieses Dokument.
+
+DOKUMENT-INHALT:
+{document_content}
+
+VERFÜGBARE INTERESSENSGRUPPEN:
+- Quality Assurance: QS-Abteilung
+- Regulatory Affairs: Regulatory-Abteilung
+- R&D: Forschung & Entwicklung
+- Manufacturing: Fertigung/Produktion
+- Clinical Affairs: Klinische Abteilung
+- Risk Management: Risikomanagement
+- Training & Competence: Schulung & Kompetenz
+- Supplier Management: Lieferantenmanagement
+- Customer Service: Kundendienst
+- Management: Geschäftsführung
+- IT & Data Management: IT-Abteilung
+- Legal & Compliance: Rechtsabteilung
+- Sales & Marketing: Vertrieb & Marketing
+- Project Management: Projektmanagement
+- Maintenance: Wartung & Instandhaltung
+
+JSON-FORMAT:
+{{
+    "interest_groups": ["Quality Assurance", "Regulatory Affairs", "R&D"],
+    "relevance_reasoning": "Kurze Begründung der Relevanz"
+}}
+
+IDENTIFIZIEREN SIE RELEVANTE GRUPPEN:
+"""
+
+COMPLIANCE_ANALYSIS_PROMPT = """
+Analysieren Sie Compliance-Aspekte und regulatorische Referenzen.
+
+DOKUMENT-INHALT:
+{document_content}
+
+SUCHEN SIE NACH:
+
+ISO STANDARDS:
+- ISO 13485 (Medical Device QMS)
+- ISO 14971 (Risk Management)
+- ISO 27001 (Information Security)
+- ISO 9001 (Quality Management)
+
+REGULATORY FRAMEWORKS:
+- FDA 21 CFR 820 (QSR)
+- FDA 21 CFR 11 (Electronic Records)
+- MDR 2017/745 (Medical Device Regulation)
+- IVDR 2017/746 (In Vitro Diagnostic Regulation)
+- GDPR (Data Protection)
+
+COMPLIANCE AREAS:
+- Design Controls
+- Risk Management
+- Clinical Evaluation
+- Post-Market Surveillance
+- Vigilance
+- Quality System
+- Manufacturing Controls
+- Labeling
+- Sterilization
+- Biocompatibility
+
+JSON-FORMAT:
+{{
+    "iso_standards_referenced": ["ISO 13485", "ISO 14971"],
+    "regulatory_references": ["FDA 21 CFR 820", "MDR 2017/745"],
+    "compliance_areas": ["Design Controls", "Risk Management"],
+    "compliance_level": "CRITICAL | HIGH | MEDIUM | LOW | NOT_APPLICABLE",
+    "compliance_notes": "Spezifische Compliance-Hinweise"
+}}
+
+ANALYSIEREN SIE COMPLIANCE-ASPEKTE:
+"""
+
+CHUNKING_METADATA_PROMPT = """
+Analysieren Sie diesen Dokumentabschnitt für erweiterte Chunk-Metadaten.
+
+CHUNK-INHALT:
+{chunk_content}
+
+DOKUMENT-KONTEXT:
+- Titel: {document_title}
+- Typ: {document_type}
+- Sektion: {section_title}
+
+ANALYSIEREN SIE:
+- Wichtigkeit für das Gesamtdokument
+- Relevante Keywords
+- Interessensgruppen
+- Compliance-Bezüge
+
+JSON-FORMAT:
+{{
+    "section_title": "Sektions-/Kapitelname",
+    "paragraph_number": 1,
+    "word_count": 150,
+    "keywords": [
+        {{
+            "term": "Chunk-spezifisches Keyword",
+            "importance": "HIGH",
+            "category": "process",
+            "confidence": 0.85
+        }}
+    ],
+    "importance_score": 0.8,
+    "interest_groups": ["Quality Assurance", "R&D"],
+    "chunk_summary": "Kurze Zusammenfassung des Chunk-Inhalts"
+}}
+
+ANALYSIEREN SIE DEN CHUNK:
+"""
+
+# Zeichenlimits je Prompt (Token-Effizienz)
+DOCUMENT_CONTENT_LIMIT = 8000
+ASSESSMENT_CONTENT_LIMIT = 6000
+INTEREST_GROUP_CONTENT_LIMIT = 4000
+CHUNK_CONTENT_LIMIT = 2000
+
+
+def build_enhanced_extraction_prompt(document_content: str,
+                                     document_title: Optional[str] = None,
+                                     document_type_hint: Optional[str] = None) -> str:
+    """Prompt für die Metadaten-Extraktion eines Dokuments (Titel/Typ als optionale Hinweise)"""
+    prompt = ENHANCED_METADATA_EXTRACTION_PROMPT.format(
+        document_content=document_content[:DOCUMENT_CONTENT_LIMIT]
+    )
+    if document_title:
+        prompt += f"\n\nHINWEIS - DOKUMENTTITEL: {document_title}"
+    if document_type_hint:
+        prompt += f"\nHINWEIS - DOKUMENTTYP: {document_type_hint}"
+    return prompt
+
+
+def build_chunking_prompt(chunk_content: str,
+                          document_title: str,
+                          document_type: str,
+                          section_title: Optional[str] = None) -> str:
+    """Prompt für die Metadaten eines einzelnen Chunks"""
+    return CHUNKING_METADATA_PROMPT.format(
+        chunk_content=chunk_content[:CHUNK_CONTENT_LIMIT],
+        document_title=document_title,
+        document_type=document_type,
+        section_title=section_title or "Unbekannt"
+    )
+
+
+def build_quality_assessment_prompt(document_content: str) -> str:
+    """Prompt für die Qualitätsbewertung"""
+    return QUALITY_ASSESSMENT_PROMPT.format(document_content=document_content[:ASSESSMENT_CONTENT_LIMIT])
+
+
+def build_compliance_analysis_prompt(document_content: str) -> str:
+    """Prompt für die Compliance-Analyse"""
+    return COMPLIANCE_ANALYSIS_PROMPT.format(document_content=document_content[:ASSESSMENT_CONTENT_LIMIT])
+
+
+def build_interest_group_prompt(document_content: str) -> str:
+    """Prompt für die Zuordnung zu Interessensgruppen"""
+    return INTEREST_GROUP_ANALYSIS_PROMPT.format(document_content=document_content[:INTEREST_GROUP_CONTENT_LIMIT])
+
+
+def optimize_prompt_for_model(prompt: str, model_name: str = "gpt-4o-mini") -> str:
+    """Provider-spezifische Anpassung des Prompts ("openai"/"gpt-4o-mini" oder "gemini")"""
+    if "gemini" in model_name:
+        # Gemini bevorzugt klarere Instruktionen
+        return prompt.replace("ANTWORTEN SIE", "Bitte antworten Sie")
+    if not prompt.lstrip().startswith("Sie sind ein Experte"):
+        return "Sie sind ein Experte für Qualitätsmanagement. " + prompt
+    return prompt
+
+
+_BUILDERS = {
+    "enhanced_extraction": build_enhanced_extraction_prompt,
+    "quality_assessment": build_quality_assessment_prompt,
+    "compliance_analysis": build_compliance_analysis_prompt,
+    "interest_groups": build_interest_group_prompt,
+}
+
+
+def get_prompt(prompt_type: str = "enhanced_extraction", **kwargs) -> str:
+    """Holt Enhanced-Metadaten Prompt (``content`` = Dokumentinhalt)"""
+    if prompt_type == "chunking":
+        return build_chunking_prompt(
+            chunk_content=kwargs.get("content", ""),
+            document_title=kwargs.get("document_title", ""),
+            document_type=kwargs.get("document_type", "OTHER"),
+            section_title=kwargs.get("section_title")
+        )
+    builder = _BUILDERS.get(prompt_type, build_enhanced_extraction_prompt)
+    return builder(kwargs.get("content", ""))
@@ -80,7 +80,7 @@ Last Updated: 2025-01-27
 
 from pydantic import BaseModel, EmailStr, field_validator, Field, ConfigDict
 from datetime import datetime, date
-from typing import Optional, List, Dict, Any, Union
+from typing import Optional, List, Dict, Any, Union, Generic, TypeVar
 from .models import DocumentStatus, EquipmentStatus, DocumentType
 from enum import Enum
 import json
@@ -513,6 +513,51 @@ class Document(DocumentBase):
     
     model_config = ConfigDict(from_attributes=True)
 
+class DocumentSummary(BaseModel):
+    """
+    Schlanke Listen-Ansicht eines Dokuments (``view=summary``).
+    
+    Enthält nur leichte Spalten - extracted_text, Analyse-JSONs und
+    Beziehungen werden für Listen weder geladen noch übertragen.
+    """
+    id: int
+    title: str
+    document_number: str
+    document_type: DocumentType
+    version: str
+    status: DocumentStatus
+    content: Optional[str] = None
+    file_path: Optional[str] = None
+    file_name: Optional[str] = None
+    file_size: Optional[int] = None
+    mime_type: Optional[str] = None
+    keywords: Optional[str] = None
+    tags: Optional[str] = None
+    chapter_numbers: Optional[str] = None
+    compliance_status: Optional[str] = None
+    priority: Optional[str] = None
+    upload_method: Optional[str] = None
+    creator_id: Optional[int] = None
+    reviewed_by_id: Optional[int] = None
+    reviewed_at: Optional[datetime] = None
+    approved_by_id: Optional[int] = None
+    approved_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    
+    model_config = ConfigDict(from_attributes=True)
+
+class DocumentSearchHit(DocumentSummary):
+    """
+    Treffer der Volltextsuche: Listen-Ansicht plus Relevanz.
+    
+    ``score`` ist der (invertierte) BM25-Wert - höher bedeutet relevanter.
+    ``title_highlight``/``snippet`` markieren Treffer mit ``<mark>``.
+    """
+    score: float = 0.0
+    title_highlight: Optional[str] = None
+    snippet: Optional[str] = None
+
 # === FILE UPLOAD SCHEMAS ===
 
 class FileUploadResponse(BaseModel):
@@ -523,6 +568,7 @@ class FileUploadResponse(BaseModel):
     file_hash: str
     mime_type: str
     uploaded_at: datetime
+    deduplicated: bool = False  # Inhalt (SHA-256) war bereits gespeichert
     
 class DocumentWithFileCreate(BaseModel):
     """Schema für Dokument-Erstellung mit Datei-Upload"""
@@ -692,12 +738,48 @@ class GenericResponse(BaseModel):
     message: str
     success: bool = True
 
+class BulkCreateRequest(BaseModel):
+    """
+    Bulk-Anlage mehrerer Einträge in einer Transaktion.
+    
+    Jeder Eintrag wird einzeln gegen das Create-Schema des Endpoints
+    validiert - ungültige Einträge erscheinen in den Ergebnissen, statt den
+    ganzen Request abzulehnen.
+    """
+    items: List[Dict[str, Any]] = Field(..., min_length=1, description="Einträge im Format des Einzel-Endpoints")
+    atomic: bool = Field(False, description="Alles oder nichts: bei einem fehlerhaften Eintrag wird nichts gespeichert")
+
+class BulkItemResult(BaseModel):
+    """Ergebnis eines Eintrags (index = Position im Request)."""
+    index: int
+    success: bool
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class BulkCreateResponse(BaseModel):
+    total: int
+    created: int
+    failed: int
+    results: List[BulkItemResult]
+
 class PaginatedResponse(BaseModel):
     total: int
     limit: int
     offset: int
     items: List[dict]
 
+PageItem = TypeVar("PageItem")
+
+class CursorPage(BaseModel, Generic[PageItem]):
+    """
+    Seite einer Keyset-Pagination.
+    
+    ``next_cursor`` ist ein opakes Token für die Folgeseite
+    (``?cursor=<next_cursor>``) oder None auf der letzten Seite.
+    """
+    items: List[PageItem]
+    next_cursor: Optional[str] = None
+
 # === BENUTZER-SELBSTVERWALTUNG SCHEMAS ===
 
 class PasswordChangeRequest(BaseModel):
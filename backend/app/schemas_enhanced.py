@@ -103,6 +103,8 @@ class EnhancedChunkMetadata(BaseModel):
     document_id: int = Field(..., description="SQL Document ID")
     chunk_index: int = Field(..., description="Position des Chunks im Dokument")
     chunk_id: Optional[str] = Field(None, description="Eindeutige Chunk-ID")
+    char_start: Optional[int] = Field(None, ge=0, description="Start-Offset des Chunks im Dokumenttext")
+    char_end: Optional[int] = Field(None, ge=0, description="End-Offset (exklusiv) des Chunks im Dokumenttext")
     
     # Document Context
     document_title: str = Field(..., description="Vollständiger Dokumenttitel")
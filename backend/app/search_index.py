@@ -0,0 +1,207 @@
+"""
+KI-QMS Volltextsuche (SQLite FTS5)
+
+FTS5-Index über Titel, Beschreibung (``content``) und extrahierten Text der
+Dokumente. Ersetzt ``ILIKE '%term%'``-Scans über große Text-Spalten:
+
+- External-Content-Tabelle ``documents_fts`` (kein doppelter Textspeicher),
+  synchron gehalten über Trigger auf ``documents`` - unabhängig davon, ob
+  über ORM oder Roh-SQL geschrieben wird
+- Tokenizer ``unicode61 remove_diacritics 2``: Umlaute werden gefaltet
+  (``Prüfung`` findet ``Prufung`` und umgekehrt), für ``ß``/``ss`` werden
+  beide Schreibweisen gesucht
+- Prefix-Suche auf dem letzten Suchbegriff (``kalib`` → ``Kalibrierung``),
+  Prefix-Index für 2-3 Zeichen - ersetzt bei der Eingabe deutscher
+  Flexionen/Komposita den fehlenden Stemmer
+- BM25-Ranking mit Spaltengewichtung (Titel > Beschreibung > Volltext)
+- Hervorgehobene Snippets (``<mark>...</mark>``)
+
+Auf Datenbanken ohne FTS5 (z.B. PostgreSQL) fallen die Endpoints auf die
+bisherige ILIKE-Suche zurück.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional
+import logging
+import re
+
+from sqlalchemy import Integer, column, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger("KI-QMS.SearchIndex")
+
+FTS_TABLE = "documents_fts"
+
+# BM25-Gewichte je Spalte (title, content, extracted_text)
+BM25_WEIGHTS = (10.0, 4.0, 1.0)
+SNIPPET_TOKENS = 16
+HIGHLIGHT_OPEN = "<mark>"
+HIGHLIGHT_CLOSE = "</mark>"
+
+_CREATE_TABLE_SQL = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    title, content, extracted_text,
+    content='documents', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+)
+"""
+
+_TRIGGER_SQL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON documents BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, content, extracted_text)
+        VALUES (new.id, new.title, new.content, new.extracted_text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON documents BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content, extracted_text)
+        VALUES ('delete', old.id, old.title, old.content, old.extracted_text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, content, extracted_text ON documents BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content, extracted_text)
+        VALUES ('delete', old.id, old.title, old.content, old.extracted_text);
+        INSERT INTO {FTS_TABLE}(rowid, title, content, extracted_text)
+        VALUES (new.id, new.title, new.content, new.extracted_text);
+    END
+    """,
+]
+
+_QUERY_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+# Wird von ensure_search_index() gesetzt
+FTS5_AVAILABLE = False
+
+
+@dataclass
+class SearchHit:
+    """Treffer der Volltextsuche (score: höher = relevanter)."""
+    document_id: int
+    score: float
+    title_highlight: Optional[str]
+    snippet: Optional[str]
+
+
+def ensure_search_index(engine) -> bool:
+    """
+    Legt FTS5-Tabelle und Sync-Trigger an (idempotent) und befüllt den
+    Index beim ersten Anlegen aus den bestehenden Dokumenten.
+
+    Returns:
+        bool: True wenn die FTS5-Suche verfügbar ist
+    """
+    global FTS5_AVAILABLE
+
+    if engine.dialect.name != "sqlite":
+        logger.info(f"ℹ️ Volltextindex: FTS5 nur für SQLite, {engine.dialect.name} nutzt ILIKE-Suche")
+        FTS5_AVAILABLE = False
+        return False
+
+    try:
+        with engine.begin() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": FTS_TABLE}
+            ).first() is not None
+
+            conn.execute(text(_CREATE_TABLE_SQL))
+            for trigger_sql in _TRIGGER_SQL:
+                conn.execute(text(trigger_sql))
+
+            if not exists:
+                conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+                logger.info("🔎 FTS5-Volltextindex angelegt und aus bestehenden Dokumenten aufgebaut")
+
+        FTS5_AVAILABLE = True
+    except OperationalError as e:
+        logger.warning(f"⚠️ FTS5 nicht verfügbar, Suche nutzt ILIKE: {e}")
+        FTS5_AVAILABLE = False
+
+    return FTS5_AVAILABLE
+
+
+def rebuild_search_index(db: Session):
+    """Baut den FTS5-Index komplett neu auf (z.B. nach Massenimport ohne Trigger)."""
+    db.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    db.commit()
+
+
+def _term_variants(term: str) -> List[str]:
+    """Schreibvarianten eines Begriffs (ß/ss), da unicode61 ``ß`` nicht faltet."""
+    variants = {term}
+    if "ß" in term:
+        variants.add(term.replace("ß", "ss"))
+    if "ss" in term:
+        variants.add(term.replace("ss", "ß"))
+    return sorted(variants)
+
+
+def build_match_query(user_query: str, prefix: bool = True) -> Optional[str]:
+    """
+    Übersetzt eine Benutzereingabe in eine sichere FTS5-MATCH-Anfrage.
+
+    Jeder Begriff wird gequotet (keine FTS5-Syntax-Injection), alle
+    Begriffe müssen vorkommen. Der letzte Begriff wird als Prefix gesucht
+    (Suche während der Eingabe, deutsche Flexionen/Komposita), ``ß``/``ss``
+    werden beide gesucht.
+
+    Returns:
+        MATCH-Ausdruck oder None, wenn die Eingabe keine Suchbegriffe enthält
+    """
+    terms = _QUERY_TERM_RE.findall(user_query.lower())
+    if not terms:
+        return None
+
+    parts = []
+    for position, term in enumerate(terms):
+        suffix = "*" if prefix and position == len(terms) - 1 else ""
+        alternatives = [f'"{variant}"{suffix}' for variant in _term_variants(term)]
+        parts.append(alternatives[0] if len(alternatives) == 1 else "(" + " OR ".join(alternatives) + ")")
+    return " AND ".join(parts)
+
+
+def matching_ids_select(match_query: str):
+    """Subquery der Dokument-IDs zu einer MATCH-Anfrage (für ``Document.id.in_(...)``)."""
+    return (
+        text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match")
+        .bindparams(match=match_query)
+        .columns(column("rowid", Integer))
+    )
+
+
+def search(db: Session, user_query: str, limit: int = 50, offset: int = 0) -> List[SearchHit]:
+    """
+    Volltextsuche mit BM25-Ranking und hervorgehobenen Snippets.
+
+    Returns:
+        List[SearchHit]: Treffer, relevanteste zuerst
+    """
+    match_query = build_match_query(user_query)
+    if not match_query:
+        return []
+
+    weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+    rows = db.execute(
+        text(f"""
+            SELECT rowid,
+                   bm25({FTS_TABLE}, {weights}) AS rank,
+                   highlight({FTS_TABLE}, 0, '{HIGHLIGHT_OPEN}', '{HIGHLIGHT_CLOSE}') AS title_highlight,
+                   snippet({FTS_TABLE}, -1, '{HIGHLIGHT_OPEN}', '{HIGHLIGHT_CLOSE}', '…', {SNIPPET_TOKENS}) AS snippet
+            FROM {FTS_TABLE}
+            WHERE {FTS_TABLE} MATCH :match
+            ORDER BY rank
+            LIMIT :limit OFFSET :offset
+        """),
+        {"match": match_query, "limit": limit, "offset": offset}
+    ).all()
+
+    # bm25() liefert negative Werte (kleiner = besser) - für die API umdrehen
+    return [
+        SearchHit(document_id=row.rowid, score=round(-row.rank, 4),
+                  title_highlight=row.title_highlight, snippet=row.snippet)
+        for row in rows
+    ]
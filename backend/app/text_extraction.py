@@ -12,7 +12,7 @@ Hauptfunktionalitäten:
 - 🛡️ Robuste Fehlerbehandlung und Fallback-Mechanismen
 
 Unterstützte Formate:
-- PDF: PyPDF2 mit Seiten-strukturierter Extraktion
+- PDF: PyMuPDF (Fallback PyPDF2) mit Seiten-strukturierter, paralleler Extraktion
 - Word: python-docx für DOCX mit Tabellen-Support
 - Excel: openpyxl für XLSX mit Multi-Sheet-Verarbeitung  
 - Text: TXT, MD mit UTF-8/Latin-1 Fallback
@@ -25,8 +25,9 @@ QMS-Features:
 - QMS-Prozess-Terminologie (CAPA, Audit, Kalibrierung)
 
 Performance:
+- Async API (extract_text_from_file_async) mit Worker-Pool für CPU-gebundene Parser
 - Chunked Processing für große Dateien
-- Memory-effiziente Stream-Verarbeitung
+- Memory-effiziente Stream-Verarbeitung (iter_text_segments, read_text_prefix)
 - Graceful Degradation bei Parsing-Fehlern
 - Logging für Debugging und Monitoring
 
@@ -35,11 +36,21 @@ Version: 2.0.0 (Enhanced für RAG-Integration)
 """
 
 from pathlib import Path
-from typing import Optional, Union, Dict, Any
+from typing import Optional, Union, Dict, Any, Iterator, Tuple
+from dataclasses import dataclass
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import codecs
 import logging
 import tempfile
 import asyncio
 
+from .config import get_extraction_pool_type, get_extraction_pool_workers
+from .pdf_extraction import (
+    iter_pdf_pages, pdf_page_count, extract_pdf_page_range,
+    split_page_ranges, format_pdf_page
+)
+
 logger = logging.getLogger(__name__)
 
 # Enhanced OCR Import
@@ -66,106 +77,114 @@ except ImportError as e:
     DOCUMENT_VISION_AVAILABLE = False
     logger.warning(f"⚠️ Document Vision Engine nicht verfügbar: {e}")
 
-def extract_text_from_file(file_path: Union[str, Path], mime_type: str) -> str:
+# MIME-Types je Parser (CPU-gebunden, laufen im Worker-Pool)
+WORD_MIME_TYPES = {'application/vnd.openxmlformats-officedocument.wordprocessingml.document'}
+EXCEL_MIME_TYPES = {'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'}
+TEXT_MIME_TYPES = {'text/plain', 'text/markdown'}
+
+# Lazy initialisierter Worker-Pool für PyPDF2/python-docx/openpyxl
+_extraction_executor: Optional[Executor] = None
+
+
+def get_extraction_executor() -> Executor:
+    """
+    Gibt den geteilten Worker-Pool für CPU-gebundene Parser zurück.
+    
+    Der Pool wird beim ersten Aufruf angelegt (Typ und Größe über
+    TEXT_EXTRACTION_POOL / TEXT_EXTRACTION_WORKERS konfigurierbar).
+    Ein Process-Pool umgeht den GIL, sodass parallele Uploads nicht
+    mehr aufeinander warten.
+    """
+    global _extraction_executor
+    if _extraction_executor is None:
+        workers = get_extraction_pool_workers()
+        if get_extraction_pool_type() == "process":
+            try:
+                _extraction_executor = ProcessPoolExecutor(max_workers=workers)
+            except (OSError, NotImplementedError) as e:
+                logger.warning(f"⚠️ Process-Pool nicht verfügbar, nutze Thread-Pool: {e}")
+        if _extraction_executor is None:
+            _extraction_executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="text-extraction"
+            )
+        logger.info(f"⚡ Extraktions-Pool gestartet: {type(_extraction_executor).__name__} ({workers} Worker)")
+    return _extraction_executor
+
+
+def shutdown_extraction_executor() -> None:
+    """Beendet den Extraktions-Pool (z.B. beim Backend-Shutdown)."""
+    global _extraction_executor
+    if _extraction_executor is not None:
+        _extraction_executor.shutdown(wait=False, cancel_futures=True)
+        _extraction_executor = None
+
+
+def _extract_by_mime_type(file_path: Path, mime_type: str) -> str:
+    """
+    Wählt den passenden Parser für den MIME-Type (synchron, Pool-tauglich).
+    
+    Muss auf Modulebene liegen, damit der Process-Pool sie picklen kann.
+    """
+    if mime_type == 'application/pdf':
+        return _extract_pdf_text(file_path)
+    elif mime_type in WORD_MIME_TYPES:
+        return _extract_word_text(file_path)
+    elif mime_type in EXCEL_MIME_TYPES:
+        return _extract_excel_text(file_path)
+    elif mime_type in ['application/msword']:
+        return "[DOC-Format nicht unterstützt - bitte zu DOCX konvertieren]"
+    elif mime_type in TEXT_MIME_TYPES:
+        return _extract_text_file(file_path)
+    else:
+        logger.warning(f"⚠️ Unbekannter MIME-Type: {mime_type}")
+        return "[Unbekanntes Dateiformat]"
+
+
+async def _run_in_extraction_pool(func, *args):
+    """Führt einen synchronen Parser im Worker-Pool aus, ohne den Event-Loop zu blockieren."""
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_extraction_executor(), func, *args)
+    except BrokenProcessPool:
+        # Abgestürzter Worker (z.B. OOM) - Pool neu aufbauen und einmal wiederholen
+        logger.warning("⚠️ Extraktions-Pool defekt - starte neu")
+        shutdown_extraction_executor()
+        return await loop.run_in_executor(get_extraction_executor(), func, *args)
+
+
+async def extract_text_from_file_async(
+    file_path: Union[str, Path],
+    mime_type: str,
+    enable_vision_fallback: bool = True
+) -> str:
     """
-    Extrahiert Text aus verschiedenen Dateiformaten mit Enhanced OCR Fallback
+    Extrahiert Text aus verschiedenen Dateiformaten (async) mit Vision-Fallback.
+    
+    Die CPU-gebundenen Parser (PyPDF2, python-docx, openpyxl) laufen im
+    Worker-Pool, die Vision-Fallbacks werden direkt im laufenden Event-Loop
+    awaited. Für FastAPI-Handler ist dies die bevorzugte API.
+    
+    Args:
+        file_path: Pfad zur Datei
+        mime_type: MIME-Type der Datei
+        enable_vision_fallback: Vision/Enhanced OCR bei wenig Text versuchen
+        
+    Returns:
+        str: Extrahierter Text oder Platzhalter-Meldung in eckigen Klammern
     """
     file_path = Path(file_path) if isinstance(file_path, str) else file_path
     
     try:
         logger.info(f"🔍 Textextraktion gestartet für: {file_path.name} ({mime_type})")
         
-        # Standard-Textextraktion versuchen
-        extracted_text = ""
-        
+        # Standard-Textextraktion im Worker-Pool
         if mime_type == 'application/pdf':
-            extracted_text = _extract_pdf_text(file_path)
-        elif mime_type in ['application/vnd.openxmlformats-officedocument.wordprocessingml.document']:
-            extracted_text = _extract_word_text(file_path)
-        elif mime_type in ['application/msword']:
-            extracted_text = "[DOC-Format nicht unterstützt - bitte zu DOCX konvertieren]"
-        elif mime_type == 'text/plain':
-            extracted_text = _extract_text_file(file_path)
+            extracted_text = await _extract_pdf_text_parallel(file_path)
         else:
-            logger.warning(f"⚠️ Unbekannter MIME-Type: {mime_type}")
-            extracted_text = "[Unbekanntes Dateiformat]"
+            extracted_text = await _run_in_extraction_pool(_extract_by_mime_type, file_path, mime_type)
         
-        # 🎯 PREMIUM: Document-to-Image Vision OCR für komplexe Dokumente
-        if len(extracted_text.strip()) < 100 and DOCUMENT_VISION_AVAILABLE:
-            logger.info("🎯 PREMIUM: Wenig Text → Document-to-Image Vision OCR")
-            try:
-                # Async call in sync context
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                vision_result = loop.run_until_complete(
-                    extract_text_with_document_vision(str(file_path))
-                )
-                loop.close()
-                
-                if vision_result['success'] and len(vision_result['extracted_text']) > len(extracted_text):
-                    chars = len(vision_result['extracted_text'])
-                    logger.info(f"🎉 Document Vision OCR erfolgreich: {chars} Zeichen")
-                    extracted_text = vision_result['extracted_text']
-                    
-                    # Success Metrics loggen
-                    if 'success_metrics' in vision_result:
-                        metrics = vision_result['success_metrics']
-                        logger.info(f"📊 Erfolgsrate: {metrics['success_rate']:.1f}%, Qualität: {metrics['quality_score']:.1f}/100")
-                    
-                    # Compliance-Warnungen protokollieren
-                    if vision_result.get('process_references'):
-                        logger.info(f"📎 Prozess-Referenzen gefunden: {vision_result['process_references']}")
-                    
-                    return extracted_text
-                
-            except Exception as e:
-                logger.error(f"❌ Document Vision OCR fehlgeschlagen: {e}")
-        
-        # Fallback: Standard Vision OCR für komplexe Dokumente mit Diagrammen
-        if len(extracted_text.strip()) < 100 and VISION_OCR_AVAILABLE:
-            logger.info("🔍 Wenig Text gefunden - versuche Standard Vision OCR für Diagramm-Analyse")
-            try:
-                # Async call in sync context
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                vision_result = loop.run_until_complete(
-                    extract_text_with_vision(file_path, mime_type)
-                )
-                loop.close()
-                
-                if vision_result['success'] and len(vision_result['text']) > len(extracted_text):
-                    logger.info(f"✅ Standard Vision OCR erfolgreich: {len(vision_result['text'])} Zeichen")
-                    extracted_text = vision_result['text']
-                    
-                    # Compliance-Warnungen protokollieren
-                    if vision_result.get('compliance_warnings'):
-                        logger.warning(f"⚠️ Compliance-Warnungen gefunden: {len(vision_result['compliance_warnings'])}")
-                    
-                    # Prozess-Referenzen protokollieren
-                    if vision_result.get('process_references'):
-                        logger.info(f"📎 Prozess-Referenzen gefunden: {vision_result['process_references']}")
-                
-            except Exception as e:
-                logger.error(f"❌ Standard Vision OCR fehlgeschlagen: {e}")
-
-        # Enhanced OCR für komplexe Dokumente (wenn noch wenig Text)
-        if len(extracted_text.strip()) < 50 and ENHANCED_OCR_AVAILABLE:
-            logger.info("🔍 Sehr wenig Text gefunden - versuche Enhanced OCR")
-            try:
-                # Async call in sync context
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                enhanced_result = loop.run_until_complete(
-                    extract_enhanced_text(file_path, mime_type)
-                )
-                loop.close()
-                
-                if enhanced_result['success'] and len(enhanced_result['text']) > len(extracted_text):
-                    logger.info(f"✅ Enhanced OCR erfolgreich: {len(enhanced_result['text'])} Zeichen")
-                    extracted_text = enhanced_result['text']
-                
-            except Exception as e:
-                logger.error(f"❌ Enhanced OCR fehlgeschlagen: {e}")
+        if enable_vision_fallback:
+            extracted_text = await _apply_vision_fallbacks(file_path, mime_type, extracted_text)
         
         # Final Check
         if len(extracted_text.strip()) < 20:
@@ -180,63 +199,352 @@ def extract_text_from_file(file_path: Union[str, Path], mime_type: str) -> str:
         logger.error(f"❌ Textextraktion fehlgeschlagen für {file_path}: {e}")
         return f"[Extraktionsfehler: {str(e)}]"
 
-def _extract_text_file(file_path: Path) -> str:
-    """Extrahiert Text aus TXT/MD Dateien."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
-    except UnicodeDecodeError:
-        # Fallback für andere Encodings
-        with open(file_path, 'r', encoding='latin-1') as f:
-            return f.read()
 
-def _extract_pdf_text(file_path: Path) -> str:
-    """Extrahiert Text aus PDF-Dateien mit PyPDF2."""
+async def _extract_pdf_text_parallel(file_path: Path) -> str:
+    """
+    Extrahiert große PDFs bereichsweise parallel im Worker-Pool.
+    
+    PDFs mit höchstens einem Seitenbereich (PDF_PAGE_RANGE_SIZE) werden
+    in einem einzigen Worker-Aufruf verarbeitet.
+    """
     try:
-        import PyPDF2
+        page_count, backend = await _run_in_extraction_pool(pdf_page_count, file_path)
+        ranges = split_page_ranges(page_count)
+        if len(ranges) <= 1:
+            return await _run_in_extraction_pool(_extract_pdf_text, file_path)
+        
+        logger.info(f"⚡ PDF parallel: {page_count} Seiten in {len(ranges)} Bereichen ({backend})")
+        range_results = await asyncio.gather(*[
+            _run_in_extraction_pool(extract_pdf_page_range, file_path, start, end)
+            for start, end in ranges
+        ])
+        
+        text_parts = [
+            text for pages in range_results for page in pages
+            if (text := format_pdf_page(page)) is not None
+        ]
+        return "\n".join(text_parts) if text_parts else "[Kein Text extrahiert]"
         
-        with open(file_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            text_parts = []
-            
-            for page_num, page in enumerate(reader.pages, 1):
-                try:
-                    page_text = page.extract_text()
-                    if page_text.strip():
-                        text_parts.append(f"=== Seite {page_num} ===")
-                        text_parts.append(page_text)
-                except Exception as page_error:
-                    text_parts.append(f"[Fehler auf Seite {page_num}: {str(page_error)}]")
-            
-            return "\n".join(text_parts) if text_parts else "[Kein Text extrahiert]"
-            
     except ImportError:
-        return "[PyPDF2 nicht installiert]"
+        return "[PyMuPDF/PyPDF2 nicht installiert]"
     except Exception as e:
         return f"[PDF-Extraktion fehlgeschlagen: {str(e)}]"
 
-def _extract_word_text(file_path: Path) -> str:
-    """Extrahiert Text aus Word-Dokumenten (.docx)."""
+
+async def _apply_vision_fallbacks(file_path: Path, mime_type: str, extracted_text: str) -> str:
+    """Versucht Document Vision, Standard Vision und Enhanced OCR bei zu wenig Text."""
+    # 🎯 PREMIUM: Document-to-Image Vision OCR für komplexe Dokumente
+    if len(extracted_text.strip()) < 100 and DOCUMENT_VISION_AVAILABLE:
+        logger.info("🎯 PREMIUM: Wenig Text → Document-to-Image Vision OCR")
+        try:
+            vision_result = await extract_text_with_document_vision(str(file_path))
+            
+            if vision_result['success'] and len(vision_result['extracted_text']) > len(extracted_text):
+                chars = len(vision_result['extracted_text'])
+                logger.info(f"🎉 Document Vision OCR erfolgreich: {chars} Zeichen")
+                
+                # Success Metrics loggen
+                if 'success_metrics' in vision_result:
+                    metrics = vision_result['success_metrics']
+                    logger.info(f"📊 Erfolgsrate: {metrics['success_rate']:.1f}%, Qualität: {metrics['quality_score']:.1f}/100")
+                
+                # Compliance-Warnungen protokollieren
+                if vision_result.get('process_references'):
+                    logger.info(f"📎 Prozess-Referenzen gefunden: {vision_result['process_references']}")
+                
+                return vision_result['extracted_text']
+            
+        except Exception as e:
+            logger.error(f"❌ Document Vision OCR fehlgeschlagen: {e}")
+    
+    # Fallback: Standard Vision OCR für komplexe Dokumente mit Diagrammen
+    if len(extracted_text.strip()) < 100 and VISION_OCR_AVAILABLE:
+        logger.info("🔍 Wenig Text gefunden - versuche Standard Vision OCR für Diagramm-Analyse")
+        try:
+            vision_result = await extract_text_with_vision(str(file_path))
+            
+            if vision_result['success'] and len(vision_result['text']) > len(extracted_text):
+                logger.info(f"✅ Standard Vision OCR erfolgreich: {len(vision_result['text'])} Zeichen")
+                extracted_text = vision_result['text']
+                
+                # Compliance-Warnungen protokollieren
+                if vision_result.get('compliance_warnings'):
+                    logger.warning(f"⚠️ Compliance-Warnungen gefunden: {len(vision_result['compliance_warnings'])}")
+                
+                # Prozess-Referenzen protokollieren
+                if vision_result.get('process_references'):
+                    logger.info(f"📎 Prozess-Referenzen gefunden: {vision_result['process_references']}")
+            
+        except Exception as e:
+            logger.error(f"❌ Standard Vision OCR fehlgeschlagen: {e}")
+
+    # Enhanced OCR für komplexe Dokumente (wenn noch wenig Text)
+    if len(extracted_text.strip()) < 50 and ENHANCED_OCR_AVAILABLE:
+        logger.info("🔍 Sehr wenig Text gefunden - versuche Enhanced OCR")
+        try:
+            enhanced_result = await extract_enhanced_text(file_path, mime_type)
+            
+            if enhanced_result['success'] and len(enhanced_result['text']) > len(extracted_text):
+                logger.info(f"✅ Enhanced OCR erfolgreich: {len(enhanced_result['text'])} Zeichen")
+                extracted_text = enhanced_result['text']
+            
+        except Exception as e:
+            logger.error(f"❌ Enhanced OCR fehlgeschlagen: {e}")
+    
+    return extracted_text
+
+
+def extract_text_from_file(
+    file_path: Union[str, Path],
+    mime_type: str,
+    enable_vision_fallback: bool = True
+) -> str:
+    """
+    Synchroner Wrapper um extract_text_from_file_async() für Skripte.
+    
+    Startet genau einen Event-Loop pro Aufruf. Innerhalb eines laufenden
+    Event-Loops (FastAPI-Handler) muss stattdessen
+    ``await extract_text_from_file_async(...)`` verwendet werden.
+    
+    Raises:
+        RuntimeError: Wenn aus einem laufenden Event-Loop aufgerufen
+    """
     try:
-        from docx import Document
-        
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(
+            extract_text_from_file_async(file_path, mime_type, enable_vision_fallback)
+        )
+    raise RuntimeError(
+        "extract_text_from_file() im laufenden Event-Loop aufgerufen - "
+        "bitte 'await extract_text_from_file_async(...)' verwenden"
+    )
+
+# ===== STREAMING-EXTRAKTION (SEGMENTE MIT OFFSETS) =====
+
+# Zeilen pro Excel-Segment - begrenzt den Speicher bei großen Tabellen
+EXCEL_ROWS_PER_SEGMENT = 500
+# Zeilen pro TXT/MD-Segment
+TEXT_LINES_PER_SEGMENT = 200
+# Textanfang für Titel-Erkennung und Dokumenttyp-Klassifikation
+TEXT_PREFIX_CHARS = 3000
+
+
+@dataclass
+class TextSegment:
+    """
+    Ein Abschnitt des extrahierten Texts (Seite, Absatz, Tabelle, Sheet-Block).
+    
+    ``start``/``end`` sind Zeichen-Offsets im vollständigen Text, der durch
+    ``"\n".join(segment.text for segment in segments)`` entsteht.
+    """
+    kind: str
+    number: int
+    text: str
+    start: int = 0
+    end: int = 0
+
+
+def _with_offsets(parts: Iterator[Tuple[str, int, str]]) -> Iterator[TextSegment]:
+    """Versieht (kind, number, text)-Tupel mit fortlaufenden Zeichen-Offsets."""
+    offset = 0
+    for kind, number, text in parts:
+        segment = TextSegment(kind=kind, number=number, text=text, start=offset, end=offset + len(text))
+        offset = segment.end + 1  # "\n" als Segment-Trenner
+        yield segment
+
+
+def _detect_text_encoding(file_path: Path) -> str:
+    """UTF-8, wenn die gesamte Datei gültiges UTF-8 ist, sonst Latin-1 (wie bisher ``f.read()``)."""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                decoder.decode(block)
+        decoder.decode(b'', final=True)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+
+def iter_text_file_segments(file_path: Path) -> Iterator[TextSegment]:
+    """
+    Liest TXT/MD Dateien zeilenblockweise.
+    
+    Encoding und Zeilenenden wie beim vollständigen Lesen (UTF-8, sonst
+    Latin-1 für die ganze Datei; universelle Zeilenumbrüche): die
+    zusammengesetzten Segmente ergeben exakt den Dateiinhalt, inklusive
+    abschließendem Zeilenumbruch.
+    """
+    def _parts():
+        with open(file_path, 'r', encoding=_detect_text_encoding(file_path)) as f:
+            block = []
+            block_num = 1
+            for line in f:
+                if len(block) >= TEXT_LINES_PER_SEGMENT:
+                    # Weitere Zeile folgt: der Zeilenumbruch am Blockende ist der Segment-Trenner
+                    yield ("lines", block_num, "".join(block)[:-1])
+                    block = []
+                    block_num += 1
+                block.append(line)
+            if block:
+                yield ("lines", block_num, "".join(block))
+    
+    yield from _with_offsets(_parts())
+
+
+def iter_pdf_segments(file_path: Path) -> Iterator[TextSegment]:
+    """Liest PDF-Dateien seitenweise (PyMuPDF, Fallback PyPDF2) mit ``=== Seite N ===`` Markern."""
+    def _parts():
+        for page in iter_pdf_pages(file_path):
+            text = format_pdf_page(page)
+            if text is not None:
+                yield ("page_error" if page.error is not None else "page", page.page_number, text)
+    
+    yield from _with_offsets(_parts())
+
+
+def iter_word_segments(file_path: Path) -> Iterator[TextSegment]:
+    """Liest Word-Dokumente (.docx) absatzweise, danach die Tabellen."""
+    from docx import Document
+    
+    def _parts():
         doc = Document(str(file_path))
-        text_parts = []
         
         # Absätze extrahieren
-        for paragraph in doc.paragraphs:
+        for paragraph_num, paragraph in enumerate(doc.paragraphs, 1):
             if paragraph.text.strip():
-                text_parts.append(paragraph.text)
+                yield ("paragraph", paragraph_num, paragraph.text)
         
         # Tabellen extrahieren
         for table_num, table in enumerate(doc.tables, 1):
-            text_parts.append(f"\n=== Tabelle {table_num} ===")
+            rows = [f"\n=== Tabelle {table_num} ==="]
             for row in table.rows:
                 row_text = " | ".join(cell.text.strip() for cell in row.cells)
                 if row_text.strip():
-                    text_parts.append(row_text)
+                    rows.append(row_text)
+            yield ("table", table_num, "\n".join(rows))
+    
+    yield from _with_offsets(_parts())
+
+
+def iter_excel_segments(file_path: Path) -> Iterator[TextSegment]:
+    """
+    Liest Excel-Dateien (.xlsx) im read-only Modus in Zeilenblöcken.
+    
+    openpyxl streamt die Zeilen im read-only Modus direkt aus dem ZIP,
+    der Speicherbedarf bleibt daher auch bei sehr großen Tabellen begrenzt.
+    """
+    import openpyxl
+    
+    def _parts():
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            for sheet_num, sheet_name in enumerate(workbook.sheetnames, 1):
+                sheet = workbook[sheet_name]
+                block = [f"\n=== {sheet_name} ==="]
+                kind = "sheet"
+                
+                # Nur nicht-leere Zeilen verarbeiten
+                for row in sheet.iter_rows(values_only=True):
+                    row_values = [str(cell) if cell is not None else "" for cell in row]
+                    row_text = " | ".join(row_values).strip()
+                    
+                    if row_text and row_text != " | " * (len(row_values) - 1):
+                        block.append(row_text)
+                        if len(block) >= EXCEL_ROWS_PER_SEGMENT:
+                            yield (kind, sheet_num, "\n".join(block))
+                            block = []
+                            kind = "sheet_rows"
+                
+                if block:
+                    yield (kind, sheet_num, "\n".join(block))
+        finally:
+            workbook.close()
+    
+    yield from _with_offsets(_parts())
+
+
+def iter_text_segments(file_path: Union[str, Path], mime_type: str) -> Iterator[TextSegment]:
+    """
+    Streamt den Dokumenttext segmentweise (Seite/Absatz/Tabelle/Sheet-Block).
+    
+    Konsumenten können jederzeit abbrechen (z.B. Titel-Erkennung nach 3000
+    Zeichen) oder die Segmente direkt an den Chunker weiterreichen.
+    Parser-Fehler werden als Exception an den Aufrufer weitergegeben.
+    
+    Args:
+        file_path: Pfad zur Datei
+        mime_type: MIME-Type der Datei
         
-        return "\n".join(text_parts) if text_parts else "[Kein Text gefunden]"
+    Yields:
+        TextSegment: Segmente mit Zeichen-Offsets im Gesamttext
+    """
+    file_path = Path(file_path) if isinstance(file_path, str) else file_path
+    
+    if mime_type == 'application/pdf':
+        yield from iter_pdf_segments(file_path)
+    elif mime_type in WORD_MIME_TYPES:
+        yield from iter_word_segments(file_path)
+    elif mime_type in EXCEL_MIME_TYPES:
+        yield from iter_excel_segments(file_path)
+    elif mime_type in TEXT_MIME_TYPES:
+        yield from iter_text_file_segments(file_path)
+
+
+def read_text_prefix(file_path: Union[str, Path], mime_type: str, max_chars: int = TEXT_PREFIX_CHARS) -> str:
+    """
+    Liest nur so viele Segmente, bis ``max_chars`` Zeichen vorliegen.
+    
+    Für Titel-Erkennung und Klassifikation, die ohnehin nur die ersten
+    3000 Zeichen auswerten - große Dokumente werden nicht vollständig geparst.
+    
+    Returns:
+        str: Textanfang (max. ``max_chars`` Zeichen), leer bei Parser-Fehlern
+    """
+    parts = []
+    collected = 0
+    try:
+        for segment in iter_text_segments(file_path, mime_type):
+            parts.append(segment.text)
+            collected = segment.end
+            if collected >= max_chars:
+                break
+    except Exception as e:
+        logger.warning(f"⚠️ Textanfang konnte nicht gelesen werden ({file_path}): {e}")
+    return "\n".join(parts)[:max_chars]
+
+
+async def read_text_prefix_async(file_path: Union[str, Path], mime_type: str, max_chars: int = TEXT_PREFIX_CHARS) -> str:
+    """Async-Variante von read_text_prefix() im Extraktions-Pool."""
+    return await _run_in_extraction_pool(read_text_prefix, file_path, mime_type, max_chars)
+
+
+def _join_segments(segments: Iterator[TextSegment]) -> str:
+    """Setzt Segmente zum vollständigen Text zusammen (kompatibel zu den Offsets)."""
+    return "\n".join(segment.text for segment in segments)
+
+
+def _extract_text_file(file_path: Path) -> str:
+    """Extrahiert Text aus TXT/MD Dateien."""
+    return _join_segments(iter_text_file_segments(file_path))
+
+def _extract_pdf_text(file_path: Path) -> str:
+    """Extrahiert Text aus PDF-Dateien (PyMuPDF, Fallback PyPDF2)."""
+    try:
+        text = _join_segments(iter_pdf_segments(file_path))
+        return text if text else "[Kein Text extrahiert]"
+            
+    except ImportError:
+        return "[PyMuPDF/PyPDF2 nicht installiert]"
+    except Exception as e:
+        return f"[PDF-Extraktion fehlgeschlagen: {str(e)}]"
+
+def _extract_word_text(file_path: Path) -> str:
+    """Extrahiert Text aus Word-Dokumenten (.docx)."""
+    try:
+        text = _join_segments(iter_word_segments(file_path))
+        return text if text else "[Kein Text gefunden]"
         
     except ImportError:
         return "[python-docx nicht installiert]"
@@ -246,24 +554,8 @@ def _extract_word_text(file_path: Path) -> str:
 def _extract_excel_text(file_path: Path) -> str:
     """Extrahiert Text aus Excel-Dateien (.xlsx)."""
     try:
-        import openpyxl
-        
-        workbook = openpyxl.load_workbook(file_path, data_only=True)
-        text_parts = []
-        
-        for sheet_name in workbook.sheetnames:
-            sheet = workbook[sheet_name]
-            text_parts.append(f"\n=== {sheet_name} ===")
-            
-            # Nur nicht-leere Zeilen verarbeiten
-            for row in sheet.iter_rows(values_only=True):
-                row_values = [str(cell) if cell is not None else "" for cell in row]
-                row_text = " | ".join(row_values).strip()
-                
-                if row_text and row_text != " | " * (len(row_values) - 1):
-                    text_parts.append(row_text)
-        
-        return "\n".join(text_parts) if text_parts else "[Kein Inhalt gefunden]"
+        text = _join_segments(iter_excel_segments(file_path))
+        return text if text else "[Kein Inhalt gefunden]"
         
     except ImportError:
         return "[openpyxl nicht installiert]"
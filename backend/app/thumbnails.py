@@ -0,0 +1,267 @@
+"""
+KI-QMS Vorschau-Thumbnails (mehrere Auflösungen, alle Seiten)
+
+Die PNG-Vorschau (``png_preview_path``) ist eine 300-DPI-Seite 1 für die
+Vision API - für Listen- und Galerieansichten viel zu groß. Nach dem Upload
+erzeugt ein Hintergrund-Task je Seite WebP- (Fallback JPEG-) Thumbnails in
+den Größen ``THUMBNAIL_SIZES`` (längste Kante in Pixeln):
+
+    uploads/{type}/.thumbs/<file_hash>/p1-small.webp
+    uploads/{type}/.thumbs/<file_hash>/p1-medium.webp
+    ...
+
+- Quelle: PDF (PyMuPDF, jede Seite einmal in der größten Stufe gerendert und
+  daraus verkleinert), Bilddateien (Pillow, alle Frames), sonst die
+  gespeicherte PNG-Vorschau (nur Seite 1)
+- Schlüssel ist der Inhalts-Hash: identische Uploads teilen sich ihre
+  Thumbnails, bereits erzeugte werden nicht erneut gerendert
+- Je Thumbnail wird der SHA-256 in ``DocumentThumbnail`` gespeichert (ETag
+  für ``/api/documents/{id}/preview/image?size=...``)
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+import hashlib
+import io
+import logging
+import os
+import shutil
+import uuid
+
+from PIL import Image, ImageSequence, features
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .config import get_thumbnail_format, get_thumbnail_max_pages
+from .database import SessionLocal
+from .models import Document as DocumentModel, DocumentThumbnail
+
+logger = logging.getLogger("KI-QMS.Thumbnails")
+
+# Größenstufen: längste Bildkante in Pixeln
+THUMBNAIL_SIZES = {"small": 160, "medium": 480, "large": 1024}
+THUMBNAIL_QUALITY = 80
+THUMBNAIL_DIR_NAME = ".thumbs"
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tif", ".tiff", ".webp"}
+MEDIA_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+
+@dataclass(frozen=True)
+class ThumbnailFile:
+    """Ein geschriebenes Thumbnail mit seinem Inhalts-Hash."""
+    page: int
+    size: str
+    image_format: str
+    path: Path
+    sha256: str
+    file_size: int
+    width: int
+    height: int
+
+
+def thumbnail_format() -> str:
+    """Konfiguriertes Format, JPEG wenn Pillow ohne WebP-Unterstützung gebaut ist."""
+    image_format = get_thumbnail_format()
+    if image_format == "webp" and not features.check("webp"):
+        return "jpeg"
+    return image_format
+
+
+def media_type_for(image_format: str) -> str:
+    return MEDIA_TYPES.get(image_format, "application/octet-stream")
+
+
+def _pdf_pages(path: Path, max_edge: int, max_pages: int) -> Iterator[Image.Image]:
+    """Rendert PDF-Seiten direkt in der größten benötigten Auflösung."""
+    import fitz
+    with fitz.open(path) as doc:
+        for index in range(min(doc.page_count, max_pages)):
+            page = doc.load_page(index)
+            zoom = max_edge / max(page.rect.width, page.rect.height, 1)
+            pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+            yield Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+
+
+def _image_pages(path: Path, max_pages: int) -> Iterator[Image.Image]:
+    """Alle Frames einer Bilddatei (z.B. mehrseitiges TIFF)."""
+    with Image.open(path) as image:
+        for index, frame in enumerate(ImageSequence.Iterator(image)):
+            if index >= max_pages:
+                break
+            yield frame.convert("RGB")
+
+
+def _source_pages(source: Path, max_edge: int, max_pages: int) -> Iterator[Image.Image]:
+    suffix = source.suffix.lower()
+    if suffix == ".pdf":
+        return _pdf_pages(source, max_edge, max_pages)
+    if suffix in IMAGE_SUFFIXES:
+        return _image_pages(source, max_pages)
+    raise ValueError(f"Keine Thumbnail-Quelle für Dateityp {suffix}")
+
+
+def _encode(image: Image.Image, image_format: str) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format.upper(), quality=THUMBNAIL_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def _write_atomic(path: Path, data: bytes):
+    part_path = path.with_name(f".{uuid.uuid4().hex}.part")
+    with open(part_path, 'wb') as f:
+        f.write(data)
+    os.replace(part_path, path)
+
+
+def render_thumbnails(source: Path, target_dir: Path, image_format: str,
+                      sizes: Optional[Dict[str, int]] = None,
+                      max_pages: int = 50) -> List[ThumbnailFile]:
+    """
+    Schreibt für jede Seite von ``source`` ein Thumbnail je Größenstufe.
+
+    Größere Stufen werden zuerst erzeugt, kleinere aus der größeren
+    verkleinert; kleine Vorlagen werden nicht hochskaliert.
+
+    Raises:
+        ValueError: wenn ``source`` weder PDF noch Bilddatei ist
+    """
+    sizes = sizes or THUMBNAIL_SIZES
+    ordered = sorted(sizes.items(), key=lambda item: item[1], reverse=True)
+    suffix = "jpg" if image_format == "jpeg" else image_format
+    target_dir.mkdir(parents=True, exist_ok=True)
+
+    written: List[ThumbnailFile] = []
+    for page_number, page_image in enumerate(_source_pages(source, ordered[0][1], max_pages), start=1):
+        image = page_image
+        for size_name, max_edge in ordered:
+            image = image.copy()
+            image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+            data = _encode(image, image_format)
+            path = target_dir / f"p{page_number}-{size_name}.{suffix}"
+            _write_atomic(path, data)
+            written.append(ThumbnailFile(
+                page=page_number, size=size_name, image_format=image_format, path=path,
+                sha256=hashlib.sha256(data).hexdigest(), file_size=len(data),
+                width=image.width, height=image.height
+            ))
+    return written
+
+
+def thumbnail_source(document: DocumentModel) -> Optional[Path]:
+    """Original (PDF/Bild), sonst die PNG-Vorschau; None wenn nichts vorliegt."""
+    if document.file_path:
+        original = Path(document.file_path)
+        if original.suffix.lower() == ".pdf" or original.suffix.lower() in IMAGE_SUFFIXES:
+            if original.exists():
+                return original
+    if document.png_preview_path and Path(document.png_preview_path).exists():
+        return Path(document.png_preview_path)
+    return None
+
+
+def thumbnail_dir(document: DocumentModel) -> Path:
+    """Thumbnail-Verzeichnis neben dem Original, benannt nach dem Inhalts-Hash."""
+    base = Path(document.file_path or document.png_preview_path).parent
+    return base / THUMBNAIL_DIR_NAME / document.file_hash
+
+
+def get_thumbnail(db: Session, content_hash: Optional[str], page: int, size: str) -> Optional[DocumentThumbnail]:
+    if not content_hash:
+        return None
+    return db.scalars(
+        select(DocumentThumbnail).where(
+            DocumentThumbnail.content_hash == content_hash,
+            DocumentThumbnail.page == page,
+            DocumentThumbnail.size == size
+        )
+    ).first()
+
+
+def list_thumbnails(db: Session, content_hash: Optional[str]) -> List[DocumentThumbnail]:
+    if not content_hash:
+        return []
+    return list(db.scalars(
+        select(DocumentThumbnail)
+        .where(DocumentThumbnail.content_hash == content_hash)
+        .order_by(DocumentThumbnail.page, DocumentThumbnail.width)
+    ))
+
+
+def generate_document_thumbnails(document_id: int) -> int:
+    """
+    Hintergrund-Task nach dem Upload: Thumbnails für ein Dokument erzeugen.
+
+    Läuft mit eigener Session (die Request-Session ist dann bereits
+    geschlossen). Fehler werden nur protokolliert - die PNG-Vorschau bleibt
+    als Rückfall erhalten.
+
+    Returns:
+        int: Anzahl neu gespeicherter Thumbnails
+    """
+    db = SessionLocal()
+    try:
+        document = db.get(DocumentModel, document_id)
+        if document is None or not document.file_hash:
+            return 0
+        if db.scalar(select(DocumentThumbnail.id).where(DocumentThumbnail.content_hash == document.file_hash).limit(1)):
+            logger.debug(f"♻️ Thumbnails für Inhalt {document.file_hash[:8]}... bereits vorhanden")
+            return 0
+
+        source = thumbnail_source(document)
+        if source is None:
+            logger.info(f"ℹ️ Keine Thumbnail-Quelle für Dokument {document_id}")
+            return 0
+
+        thumbnails = render_thumbnails(source, thumbnail_dir(document), thumbnail_format(),
+                                       max_pages=get_thumbnail_max_pages())
+        db.add_all(DocumentThumbnail(
+            content_hash=document.file_hash, page=thumb.page, size=thumb.size,
+            image_format=thumb.image_format, path=str(thumb.path), file_hash=thumb.sha256,
+            file_size=thumb.file_size, width=thumb.width, height=thumb.height
+        ) for thumb in thumbnails)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Paralleler Upload desselben Inhalts war schneller
+            db.rollback()
+            return 0
+
+        total_size = sum(thumb.file_size for thumb in thumbnails)
+        pages = len({thumb.page for thumb in thumbnails})
+        logger.info(f"🖼️ {len(thumbnails)} Thumbnails für Dokument {document_id} erzeugt ({pages} Seiten, {total_size} Bytes)")
+        return len(thumbnails)
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"⚠️ Thumbnail-Erzeugung für Dokument {document_id} fehlgeschlagen: {e}")
+        return 0
+    finally:
+        db.close()
+
+
+def remove_thumbnails(db: Session, content_hash: Optional[str]) -> int:
+    """
+    Entfernt Thumbnails eines Inhalts, auf den kein Dokument mehr verweist.
+
+    Returns:
+        int: Anzahl entfernter Thumbnails
+    """
+    if not content_hash:
+        return 0
+    if db.scalar(select(DocumentModel.id).where(DocumentModel.file_hash == content_hash).limit(1)) is not None:
+        return 0
+
+    thumbnails = list_thumbnails(db, content_hash)
+    for directory in {Path(thumb.path).parent for thumb in thumbnails}:
+        shutil.rmtree(directory, ignore_errors=True)
+        try:
+            directory.parent.rmdir()  # leeres .thumbs-Verzeichnis
+        except OSError:
+            pass
+    db.execute(delete(DocumentThumbnail).where(DocumentThumbnail.content_hash == content_hash))
+    db.commit()
+    if thumbnails:
+        logger.info(f"🗑️ {len(thumbnails)} Thumbnails für Inhalt {content_hash[:8]}... entfernt")
+    return len(thumbnails)
@@ -0,0 +1,80 @@
+"""
+KI-QMS Token-Sperrliste (JWT-Revocation)
+
+JWTs sind zustandslos - ohne Sperrliste wäre ein Token bis zum Ablauf
+gültig. Diese In-Memory-Sperrliste wird bei jedem Request vor allen
+anderen Prüfungen abgefragt (reiner Dictionary-Zugriff, kein DB-Zugriff):
+
+- Einzelne Tokens (``jti``), z.B. bei ``/api/auth/logout`` - Einträge
+  verfallen automatisch mit dem Ablaufzeitpunkt des Tokens
+- Alle Tokens eines Benutzers, die vor einem Zeitpunkt ausgestellt wurden
+  (``iat``), z.B. nach Deaktivierung, Löschung oder Passwort-Reset durch
+  einen Administrator
+
+Die Sperrliste gilt pro Prozess. Bei mehreren Uvicorn-Workern greifen in
+den übrigen Prozessen die Deaktivierungsprüfung und die TTL des
+Principal-Caches (siehe principal_cache.py).
+"""
+
+from typing import Dict, Optional
+import logging
+import threading
+import time
+
+from .config import get_access_token_expire_minutes
+
+logger = logging.getLogger("KI-QMS.TokenRevocation")
+
+
+class TokenDenylist:
+    """Gesperrte Token-IDs und Sperrzeitpunkte je Benutzer."""
+
+    def __init__(self, max_token_lifetime_seconds: int):
+        self.max_token_lifetime_seconds = max_token_lifetime_seconds
+        self._lock = threading.Lock()
+        self._revoked_tokens: Dict[str, float] = {}
+        self._revoked_users: Dict[int, float] = {}
+
+    def revoke_token(self, jti: str, expires_at: Optional[float] = None):
+        """Sperrt ein einzelnes Token bis zu seinem Ablauf."""
+        if not jti:
+            return
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            self._revoked_tokens[jti] = expires_at or now + self.max_token_lifetime_seconds
+
+    def revoke_user(self, user_id: int):
+        """Sperrt alle bis jetzt ausgestellten Tokens eines Benutzers."""
+        with self._lock:
+            self._prune(time.time())
+            self._revoked_users[user_id] = time.time()
+        logger.info(f"🔒 Tokens von Benutzer {user_id} gesperrt")
+
+    def is_revoked(self, user_id: int, payload: dict) -> bool:
+        """True, wenn das Token einzeln oder über seinen Benutzer gesperrt ist."""
+        jti = payload.get("jti")
+        if jti and jti in self._revoked_tokens:
+            return True
+        revoked_at = self._revoked_users.get(user_id)
+        if revoked_at is not None and float(payload.get("iat") or 0) <= revoked_at:
+            return True
+        return False
+
+    def _prune(self, now: float):
+        """Entfernt abgelaufene Einträge (Aufruf unter Lock)."""
+        self._revoked_tokens = {jti: exp for jti, exp in self._revoked_tokens.items() if exp > now}
+        cutoff = now - self.max_token_lifetime_seconds
+        self._revoked_users = {uid: ts for uid, ts in self._revoked_users.items() if ts > cutoff}
+
+    def __len__(self) -> int:
+        return len(self._revoked_tokens) + len(self._revoked_users)
+
+
+# Globale Sperrliste
+token_denylist = TokenDenylist(get_access_token_expire_minutes() * 60)
+
+
+def revoke_user_tokens(user_id: int):
+    """Nach Deaktivierung, Löschung oder Passwort-Reset eines Benutzers aufrufen."""
+    token_denylist.revoke_user(user_id)
@@ -0,0 +1,275 @@
+"""
+KI-QMS Vision-Ergebnis-Merge (mehrseitige Dokumente)
+
+Jede Seite eines Dokuments wird einzeln von der Vision API analysiert und
+liefert ein eigenes JSON (Prozessschritte, all_extracted_texts, Referenzen,
+Tabellen, ...). ``VisionResultMerger`` fügt diese Seiten-Ergebnisse ohne
+weiteren LLM-Aufruf zu einem Dokument-JSON zusammen:
+
+- Seiten werden beim Eintreffen normalisiert (``add_page``), während die
+  übrigen Seiten noch analysiert werden; ``merge()`` setzt in
+  Seitenreihenfolge zusammen
+- Prozessschritte: Nummerierung über Seiten fortgeführt (inkl.
+  Ja/Nein-Verweisen), ``source_page`` je Schritt
+- Tabellen: Fortsetzung auf der Folgeseite (gleiche Kopfzeile) wird an die
+  Tabelle angehängt
+- Objekt-Listen (Referenzen, Definitionen, ...): Duplikate entfernt,
+  ``source_pages`` je Eintrag
+- Text-Listen (all_extracted_texts, ...): Reihenfolge und inhaltliche
+  Wiederholungen (z.B. "Ja"/"Nein") bleiben erhalten; nur Kopf-/Fußzeilen
+  (auf jeder Seite am Anfang/Ende einer Text-Liste oder auf den meisten
+  Seiten einmal vorhanden) erscheinen einmal und werden in
+  ``merge_info.repeated_texts`` mit ihren Seiten ausgewiesen
+- Einzelwerte (Metadaten): erster nicht-leerer Wert
+
+Ein einseitiges Dokument wird unverändert zurückgegeben.
+"""
+
+from typing import Any, Dict, List, Optional
+import json
+import logging
+
+from .json_parser import get_global_parser
+
+logger = logging.getLogger("KI-QMS.VisionMerge")
+
+# Transport-Felder der Vision-Aufrufe (kein Dokumentinhalt)
+RESULT_META_KEYS = {
+    "success", "content", "context", "tokens_used", "provider", "parsing_method",
+    "parsed_json", "raw_response", "page",
+}
+STEP_REFERENCE_KEYS = ("yes_next_step_number", "no_next_step_number")
+# Kopf-/Fußzeilen: so viele Einträge am Anfang/Ende einer Text-Liste zählen als Seitenrand
+HEADER_FOOTER_LINES = 2
+# "Auf den meisten Seiten" erst ab dieser Seitenzahl (bei 2 Seiten nur Seitenrand)
+MAJORITY_MIN_PAGES = 3
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == 0 or value == [] or value == {}
+
+
+def _identity(item: Dict[str, Any]) -> str:
+    """Vergleichsschlüssel eines Listeneintrags (ohne Provenienz, Groß-/Kleinschreibung egal)."""
+    content = {key: value for key, value in item.items() if key not in ("source_page", "source_pages")}
+    return json.dumps(content, sort_keys=True, ensure_ascii=False).lower()
+
+
+def _step_number(step: Dict[str, Any]) -> Optional[int]:
+    try:
+        return int(step.get("step_number"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _text_lists(data: Dict[str, Any]):
+    """Alle Text-Listen einer Seite (ohne Prozessschritte und Tabellen), Texte getrimmt."""
+    for key, value in data.items():
+        if key in ("process_steps", "tables"):
+            continue
+        if isinstance(value, dict):
+            yield from _text_lists(value)
+        elif isinstance(value, list):
+            texts = [item.strip() for item in value if isinstance(item, str) and item.strip()]
+            if texts:
+                yield texts
+
+
+def _header_footer_texts(pages: List[Dict[str, Any]]) -> set:
+    """
+    Kopf-/Fußzeilen eines mehrseitigen Dokuments: Texte, die auf jeder Seite am
+    Anfang oder Ende einer Text-Liste stehen, oder (ab MAJORITY_MIN_PAGES Seiten)
+    auf mehr als der Hälfte der Seiten genau einmal vorkommen. Texte, die sich
+    innerhalb einer Seite wiederholen, sind Inhalt (z.B. "Ja"/"Nein").
+    """
+    edge_pages: Dict[str, set] = {}
+    text_pages: Dict[str, set] = {}
+    repeated_on_page = set()
+    for page_index, data in enumerate(pages):
+        page_counts: Dict[str, int] = {}
+        for texts in _text_lists(data):
+            for text in texts:
+                page_counts[text] = page_counts.get(text, 0) + 1
+            for text in texts[:HEADER_FOOTER_LINES] + texts[-HEADER_FOOTER_LINES:]:
+                edge_pages.setdefault(text, set()).add(page_index)
+        for text, count in page_counts.items():
+            text_pages.setdefault(text, set()).add(page_index)
+            if count > 1:
+                repeated_on_page.add(text)
+
+    headers = {text for text, found in edge_pages.items() if len(found) == len(pages)}
+    if len(pages) >= MAJORITY_MIN_PAGES:
+        headers |= {
+            text for text, found in text_pages.items()
+            if len(found) * 2 > len(pages) and text not in repeated_on_page
+        }
+    return headers
+
+
+def page_json(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Inhalt eines Vision-Ergebnisses als Dict (geparstes JSON oder Rohtext)."""
+    if isinstance(result.get("parsed_json"), dict):
+        return result["parsed_json"]
+
+    content = result.get("content")
+    if isinstance(content, dict):
+        return content
+    if isinstance(content, str) and content.strip():
+        parsed = get_global_parser().parse_json_object(content)
+        if parsed is not None:
+            return parsed
+
+    data = {key: value for key, value in result.items() if key not in RESULT_META_KEYS}
+    if data:
+        return data
+    return {"extracted_text": result.get("extracted_text") or result.get("description") or content or ""}
+
+
+class VisionResultMerger:
+    """Sammelt Seiten-Ergebnisse (beliebige Reihenfolge) und fügt sie zusammen."""
+
+    def __init__(self):
+        self._pages: Dict[int, Dict[str, Any]] = {}
+
+    def add_page(self, page_number: int, result: Dict[str, Any]):
+        """Nimmt das Ergebnis einer Seite auf (1-basiert), sobald es vorliegt."""
+        self._pages[page_number] = page_json(result)
+
+    @property
+    def page_count(self) -> int:
+        return len(self._pages)
+
+    def merge(self) -> Dict[str, Any]:
+        pages = sorted(self._pages)
+        if not pages:
+            return {}
+        if len(pages) == 1:
+            return self._pages[pages[0]]
+
+        merged: Dict[str, Any] = {}
+        # Nur Kopf-/Fußzeilen werden zusammengefasst (Seiten je Text)
+        text_pages: Dict[str, List[int]] = {
+            text: [] for text in _header_footer_texts([self._pages[page_number] for page_number in pages])
+        }
+        for page_number in pages:
+            self._merge_into(merged, self._pages[page_number], page_number, text_pages)
+
+        repeated = {text: page_list for text, page_list in text_pages.items() if len(page_list) > 1}
+        merged["merge_info"] = {
+            "pages": len(pages),
+            "merged_from_pages": pages,
+            "repeated_texts": repeated,
+        }
+        logger.info(f"🧩 {len(pages)} Seiten zusammengeführt ({len(repeated)} wiederkehrende Texte entfernt)")
+        return merged
+
+    def _merge_into(self, target: Dict[str, Any], source: Dict[str, Any], page_number: int,
+                    text_pages: Dict[str, List[int]]):
+        for key, value in source.items():
+            if key == "process_steps" and isinstance(value, list):
+                self._merge_steps(target.setdefault(key, []), value, page_number)
+            elif key == "tables" and isinstance(value, list):
+                self._merge_tables(target.setdefault(key, []), value, page_number)
+            elif key == "extracted_text" and isinstance(value, str):
+                if value.strip():
+                    existing = target.get(key, "")
+                    target[key] = f"{existing}\n\n--- Seite {page_number} ---\n{value}".lstrip()
+            elif isinstance(value, dict):
+                existing = target.get(key)
+                if not isinstance(existing, dict):
+                    existing = target[key] = {}
+                self._merge_into(existing, value, page_number, text_pages)
+            elif isinstance(value, list):
+                existing = target.get(key)
+                if not isinstance(existing, list):
+                    existing = target[key] = []
+                self._merge_list(existing, value, page_number, text_pages)
+            elif _is_empty(target.get(key)) and not _is_empty(value):
+                target[key] = value
+            elif key not in target:
+                target[key] = value
+
+    def _merge_list(self, target: List[Any], items: List[Any], page_number: int,
+                    text_pages: Dict[str, List[int]]):
+        """
+        Objekte: Duplikate mit source_pages; Werte: geordnete Vereinigung;
+        Texte: angehängt, Kopf-/Fußzeilen (Schlüssel in text_pages) nur einmal.
+        """
+        known = {}
+        for index, item in enumerate(target):
+            known[self._value_identity(item)] = index
+
+        for item in items:
+            if _is_empty(item):
+                continue
+            if isinstance(item, dict):
+                identity = _identity(item)
+                if identity in known:
+                    pages = target[known[identity]].setdefault("source_pages", [])
+                    if page_number not in pages:
+                        pages.append(page_number)
+                    continue
+                known[identity] = len(target)
+                target.append({**item, "source_pages": [page_number]})
+                continue
+
+            identity = self._value_identity(item)
+            if isinstance(item, str):
+                page_list = text_pages.get(item.strip())
+                if page_list is None:
+                    target.append(item)
+                    continue
+                if page_number not in page_list:
+                    page_list.append(page_number)
+            if identity not in known:
+                known[identity] = len(target)
+                target.append(item)
+
+    @staticmethod
+    def _value_identity(item: Any) -> str:
+        if isinstance(item, dict):
+            return _identity(item)
+        if isinstance(item, str):
+            item = item.strip()
+        return json.dumps(item, ensure_ascii=False)
+
+    def _merge_steps(self, target: List[Dict[str, Any]], steps: List[Any], page_number: int):
+        """Hängt Prozessschritte an; seitenlokale Nummern werden fortgeführt."""
+        steps = [step for step in steps if isinstance(step, dict)]
+        previous_max = max((_step_number(step) or 0 for step in target), default=0)
+        page_numbers = [number for number in (_step_number(step) for step in steps) if number is not None]
+        # Neu bei 1 beginnende Seiten verschieben, fortlaufend nummerierte übernehmen
+        offset = previous_max - min(page_numbers) + 1 if page_numbers and min(page_numbers) <= previous_max else 0
+
+        for step in steps:
+            step = {**step, "source_page": page_number}
+            if offset:
+                if _step_number(step) is not None:
+                    step["step_number"] = _step_number(step) + offset
+                decision = step.get("decision")
+                if isinstance(decision, dict):
+                    decision = dict(decision)
+                    for reference_key in STEP_REFERENCE_KEYS:
+                        if isinstance(decision.get(reference_key), int) and decision[reference_key] > 0:
+                            decision[reference_key] += offset
+                    step["decision"] = decision
+            target.append(step)
+
+    def _merge_tables(self, target: List[Dict[str, Any]], tables: List[Any], page_number: int):
+        """Tabellen mit gleicher Kopfzeile direkt auf der Folgeseite werden fortgesetzt."""
+        for table in tables:
+            if not isinstance(table, dict):
+                continue
+            previous = target[-1] if target else None
+            headers = table.get("headers") or table.get("columns")
+            if (previous is not None and headers
+                    and headers == (previous.get("headers") or previous.get("columns"))
+                    and page_number - 1 in previous.get("source_pages", [])
+                    and isinstance(previous.get("rows"), list) and isinstance(table.get("rows"), list)):
+                previous["rows"].extend(table["rows"])
+                previous["source_pages"].append(page_number)
+                continue
+            entry = {**table, "source_pages": [page_number]}
+            if isinstance(table.get("rows"), list):
+                entry["rows"] = list(table["rows"])
+            target.append(entry)
@@ -37,6 +37,10 @@ import mimetypes
 import tempfile
 from datetime import datetime
 
+from .config import get_vision_page_concurrency
+from .file_ingest import file_sha256
+from .vision_merge import VisionResultMerger
+
 # Document Processing
 try:
     import fitz  # PyMuPDF for PDF processing
@@ -127,25 +131,23 @@ class VisionOCREngine:
         import os
         return os.getenv('GOOGLE_AI_API_KEY')
 
-    async def _get_or_convert_images(self, file_path: Path, dpi: int = 300) -> List[bytes]:
+    async def _get_or_convert_images(self, file_path: Path, dpi: int = 300, file_hash: Optional[str] = None) -> List[bytes]:
         """
         ⚡ Cached Image Conversion - verhindert doppelte LibreOffice-Aufrufe
         
         Args:
             file_path: Pfad zur Datei
             dpi: Bildauflösung (Standard: 300)
+            file_hash: SHA-256 aus dem Upload (sonst aus der Hash-Registry bzw. blockweise berechnet)
             
         Returns:
             Liste der konvertierten Bilder (aus Cache oder neu konvertiert)
         """
-        import hashlib
         import os
         
-        # Berechne Datei-Hash für Cache-Validierung
+        # Datei-Hash für Cache-Validierung (nur lesen, wenn noch unbekannt)
         try:
-            with open(file_path, 'rb') as f:
-                file_content = f.read()
-                current_hash = hashlib.sha256(file_content).hexdigest()
+            current_hash = file_hash or file_sha256(file_path)
         except Exception as e:
             logger.warning(f"⚠️ Kann Datei-Hash nicht berechnen: {e}")
             current_hash = f"{file_path}_{os.path.getmtime(file_path)}"
@@ -524,8 +526,8 @@ class VisionOCREngine:
             # Bild von Base64 zu Bytes konvertieren
             image_bytes = base64.b64decode(image_b64)
             
-            # Gemini Vision API aufrufen
-            response = self.gemini_client.generate_content([
+            # Gemini Vision API aufrufen (blockierender Client im Thread - Seiten laufen parallel)
+            response = await asyncio.to_thread(self.gemini_client.generate_content, [
                 prompt,
                 {"mime_type": "image/jpeg", "data": image_bytes}
             ])
@@ -627,7 +629,8 @@ class VisionOCREngine:
             
             for attempt in range(max_retries):
                 try:
-                    response = self.client.chat.completions.create(
+                    response = await asyncio.to_thread(
+                        self.client.chat.completions.create,
                         model=self.model,
                         messages=[
                             {
@@ -960,26 +963,9 @@ Kontext: {context}
                         'error': 'OpenAI API Key nicht konfiguriert'
                     }
             
-            results = []
-            total_tokens = 0
-            
-            for i, image_bytes in enumerate(images):
-                logger.info(f"📸 Verarbeite Bild {i+1}/{len(images)}")
-                
-                # Bild zu Base64 konvertieren
-                image_b64 = base64.b64encode(image_bytes).decode('utf-8')
-                
-                # Vision-Analyse durchführen mit Provider-Auswahl
-                if preferred_provider == "gemini":
-                    result = await self._analyze_image_with_gemini_vision(image_b64, f"Bild {i+1} aus {len(images)}", prompt)
-                else:
-                    result = await self._analyze_image_with_gpt4_vision(image_b64, f"Bild {i+1} aus {len(images)}", prompt)
-                
-                if result['success']:
-                    results.append(result)
-                    total_tokens += result.get('tokens_used', 0)
-                else:
-                    logger.warning(f"⚠️ Bild {i+1} Analyse fehlgeschlagen: {result.get('error')}")
+            # Seiten parallel analysieren, Ergebnisse beim Eintreffen zusammenführen
+            results, combined_analysis = await self._analyze_pages(images, prompt, preferred_provider)
+            total_tokens = sum(result.get('tokens_used', 0) for result in results)
             
             if not results:
                 return {
@@ -987,9 +973,6 @@ Kontext: {context}
                     'error': 'Keine Bilder erfolgreich analysiert'
                 }
             
-            # Ergebnisse kombinieren
-            combined_analysis = self._combine_vision_results(results)
-            
             # 🔧 WICHTIG: Die Vision API gibt bereits das perfekte JSON zurück!
             # KEINE weitere Verpackung in content-Feld!
             # Die Vision API gibt direkt das gewünschte JSON zurück
@@ -1008,118 +991,68 @@ Kontext: {context}
                 'error': str(e)
             }
 
-    def _combine_vision_results(self, results: List[Dict]) -> Dict:
-        """
-        Kombiniert mehrere Vision-Analyse-Ergebnisse zu einem konsistenten Format.
-        """
-        # 🔧 WICHTIG: Die Vision API gibt bereits das perfekte JSON zurück!
-        # Wir müssen nur das erste Ergebnis verwenden, da es bereits das gewünschte Format hat
-        if results and len(results) > 0:
-            first_result = results[0]
-            
-            # ✅ KRITISCH: Die Vision API gibt das JSON direkt in 'content' zurück!
-            if 'content' in first_result:
-                # Das ist das echte JSON aus der Vision API
-                try:
-                    import json
-                    # Versuche das content als JSON zu parsen
-                    if isinstance(first_result['content'], str):
-                        parsed_json = json.loads(first_result['content'])
-                        logger.info(f"✅ JSON erfolgreich geparst: {len(str(parsed_json))} Zeichen")
-                        return parsed_json
-                    else:
-                        logger.info(f"✅ Content ist bereits JSON: {len(str(first_result['content']))} Zeichen")
-                        return first_result['content']
-                except json.JSONDecodeError as e:
-                    logger.warning(f"⚠️ JSON-Parsing fehlgeschlagen: {e}")
-                    # Fallback: Verwende content als String
-                    return {'extracted_text': first_result['content']}
-            elif 'parsed_json' in first_result:
-                # Verwende das bereits geparste JSON
-                logger.info(f"✅ Verwende bereits geparste JSON: {len(str(first_result['parsed_json']))} Zeichen")
-                return first_result['parsed_json']
-            elif 'extracted_text' in first_result:
-                # Fallback: Extrahierter Text (sollte JSON sein)
-                try:
-                    import json
-                    if isinstance(first_result['extracted_text'], str):
-                        parsed_json = json.loads(first_result['extracted_text'])
-                        logger.info(f"✅ Extracted_text als JSON geparst: {len(str(parsed_json))} Zeichen")
-                        return parsed_json
-                    else:
-                        logger.info(f"✅ Extracted_text ist bereits JSON: {len(str(first_result['extracted_text']))} Zeichen")
-                        return first_result['extracted_text']
-                except json.JSONDecodeError as e:
-                    logger.warning(f"⚠️ Extracted_text JSON-Parsing fehlgeschlagen: {e}")
-                    return {'extracted_text': first_result['extracted_text']}
-            elif 'description' in first_result:
-                # Fallback: Beschreibung verwenden
-                logger.info(f"✅ Verwende description: {len(first_result['description'])} Zeichen")
-                return {'extracted_text': first_result['description']}
-            elif 'provider' in first_result and first_result['provider'] == 'gemini':
-                # Gemini-spezifische Behandlung
-                if 'parsed_json' in first_result:
-                    # Verwende das bereits geparste JSON
-                    logger.info(f"✅ Gemini parsed_json: {len(str(first_result['parsed_json']))} Zeichen")
-                    return first_result['parsed_json']
-                elif 'content' in first_result:
-                    # Versuche das content zu parsen
-                    try:
-                        import json
-                        if isinstance(first_result['content'], str):
-                            parsed_json = json.loads(first_result['content'])
-                            logger.info(f"✅ Gemini content als JSON geparst: {len(str(parsed_json))} Zeichen")
-                            return parsed_json
-                        else:
-                            logger.info(f"✅ Gemini content ist bereits JSON: {len(str(first_result['content']))} Zeichen")
-                            return first_result['content']
-                    except json.JSONDecodeError as e:
-                        logger.warning(f"⚠️ Gemini content JSON-Parsing fehlgeschlagen: {e}")
-                        # Fallback: Rohe Antwort
-                        return {'extracted_text': first_result['content']}
-                else:
-                    # Fallback für Gemini
-                    logger.info(f"✅ Gemini Fallback: {len(first_result.get('extracted_text', ''))} Zeichen")
-                    return {'extracted_text': first_result.get('extracted_text', '')}
+    async def _analyze_page(self, image_bytes: bytes, page_number: int, page_total: int,
+                            prompt: str, preferred_provider: str) -> Dict[str, Any]:
+        """Analysiert eine Seite mit dem gewählten Provider."""
+        logger.info(f"📸 Verarbeite Bild {page_number}/{page_total}")
         
-        # Fallback: Alte Logik für Kompatibilität
-        logger.warning("⚠️ Verwende Fallback-Logik - keine gültigen Ergebnisse gefunden")
-        combined = {
-            'text': '',
-            'words': [],
-            'process_references': [],
-            'structured_analysis': {}
-        }
+        # Bild zu Base64 konvertieren
+        image_b64 = base64.b64encode(image_bytes).decode('utf-8')
+        context = f"Bild {page_number} aus {page_total}"
         
-        for result in results:
-            # Text kombinieren
-            if result.get('extracted_text'):
-                combined['text'] += result['extracted_text'] + '\n\n'
-            elif result.get('description'):
-                combined['text'] += result['description'] + '\n\n'
-            
-            # Wörter aus Text extrahieren
-            import re
-            text_content = result.get('extracted_text', '') + ' ' + result.get('description', '')
-            if text_content:
-                words = re.findall(r'\b\w+\b', text_content)
-                combined['words'].extend(words)
-            
-            # Prozess-Referenzen sammeln
-            if result.get('process_references'):
-                combined['process_references'].extend(result['process_references'])
+        if preferred_provider == "gemini":
+            return await self._analyze_image_with_gemini_vision(image_b64, context, prompt)
+        return await self._analyze_image_with_gpt4_vision(image_b64, context, prompt)
+
+    async def _analyze_pages(self, images: List[bytes], prompt: str, preferred_provider: str,
+                             fail_fast: bool = False) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Analysiert alle Seiten parallel (max. VISION_PAGE_CONCURRENCY) und
+        übergibt jedes Ergebnis sofort an den VisionResultMerger.
+        
+        Args:
+            fail_fast: Fehlgeschlagene Seite bricht ab (Exception) statt übersprungen zu werden
             
-            # Strukturierte Analyse kombinieren
-            if result.get('process_flow'):
-                combined['structured_analysis']['process_flow'] = result.get('process_flow', [])
-            if result.get('document_title'):
-                combined['structured_analysis']['document_title'] = result.get('document_title', '')
+        Returns:
+            (erfolgreiche Seiten-Ergebnisse in Seitenreihenfolge, zusammengeführtes Dokument-JSON)
+        """
+        semaphore = asyncio.Semaphore(get_vision_page_concurrency())
+        merger = VisionResultMerger()
+        results = []
         
-        # Duplikate entfernen
-        combined['words'] = list(set(combined['words']))
-        combined['process_references'] = list(set(combined['process_references']))
+        async def analyze(index: int, image_bytes: bytes):
+            async with semaphore:
+                return index, await self._analyze_page(image_bytes, index + 1, len(images), prompt, preferred_provider)
         
-        return combined
+        tasks = [asyncio.create_task(analyze(index, image_bytes)) for index, image_bytes in enumerate(images)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                index, result = await finished
+                if not result.get('success'):
+                    error_msg = result.get('error', 'Unbekannter Fehler')
+                    if fail_fast:
+                        raise Exception(f"Vision-Analyse für Bild {index + 1} fehlgeschlagen: {error_msg}")
+                    logger.warning(f"⚠️ Bild {index + 1} Analyse fehlgeschlagen: {error_msg}")
+                    continue
+                result['page'] = index + 1
+                results.append(result)
+                merger.add_page(index + 1, result)
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        results.sort(key=lambda result: result['page'])
+        return results, merger.merge()
+
+    def _combine_vision_results(self, results: List[Dict]) -> Dict:
+        """
+        Kombiniert mehrere Vision-Analyse-Ergebnisse (eine Seite je Ergebnis,
+        in Seitenreihenfolge) zu einem Dokument-JSON - siehe VisionResultMerger.
+        """
+        merger = VisionResultMerger()
+        for index, result in enumerate(results):
+            merger.add_page(result.get('page', index + 1), result)
+        return merger.merge()
 
     async def analyze_document_with_api_prompt(self, images: List[bytes], document_type: str, preferred_provider: str = "openai_4o_mini", custom_prompt: str = None) -> Dict[str, Any]:
         """
@@ -1200,44 +1133,15 @@ Kontext: {context}
             else:
                 raise Exception(f"Provider {preferred_provider} nicht unterstützt. Verfügbare Provider: auto, openai_4o_mini, ollama, gemini")
             
-            # 3. Vision-Analyse mit EXAKTEM Prompt
-            results = []
-            total_tokens = 0
-            
-            for i, image_bytes in enumerate(images):
-                logger.info(f"📸 Verarbeite Bild {i+1}/{len(images)}")
-                
-                # Bild zu Base64 konvertieren
-                image_b64 = base64.b64encode(image_bytes).decode('utf-8')
-                
-                # Vision-Analyse mit EXAKTEM Prompt und Provider-Auswahl
-                if preferred_provider == "gemini":
-                    result = await self._analyze_image_with_gemini_vision(
-                        image_b64, 
-                        f"Bild {i+1} aus {len(images)}", 
-                        prompt
-                    )
-                else:
-                    result = await self._analyze_image_with_gpt4_vision(
-                        image_b64, 
-                        f"Bild {i+1} aus {len(images)}", 
-                        prompt
-                    )
-                
-                if result['success']:
-                    results.append(result)
-                    total_tokens += result.get('tokens_used', 0)
-                else:
-                    # 🚨 KEIN FALLBACK - Fehler werfen für Auditierbarkeit!
-                    error_msg = result.get('error', 'Unbekannter Fehler')
-                    raise Exception(f"Vision-Analyse für Bild {i+1} fehlgeschlagen: {error_msg}")
+            # 3. Vision-Analyse mit EXAKTEM Prompt (Seiten parallel, 🚨 KEIN FALLBACK:
+            #    eine fehlgeschlagene Seite bricht die Analyse für Auditierbarkeit ab)
+            # 4. Ergebnisse beim Eintreffen seitenweise zusammenführen
+            results, combined_analysis = await self._analyze_pages(images, prompt, preferred_provider, fail_fast=True)
+            total_tokens = sum(result.get('tokens_used', 0) for result in results)
             
             if not results:
                 raise Exception("Keine Bilder erfolgreich analysiert")
             
-            # 4. Ergebnisse kombinieren
-            combined_analysis = self._combine_vision_results(results)
-            
             logger.info(f"✅ ZENTRALE VISION-ANALYSE erfolgreich: {len(results)} Bilder verarbeitet")
             
             # Erstelle finale Antwort mit Prompt-Bestätigung
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Migration: Composite-Indizes für Keyset-Pagination
+
+Neue Indizes:
+- ix_users_created_at_id: users(created_at, id)
+- ix_documents_created_at_id: documents(created_at, id)
+- ix_documents_status_updated_at_id: documents(status, updated_at, id)
+- ix_equipment_created_at_id: equipment(created_at, id)
+- ix_calibrations_created_at_id: calibrations(created_at, id)
+
+Zusätzlich werden fehlende Sortierwerte (Altdaten) nachgetragen: created_at
+und für /api/documents/status/{status} auch documents.updated_at. Die
+Pagination liefert NULL-Einträge zwar am Ende jeder Liste, mit Zeitstempel
+stehen sie aber an der richtigen Stelle. Nachgetragen wird der jeweils
+andere Zeitstempel der Zeile, sonst die aktuelle Zeit - im selben Format wie
+vom ORM geschrieben (mit Mikrosekunden), damit SQLite die Werte korrekt
+vergleicht.
+
+Neue Datenbanken erhalten die Indizes automatisch über create_tables().
+
+Autor: KI-QMS System
+Datum: 2025
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import datetime
+
+from sqlalchemy import create_engine, func, inspect
+from sqlalchemy.exc import OperationalError, ProgrammingError
+import logging
+
+from app.models import User, Document, Equipment, Calibration
+
+# Logging Setup
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Datenbank-URL
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///qms_mvp.db")
+
+PAGINATED_MODELS = [User, Document, Equipment, Calibration]
+
+# Sortierspalten der Listen-Endpoints (documents.updated_at: /api/documents/status/{status})
+PAGINATION_SORT_COLUMNS = {
+    User: ["created_at"],
+    Document: ["created_at", "updated_at"],
+    Equipment: ["created_at"],
+    Calibration: ["created_at"],
+}
+
+
+def backfill_sort_column(conn, table, column, now):
+    """Trägt NULL-Werte einer Sortierspalte nach (anderer Zeitstempel, sonst ``now``)."""
+    fallbacks = [table.c[name] for name in ("updated_at", "created_at")
+                 if name in table.c and name != column.name]
+    # Über die Column-Typen gebunden: gleiches Format wie beim ORM
+    result = conn.execute(
+        table.update()
+        .where(column.is_(None))
+        .values({column.name: func.coalesce(*fallbacks, now) if fallbacks else now})
+    )
+    return result.rowcount
+
+
+def run_migration():
+    """Legt die Pagination-Indizes an und füllt fehlende Sortierwerte"""
+
+    engine = create_engine(DATABASE_URL)
+    now = datetime.utcnow()
+
+    try:
+        with engine.begin() as conn:
+            logger.info("🔄 Starte Migration: Keyset-Pagination-Indizes")
+
+            inspector = inspect(conn)
+            for model in PAGINATED_MODELS:
+                table = model.__table__
+                if not inspector.has_table(table.name):
+                    logger.info(f"⏭️  Tabelle {table.name} existiert nicht (wird von create_tables angelegt)")
+                    continue
+
+                # 1. Fehlende Sortierwerte nachtragen
+                for column in (table.c[name] for name in PAGINATION_SORT_COLUMNS[model]):
+                    rowcount = backfill_sort_column(conn, table, column, now)
+                    if rowcount:
+                        logger.info(f"🩹 {table.name}: {column.name} für {rowcount} Einträge nachgetragen")
+
+                # 2. Indizes anlegen
+                existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+                for index in table.indexes:
+                    if index.name in existing_indexes:
+                        logger.info(f"⏭️  {index.name} existiert bereits")
+                        continue
+                    logger.info(f"➕ Lege Index {index.name} an...")
+                    index.create(bind=conn)
+                    logger.info(f"✅ {index.name} angelegt")
+
+            logger.info("✅ Migration erfolgreich abgeschlossen!")
+
+    except (OperationalError, ProgrammingError) as e:
+        logger.error(f"❌ Datenbankfehler: {e}")
+        raise
+    except Exception as e:
+        logger.error(f"❌ Unerwarteter Fehler: {e}")
+        raise
+
+if __name__ == "__main__":
+    try:
+        run_migration()
+        logger.info("🎉 Alle Migrationen erfolgreich durchgeführt!")
+    except Exception as e:
+        logger.error(f"💥 Migration fehlgeschlagen: {e}")
+        sys.exit(1)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Login-Durchsatz (BCrypt-Verifikation) je Pool-Größe
+
+Simuliert einen Login-Ansturm (z.B. Schichtbeginn): ``--logins`` gleichzeitige
+Passwort-Prüfungen laufen über den Passwort-Hash-Pool. Gemessen werden
+Logins pro Sekunde und die maximale Verzögerung des Event-Loops - beim
+früheren synchronen Hashing blockierte jeder Login den Loop vollständig.
+
+Verwendung:
+    python scripts/benchmark_login_throughput.py
+    python scripts/benchmark_login_throughput.py --rounds 12 --logins 64 --workers 1 2 4 8
+
+Autor: KI-QMS System
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+PASSWORD = "Schichtbeginn!2025"
+
+
+def bench_sync(pwd_context, hashed: str, logins: int) -> float:
+    """Bisheriges Verhalten: Verifikation direkt im aufrufenden Thread."""
+    started = time.perf_counter()
+    for _ in range(logins):
+        pwd_context.verify(PASSWORD, hashed)
+    return time.perf_counter() - started
+
+
+async def _watch_loop_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Misst die größte Verzögerung eines periodischen Timers (Event-Loop-Blockade)."""
+    worst = 0.0
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - expected)
+    return worst
+
+
+def bench_pool(auth, hashed: str, logins: int, workers: int) -> tuple:
+    """Gleichzeitige Verifikation über den Pool mit ``workers`` Threads."""
+    os.environ["PASSWORD_HASH_WORKERS"] = str(workers)
+    auth.shutdown_password_executor()
+
+    async def _run():
+        # Pool vorab starten, damit der Thread-Start nicht mitgemessen wird
+        await auth.verify_password_async(PASSWORD, hashed)
+        stop = asyncio.Event()
+        watcher = asyncio.create_task(_watch_loop_lag(stop))
+        started = time.perf_counter()
+        await asyncio.gather(*[auth.verify_password_async(PASSWORD, hashed) for _ in range(logins)])
+        elapsed = time.perf_counter() - started
+        stop.set()
+        return elapsed, await watcher
+
+    try:
+        return asyncio.run(_run())
+    finally:
+        auth.shutdown_password_executor()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login-Durchsatz Benchmark (BCrypt)")
+    parser.add_argument("--rounds", type=int, default=None, help="BCrypt-Kostenfaktor (Standard: BCRYPT_ROUNDS)")
+    parser.add_argument("--logins", type=int, default=32, help="Gleichzeitige Logins pro Messung")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1],
+                        help="Zu messende Pool-Größen")
+    args = parser.parse_args()
+
+    if args.rounds is not None:
+        os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+
+    # Erst nach dem Setzen der Umgebung importieren (Kostenfaktor wird beim Import gelesen)
+    from app import auth
+
+    hashed = auth.get_password_hash(PASSWORD)
+    print(f"🔐 BCrypt-Kostenfaktor {auth.BCRYPT_ROUNDS}, {args.logins} Logins, {os.cpu_count()} CPU-Kerne\n")
+
+    print(f"{'Modus':<20} {'Sekunden':>10} {'Logins/s':>10} {'max. Loop-Lag':>15}")
+    print("-" * 58)
+
+    elapsed = bench_sync(auth.pwd_context, hashed, args.logins)
+    print(f"{'synchron':<20} {elapsed:>10.2f} {args.logins / elapsed:>10.1f} {'(blockiert)':>15}")
+
+    for workers in sorted(set(args.workers)):
+        elapsed, lag = bench_pool(auth, hashed, args.logins, workers)
+        label = f"pool ({workers} Worker)"
+        print(f"{label:<20} {elapsed:>10.2f} {args.logins / elapsed:>10.1f} {lag * 1000:>12.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Metadaten-Extraktion layered vs. fused (Tokens, Latenz, Vollständigkeit)
+
+Vergleicht für jedes Dokument die beiden Extraktionsmodi des
+AdvancedAIMetadataExtractor:
+
+- layered: fünf Analyse-Layer, je ein Request (Dokument wird fünfmal gesendet)
+- fused:   ein JSON-Request für alle Layer, Layer-Fallback nur für
+           fehlende/ungültige Felder
+
+Gemessen werden Latenz, Anzahl LLM-Aufrufe, Prompt-/Output-Tokens und der
+Anteil gültig gefüllter Pflichtfelder (LAYER_FIELDS).
+
+Benötigt GOOGLE_GEMINI_API_KEY (echte API-Aufrufe, verursacht Kosten).
+
+Verwendung:
+    python scripts/benchmark_metadata_extraction.py
+    python scripts/benchmark_metadata_extraction.py --files docs/sop_1.txt docs/sop_2.txt --runs 3
+
+Autor: KI-QMS System
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.ai_metadata_extractor import (
+    AdvancedAIMetadataExtractor,
+    layer_field_completeness,
+    track_token_usage,
+)
+
+SAMPLE_DOCUMENT = """
+SOP 4.2.3 Lenkung von Dokumenten
+
+1. Zweck
+Diese Standardarbeitsanweisung regelt Erstellung, Prüfung, Freigabe und
+Verteilung von QM-Dokumenten gemäß ISO 13485:2016 Kapitel 4.2.4.
+
+2. Geltungsbereich
+Gilt für alle Abteilungen, die Vorgabedokumente erstellen oder verwenden.
+
+3. Verantwortlichkeiten
+Der QMB prüft jedes Dokument, die Bereichsleitung gibt frei. Änderungen
+werden im Änderungsverlauf dokumentiert (siehe Tabelle 1).
+
+4. Ablauf
+4.1 Erstellung durch den Autor anhand der Dokumentvorlage
+4.2 Prüfung auf Konformität mit ISO 13485 und MDR (EU) 2017/745
+4.3 Freigabe und Verteilung über das QMS
+4.4 Jährliche Überprüfung, Risikobewertung nach ISO 14971
+
+Anhang A: Formblatt Dokumentänderung
+"""
+
+
+async def bench_mode(extractor: AdvancedAIMetadataExtractor, content: str, mode: str) -> dict:
+    """Eine Analyse im Modus ``mode``: Latenz, Token-Verbrauch, Vollständigkeit."""
+    processed = extractor._preprocess_content(content)
+    with track_token_usage() as usage:
+        started = time.perf_counter()
+        results = await extractor.analyze_content(processed, mode)
+        elapsed = time.perf_counter() - started
+    return {
+        "seconds": elapsed,
+        "completeness": layer_field_completeness(results),
+        **usage,
+    }
+
+
+async def run(documents: list, runs: int):
+    extractor = AdvancedAIMetadataExtractor()
+    try:
+        await extractor.initialize()
+    except Exception as e:
+        print(f"❌ Gemini-Client nicht verfügbar (GOOGLE_GEMINI_API_KEY gesetzt?): {e}")
+        return
+
+    totals = {mode: {"seconds": 0.0, "calls": 0, "prompt_tokens": 0, "output_tokens": 0, "completeness": 0.0}
+              for mode in ("layered", "fused")}
+    measurements = 0
+
+    print(f"{'Dokument':<28} {'Modus':<8} {'Sekunden':>9} {'Aufrufe':>8} {'Prompt-Tok.':>12} "
+          f"{'Output-Tok.':>12} {'Felder':>7}")
+    print("-" * 90)
+
+    for name, content in documents:
+        for _ in range(runs):
+            measurements += 1
+            for mode in ("layered", "fused"):
+                result = await bench_mode(extractor, content, mode)
+                for key in totals[mode]:
+                    totals[mode][key] += result[key]
+                print(f"{name[:28]:<28} {mode:<8} {result['seconds']:>9.2f} {result['calls']:>8} "
+                      f"{result['prompt_tokens']:>12} {result['output_tokens']:>12} {result['completeness']:>6.0%}")
+
+    print("\n📊 Durchschnitt pro Dokument")
+    for mode, total in totals.items():
+        print(f"   {mode:<8} {total['seconds'] / measurements:>6.2f}s, "
+              f"{total['calls'] / measurements:.1f} Aufrufe, "
+              f"{(total['prompt_tokens'] + total['output_tokens']) / measurements:.0f} Tokens, "
+              f"{total['completeness'] / measurements:.0%} Felder")
+
+    layered_tokens = totals["layered"]["prompt_tokens"] + totals["layered"]["output_tokens"]
+    fused_tokens = totals["fused"]["prompt_tokens"] + totals["fused"]["output_tokens"]
+    if layered_tokens:
+        print(f"\n💰 Token-Ersparnis fused: {1 - fused_tokens / layered_tokens:.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Metadaten-Extraktion Benchmark (layered vs. fused)")
+    parser.add_argument("--files", nargs="*", default=[], help="Textdateien (Standard: eingebaute Beispiel-SOP)")
+    parser.add_argument("--runs", type=int, default=1, help="Messungen pro Dokument und Modus")
+    args = parser.parse_args()
+
+    documents = [(Path(path).name, Path(path).read_text(encoding="utf-8")) for path in args.files]
+    if not documents:
+        documents = [("beispiel_sop.txt", SAMPLE_DOCUMENT)]
+
+    asyncio.run(run(documents, args.runs))
+
+
+if __name__ == "__main__":
+    main()
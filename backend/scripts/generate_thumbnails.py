@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Nachtrag: Vorschau-Thumbnails für bestehende Dokumente erzeugen
+
+Neue Uploads erhalten ihre Thumbnails (small/medium/large, alle Seiten)
+automatisch im Hintergrund. Dieses Skript erzeugt sie für Dokumente, die vor
+Einführung der Thumbnail-Stufe hochgeladen wurden. Bereits vorhandene
+Thumbnails (gleicher Inhalts-Hash) werden übersprungen.
+
+Die Tabelle document_thumbnails wird über create_tables() angelegt.
+
+Autor: KI-QMS System
+Datum: 2025
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logging
+
+from sqlalchemy import select
+
+from app.database import SessionLocal, create_tables
+from app.models import Document
+from app.thumbnails import generate_document_thumbnails
+
+# Logging Setup
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    create_tables()
+
+    with SessionLocal() as db:
+        document_ids = list(db.scalars(
+            select(Document.id).where(Document.file_hash.is_not(None)).order_by(Document.id)
+        ))
+
+    logger.info(f"🖼️ Prüfe {len(document_ids)} Dokumente mit Datei")
+    created = sum(generate_document_thumbnails(document_id) for document_id in document_ids)
+    logger.info(f"✅ {created} Thumbnails erzeugt")
+
+
+if __name__ == "__main__":
+    main()
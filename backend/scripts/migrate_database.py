@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Migration: Daten zwischen Datenbanken übertragen (z.B. SQLite → PostgreSQL)
+
+Legt das Schema in der Zieldatenbank an (create_all) und kopiert alle
+Tabellen in Abhängigkeitsreihenfolge batchweise. Spalten, die es in der
+Quelle (noch) nicht gibt, erhalten ihre Standardwerte. Auf PostgreSQL
+werden anschließend die ID-Sequenzen auf MAX(id) gesetzt.
+
+Der SQLite-Volltextindex (documents_fts) wird nicht kopiert - er wird beim
+nächsten Start über ensure_search_index() aus den Dokumenten aufgebaut.
+
+Verwendung:
+    python scripts/migrate_database.py --target postgresql+psycopg2://qms:pw@localhost/qms
+    python scripts/migrate_database.py --source sqlite:///qms_mvp.db --target sqlite:///export.db
+    python scripts/migrate_database.py --target ... --replace   # Zieltabellen vorher leeren
+
+Autor: KI-QMS System
+Datum: 2025
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+
+from sqlalchemy import create_engine, func, inspect, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from app.database import Base
+from app import models  # noqa: F401 - registriert alle Tabellen in Base.metadata
+
+# Logging Setup
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Quell-Datenbank-URL
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///qms_mvp.db")
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _reset_postgres_sequences(conn, tables):
+    """Setzt die Serial-Sequenzen nach dem Kopieren expliziter IDs auf MAX(id)."""
+    for table in tables:
+        for pk_column in table.primary_key.columns:
+            if not pk_column.autoincrement or pk_column.type.python_type is not int:
+                continue
+            conn.execute(text(f"""
+                SELECT setval(pg_get_serial_sequence(:table, :column),
+                              COALESCE(MAX({pk_column.name}), 1), MAX({pk_column.name}) IS NOT NULL)
+                FROM {table.name}
+            """), {"table": table.name, "column": pk_column.name})
+
+
+def copy_database(source_url: str, target_url: str, batch_size: int = DEFAULT_BATCH_SIZE, replace: bool = False):
+    """Kopiert alle Modell-Tabellen von source_url nach target_url"""
+
+    if make_url(source_url) == make_url(target_url):
+        raise ValueError("Quelle und Ziel sind identisch")
+
+    source_engine = create_engine(source_url)
+    target_engine = create_engine(target_url)
+
+    logger.info(f"🔄 Starte Datenübernahme: {make_url(source_url).render_as_string(hide_password=True)} → "
+                f"{make_url(target_url).render_as_string(hide_password=True)}")
+
+    # 1. Schema im Ziel anlegen
+    Base.metadata.create_all(bind=target_engine)
+    logger.info("✅ Schema in der Zieldatenbank angelegt/überprüft")
+
+    tables = Base.metadata.sorted_tables
+    source_inspector = inspect(source_engine)
+
+    with source_engine.connect() as source_conn, target_engine.begin() as target_conn:
+        # 2. Ziel muss leer sein (oder explizit geleert werden)
+        for table in reversed(tables):
+            existing_rows = target_conn.execute(select(func.count()).select_from(table)).scalar()
+            if not existing_rows:
+                continue
+            if not replace:
+                raise RuntimeError(f"Zieltabelle {table.name} enthält bereits {existing_rows} Einträge (--replace zum Überschreiben)")
+            target_conn.execute(table.delete())
+            logger.info(f"🗑️ {table.name}: {existing_rows} bestehende Einträge gelöscht")
+
+        # 3. Tabellen in Abhängigkeitsreihenfolge kopieren
+        for table in tables:
+            if not source_inspector.has_table(table.name):
+                logger.info(f"⏭️  {table.name} existiert in der Quelle nicht")
+                continue
+
+            source_columns = {column['name'] for column in source_inspector.get_columns(table.name)}
+            columns = [column for column in table.columns if column.name in source_columns]
+            skipped = [column.name for column in table.columns if column.name not in source_columns]
+            if skipped:
+                logger.info(f"ℹ️ {table.name}: Spalten ohne Quelle (Standardwerte): {', '.join(skipped)}")
+
+            query = select(*columns).order_by(*table.primary_key.columns)
+            result = source_conn.execution_options(yield_per=batch_size).execute(query)
+
+            copied = 0
+            for batch in result.partitions():
+                target_conn.execute(table.insert(), [dict(row._mapping) for row in batch])
+                copied += len(batch)
+            logger.info(f"📦 {table.name}: {copied} Einträge kopiert")
+
+        # 4. Sequenzen nachziehen
+        if target_engine.dialect.name == "postgresql":
+            _reset_postgres_sequences(target_conn, tables)
+            logger.info("🔢 PostgreSQL-Sequenzen aktualisiert")
+
+    logger.info("✅ Datenübernahme erfolgreich abgeschlossen!")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Überträgt die KI-QMS-Daten in eine andere Datenbank")
+    parser.add_argument("--source", default=DATABASE_URL, help="Quell-Datenbank-URL (Standard: DATABASE_URL)")
+    parser.add_argument("--target", required=True, help="Ziel-Datenbank-URL")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Zeilen pro Insert-Batch")
+    parser.add_argument("--replace", action="store_true", help="Bestehende Daten im Ziel vorher löschen")
+    args = parser.parse_args()
+
+    copy_database(args.source, args.target, batch_size=args.batch_size, replace=args.replace)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+        logger.info("🎉 Alle Migrationen erfolgreich durchgeführt!")
+    except (OperationalError, ProgrammingError) as e:
+        logger.error(f"❌ Datenbankfehler: {e}")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"💥 Migration fehlgeschlagen: {e}")
+        sys.exit(1)
@@ -0,0 +1,118 @@
+"""
+KI-QMS Test-Konfiguration
+
+Jeder Testlauf arbeitet in einem eigenen temporären Verzeichnis mit
+eigener SQLite-Datenbank - die Entwicklungsdatenbank ``qms_mvp.db`` und
+``uploads/`` bleiben unberührt. Die Umgebung muss vor dem ersten Import
+von ``app`` stehen, da Engine und Upload-Pfade beim Import angelegt werden.
+
+Ausführen (aus ``backend/``)::
+
+    python -m pytest tests/ -v
+"""
+
+import asyncio
+import json
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+# Arbeitsverzeichnis wie beim Backend-Start (cwd = backend/, Logs unter ../logs)
+TEST_ROOT = Path(tempfile.mkdtemp(prefix="ki-qms-tests-"))
+(TEST_ROOT / "logs").mkdir()
+(TEST_ROOT / "backend").mkdir()
+os.chdir(TEST_ROOT / "backend")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{TEST_ROOT / 'backend' / 'qms_test.db'}"
+os.environ.setdefault("UPLOADS_DIR", str(TEST_ROOT / "backend" / "uploads"))
+
+
+@pytest.fixture(scope="session")
+def engine():
+    """Sync-Engine der Test-Datenbank mit allen Tabellen."""
+    from app.database import Base, engine as app_engine
+    import app.models  # noqa: F401 - Modelle registrieren
+
+    Base.metadata.create_all(app_engine)
+    return app_engine
+
+
+@pytest.fixture
+def db(engine):
+    """Sync-Session; offene Änderungen werden nach dem Test verworfen."""
+    from app.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+@pytest.fixture(scope="session")
+def client(engine):
+    """TestClient für die FastAPI-App (Startup-Events inklusive)."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+class FakeAIProvider:
+    """
+    KI-Provider ohne Netzwerk: beantwortet Dokument-, Einzel-Chunk- und
+    gepackte Chunk-Prompts mit gültigem JSON und zählt die Aufrufe.
+    """
+
+    PACKED_CHUNK_PATTERN = re.compile(r"### ABSCHNITT chunk_index=(\d+)")
+
+    def __init__(self):
+        self.prompts = []
+        self.active = 0
+        self.max_active = 0
+
+    async def generate_response(self, prompt: str, **prompt_config) -> str:
+        self.prompts.append(prompt)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(0)
+            packed = [int(index) for index in self.PACKED_CHUNK_PATTERN.findall(prompt)]
+            if packed:
+                return json.dumps({"chunks": [self._chunk(index) for index in packed]})
+            if "CHUNK-INHALT" in prompt:
+                return json.dumps(self._chunk(None))
+            return json.dumps({
+                "title": "SOP Dokumentenlenkung",
+                "document_type": "SOP",
+                "version": "1.0",
+                "description": "Regelt Erstellung, Prüfung und Freigabe von Dokumenten",
+                "compliance_level": "HIGH",
+                "ai_confidence": 0.9,
+            })
+        finally:
+            self.active -= 1
+
+    @staticmethod
+    def _chunk(index):
+        return {
+            "chunk_index": index,
+            "section_title": f"Abschnitt {index}",
+            "keywords": [{"term": "Freigabe", "importance": "HIGH", "category": "process", "confidence": 0.9}],
+            "importance_score": 0.8,
+            "interest_groups": ["Quality Assurance"],
+        }
+
+
+@pytest.fixture
+def fake_ai_provider():
+    return FakeAIProvider()
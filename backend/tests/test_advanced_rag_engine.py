@@ -0,0 +1,162 @@
+"""
+Tests für die Indexierung der Advanced RAG Engine: Enhanced Chunk-Metadaten
+und Embeddings beschreiben dieselben Chunks.
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("qdrant_client")
+
+from app import advanced_rag_engine as rag
+from app import enhanced_metadata_extractor
+from app.enhanced_metadata_extractor import EnhancedMetadataExtractor
+
+PARAGRAPH = (
+    "Kalibrierpflichtige Prüfmittel werden im Prüfmittelverzeichnis geführt und vor dem Einsatz "
+    "auf gültige Kalibrierung geprüft. Abweichungen werden als Nichtkonformität gemeldet."
+)
+CONTENT = "\n\n".join(f"{number}. Prüfmittel\n{PARAGRAPH}" for number in range(1, 31))
+
+
+class FakeQdrant:
+    def __init__(self):
+        self.points = []
+
+    def upsert(self, collection_name, points):
+        self.points.extend(points)
+
+    def scroll(self, collection_name, scroll_filter, limit, offset=None, with_payload=True, with_vectors=False):
+        document_id = scroll_filter.must[0].match.value
+        matching = [point for point in self.points if point.payload["document_id"] == document_id]
+        start = offset or 0
+        end = start + limit
+        return matching[start:end], end if end < len(matching) else None
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.texts = 0
+
+    async def encode(self, texts):
+        self.texts += len(texts)
+        return [[0.1, 0.2, float(index)] for index, _ in enumerate(texts)]
+
+
+@pytest.fixture
+def engine(monkeypatch, fake_ai_provider):
+    monkeypatch.setenv("ENHANCED_METADATA_EXTRACTION", "true")
+    extractor = EnhancedMetadataExtractor("openai")
+    extractor.ai_provider = fake_ai_provider
+    monkeypatch.setattr(enhanced_metadata_extractor, "_enhanced_extractor", extractor)
+
+    engine = rag.AdvancedRAGEngine()
+    # Abweichend von DEFAULT_CHUNK_SIZE: eigenes Chunking des Extractors fiele auf
+    engine.chunk_size = 500
+    engine.client = FakeQdrant()
+    engine.embedding_model = FakeEmbeddings()
+    engine.chunker = rag.AdvancedChunker(engine.chunk_size, engine.chunk_overlap)
+    engine.is_initialized = True
+    return engine
+
+
+def test_metadata_chunks_and_embedded_chunks_share_offsets(engine, monkeypatch):
+    assert rag.ENHANCED_METADATA_AVAILABLE
+    responses = []
+
+    async def recording_extract(**kwargs):
+        response = await enhanced_metadata_extractor.extract_enhanced_metadata(**kwargs)
+        responses.append(response)
+        return response
+
+    monkeypatch.setattr(rag, "extract_enhanced_metadata", recording_extract)
+
+    result = asyncio.run(engine.index_document_advanced(42, "Prüfmittelüberwachung", CONTENT, "SOP"))
+
+    assert result["success"]
+    chunks_metadata = responses[0].chunks_metadata
+    payloads = [point.payload for point in engine.client.points]
+    assert len(payloads) == len(chunks_metadata) > 1
+    assert [(payload["char_start"], payload["char_end"]) for payload in payloads] == [
+        (chunk.char_start, chunk.char_end) for chunk in chunks_metadata
+    ]
+    assert all(CONTENT[payload["char_start"]:payload["char_end"]] == payload["content"] for payload in payloads)
+    assert [payload["chunk_section_title"] for payload in payloads] == [
+        f"Abschnitt {chunk.chunk_index}" for chunk in chunks_metadata
+    ]
+
+
+def _upload_response(chunk_size):
+    """Enhanced-Antwort wie aus dem Upload (eigene Chunks mit ``chunk_size``)."""
+    return asyncio.run(enhanced_metadata_extractor._enhanced_extractor.extract_enhanced_metadata(
+        CONTENT, "Prüfmittelüberwachung", "SOP", chunks=rag.chunk_document(CONTENT, chunk_size)
+    ))
+
+
+def test_index_reuses_upload_metadata_when_chunks_match(engine, fake_ai_provider):
+    upload = _upload_response(engine.chunk_size)
+    upload_calls = len(fake_ai_provider.prompts)
+
+    result = asyncio.run(engine.index_document_advanced(42, "Prüfmittelüberwachung", CONTENT, "SOP", metadata={
+        "creator_id": 1, "enhanced_metadata": upload.metadata, "chunk_metadata": upload.chunks_metadata
+    }))
+
+    assert result["success"]
+    assert len(fake_ai_provider.prompts) == upload_calls
+    payloads = [point.payload for point in engine.client.points]
+    assert len(payloads) == len(upload.chunks_metadata)
+    assert all("chunk_metadata" not in payload and "enhanced_metadata" not in payload for payload in payloads)
+    assert all(payload["creator_id"] == 1 for payload in payloads)
+    assert [payload["chunk_section_title"] for payload in payloads] == [
+        f"Abschnitt {chunk.chunk_index}" for chunk in upload.chunks_metadata
+    ]
+
+
+def test_index_skips_extraction_without_opt_in(engine, fake_ai_provider, monkeypatch):
+    monkeypatch.delenv("ENHANCED_METADATA_EXTRACTION")
+
+    result = asyncio.run(engine.index_document_advanced(42, "Prüfmittelüberwachung", CONTENT, "SOP"))
+
+    assert result["success"]
+    assert fake_ai_provider.prompts == []
+    assert "enhanced_metadata" not in result
+    assert len(engine.client.points) == len(rag.chunk_document(CONTENT, engine.chunk_size))
+
+
+def test_index_extracts_again_when_upload_chunks_differ(engine, fake_ai_provider):
+    upload = _upload_response(engine.chunk_size * 2)
+    upload_calls = len(fake_ai_provider.prompts)
+
+    result = asyncio.run(engine.index_document_advanced(42, "Prüfmittelüberwachung", CONTENT, "SOP", metadata={
+        "enhanced_metadata": upload.metadata, "chunk_metadata": upload.chunks_metadata
+    }))
+
+    assert result["success"]
+    assert len(fake_ai_provider.prompts) > upload_calls
+    payloads = [point.payload for point in engine.client.points]
+    assert len(payloads) == len(rag.chunk_document(CONTENT, engine.chunk_size)) != len(upload.chunks_metadata)
+
+
+def test_copy_document_index_reuses_vectors_without_embeddings(engine, fake_ai_provider):
+    asyncio.run(engine.index_document_advanced(42, "Prüfmittelüberwachung", CONTENT, "SOP"))
+    source = list(engine.client.points)
+    embedded, prompts = engine.embedding_model.texts, len(fake_ai_provider.prompts)
+
+    result = asyncio.run(engine.copy_document_index(42, 43, "Kopie", "SOP", metadata={"creator_id": 7}))
+
+    copies = engine.client.points[len(source):]
+    assert result["success"] and result["points_indexed"] == len(source) == len(copies)
+    assert (engine.embedding_model.texts, len(fake_ai_provider.prompts)) == (embedded, prompts)
+    assert [copy.id for copy in copies] == [43000 + point.payload["chunk_index"] for point in source]
+    assert [copy.vector for copy in copies] == [point.vector for point in source]
+    assert all(copy.payload["document_id"] == 43 and copy.payload["title"] == "Kopie" for copy in copies)
+    assert all(copy.payload["creator_id"] == 7 for copy in copies)
+    assert [copy.payload["content"] for copy in copies] == [point.payload["content"] for point in source]
+
+
+def test_copy_document_index_without_source_points(engine):
+    result = asyncio.run(engine.copy_document_index(99, 43, "Kopie"))
+
+    assert result["success"] and result["points_indexed"] == 0
+    assert engine.client.points == []
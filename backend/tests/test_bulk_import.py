@@ -0,0 +1,72 @@
+"""
+Tests für den Kalibrierungs-Bulk-Import mit zeitzonenbehafteten Datumswerten.
+"""
+
+from datetime import datetime
+import uuid
+
+import pytest
+
+from app.auth import require_admin_or_qm
+from app.main import app
+from app.models import Calibration, Equipment, User
+
+
+@pytest.fixture
+def equipment(db):
+    """Gerät mit naiver letzter Kalibrierung (wie aus SQLite gelesen) und Verantwortlichem."""
+    suffix = uuid.uuid4().hex[:8]
+    user = User(email=f"bulk-{suffix}@example.com", full_name="Bulk Import")
+    device = Equipment(
+        name="Messschieber", equipment_number=f"EQ-{suffix}", serial_number=f"SN-{suffix}",
+        last_calibration=datetime(2029, 6, 1), next_calibration=datetime(2029, 12, 1)
+    )
+    db.add_all([user, device])
+    db.commit()
+    app.dependency_overrides[require_admin_or_qm] = lambda: user
+
+    yield device
+
+    app.dependency_overrides.pop(require_admin_or_qm, None)
+    db.query(Calibration).filter(Calibration.equipment_id == device.id).delete()
+    db.query(Equipment).filter(Equipment.id == device.id).delete()
+    db.query(User).filter(User.id == user.id).delete()
+    db.commit()
+
+
+def _calibration(device, calibration_date, next_due_date):
+    responsible = app.dependency_overrides[require_admin_or_qm]()
+    return {
+        "equipment_id": device.id,
+        "calibration_date": calibration_date,
+        "next_due_date": next_due_date,
+        "responsible_user_id": responsible.id,
+    }
+
+
+def test_bulk_calibrations_accept_utc_suffix(client, db, equipment):
+    response = client.post("/api/calibrations/bulk", json={"items": [
+        _calibration(equipment, "2030-01-01T00:00:00Z", "2031-01-01T00:00:00Z"),
+    ]})
+
+    assert response.status_code == 200, response.text
+    assert response.json()["created"] == 1
+    db.refresh(equipment)
+    assert equipment.last_calibration == datetime(2030, 1, 1)
+    assert equipment.next_calibration == datetime(2031, 1, 1)
+
+
+def test_bulk_calibrations_mix_aware_and_naive_dates(client, db, equipment):
+    response = client.post("/api/calibrations/bulk", json={"items": [
+        _calibration(equipment, "2030-03-01T12:00:00+02:00", "2031-03-01T12:00:00+02:00"),
+        _calibration(equipment, "2030-02-01T08:00:00", "2031-02-01T08:00:00"),
+    ]})
+
+    assert response.status_code == 200, response.text
+    assert response.json()["created"] == 2
+    db.refresh(equipment)
+    assert equipment.last_calibration == datetime(2030, 3, 1, 10, 0)
+    assert equipment.next_calibration == datetime(2031, 3, 1, 10, 0)
+    stored = {calibration.calibration_date for calibration in
+              db.query(Calibration).filter(Calibration.equipment_id == equipment.id)}
+    assert stored == {datetime(2030, 3, 1, 10, 0), datetime(2030, 2, 1, 8, 0)}
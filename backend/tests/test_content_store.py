@@ -0,0 +1,65 @@
+"""
+Tests für den Content-Store (Blobs, parallele Uploads) und die Übernahme
+gespeicherter KI-Ergebnisse bei identischem Inhalt.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import os
+import threading
+
+from app.content_store import ContentStore, reused_ai_result, stored_ai_analysis
+from app.models import Document, DocumentType
+
+UPLOADS = 8
+
+
+def test_parallel_puts_keep_all_links_on_one_blob(tmp_path):
+    store = ContentStore(tmp_path / ".cas")
+    data = b"%PDF-1.4 identischer Inhalt"
+    sha256 = hashlib.sha256(data).hexdigest()
+    barrier = threading.Barrier(UPLOADS)
+
+    def upload(number):
+        part = tmp_path / f".{number}.part"
+        part.write_bytes(data)
+        barrier.wait()
+        created = store.put(part, sha256)
+        store.link(sha256, tmp_path / "SOP" / f"{number}_dokument.pdf")
+        return created
+
+    with ThreadPoolExecutor(max_workers=UPLOADS) as pool:
+        created = list(pool.map(upload, range(UPLOADS)))
+
+    blob = store.blob_path(sha256)
+    assert created.count(True) == 1
+    assert all(os.path.samefile(tmp_path / "SOP" / f"{number}_dokument.pdf", blob) for number in range(UPLOADS))
+    assert blob.stat().st_nlink == UPLOADS + 1
+    assert not list(tmp_path.glob(".*.part"))
+
+
+def test_reused_ai_result_uses_stored_values():
+    document = Document(
+        id=7, document_type=DocumentType.SOP, keywords="Lenkung, Freigabe", priority="hoch",
+        remarks="Eingescannt\n\n🤖 KI-Analyse (openai):\n- Sprache: en (75.0%)\n- Qualität: 80.0%\n"
+                "- Komplexität: 8/10\n- Compliance-Keywords: ISO 13485, Dokumentenlenkung"
+    )
+
+    result = reused_ai_result(document)
+
+    assert stored_ai_analysis(document).startswith("🤖 KI-Analyse (openai):")
+    assert result["document_type"] == "SOP"
+    assert result["keywords"] == ["Lenkung", "Freigabe"]
+    assert result["risk_level"] == "hoch"
+    assert (result["language"], result["language_confidence"]) == ("en", 0.75)
+    assert result["quality_score"] == 8
+    assert result["main_topics"] == ["ISO 13485", "Dokumentenlenkung"]
+
+
+def test_reused_ai_result_without_stored_analysis_invents_nothing():
+    document = Document(id=8, document_type=DocumentType.SOP, keywords="", remarks="manuell angelegt")
+
+    result = reused_ai_result(document)
+
+    assert stored_ai_analysis(document) is None
+    assert not {"confidence", "language", "language_confidence", "quality_score", "risk_level"} & set(result)
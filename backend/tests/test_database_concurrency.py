@@ -0,0 +1,164 @@
+"""
+Tests für den gemeinsamen SQLite-Schreib-Lock: Sync-Sessions (``get_db``,
+Threadpool) und AsyncSessions (``get_async_db``) schreiben parallel in
+dieselbe Datei, ohne ``database is locked`` und ohne den Event-Loop
+anzuhalten.
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+
+from app.database import (
+    AsyncSessionLocal, IS_SQLITE, SessionLocal, async_engine, dispose_async_engines, engine as writer_engine
+)
+from app.models import User
+
+pytestmark = pytest.mark.skipif(not IS_SQLITE, reason="Schreib-Lock nur für SQLite")
+
+HOLD_SECONDS = 0.3
+# Kurzer SQLite-busy_timeout: Gewartet werden darf nur am gemeinsamen Lock,
+# nicht in SQLite (dort endet es nach Ablauf mit "database is locked")
+BUSY_TIMEOUT_MS = 50
+WRITERS = 4
+WRITES_PER_WRITER = 5
+
+
+@pytest.fixture
+def prefix(engine):
+    """E-Mail-Präfix der Testbenutzer; räumt sie nach dem Test wieder ab."""
+    prefix = f"concurrency-{uuid.uuid4().hex[:8]}"
+    yield prefix
+    writer_engine.dispose()                        # busy_timeout zurücksetzen
+    with SessionLocal() as db:
+        db.query(User).filter(User.email.like(f"{prefix}%")).delete(synchronize_session=False)
+        db.commit()
+
+
+def _user(prefix, source, number):
+    return User(email=f"{prefix}-{source}-{number}@example.com", full_name=f"Concurrency {source} {number}")
+
+
+def _short_busy_timeout():
+    """Auf der (einzigen) Sync-Schreib-Connection."""
+    with writer_engine.connect() as connection:
+        connection.exec_driver_sql(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+
+
+async def _short_busy_timeout_async():
+    """Auf der (einzigen) Async-Schreib-Connection."""
+    async with async_engine.connect() as connection:
+        await connection.exec_driver_sql(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+
+
+def _count(prefix):
+    with SessionLocal() as db:
+        return db.scalar(select(func.count(User.id)).where(User.email.like(f"{prefix}%")))
+
+
+def test_sync_writer_waits_for_async_write_transaction(prefix):
+    async_has_writer = threading.Event()
+    errors = []
+
+    def sync_write():
+        async_has_writer.wait()
+        try:
+            with SessionLocal() as db:
+                db.add(_user(prefix, "sync", 0))
+                db.commit()
+        except Exception as e:
+            errors.append(e)
+
+    async def scenario():
+        _short_busy_timeout()
+        thread = threading.Thread(target=sync_write)
+        thread.start()
+        try:
+            async with AsyncSessionLocal() as db:
+                db.add(_user(prefix, "async", 0))
+                await db.flush()                           # hält die Schreib-Connection
+                async_has_writer.set()
+                await asyncio.sleep(HOLD_SECONDS)
+                await db.commit()
+        finally:
+            async_has_writer.set()
+            await asyncio.to_thread(thread.join)
+            await dispose_async_engines()
+
+    asyncio.run(scenario())
+
+    assert errors == []
+    assert _count(prefix) == 2
+
+
+def test_async_writer_waits_without_blocking_event_loop(prefix):
+    sync_has_writer = threading.Event()
+
+    def sync_write():
+        with SessionLocal() as db:
+            db.add(_user(prefix, "sync", 0))
+            db.flush()                                     # hält die Schreib-Connection
+            sync_has_writer.set()
+            time.sleep(HOLD_SECONDS)
+            db.commit()
+
+    async def ticker(stop):
+        ticks = 0
+        while not stop.is_set():
+            await asyncio.sleep(0.01)
+            ticks += 1
+        return ticks
+
+    async def scenario():
+        await _short_busy_timeout_async()
+        thread = threading.Thread(target=sync_write)
+        thread.start()
+        await asyncio.to_thread(sync_has_writer.wait)
+        stop = asyncio.Event()
+        ticks = asyncio.create_task(ticker(stop))
+        try:
+            async with AsyncSessionLocal() as db:
+                db.add(_user(prefix, "async", 0))
+                await db.commit()
+        finally:
+            stop.set()
+            await asyncio.to_thread(thread.join)
+            await dispose_async_engines()
+        return await ticks
+
+    ticks = asyncio.run(scenario())
+
+    assert _count(prefix) == 2
+    # Der Event-Loop lief weiter, während die AsyncSession auf den Schreiber wartete
+    assert ticks >= HOLD_SECONDS / 0.01 / 3
+
+
+def test_parallel_sync_and_async_writers_commit_everything(prefix):
+    def sync_writer(number):
+        for write in range(WRITES_PER_WRITER):
+            with SessionLocal() as db:
+                db.add(_user(prefix, f"sync{number}", write))
+                db.commit()
+
+    async def async_writer(number):
+        for write in range(WRITES_PER_WRITER):
+            async with AsyncSessionLocal() as db:
+                db.add(_user(prefix, f"async{number}", write))
+                await db.commit()
+
+    async def scenario():
+        try:
+            await asyncio.gather(
+                *(asyncio.to_thread(sync_writer, number) for number in range(WRITERS)),
+                *(async_writer(number) for number in range(WRITERS)),
+            )
+        finally:
+            await dispose_async_engines()
+
+    asyncio.run(scenario())
+
+    assert _count(prefix) == 2 * WRITERS * WRITES_PER_WRITER
@@ -0,0 +1,37 @@
+"""
+Tests für den MinHash/LSH-Duplikats-Index.
+"""
+
+from app.ai_engine import similarity_tokens
+from app.duplicate_index import MinHashLSHIndex, compute_minhash, estimate_similarity
+
+SOP_TEXT = "Diese Standardarbeitsanweisung regelt die Lenkung und Freigabe von Dokumenten nach ISO 13485"
+
+
+def test_identical_texts_have_similarity_one():
+    signature = compute_minhash(similarity_tokens(SOP_TEXT))
+
+    assert estimate_similarity(signature, compute_minhash(similarity_tokens(SOP_TEXT))) == 1.0
+
+
+def test_texts_without_tokens_are_never_similar():
+    empty = compute_minhash(similarity_tokens(""))
+    stopwords_only = compute_minhash(similarity_tokens("und der die - 1. a"))
+    sop = compute_minhash(similarity_tokens(SOP_TEXT))
+
+    assert estimate_similarity(empty, stopwords_only) == 0.0
+    assert estimate_similarity(empty, sop) == 0.0
+
+
+def test_index_does_not_return_empty_documents_as_candidates():
+    index = MinHashLSHIndex()
+    empty = compute_minhash(set())
+    index.add(1, empty)
+    index.add(2, compute_minhash(set()))
+    index.add(3, compute_minhash(similarity_tokens(SOP_TEXT)))
+
+    assert index.query(empty, exclude_id=1) == []
+    assert [doc_id for doc_id, _ in index.query(compute_minhash(similarity_tokens(SOP_TEXT)))] == [3]
+    assert index.get(1) is not None
+    index.remove(1)
+    assert index.get(1) is None
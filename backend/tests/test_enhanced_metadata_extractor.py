@@ -0,0 +1,50 @@
+"""
+Tests für den Enhanced Metadata Extractor (Chunk-Metadaten mit Packing,
+Concurrency-Limit und gemeinsamen Chunks).
+"""
+
+import asyncio
+
+import pytest
+
+from app.chunking import chunk_document
+from app.enhanced_metadata_extractor import EnhancedMetadataExtractor, MAX_CHUNKS_PER_PACK
+from app.json_parser import create_fallback_metadata
+
+PARAGRAPH = (
+    "Die Freigabe von Dokumenten erfolgt durch die QM-Leitung nach Prüfung durch den Fachbereich. "
+    "Änderungen werden im Änderungsverlauf dokumentiert und den betroffenen Bereichen mitgeteilt."
+)
+CONTENT = "\n\n".join(f"{number}. Abschnitt\n{PARAGRAPH}" for number in range(1, 61))
+
+
+@pytest.fixture
+def extractor(fake_ai_provider):
+    extractor = EnhancedMetadataExtractor("openai")
+    extractor.ai_provider = fake_ai_provider
+    return extractor
+
+
+def test_extract_chunks_metadata_packs_chunks_into_few_requests(extractor, fake_ai_provider):
+    records = chunk_document(CONTENT)
+    document_metadata = create_fallback_metadata("SOP Dokumentenlenkung")
+
+    chunks_metadata = asyncio.run(extractor._extract_chunks_metadata(CONTENT, document_metadata))
+
+    assert len(records) > MAX_CHUNKS_PER_PACK
+    assert [chunk.chunk_index for chunk in chunks_metadata] == [record.index for record in records]
+    assert [(chunk.char_start, chunk.char_end) for chunk in chunks_metadata] == [
+        (record.start, record.end) for record in records
+    ]
+    assert all(chunk.section_title == f"Abschnitt {chunk.chunk_index}" for chunk in chunks_metadata)
+    assert len(fake_ai_provider.prompts) < len(records)
+    assert fake_ai_provider.max_active <= extractor.chunk_concurrency
+    assert extractor.performance_metrics["chunk_fallbacks"] == 0
+
+
+def test_extract_enhanced_metadata_uses_provider_response(extractor):
+    response = asyncio.run(extractor.extract_enhanced_metadata(CONTENT, "SOP Dokumentenlenkung", "SOP"))
+
+    assert response.success
+    assert response.metadata.title == "SOP Dokumentenlenkung"
+    assert response.chunks_created == len(chunk_document(CONTENT))
@@ -0,0 +1,90 @@
+"""
+Tests für den toleranten JSON-Parser (Reparatur von LLM-Antworten) und die
+Strategie-Metriken des Enhanced JSON Parsers.
+"""
+
+import pytest
+
+from app.json_parser import EnhancedJSONParser, JSONParseError, TolerantJSONParser, parse_tolerant_json
+
+METADATA = '{"title": "SOP Dokumentenlenkung", "document_type": "SOP", "description": "Lenkung", "ai_confidence": 0.9'
+
+
+@pytest.fixture
+def parser():
+    return EnhancedJSONParser(enable_logging=False)
+
+
+def _parse(text):
+    parser = TolerantJSONParser(text)
+    return parser.parse(), parser.repaired
+
+
+def test_valid_json_is_not_marked_repaired():
+    assert _parse('{"a": [1, 2.5, true, null], "b": {"c": "d"}}') == (
+        {"a": [1, 2.5, True, None], "b": {"c": "d"}}, False
+    )
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('```json\n{"title": "SOP 12", "keywords": ["Lenkung", "Freig', {"title": "SOP 12", "keywords": ["Lenkung", "Freig"]}),
+    ('{"title": "SOP", "nested": {"a": 1, "b": [1, 2', {"title": "SOP", "nested": {"a": 1, "b": [1, 2]}}),
+    ('{"title": "SOP", "version":', {"title": "SOP"}),
+    ('{"title": "SOP", "vers', {"title": "SOP"}),
+])
+def test_truncated_responses_are_closed_at_the_cut(text, expected):
+    assert _parse(text) == (expected, True)
+
+
+def test_unquoted_keys_single_quotes_comments_and_trailing_commas():
+    text = "Antwort:\n{title: 'Prüf\\'anweisung', // Kommentar\n \"n\" = 5, ok: True, /* x */ list: [1, 2,],}"
+
+    assert _parse(text) == ({"title": "Prüf'anweisung", "n": 5, "ok": True, "list": [1, 2]}, True)
+
+
+def test_urls_times_and_identifiers_stay_text():
+    data, _ = _parse('{url: https://example.com/a?b=1, time: 10:30, id: 4711-A, n: -1.5e3}')
+
+    assert data == {"url": "https://example.com/a?b=1", "time": "10:30", "id": "4711-A", "n": -1500.0}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"title": "SOP", "version": , "document_type": "SOP", "ai_confidence": 0.9}',
+     {"title": "SOP", "document_type": "SOP", "ai_confidence": 0.9}),
+    ('{"title": "SOP", "version": }', {"title": "SOP"}),
+    ('{"a": [1,, 2, ], "b": [,,]}', {"a": [1, 2], "b": []}),
+])
+def test_empty_values_are_dropped_without_shifting_keys(text, expected):
+    assert _parse(text) == (expected, True)
+
+
+def test_many_stray_delimiters_do_not_recurse():
+    data, repaired = _parse('{"title": "SOP", "a": ' + "," * 5000 + '"document_type": "SOP"}')
+
+    assert data == {"title": "SOP", "document_type": "SOP"}
+    assert repaired
+
+
+def test_deep_nesting_is_a_parse_error(parser):
+    with pytest.raises(JSONParseError):
+        parse_tolerant_json('{"a": ' + "[" * 5000)
+    assert parser.parse_json_object("[" * 5000 + "1") is None
+
+
+def test_strategy_metrics_count_attempts_and_hits(parser):
+    assert parser.parse_enhanced_metadata(METADATA + "}").title == "SOP Dokumentenlenkung"
+    repaired = parser.parse_enhanced_metadata(METADATA.replace('"description": "Lenkung"', '"description": ,'))
+
+    strategies = parser.get_performance_metrics()["strategies"]
+    assert repaired.title == "SOP Dokumentenlenkung"
+    assert (strategies["fast_path"]["attempts"], strategies["fast_path"]["hits"]) == (2, 1)
+    assert (strategies["tolerant"]["attempts"], strategies["tolerant"]["hits"]) == (1, 1)
+    assert strategies["partial_json"]["attempts"] == 0
+    assert strategies["tolerant"]["hit_rate"] == "100.0%"
+
+
+@pytest.mark.parametrize("text", ['[1, 2,]', '[1 2]', '{"a": 1,}', '{"a": 1 "b": 2}', '{, "a": 1}'])
+def test_comma_errors_are_marked_repaired(text):
+    _, repaired = _parse(text)
+
+    assert repaired
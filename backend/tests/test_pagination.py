@@ -0,0 +1,95 @@
+"""
+Tests für die Keyset-Pagination (Cursor), inkl. Einträgen ohne Sortierwert.
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+import importlib.util
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, create_engine, select, text
+from sqlalchemy.orm import Session, declarative_base
+
+from app.pagination import _keyset_phases, encode_cursor, paginate_keyset
+
+MIGRATION_SCRIPT = Path(__file__).resolve().parents[1] / "scripts" / "add_pagination_indexes.py"
+
+Base = declarative_base()
+
+
+class Entry(Base):
+    __tablename__ = "entries"
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    start = datetime(2025, 1, 1)
+    with Session(engine) as db:
+        for entry_id in range(1, 11):
+            # Jeder dritte Eintrag ohne Sortierwert (Altdaten)
+            created_at = None if entry_id % 3 == 0 else start + timedelta(minutes=entry_id % 4)
+            db.add(Entry(id=entry_id, created_at=created_at))
+        db.commit()
+        yield db
+
+
+def _all_pages(db, limit, descending):
+    ids, cursor, pages = [], None, 0
+    while True:
+        entries, cursor = paginate_keyset(db.query(Entry), Entry.created_at, Entry.id, cursor, limit, descending)
+        ids.extend(entry.id for entry in entries)
+        pages += 1
+        if cursor is None:
+            return ids, pages
+
+
+@pytest.mark.parametrize("descending", [True, False])
+@pytest.mark.parametrize("limit", [1, 2, 3, 4, 20])
+def test_pages_cover_all_rows_including_null_sort_values(session, limit, descending):
+    ids, _ = _all_pages(session, limit, descending)
+
+    assert sorted(ids) == list(range(1, 11))
+    assert len(ids) == len(set(ids))
+    # NULL-Einträge stehen am Ende, nach id sortiert
+    null_ids = [entry_id for entry_id in ids if entry_id % 3 == 0]
+    assert ids[-len(null_ids):] == sorted(null_ids, reverse=descending)
+
+
+@pytest.mark.parametrize("descending", [True, False])
+@pytest.mark.parametrize("cursor", [None, encode_cursor(datetime(2025, 1, 1), 5), encode_cursor(None, 5)])
+def test_every_phase_seeks_the_composite_index(session, cursor, descending):
+    session.execute(text("CREATE INDEX ix_entries_created_id ON entries (created_at, id)"))
+
+    for phase in _keyset_phases(session.query(Entry), Entry.created_at, Entry.id, cursor, descending):
+        sql = str(phase.limit(21).statement.compile(session.bind, compile_kwargs={"literal_binds": True}))
+        plan = " | ".join(row[-1] for row in session.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+        assert plan.startswith("SEARCH entries USING") and "INDEX ix_entries_created_id" in plan, plan
+        assert "TEMP B-TREE" not in plan, plan
+
+
+def test_backfill_uses_orm_timestamp_format(tmp_path):
+    spec = importlib.util.spec_from_file_location("add_pagination_indexes", MIGRATION_SCRIPT)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'migration.db'}")
+    Base.metadata.create_all(engine)
+    table = Entry.__table__
+    now = datetime(2025, 6, 1, 12, 0, 0, 123456)
+    with engine.begin() as conn:
+        conn.execute(table.insert(), [
+            {"id": 1, "created_at": None, "updated_at": None},
+            {"id": 2, "created_at": None, "updated_at": datetime(2025, 5, 1, 8, 30)},
+        ])
+        assert migration.backfill_sort_column(conn, table, table.c.created_at, now) == 2
+        raw = dict(conn.execute(text("SELECT id, created_at FROM entries")).all())
+
+    assert raw[1] == "2025-06-01 12:00:00.123456"
+    assert raw[2] == "2025-05-01 08:30:00.000000"
+    with Session(engine) as db:
+        assert db.scalar(select(Entry.created_at).where(Entry.id == 1)) == now
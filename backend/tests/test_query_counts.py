@@ -0,0 +1,76 @@
+"""
+Tests für die Anzahl der SQL-Statements (N+1-Schutz).
+
+Berechtigungsauflösung und ``/api/users/{id}/groups`` laden Mitgliedschaften
+und Gruppen per Join - unabhängig davon, wie vielen Gruppen ein Benutzer
+angehört.
+"""
+
+import json
+import uuid
+
+import pytest
+
+from app.auth import get_user_groups, get_user_permissions
+from app.models import InterestGroup, User, UserGroupMembership
+from app.query_counter import assert_max_queries
+
+GROUP_COUNT = 5
+
+
+@pytest.fixture
+def member(db):
+    """Benutzer mit ``GROUP_COUNT`` aktiven Gruppen und einer deaktivierten (committet)."""
+    suffix = uuid.uuid4().hex[:8]
+    user = User(
+        email=f"query-count-{suffix}@example.com",
+        full_name="Query Count",
+        individual_permissions=json.dumps(["individual_right"]),
+    )
+    groups = [
+        InterestGroup(
+            name=f"Gruppe {suffix} {index}",
+            code=f"group_{suffix}_{index}",
+            group_permissions=json.dumps([f"permission_{index}"]),
+            is_active=index < GROUP_COUNT,
+        )
+        for index in range(GROUP_COUNT + 1)
+    ]
+    db.add(user)
+    db.add_all(groups)
+    db.flush()
+    db.add_all(
+        UserGroupMembership(user_id=user.id, interest_group_id=group.id, is_active=index < GROUP_COUNT)
+        for index, group in enumerate(groups)
+    )
+    db.commit()
+    db.refresh(user)
+
+    yield user
+
+    db.query(UserGroupMembership).filter(UserGroupMembership.user_id == user.id).delete()
+    db.query(User).filter(User.id == user.id).delete()
+    db.query(InterestGroup).filter(InterestGroup.id.in_([group.id for group in groups])).delete()
+    db.commit()
+
+
+def test_permission_resolution_uses_one_query(db, member):
+    with assert_max_queries(1):
+        permissions = get_user_permissions(db, member)
+
+    assert set(permissions) == {"individual_right"} | {f"permission_{index}" for index in range(GROUP_COUNT)}
+
+
+def test_group_resolution_uses_one_query(db, member):
+    with assert_max_queries(1):
+        groups = get_user_groups(db, member)
+
+    assert len(groups) == GROUP_COUNT
+
+
+def test_user_groups_endpoint_query_count_is_constant(client, member):
+    with assert_max_queries(1):
+        response = client.get(f"/api/users/{member.id}/groups")
+
+    assert response.status_code == 200
+    assert len(response.json()) == GROUP_COUNT
@@ -0,0 +1,53 @@
+"""
+Tests für die segmentweise Textextraktion (TXT/MD) und den Textanfang.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from app.text_extraction import (
+    TEXT_LINES_PER_SEGMENT,
+    _extract_text_file,
+    iter_text_file_segments,
+    read_text_prefix,
+)
+
+
+def _read_whole_file(path: Path) -> str:
+    """Bisheriges Verhalten: komplette Datei, UTF-8 mit Latin-1-Fallback."""
+    try:
+        return path.read_text(encoding="utf-8")
+    except UnicodeDecodeError:
+        return path.read_text(encoding="latin-1")
+
+
+@pytest.mark.parametrize("content", [
+    b"",
+    b"eine Zeile ohne Umbruch",
+    b"eine Zeile\n",
+    b"Windows\r\nZeilen\r\n",
+    "Umlaute äöü\n".encode("utf-8") * (TEXT_LINES_PER_SEGMENT * 2),
+    b"Block\n" * TEXT_LINES_PER_SEGMENT,
+    b"Block\n" * (TEXT_LINES_PER_SEGMENT - 1) + b"ohne Umbruch",
+    b"UTF-8 zuerst\n" * (TEXT_LINES_PER_SEGMENT + 5) + "Latin-1 später: ä\n".encode("latin-1"),
+])
+def test_text_file_segments_match_whole_file_read(tmp_path, content):
+    path = tmp_path / "dokument.txt"
+    path.write_bytes(content)
+
+    text = _extract_text_file(path)
+    segments = list(iter_text_file_segments(path))
+
+    assert text == _read_whole_file(path)
+    assert all(text[segment.start:segment.end] == segment.text for segment in segments)
+
+
+def test_read_text_prefix_stops_after_max_chars(tmp_path):
+    path = tmp_path / "sop.txt"
+    path.write_text("Standardarbeitsanweisung Lenkung von Dokumenten\n" * 5000, encoding="utf-8")
+
+    prefix = read_text_prefix(path, "text/plain", max_chars=3000)
+
+    assert len(prefix) == 3000
+    assert prefix.startswith("Standardarbeitsanweisung")
@@ -0,0 +1,103 @@
+"""
+Tests für das Zusammenführen mehrseitiger Vision-Ergebnisse: fortgeführte
+Schritt-Nummerierung, Tabellen-Fortsetzung und Kopf-/Fußzeilen.
+"""
+
+from app.vision_merge import VisionResultMerger
+
+HEADER = "Musterfirma GmbH - SOP-001 Dokumentenlenkung"
+FOOTER = "Vertraulich"
+
+
+def _merge(*pages):
+    merger = VisionResultMerger()
+    # Ergebnisse treffen in beliebiger Reihenfolge ein
+    for page_number, page in reversed(list(enumerate(pages, start=1))):
+        merger.add_page(page_number, {"success": True, "parsed_json": page})
+    return merger.merge()
+
+
+def _step(number, label, yes=None, no=None):
+    step = {"step_number": number, "label": label}
+    if yes is not None:
+        step["decision"] = {"is_decision": True, "yes_next_step_number": yes, "no_next_step_number": no}
+    return step
+
+
+def test_single_page_is_returned_unchanged():
+    page = {"all_extracted_texts": ["Ja", "Ja"], "process_steps": [_step(1, "Start")]}
+
+    assert _merge(page) == page
+
+
+def test_steps_restarting_per_page_are_renumbered_with_decision_references():
+    merged = _merge(
+        {"process_steps": [_step(1, "Start"), _step(2, "Prüfen", yes=3, no=1), _step(3, "Freigeben")]},
+        {"process_steps": [_step(1, "Archivieren"), _step(2, "Prüfen", yes=1, no=0)]},
+    )
+
+    steps = merged["process_steps"]
+    assert [(step["step_number"], step["source_page"]) for step in steps] == [(1, 1), (2, 1), (3, 1), (4, 2), (5, 2)]
+    assert steps[1]["decision"]["yes_next_step_number"] == 3
+    assert steps[4]["decision"]["yes_next_step_number"] == 4
+    assert steps[4]["decision"]["no_next_step_number"] == 0
+
+
+def test_continuously_numbered_steps_are_kept():
+    merged = _merge(
+        {"process_steps": [_step(1, "Start"), _step(2, "Prüfen")]},
+        {"process_steps": [_step(3, "Freigeben", yes=4, no=1), _step(4, "Ende")]},
+    )
+
+    steps = merged["process_steps"]
+    assert [step["step_number"] for step in steps] == [1, 2, 3, 4]
+    assert steps[2]["decision"]["yes_next_step_number"] == 4
+
+
+def test_table_with_same_headers_on_next_page_is_continued():
+    headers = ["Nr.", "Prüfmerkmal"]
+    merged = _merge(
+        {"tables": [{"headers": headers, "rows": [["1", "Maß"]]}]},
+        {"tables": [{"headers": headers, "rows": [["2", "Oberfläche"]]},
+                    {"headers": ["Version", "Datum"], "rows": [["1.0", "2024-01-01"]]}]},
+        {"tables": [{"headers": headers, "rows": [["3", "Härte"]]}]},
+    )
+
+    tables = merged["tables"]
+    assert tables[0] == {"headers": headers, "rows": [["1", "Maß"], ["2", "Oberfläche"]], "source_pages": [1, 2]}
+    assert tables[1]["source_pages"] == [2]
+    # Nicht direkt auf die Tabelle folgend: neue Tabelle
+    assert tables[2] == {"headers": headers, "rows": [["3", "Härte"]], "source_pages": [3]}
+
+
+def test_header_and_footer_appear_once_while_content_repeats_are_kept():
+    merged = _merge(
+        {"all_extracted_texts": [HEADER, "Maß prüfen?", "Ja", "Nein", "Seite 1 von 2", FOOTER]},
+        {"all_extracted_texts": [HEADER, "Oberfläche prüfen?", "Ja", "Nein", "Seite 2 von 2", FOOTER]},
+    )
+
+    assert merged["all_extracted_texts"] == [
+        HEADER, "Maß prüfen?", "Ja", "Nein", "Seite 1 von 2", FOOTER,
+        "Oberfläche prüfen?", "Ja", "Nein", "Seite 2 von 2",
+    ]
+    assert merged["merge_info"]["repeated_texts"] == {HEADER: [1, 2], FOOTER: [1, 2]}
+
+
+def test_text_on_most_pages_is_a_header_unless_it_repeats_within_a_page():
+    merged = _merge(
+        {"all_extracted_texts": ["Deckblatt", "Inhalt", "Titel"]},
+        {"all_extracted_texts": ["Schritt A", "Stand 01/2024", "Ja", "Ja", "Schritt B", "Schritt C"]},
+        {"all_extracted_texts": ["Schritt D", "Stand 01/2024", "Ja", "Schritt E", "Schritt F"]},
+    )
+
+    texts = merged["all_extracted_texts"]
+    assert texts.count("Stand 01/2024") == 1
+    assert texts.count("Ja") == 3
+    assert merged["merge_info"]["repeated_texts"] == {"Stand 01/2024": [2, 3]}
+
+
+def test_repeated_objects_are_merged_with_source_pages():
+    reference = {"type": "ISO", "reference": "ISO 13485"}
+    merged = _merge({"references": [reference]}, {"references": [{"type": "iso", "reference": "ISO 13485"}]})
+
+    assert merged["references"] == [{**reference, "source_pages": [1, 2]}]
@@ -520,7 +520,7 @@ def process_document_with_prompt(file_data, upload_method: str = "visio", docume
 def get_documents(limit: int = 100) -> List[Dict]:
     """Lädt Dokumente von der API"""
     def _get_docs():
-        response = requests.get(f"{API_BASE_URL}/api/documents?limit={limit}", timeout=REQUEST_TIMEOUT)
+        response = requests.get(f"{API_BASE_URL}/api/documents?limit={limit}&view=summary", timeout=REQUEST_TIMEOUT)
         if response.status_code == 200:
             documents = response.json()
             logger.info(f"✅ {len(documents)} Dokumente geladen")
@@ -561,6 +561,29 @@ def delete_document(document_id: int) -> bool:
     result = safe_api_call(_delete)
     return result is True
 
+def get_document_preview_image(document_id: int, size: Optional[str] = None) -> Optional[bytes]:
+    """Lädt die Vorschau (binär, ``size``: small/medium/large-Thumbnail); bekannte Bilder werden per ETag revalidiert (304)"""
+    cache = st.session_state.setdefault("preview_cache", {})
+    cache_key = (document_id, size)
+    
+    def _get_preview():
+        cached = cache.get(cache_key)
+        headers = {"If-None-Match": cached["etag"]} if cached else {}
+        response = requests.get(
+            f"{API_BASE_URL}/api/documents/{document_id}/preview/image",
+            params={"size": size} if size else None,
+            headers=headers, timeout=REQUEST_TIMEOUT
+        )
+        if response.status_code == 304 and cached:
+            return cached["content"]
+        if response.status_code == 200:
+            if response.headers.get("ETag"):
+                cache[cache_key] = {"etag": response.headers["ETag"], "content": response.content}
+            return response.content
+        return None
+    
+    return safe_api_call(_get_preview)
+
 def analyze_document_with_ai(document_id: int, analyze_duplicates: bool = True) -> Optional[Dict]:
     """🤖 Führt KI-Analyse für ein Dokument durch"""
     def _analyze():
@@ -722,7 +745,7 @@ def change_document_status(document_id: int, new_status: str, comment: str = "",
 def get_documents_by_status(status: str) -> List[Dict]:
     """Lädt Dokumente nach Status gefiltert"""
     def _get_docs_by_status():
-        response = requests.get(f"{API_BASE_URL}/api/documents/status/{status}", timeout=REQUEST_TIMEOUT)
+        response = requests.get(f"{API_BASE_URL}/api/documents/status/{status}?view=summary", timeout=REQUEST_TIMEOUT)
         if response.status_code == 200:
             return response.json()
         return []
@@ -3276,6 +3299,14 @@ def render_documents_page():
             if doc.get('keywords'):
                 st.markdown(f"**🏷️ Keywords:** {doc.get('keywords')}")
             
+            # Vorschau-Thumbnail (nur auf Wunsch laden, Wiederholungen kosten ein 304)
+            if doc.get('file_path') and st.checkbox("🖼️ Vorschau anzeigen", key=f"preview_{doc['id']}"):
+                preview_image = get_document_preview_image(doc['id'], size="medium")
+                if preview_image:
+                    st.image(preview_image, use_container_width=True)
+                else:
+                    st.info("Keine PNG-Vorschau verfügbar")
+            
             # Aktionen
             col1, col2, col3, col4 = st.columns(4)
             